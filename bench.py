@@ -12,29 +12,75 @@ Fluxo padrão
 3. Grava resultados/bench.csv  (cabeçalhos com unidades claras)
 4. Empacota S*.csv em:
       resultados/resultados.tar        (rápido, sem compressão)
-   ou resultados/resultados.tar.gz     (--gz, mais lento)
+   ou resultados/resultados.tar.gz     (--gz, gzip em blocos paralelos —
+                                        --threads N, via pcompress)
+   Se o manifesto mostra o tar atual com os mesmos S*.csv, nada é refeito.
 
 Uso:
     python bench.py            # completo, tar sem gzip
     python bench.py --gz       # tar.gz
     python bench.py 15 13 --notar   # apenas S15 e S13, sem tar
+
+Modo estatístico (--stats)
+--------------------------
+Chama `lotogen.write_table` no próprio processo (sem subprocess/polling),
+com --warmup execuções descartadas e --reps repetições por cenário
+(k × formato × writer).  Reporta mediana, p95 e desvio‑padrão, grava
+resultados/bench_stats.json e, com --compare baseline.json, aponta
+regressões em "Linhas/s" e "MB gravados/s" (Mann‑Whitney unilateral,
+p < --alpha e queda da mediana > --min-drop).
+
+    python bench.py 13 --stats --reps 7 --warmup 1
+    python bench.py 13 --stats --compare base.json   # sai com 1 se regrediu
+
+Modo pipeline (--pipeline)
+--------------------------
+Roda geração → SB15_14…SB15_11 → verificação sob o mesmo harness e anexa
+uma linha por etapa (mais TOTAL) em resultados/pipeline_bench.csv:
+tempo, CPU user/sys, pico RSS real (ru_maxrss do kernel via wait4) e I/O
+em blocos, com máquina, Python e revisão git.
+
+    python bench.py --pipeline                     # tudo
+    python bench.py --pipeline --stages sb14 verify --jobs 4
+
+Linha do tempo (--timeline)
+---------------------------
+As métricas vêm do timeline.Recorder (thread lendo /proc a cada
+--sample-ms, 20 ms por padrão).  Com --timeline a série completa de cada
+execução (RSS, CPU, I/O, page faults e fase corrente) é gravada em
+resultados/timeline/, junto com as curvas de vazão e um resumo por fase.
+
+    python bench.py 13 --timeline --sample-ms 10
+    python bench.py --pipeline --stages sb14 --timeline
 Requer:  pip install psutil
 """
 
 from __future__ import annotations
 
 import argparse
+import contextlib
 import csv
+import io
+import json
+import os
+import platform
 import shutil
+import statistics
+import sys
 import tarfile
 import time
-from math import comb
+from datetime import datetime
+from math import comb, erf, sqrt
 from pathlib import Path
-from typing import List
+from typing import Dict, List, Tuple
 
-import psutil
 import subprocess
 
+import lotogen
+import manifest
+import pcompress
+import timeline
+
 # ─── Configurações ───────────────────────────────────────────────────────────
 RESULT_DIR = Path("resultados")
 DEFAULT_KS = [15, 14, 13, 12, 11]
@@ -42,6 +88,7 @@ DEFAULT_KS = [15, 14, 13, 12, 11]
 LOG_CSV = RESULT_DIR / "bench.csv"
 TAR_RAW = RESULT_DIR / "resultados.tar"
 TAR_GZ  = RESULT_DIR / "resultados.tar.gz"
+TIMELINE_DIR = RESULT_DIR / "timeline"
 
 CSV_HEADER = [
     "k",
@@ -64,6 +111,10 @@ def mb(val_bytes: int, digits: int = 1) -> float:
     return round(val_bytes / 1_048_576, digits)
 
 
+def timeline_path(label: str) -> Path:
+    return TIMELINE_DIR / f"{label}_{datetime.now():%Y%m%d-%H%M%S}.csv"
+
+
 def clean_result_dir() -> None:
     if RESULT_DIR.exists():
         shutil.rmtree(RESULT_DIR)
@@ -71,29 +122,23 @@ def clean_result_dir() -> None:
 
 
 # ─── Núcleo de coleta ────────────────────────────────────────────────────────
-def run_generator(k: int) -> dict:
+def run_generator(k: int, sample_ms: int = timeline.DEFAULT_SAMPLE_MS,
+                  keep_timeline: bool = False) -> dict:
     """Executa lotogen.py e retorna dicionário de métricas de desempenho."""
     cmd = ["python", "lotogen.py", str(k), "--csv", "--outdir", str(RESULT_DIR)]
     print("⚙️ ", " ".join(cmd))
 
     start = time.perf_counter()
-    proc = subprocess.Popen(cmd)
-    psp = psutil.Process(proc.pid)
-
-    peak_rss = 0
-    last_cpu_user = last_cpu_sys = last_io_bytes = 0
+    _, rec = timeline.run(cmd, sample_ms)
+    elapsed = round(time.perf_counter() - start, 2)
+    if keep_timeline:
+        timeline.save_outputs(rec.samples, timeline_path(f"gen_S{k}"))
 
-    while proc.poll() is None:  # loop até término
-        try:
-            mem = psp.memory_info().rss
-            peak_rss = max(peak_rss, mem)
-            last_cpu_user, last_cpu_sys = psp.cpu_times()[:2]
-            last_io_bytes = psp.io_counters().write_bytes
-        except psutil.Error:
-            break  # processo já finalizado
-        time.sleep(0.1)
+    peak_rss = rec.peak_rss_kb() * 1024
+    last_cpu_user = rec.last("user_ms") / 1000
+    last_cpu_sys = rec.last("sys_ms") / 1000
+    last_io_bytes = rec.last("write_bytes")
 
-    elapsed = round(time.perf_counter() - start, 2)
     combos = comb(25, k)
     lines_s = round(combos / elapsed, 1)
 
@@ -124,21 +169,327 @@ def save_csv(rows: List[dict]) -> None:
         writer.writeheader()
         writer.writerows(rows)
     print("📄 Log salvo em", LOG_CSV)
+    import historico                        # sqlite3 só ao registrar
+    historico.registrar(LOG_CSV)
 
 
-def create_tar(rows: List[dict], compress: bool) -> None:
-    """Empacota todos os S*.csv em tar (com ou sem gzip)."""
+def create_tar(rows: List[dict], compress: bool, threads: int = 0) -> None:
+    """Empacota todos os S*.csv em tar (com ou sem gzip paralelo)."""
     tar_path = TAR_GZ if compress else TAR_RAW
-    mode = "w:gz" if compress else "w"
+    srcs = [RESULT_DIR / r["Arquivo"] for r in rows]
+
+    # já existe, fresco, com exatamente estes membros? então não recomprime
+    meta = manifest.load()
+    members = {p.name: (manifest.lookup(p, meta) or {}).get("blake2b") for p in srcs}
+    prev = manifest.lookup(tar_path, meta)
+    if (prev and None not in members.values()
+            and prev["parametros"].get("membros") == members):
+        print("📦", tar_path, "já atualizado (manifesto) — nada a recomprimir.")
+        return
+
     print("🗜️  Empacotando em", tar_path.name)
-    with tarfile.open(tar_path, mode) as tar:
-        for r in rows:
-            src = RESULT_DIR / r["Arquivo"]
-            print("  • adicionando", src.name)
-            tar.add(src, arcname=src.name)
+    with open(tar_path, "wb") as raw:
+        out = (pcompress.ParallelGzipWriter(raw, threads=threads or None)
+               if compress else raw)
+        with tarfile.open(fileobj=out, mode="w|") as tar:
+            for src in srcs:
+                print("  • adicionando", src.name)
+                tar.add(src, arcname=src.name)
+        if compress:
+            out.close()
+    manifest.record(tar_path, len(rows), manifest.file_digest(tar_path), "bench.py",
+                    {"gz": compress, "ks": [r["k"] for r in rows], "membros": members})
     print("📦", tar_path, "criado.")
 
 
+# ─── Modo estatístico (in-process) ───────────────────────────────────────────
+STATS_JSON = RESULT_DIR / "bench_stats.json"
+STATS_DIR = RESULT_DIR / "_stats"           # saídas descartáveis das repetições
+STAT_METRICS = ("Linhas/s", "MB gravados/s")
+SCENARIOS = [("csv", "csv"), ("csv", "join"), ("csv", "batch"),
+             ("txt", "join"), ("txt", "batch")]
+
+
+def percentile(xs: List[float], q: float) -> float:
+    """Percentil com interpolação linear (q em 0–100)."""
+    ys = sorted(xs)
+    pos = (len(ys) - 1) * q / 100
+    lo = int(pos)
+    hi = min(lo + 1, len(ys) - 1)
+    return ys[lo] + (ys[hi] - ys[lo]) * (pos - lo)
+
+
+def summarize(xs: List[float]) -> dict:
+    return {
+        "mediana": round(statistics.median(xs), 3),
+        "p95": round(percentile(xs, 95), 3),
+        "desvio": round(statistics.stdev(xs), 3) if len(xs) > 1 else 0.0,
+        "min": round(min(xs), 3),
+        "max": round(max(xs), 3),
+        "amostras": [round(x, 3) for x in xs],
+    }
+
+
+def run_once(k: int, fmt: str, writer: str) -> Dict[str, float]:
+    """Uma execução de write_table no processo atual (saída silenciada)."""
+    target = STATS_DIR / f"S{k}.{fmt}"
+    sink = io.StringIO()
+    t0 = time.perf_counter()
+    c0 = time.process_time()
+    with contextlib.redirect_stdout(sink), contextlib.redirect_stderr(sink):
+        lotogen.write_table(k, STATS_DIR, csv_mode=fmt == "csv",
+                            step=lotogen.nchoosek(k), writer=writer, record=False)
+    elapsed = time.perf_counter() - t0
+    cpu = time.process_time() - c0
+    size = target.stat().st_size
+    target.unlink()
+    return {
+        "Tempo (s)": elapsed,
+        "CPU (s)": cpu,
+        "Linhas/s": comb(25, k) / elapsed,
+        "MB gravados/s": size / 1_048_576 / elapsed,
+    }
+
+
+def run_stats(ks: List[int], reps: int, warmup: int,
+              scenarios: List[Tuple[str, str]]) -> dict:
+    STATS_DIR.mkdir(parents=True, exist_ok=True)
+    result = {
+        "meta": {
+            "data": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "plataforma": platform.platform(),
+            "cpu": platform.processor() or platform.machine(),
+            "reps": reps,
+            "warmup": warmup,
+        },
+        "cenarios": {},
+    }
+    for k in ks:
+        for fmt, writer in scenarios:
+            name = f"S{k}/{fmt}/{writer}"
+            print(f"⏱  {name}: {warmup} aquecimento + {reps} repetições")
+            for _ in range(warmup):
+                run_once(k, fmt, writer)
+            samples = [run_once(k, fmt, writer) for _ in range(reps)]
+            result["cenarios"][name] = {
+                m: summarize([s[m] for s in samples]) for m in samples[0]
+            }
+    shutil.rmtree(STATS_DIR, ignore_errors=True)
+    return result
+
+
+def print_stats(result: dict) -> None:
+    print(f"\n{'cenário':<18} {'Linhas/s (med)':>15} {'MB/s (med)':>11}"
+          f" {'t p95 (s)':>10} {'σ t (s)':>8}")
+    for name, m in result["cenarios"].items():
+        print(f"{name:<18} {m['Linhas/s']['mediana']:>15,.0f} {m['MB gravados/s']['mediana']:>11.2f}"
+              f" {m['Tempo (s)']['p95']:>10.2f} {m['Tempo (s)']['desvio']:>8.3f}")
+
+
+def mann_whitney_less(cur: List[float], base: List[float]) -> float:
+    """p-valor unilateral de H1: `cur` tende a ser menor que `base`.
+
+    Distribuição exata de U (programação dinâmica) para amostras pequenas,
+    aproximação normal com correção de continuidade acima de 20 cada.
+    """
+    n1, n2 = len(cur), len(base)
+    u = sum((c < b) + 0.5 * (c == b) for c in cur for b in base)
+    if n1 <= 20 and n2 <= 20:
+        # counts[(i, j)][v] = nº de ordenações com U = v.  O maior elemento
+        # vem de `cur` (soma 0 pares) ou de `base` (soma i pares).
+        counts = {(0, 0): [1]}
+        for i in range(n1 + 1):
+            for j in range(n2 + 1):
+                if i == j == 0:
+                    continue
+                dist = [0] * (i * j + 1)
+                if i:
+                    for v, c in enumerate(counts[(i - 1, j)]):
+                        dist[v] += c
+                if j:
+                    for v, c in enumerate(counts[(i, j - 1)]):
+                        dist[v + i] += c
+                counts[(i, j)] = dist
+        dist = counts[(n1, n2)]
+        total = sum(dist)
+        return sum(c for v, c in enumerate(dist) if v >= u) / total
+    mu = n1 * n2 / 2
+    sigma = sqrt(n1 * n2 * (n1 + n2 + 1) / 12)
+    z = (u - 0.5 - mu) / sigma
+    return 0.5 * (1 - erf(z / sqrt(2)))
+
+
+def compare(result: dict, baseline_path: Path, alpha: float, min_drop: float) -> int:
+    """Imprime a comparação com a baseline e devolve nº de regressões."""
+    base = json.loads(baseline_path.read_text(encoding="utf8"))
+    regressions = 0
+    print(f"\n📊 Comparação com {baseline_path}")
+    for name, cur in result["cenarios"].items():
+        if name not in base.get("cenarios", {}):
+            print(f"  • {name}: ausente na baseline")
+            continue
+        for metric in STAT_METRICS:
+            a = cur[metric]["amostras"]
+            b = base["cenarios"][name][metric]["amostras"]
+            drop = 1 - statistics.median(a) / statistics.median(b)
+            p = mann_whitney_less(a, b)
+            flag = p < alpha and drop > min_drop
+            regressions += flag
+            mark = "❌ REGRESSÃO" if flag else "ok"
+            print(f"  {name:<18} {metric:<14} {-drop:+7.1%}  p={p:.3f}  {mark}")
+    return regressions
+
+
+# ─── Modo pipeline (--pipeline) ──────────────────────────────────────────────
+PIPE_CSV = RESULT_DIR / "pipeline_bench.csv"
+PIPE_HEADER = [
+    "Data", "Revisão", "Máquina", "Python", "Etapa", "Comando", "Status",
+    "Tempo (s)", "CPU usuário (s)", "CPU sistema (s)", "Pico RSS (MB)",
+    "I/O lido (MB)", "I/O gravado (MB)",
+]
+RSS_UNIT = 1 if sys.platform == "darwin" else 1024   # ru_maxrss: bytes × KiB
+BLOCK = 512                                          # ru_inblock/oublock
+
+
+def pipeline_stages(stream: bool, jobs: int) -> Dict[str, List[str]]:
+    py = sys.executable
+    extra = ["--stream"] if stream else []
+    return {
+        "gen":    [py, "lotogen.py", "--all", "--csv", "--outdir", str(RESULT_DIR)],
+        "sb14":   [py, "programa2.py", *extra],
+        "sb13":   [py, "programa3.py", *extra],
+        "sb12":   [py, "programa4.py", *extra],
+        "sb11":   [py, "programa5.py", *extra],
+        "verify": [py, "verify_all.py", "--jobs", str(jobs)],
+    }
+
+
+def git_revision() -> str:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"],
+                             capture_output=True, text=True, timeout=5)
+        return out.stdout.strip() or "-"
+    except (OSError, subprocess.SubprocessError):
+        return "-"
+
+
+def run_stage(cmd: List[str], tl_label: str = "", sample_ms: int = 0) -> dict:
+    """Executa uma etapa e devolve métricas do processo (e descendentes).
+
+    POSIX: os.wait4 dá o pico de RSS registrado pelo kernel (sem perder
+    picos entre amostras); CPU e blocos de I/O vêm do delta de
+    RUSAGE_CHILDREN, que inclui os workers que a etapa aguardou.
+    Sem wait4 (Windows) recorre ao polling psutil.
+    Com `tl_label`, um timeline.Recorder grava a série da etapa em paralelo.
+    """
+    start = time.perf_counter()
+    if tl_label:
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE,
+                                env={**os.environ, "PYTHONUNBUFFERED": "1"})
+        rec = timeline.Recorder(proc.pid, sample_ms).start()
+        pump = rec.follow(proc.stdout)
+    else:
+        proc = subprocess.Popen(cmd)
+    try:
+        return _wait_stage(proc, start)
+    finally:
+        if tl_label:
+            pump.join()
+            rec.stop()
+            timeline.save_outputs(rec.samples, timeline_path(tl_label))
+
+
+def _wait_stage(proc: subprocess.Popen, start: float) -> dict:
+    if hasattr(os, "wait4"):
+        import resource
+        before = resource.getrusage(resource.RUSAGE_CHILDREN)
+        _, status, ru = os.wait4(proc.pid, 0)
+        proc.returncode = (os.WEXITSTATUS(status) if os.WIFEXITED(status)
+                           else -os.WTERMSIG(status))
+        after = resource.getrusage(resource.RUSAGE_CHILDREN)
+        return {
+            "rc": proc.returncode,
+            "Tempo (s)": round(time.perf_counter() - start, 2),
+            "CPU usuário (s)": round(after.ru_utime - before.ru_utime, 2),
+            "CPU sistema (s)": round(after.ru_stime - before.ru_stime, 2),
+            "Pico RSS (MB)": mb(ru.ru_maxrss * RSS_UNIT),
+            "I/O lido (MB)": mb((after.ru_inblock - before.ru_inblock) * BLOCK),
+            "I/O gravado (MB)": mb((after.ru_oublock - before.ru_oublock) * BLOCK),
+        }
+
+    import psutil
+    psp = psutil.Process(proc.pid)
+    peak = cpu_u = cpu_s = rd = wr = 0
+    while proc.poll() is None:
+        try:
+            mi = psp.memory_info()
+            peak = max(peak, getattr(mi, "peak_wset", 0) or mi.rss)
+            cpu_u, cpu_s = psp.cpu_times()[:2]
+            io_ = psp.io_counters()
+            rd, wr = io_.read_bytes, io_.write_bytes
+        except psutil.Error:
+            break
+        time.sleep(0.1)
+    return {
+        "rc": proc.returncode,
+        "Tempo (s)": round(time.perf_counter() - start, 2),
+        "CPU usuário (s)": round(cpu_u, 2),
+        "CPU sistema (s)": round(cpu_s, 2),
+        "Pico RSS (MB)": mb(peak),
+        "I/O lido (MB)": mb(rd),
+        "I/O gravado (MB)": mb(wr),
+    }
+
+
+def run_pipeline(names: List[str], stream: bool, jobs: int,
+                 keep_timeline: bool = False,
+                 sample_ms: int = timeline.DEFAULT_SAMPLE_MS) -> List[dict]:
+    import psutil
+    stages = pipeline_stages(stream, jobs)
+    base = {
+        "Data": datetime.now().isoformat(timespec="seconds"),
+        "Revisão": git_revision(),
+        "Máquina": f"{platform.node()} ({os.cpu_count()} CPUs, "
+                   f"{mb(psutil.virtual_memory().total, 0):.0f} MB)",
+        "Python": platform.python_version(),
+    }
+    rows: List[dict] = []
+    for name in names:
+        cmd = stages[name]
+        print(f"\n🏁 Etapa {name}: {' '.join(cmd[1:])}")
+        m = run_stage(cmd, name if keep_timeline else "", sample_ms)
+        rc = m.pop("rc")
+        rows.append({**base, "Etapa": name, "Comando": " ".join(cmd[1:]),
+                     "Status": "ok" if rc == 0 else f"falha ({rc})", **m})
+        print(f"   ⏱ {m['Tempo (s)']} s · pico {m['Pico RSS (MB)']} MB · rc={rc}")
+        if rc != 0:
+            print("   ⛔ etapa falhou — etapas seguintes dependem dela, parando.")
+            break
+
+    total = {**base, "Etapa": "TOTAL", "Comando": "-",
+             "Status": "ok" if all(r["Status"] == "ok" for r in rows) else "falha"}
+    for col in ("Tempo (s)", "CPU usuário (s)", "CPU sistema (s)",
+                "I/O lido (MB)", "I/O gravado (MB)"):
+        total[col] = round(sum(r[col] for r in rows), 2)
+    total["Pico RSS (MB)"] = max((r["Pico RSS (MB)"] for r in rows), default=0)
+    rows.append(total)
+    return rows
+
+
+def save_pipeline_csv(rows: List[dict]) -> None:
+    """Anexa a execução em pipeline_bench.csv (histórico entre máquinas/revisões)."""
+    first = not PIPE_CSV.exists()
+    with PIPE_CSV.open("a", newline="", encoding="utf8") as f:
+        writer = csv.DictWriter(f, fieldnames=PIPE_HEADER)
+        if first:
+            writer.writeheader()
+        writer.writerows(rows)
+    print("📄 Log salvo em", PIPE_CSV)
+    import historico                        # sqlite3 só ao registrar
+    historico.registrar(PIPE_CSV)
+
+
 # ─── CLI ─────────────────────────────────────────────────────────────────────
 def parse_args() -> argparse.Namespace:
     ap = argparse.ArgumentParser(description="Benchmark Lotofácil (Sk → CSV)")
@@ -146,6 +497,33 @@ def parse_args() -> argparse.Namespace:
     ap.add_argument("--keep", action="store_true", help="não limpar ./resultados/")
     ap.add_argument("--gz",   action="store_true", help="criar resultados.tar.gz (compactado)")
     ap.add_argument("--notar", action="store_true", help="não criar arquivo tar")
+    ap.add_argument("--threads", type=int, default=0,
+                    help="threads de compressão do --gz (0 = nº de CPUs)")
+    ap.add_argument("--stats", action="store_true",
+                    help="benchmark in-process com repetições e estatísticas")
+    ap.add_argument("--reps", type=int, default=5, help="repetições medidas (--stats)")
+    ap.add_argument("--warmup", type=int, default=1, help="execuções descartadas (--stats)")
+    ap.add_argument("--scenario", action="append", metavar="FMT/WRITER",
+                    help="restringe cenários (ex.: csv/batch); repetível")
+    ap.add_argument("--json", type=Path, default=STATS_JSON, help="arquivo JSON de saída")
+    ap.add_argument("--compare", type=Path, metavar="BASELINE.json",
+                    help="sinaliza regressões contra uma execução anterior")
+    ap.add_argument("--alpha", type=float, default=0.05, help="nível de significância")
+    ap.add_argument("--min-drop", type=float, default=0.03,
+                    help="queda mínima da mediana p/ contar como regressão (fração)")
+    ap.add_argument("--pipeline", action="store_true",
+                    help="mede geração, programas 2‑5 e verificação de ponta a ponta")
+    ap.add_argument("--stages", nargs="+", metavar="ETAPA",
+                    choices=list(pipeline_stages(False, 1)),
+                    help="subconjunto de etapas do --pipeline (ordem preservada)")
+    ap.add_argument("--stream", action="store_true",
+                    help="programas 2‑5 em modo --stream (--pipeline)")
+    ap.add_argument("--jobs", type=int, default=1,
+                    help="processos do verify_all (--pipeline)")
+    ap.add_argument("--timeline", action="store_true",
+                    help="grava a série de recursos de cada execução em resultados/timeline/")
+    ap.add_argument("--sample-ms", type=int, default=timeline.DEFAULT_SAMPLE_MS,
+                    help="intervalo de amostragem da linha do tempo (ms)")
     return ap.parse_args()
 
 
@@ -154,16 +532,41 @@ def main() -> None:
     args = parse_args()
     ks = DEFAULT_KS if not args.ks else args.ks
 
+    if args.pipeline:
+        RESULT_DIR.mkdir(exist_ok=True)
+        order = list(pipeline_stages(False, 1))
+        names = [n for n in order if n in args.stages] if args.stages else order
+        rows = run_pipeline(names, args.stream, args.jobs,
+                            args.timeline, args.sample_ms)
+        save_pipeline_csv(rows)
+        if rows[-1]["Status"] != "ok":
+            sys.exit(1)
+        return
+
+    if args.stats:
+        scenarios = ([tuple(s.split("/")) for s in args.scenario]
+                     if args.scenario else SCENARIOS)
+        RESULT_DIR.mkdir(exist_ok=True)
+        result = run_stats(ks, args.reps, args.warmup, scenarios)
+        print_stats(result)
+        args.json.write_text(json.dumps(result, ensure_ascii=False, indent=1), encoding="utf8")
+        print("📄 Estatísticas salvas em", args.json)
+        import historico                        # sqlite3 só ao registrar
+        historico.registrar(args.json)
+        if args.compare and compare(result, args.compare, args.alpha, args.min_drop):
+            sys.exit(1)
+        return
+
     if not args.keep and ks == DEFAULT_KS:
         clean_result_dir()
     else:
         RESULT_DIR.mkdir(exist_ok=True)
 
-    rows = [run_generator(k) for k in ks]
+    rows = [run_generator(k, args.sample_ms, args.timeline) for k in ks]
     save_csv(rows)
 
     if not args.notar:
-        create_tar(rows, compress=args.gz)
+        create_tar(rows, compress=args.gz, threads=args.threads)
 
 
 if __name__ == "__main__":
@@ -6,15 +6,25 @@ calcular_custo_sb.py  –  Calcula custo financeiro e gera relatório CSV.
 
 • Para cada SB15_k (k = 14,13,12,11) conta linhas, multiplica por R$ 3,00
   e registra situação de verificação (arquivo presente / ausente).
+• As linhas vêm do manifest.json quando o arquivo ainda é o registrado
+  (O(1)), ou do cabeçalho do SB15_k.sb; só o resto é recontado.
 • Salva tabela consolidada em  `resultados/custo_sb.csv`  (cria pasta
   se ainda não existir) **e** imprime visão amigável no terminal.
 • Saída CSV facilita anexar ao REPORT ou importar em Excel.
+• Com --sorteio/--sorteios, avalia cada SB contra os sorteios (premios.py:
+  máscaras uint32 + popcount vetorizado) e reporta acertos 11‑15, retorno
+  médio por sorteio e saldo (retorno − custo).
 
 Uso:
     python calcular_custo_sb.py
+    python calcular_custo_sb.py --sorteio 2,3,5,6,9,10,11,13,14,16,18,20,23,24,25
+    python calcular_custo_sb.py --sorteios historico.csv --premio 14=1800
 """
 from pathlib import Path
-import csv, sys
+import argparse, csv, sys
+
+import manifest
+import sbformat
 
 CARD_PRICE = 3.00
 RESULT_DIR = Path("prog7_saida")
@@ -27,37 +37,96 @@ SB_PATHS = {
     "SB15_11": Path("prog5_saida/SB15_11.csv"),
 }
 
+FIELDS = ["SB", "Linhas", "Custo_R$", "Status", "Verificado",
+          "Acertos_11", "Acertos_12", "Acertos_13", "Acertos_14", "Acertos_15",
+          "Retorno_R$", "Saldo_R$"]
+
+def parse_args() -> argparse.Namespace:
+    ap = argparse.ArgumentParser(description="Custo (e retorno) de cada SB15_k")
+    ap.add_argument("--sorteio", action="append", default=[], metavar="D1,…,D15",
+                    help="sorteio para calcular o retorno (repetível)")
+    ap.add_argument("--sorteios", type=Path, help="CSV com um sorteio por linha")
+    ap.add_argument("--premio", action="append", metavar="FAIXA=R$",
+                    help="valor de uma faixa (ex.: 14=1800); repetível")
+    return ap.parse_args()
+
+def load_draws(args: argparse.Namespace):
+    """Máscaras dos sorteios pedidos (None se nenhum) — numpy só se preciso."""
+    if not args.sorteio and not args.sorteios:
+        return None
+    np = sbformat._numpy()
+    if np is None:
+        sys.exit("❌ --sorteio/--sorteios requer numpy (pip install numpy).")
+    import premios
+    parts = [np.array([premios.parse_draw(s) for s in args.sorteio], dtype=np.uint32)]
+    if args.sorteios:
+        if not args.sorteios.exists():
+            sys.exit(f"❌ {args.sorteios} não encontrado.")
+        parts.append(premios.load_draws(args.sorteios))
+    return np.concatenate(parts)
+
+def evaluate(path: Path, draws, table: dict, cost: float) -> dict:
+    """Médias por sorteio de acertos 11‑15, retorno e saldo."""
+    import premios
+    hists = premios.batch_histograms(premios.load_sb(path), draws)
+    mean = hists.mean(axis=0)
+    ret = float(premios.prize_total(hists, table).mean())
+    out = {f"Acertos_{h}": round(float(mean[h]), 2) for h in premios.HITS}
+    out.update({"Retorno_R$": f"{ret:.2f}", "Saldo_R$": f"{ret - cost:.2f}"})
+    return out
+
 def main() -> None:
+    args = parse_args()
+    draws = load_draws(args)
+    if draws is not None:
+        import premios
+        table = premios.parse_premios(args.premio)
     rows = []
+    meta = manifest.load()
     print("Subconjunto | Linhas | Custo (R$) | Status")
 
     for label, path in SB_PATHS.items():
         if not path.exists():
             print(f"{label:<11} |    —    |    —      | arquivo ausente")
-            rows.append({"SB": label, "Linhas": "-", "Custo_R$": "-", "Status": "MISSING"})
+            rows.append({"SB": label, "Linhas": "-", "Custo_R$": "-",
+                         "Status": "MISSING", "Verificado": "-"})
             continue
 
-        # conta linhas rapidamente lendo em modo binário
-        with path.open("rb") as f:
-            n_lines = sum(1 for _ in f)
+        # manifesto fresco ou cabeçalho do .sb → O(1); senão conta as linhas
+        entry = manifest.lookup(path, meta)
+        binary = sbformat.is_binary(sbformat.resolve(path))
+        n_lines = manifest.count_rows(path, meta) if entry or not binary else sbformat.count(path)
+        verified = ((entry or {}).get("verificacao") or {}).get("status", "-")
         cost = n_lines * CARD_PRICE
 
-        print(f"{label:<11} | {n_lines:>7,} | R$ {cost:>11,.2f} | ok".replace(",","."))
-        rows.append({
+        origin = "manifesto" if entry else ".sb" if binary else "contado"
+        print(f"{label:<11} | {n_lines:>7,} | R$ {cost:>11,.2f} | ok".replace(",",".")
+              + f" ({origin} · verif.: {verified})")
+        row = {
             "SB": label,
             "Linhas": n_lines,
             "Custo_R$": f"{cost:.2f}",
-            "Status": "OK"
-        })
+            "Status": "OK",
+            "Verificado": verified,
+        }
+        if draws is not None:
+            row.update(evaluate(path, draws, table, cost))
+            print(f"{'':<11}   acertos/sorteio "
+                  + " ".join(f"{h}:{row[f'Acertos_{h}']}" for h in premios.HITS)
+                  + (f" | retorno R$ {float(row['Retorno_R$']):,.2f}"
+                     f" | saldo R$ {float(row['Saldo_R$']):,.2f}").replace(",", "."))
+        rows.append(row)
 
     # ------------- grava CSV -------------
     RESULT_DIR.mkdir(exist_ok=True)
     with CSV_OUT.open("w", newline="", encoding="utf8") as fcsv:
-        writer = csv.DictWriter(fcsv, fieldnames=["SB", "Linhas", "Custo_R$", "Status"])
+        writer = csv.DictWriter(fcsv, fieldnames=FIELDS, restval="-")
         writer.writeheader()
         writer.writerows(rows)
 
     print(f"\n📄 Arquivo de custo salvo em {CSV_OUT}\n")
+    import historico                        # sqlite3 só ao registrar
+    historico.registrar(CSV_OUT)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,479 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# AUTOR: Leonardo dos Santos Marques
+"""
+cover_engine.py — motores de seleção compartilhados pelos programas 2‑5.
+
+    lazy         greedy clássico com heap de ganhos "preguiçosos" (o padrão;
+                 implementado em cada programa)
+    estocastico  stochastic greedy (Mirzasoleiman et al., 2015): a cada passo
+                 avalia só uma amostra aleatória de s candidatos,
+
+                     s = ⌈ n / k̂ · ln(1/ε) ⌉      (n = |S15|, k̂ = limite inferior)
+
+                 e escolhe o melhor dela.  Para cobertura máxima com k̂
+                 escolhas isso garante (1 − 1/e − ε) do ótimo em esperança,
+                 com O(n·ln(1/ε)) avaliações no total em vez de ~O(n·log n).
+    paralelo     greedy por limiares em lotes (Berger–Rompel–Shor / Blelloch
+                 et al.): limiar t cai por (1+ε); a cada rodada processos
+                 reavaliam os candidatos cujo último ganho (um teto) ainda
+                 é ≥ t, sobre o mapa de descobertas em memória compartilhada,
+                 e os pendentes passam em janelas: cada S_k fica com o lance
+                 de maior prioridade (ganho, linha) — mínimo da chave num
+                 mapa uint32 de 2^25 em memória compartilhada — e só entra
+                 quem mantém ≥ t elementos próprios.  Lance, posse e baixa
+                 rodam nos processos; o principal só ordena a fila.
+                 Garantia (1+ε)·H(m); na prática α fica a < 1 % do lazy.
+                 Trabalha direto nas máscaras (S15 pelo posto lexicográfico):
+                 dispensa S_k.csv, o texto de S15 e os índices.
+
+Condição de cobertura: por padrão um cartão cobre as C(15,k) S_k que contém
+(`_omit_matrix`).  Com `acertos=t` (motor paralelo, universo = os C(25,15)
+sorteios) cobre todo sorteio com que tenha ≥ t acertos — garantia "todo
+sorteio acerta ≥ t em algum cartão" (garantia.py --gerar T).  A vizinhança
+são os sorteios a r ≤ 15 − t trocas do cartão,
+
+    |V(t)| = Σ_r C(15,r)·C(10,r)     t = 14: 151 · 13: 4 876 · 12: 59 476 · 11: 346 126
+
+e não é guardada: tabelas de deslocamento fixas (quais das 15 posições do
+cartão saem × quais das 10 de fora entram, por r) viram máscaras em lote
+com dois produtos float64 e um XOR em broadcast (`_hit_masks`), direto no
+espaço de máscaras indexado pelo mapa de 2^25 bytes.  Custo por passada
+≈ 3,27 M × |V(t)| consultas; num núcleo t = 14 leva 2 min e t = 13, 37 min
+(12 e 11 só com muitos --jobs).
+
+Como o ganho de um candidato só diminui, o último ganho medido é um limite
+superior: a amostra é avaliada em ordem decrescente desse limite e para
+quando nenhum restante pode superar o melhor já visto (mesma escolha, menos
+avaliações).  Candidatos com ganho zero saem do pool, então o fim da
+cobertura não degenera em amostragem vazia e termina sempre em 100 %.
+
+Os logs cover{k}_log.csv ganham as colunas Motor, Epsilon, Amostra e
+Avaliacoes (avaliações de ganho), para comparar qualidade (SB_size/α) ×
+tempo entre os motores; `append_log` migra o cabeçalho de logs antigos.
+
+Com `tel` (telemetry.py) cada passo informa avaliações, avaliações "velhas"
+(limite acima do ganho real), melhor ganho da amostra e tamanho do pool.
+"""
+from __future__ import annotations
+
+import argparse, csv, math, os, random, sys
+from array import array
+from functools import partial
+from itertools import combinations
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+ENGINES = ("lazy", "estocastico", "paralelo")
+DEFAULT_EPS = 0.1
+CHUNK_CELLS = 1 << 22                  # candidatos × C(15,k) por bloco vetorizado
+ENGINE_FIELDS = ["Motor", "Epsilon", "Amostra", "Avaliacoes"]
+DEFAULT_SHARD = 65_536                 # linhas S15 por faixa de --workers (cover_workers.py)
+
+def add_workers_args(p: argparse.ArgumentParser) -> None:
+    """--workers/--faixa dos programas 2‑5 sem importar cover_workers (socket,
+    threading, subprocess): o módulo só carrega quando --workers é usado."""
+    p.add_argument("--workers", metavar="HOST:PORTA,…",
+                   help="pré-passada em workers TCP (cover_workers.py worker); "
+                        "local:N sobe N workers neste host")
+    p.add_argument("--faixa", type=int, default=DEFAULT_SHARD,
+                   help="linhas S15 por faixa enviada a um worker")
+
+def sample_size(n_rows: int, k_est: int, eps: float) -> int:
+    """s = ⌈n/k̂ · ln(1/ε)⌉, limitado a [1, n]."""
+    if not 0 < eps < 1:
+        raise ValueError("ε deve estar em (0, 1)")
+    return max(1, min(n_rows, math.ceil(n_rows / max(1, k_est) * math.log(1 / eps))))
+
+def stochastic_greedy(n_rows: int, ids_of: Callable[[int], Sequence[int]],
+                      uncovered: Set[int], k_est: int, eps: float = DEFAULT_EPS,
+                      seed: int = 0, pct_step: float = 1.0, tel=None
+                      ) -> Tuple[List[int], Dict[str, int]]:
+    """Cobre `uncovered` (modificado no lugar); devolve linhas escolhidas e contadores."""
+    rng = random.Random(seed)
+    total = len(uncovered)
+    s = sample_size(n_rows, k_est, eps)
+    pool = list(range(n_rows))
+    bound = array("H", [min(len(ids_of(0)), 0xFFFF)]) * n_rows   # ganho máximo possível
+    chosen: List[int] = []
+    evals = stale = 0
+    next_print = pct_step
+    while uncovered:
+        best_gain, best_rid, best_new = 0, -1, None
+        dead = set()
+        sample = [rng.randrange(len(pool)) for _ in range(min(s, len(pool)))]
+        sample.sort(key=lambda j: bound[pool[j]], reverse=True)
+        for j in sample:                             # o limite poupa avaliações inúteis
+            rid = pool[j]
+            if bound[rid] <= best_gain:
+                break
+            new = [i for i in ids_of(rid) if i in uncovered]
+            if len(new) < bound[rid]:
+                stale += 1
+            bound[rid] = len(new)
+            evals += 1
+            if not new:
+                dead.add(j)
+            elif len(new) > best_gain:
+                best_gain, best_rid, best_new = len(new), rid, new
+        for j in sorted(dead, reverse=True):        # remoção O(1): troca com o último
+            pool[j] = pool[-1]
+            pool.pop()
+        if best_new is None:
+            if not pool:
+                raise RuntimeError("pool de candidatos esgotado com elementos descobertos")
+            continue
+        uncovered.difference_update(best_new)
+        chosen.append(best_rid)
+        if tel is not None:
+            tel.tick(total - len(uncovered), len(chosen), evals, stale, best_gain, len(pool))
+
+        pct = 100 * (total - len(uncovered)) / total
+        if pct >= next_print or not uncovered:
+            print(f"   {pct:6.2f}% coberto | SB tamanho: {len(chosen):,} | "
+                  f"{evals:,} avaliações")
+            next_print += pct_step
+    if tel is not None:
+        tel.tick(total, len(chosen), evals, stale, 0, len(pool), force=True)
+    return chosen, {"amostra": s, "avaliacoes": evals}
+
+# ─── Greedy paralelo por limiares ──────────────────────────────────────────
+_W: Dict[str, object] = {}             # estado do processo de trabalho
+
+def _pick_matrix(np, n: int, r: int):
+    """(n, C(n,r)): 1 nas posições escolhidas de cada r‑combinação de n."""
+    combos = list(combinations(range(n), r))
+    m = np.zeros((n, len(combos)))
+    for j, c in enumerate(combos):
+        m[list(c), j] = 1
+    return m
+
+def _omit_matrix(np, k: int):
+    """(15, C(15,k)): 1 nas posições omitidas de cada sub-combinação."""
+    return _pick_matrix(np, 15, 15 - k)
+
+def hit_size(t: int) -> int:
+    """Sorteios com ≥ t acertos de um cartão: Σ_{r ≤ 15−t} C(15,r)·C(10,r)."""
+    return sum(math.comb(15, r) * math.comb(10, r) for r in range(16 - t))
+
+def _hit_tables(np, t: int):
+    """Por r = 0…15−t: (posições do cartão que saem, posições de fora que entram)."""
+    return [(_pick_matrix(np, 15, r), _pick_matrix(np, 10, r)) for r in range(16 - t)]
+
+def _bit_values(np, x, count: int):
+    """(c, count) float64: os `count` bits ligados de cada x, do menor ao maior.
+
+    Isola o bit mais baixo (x & −x) `count` vezes — ~2,5× mais rápido que
+    np.nonzero sobre a matriz (c, 25) de bits.
+    """
+    x = x.astype(np.uint32)
+    out = np.empty((len(x), count), np.uint32)
+    for i in range(count):
+        low = x & (~x + np.uint32(1))
+        out[:, i] = low
+        x ^= low
+    return out.astype(np.float64)
+
+def _submasks(np, cards, omit):
+    """Máscaras S_k contidas em cada cartão: (c, C(15,k)) uint32.
+
+    Soma dos bits omitidos por produto de matrizes em float64 (BLAS; exato,
+    somas < 2^25) — ~6× mais rápido que matmul inteiro ou XOR por coluna.
+    """
+    return cards[:, None] ^ (_bit_values(np, cards, 15) @ omit).astype(np.uint32)
+
+def _hit_masks(np, cards, tables):
+    """Sorteios com ≥ t acertos de cada cartão: (c, hit_size(t)) uint32.
+
+    Trocar r dezenas do cartão por r de fora = XOR da soma de r bits de
+    dentro com a de r bits de fora; as somas saem de produtos float64 como
+    em _submasks e o broadcast (c, C(15,r), C(10,r)) monta todas as trocas.
+    """
+    inside = _bit_values(np, cards, 15)
+    outside = _bit_values(np, ~cards & np.uint32((1 << 25) - 1), 10)
+    parts = []
+    for rem, add in tables:
+        out = (cards[:, None] ^ (inside @ rem).astype(np.uint32))[:, :, None]
+        parts.append((out ^ (outside @ add).astype(np.uint32)[:, None, :]).reshape(len(cards), -1))
+    return np.concatenate(parts, axis=1)
+
+def _neighborhood(np, k: int, acertos: Optional[int]):
+    """(função cartões → máscaras cobertas, nº por cartão) da condição de cobertura."""
+    if acertos:
+        return partial(_hit_masks, np, tables=_hit_tables(np, acertos)), hit_size(acertos)
+    return partial(_submasks, np, omit=_omit_matrix(np, k)), math.comb(15, k)
+
+def _gain_dtype(np, per_row: int):
+    return np.uint16 if per_row <= 0xFFFF else np.uint32
+
+def _popcount(np, x):
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(x)
+    x = x - ((x >> 1) & 0x55555555)
+    x = (x & 0x33333333) + ((x >> 2) & 0x33333333)
+    x = (x + (x >> 4)) & 0x0F0F0F0F
+    return ((x * 0x01010101) & 0xFFFFFFFF) >> 24
+
+ROW_BITS = 22                          # chave de prioridade uint32: nível de ganho | linha
+LEVELS = 1 << (32 - ROW_BITS)
+FREE = 0xFFFFFFFF                      # S_k sem lance na janela
+
+def _attach(names: Tuple[str, ...], n: int, k: int, acertos: Optional[int] = None) -> None:
+    import numpy as np
+    from multiprocessing import shared_memory
+    shms = [shared_memory.SharedMemory(name=x) for x in names]
+    nb, per_row = _neighborhood(np, k, acertos)
+    _W.update(np=np, shms=shms, nb=nb, per_row=per_row,
+              step=max(1, CHUNK_CELLS // per_row),
+              cards=np.ndarray(n, np.uint32, shms[0].buf),
+              unc=np.ndarray(1 << 25, np.uint8, shms[1].buf),
+              gain=np.ndarray(n, _gain_dtype(np, per_row), shms[2].buf),
+              win=np.ndarray(1 << 25, np.uint32, shms[3].buf))
+
+def _key(np, rows, g, t: int):
+    """Prioridade (menor vence): ganho acima de t decrescente, depois a linha."""
+    level = (LEVELS - 1 - np.minimum(g.astype(np.int64) - t, LEVELS - 1)).astype(np.uint32)
+    return (level << np.uint32(ROW_BITS)) | rows.astype(np.uint32)
+
+def _chunks(rows):
+    """(linhas, máscaras vizinhas) em blocos de CHUNK_CELLS células."""
+    step = _W["step"]
+    for a in range(0, len(rows), step):
+        r = rows[a:a + step]
+        yield r, _W["nb"](_W["cards"][r])
+
+def _fill_range(start: int, end: int) -> None:
+    """Cartões S15 das linhas [start, end): posto lexicográfico → máscara (= S15.csv)."""
+    import sbdaemon
+    np, step = _W["np"], _W["step"]
+    for a in range(start, end, step):
+        b = min(end, a + step)
+        _W["cards"][a:b] = sbdaemon.lex_unrank(np, np.arange(a, b, dtype=np.int64), 15)
+
+def _eval_range(start: int, end: int, t: int) -> int:
+    """Reavalia em [start, end) quem ainda pode ter ganho ≥ t; devolve nº de avaliações."""
+    np, unc, gain = _W["np"], _W["unc"], _W["gain"]
+    step = _W["step"]
+    evals = 0
+    for a in range(start, end, step):
+        rows = a + np.nonzero(gain[a:min(end, a + step)] >= t)[0]   # último ganho = teto
+        if not len(rows):
+            continue
+        gain[rows] = unc[_W["nb"](_W["cards"][rows])].sum(axis=1, dtype=gain.dtype)
+        evals += len(rows)
+    return evals
+
+def _bid(rows, t: int) -> int:
+    """Lance: reavalia `rows` e, quem mantém ganho ≥ t, grava o mínimo da sua
+    chave em `win` para cada S_k descoberta.  Devolve o nº de lances."""
+    np, unc, gain, win = _W["np"], _W["unc"], _W["gain"], _W["win"]
+    bids = 0
+    for r, sub in _chunks(rows):
+        live = unc[sub].astype(bool)
+        g = live.sum(axis=1)
+        gain[r] = g
+        ok = g >= t
+        if ok.any():
+            live = live[ok]
+            key = np.broadcast_to(_key(np, r[ok], g[ok], t)[:, None], live.shape)
+            np.minimum.at(win, sub[ok][live], key[live])
+            bids += int(ok.sum())
+    return bids
+
+def _claim(rows, t: int):
+    """Posse: entra quem ficou com ≥ t S_k descobertas (ganho zerado).  Devolve
+    (linhas aceitas, S_k próprias delas) — disjuntas, um piso do que a baixa cobre."""
+    np, unc, gain, win = _W["np"], _W["unc"], _W["gain"], _W["win"]
+    won, owned = [], 0
+    for r, sub in _chunks(rows[gain[rows] >= t]):
+        key = _key(np, r, gain[r], t)
+        own = (unc[sub].astype(bool) & (win[sub] == key[:, None])).sum(axis=1)
+        ok = own >= t
+        gain[r[ok]] = 0
+        won.append(r[ok])
+        owned += int(own[ok].sum())
+    return (np.concatenate(won) if won else rows[:0]), owned
+
+def _settle(rows, won, t: int) -> None:
+    """Baixa: cobre as S_k dos aceitos e libera em `win` as dos lances perdidos."""
+    for _, sub in _chunks(won):
+        _W["unc"][sub] = 0
+    for _, sub in _chunks(rows[_W["gain"][rows] >= t]):
+        _W["win"][sub] = FREE
+
+def parallel_greedy(cards, k: int, eps: float = DEFAULT_EPS,
+                    jobs: Optional[int] = None, pct_step: float = 1.0, tel=None,
+                    acertos: Optional[int] = None) -> Tuple[List[int], Dict[str, int]]:
+    """Cobre todas as C(25,k) S_k com cartões S15; devolve linhas e contadores.
+
+    `cards`: máscaras uint32 dos candidatos, ou None = as C(25,15) linhas de
+    S15.csv, montadas pelo posto nos processos (sem ler o texto).  Com
+    `acertos=t` (k = 15) a cobertura é "≥ t acertos" em vez de "contém".
+
+    Por limiar: reavaliação de todos os tetos ≥ t por faixas; depois os
+    pendentes, em ordem de chave, passam em janelas de jobs × bloco, cada
+    janela em três fases repartidas entre os processos — lance (mínimo da
+    chave por S_k em `win`), posse (entra quem ficou com ≥ t) e baixa (cobre
+    as S_k dos aceitos, libera `win`).  O processo principal só ordena a fila
+    e junta as listas.  Entre processos o mínimo não é atômico: um lance
+    pode se perder e a S_k ficar com um candidato de prioridade menor; cada
+    S_k continua com um só dono e cada aceito com ≥ t próprias, só a escolha
+    pode variar entre execuções com jobs > 1.  Se assim uma janela ficar sem
+    nenhum aceito, o pendente de menor chave (ganho ≥ t, já reavaliado) entra
+    pelo processo principal — toda janela avança, e o laço termina.
+    """
+    import numpy as np
+    from multiprocessing import shared_memory
+    if not 0 < eps < 1:
+        raise ValueError("ε deve estar em (0, 1)")
+    if acertos is not None and (k != 15 or not 0 < acertos <= 15):
+        raise ValueError("acertos exige universo S15 (k = 15) e 1 ≤ t ≤ 15")
+    jobs = max(1, jobs or os.cpu_count() or 1)
+    n = math.comb(25, 15) if cards is None else len(cards)
+    if n > 1 << ROW_BITS:
+        raise ValueError(f"no máximo {1 << ROW_BITS:,} candidatos")
+    total = math.comb(25, k)
+    per_row = hit_size(acertos) if acertos else math.comb(15, k)
+    gtype = _gain_dtype(np, per_row)
+
+    sizes = (4 * n, 1 << 25, np.dtype(gtype).itemsize * n, 4 << 25)
+    shms = [shared_memory.SharedMemory(create=True, size=sz) for sz in sizes]
+    pool = None
+    try:
+        names = tuple(x.name for x in shms)
+        _attach(names, n, k, acertos)
+        unc, gain, win = _W["unc"], _W["gain"], _W["win"]
+        unc[:] = _popcount(np, np.arange(1 << 25, dtype=np.uint32)) == k
+        gain[:] = per_row
+        win[:] = FREE
+        bounds = [(n * i // (jobs * 4), n * (i + 1) // (jobs * 4)) for i in range(jobs * 4)]
+        starts, ends = (list(x) for x in zip(*bounds))
+        window = _W["step"]                          # janela maior = mais conflitos
+        if jobs > 1:
+            from concurrent.futures import ProcessPoolExecutor
+            pool = ProcessPoolExecutor(jobs, initializer=_attach, initargs=(names, n, k, acertos))
+
+        def phase(fn, *cols):
+            return list(map(fn, *cols) if pool is None else pool.map(fn, *cols))
+
+        if cards is None:
+            phase(_fill_range, starts, ends)
+        else:
+            _W["cards"][:] = cards
+
+        chosen: List[int] = []
+        evals = retries = rounds = 0
+        covered, next_print = 0, pct_step
+        t = per_row
+        while covered < total:
+            # 1) reavaliação por faixas de quem ainda pode ter ganho ≥ t
+            evals += sum(phase(_eval_range, starts, ends, [t] * len(bounds)))
+            rounds += 1
+
+            # 2) fila por prioridade (ganho desc., linha) — desempate aleatório
+            #    reduz conflitos mas piora α (~3 % em k = 14); janelas em ordem
+            pend = np.nonzero(gain >= t)[0]
+            pend = pend[np.argsort(_key(np, pend, gain[pend], t), kind="stable")]
+            back = pend[:0]
+            while len(pend) or len(back):
+                take = max(0, window - len(back))
+                rows, pend = np.concatenate([back, pend[:take]]), pend[take:]
+                parts = np.array_split(rows, jobs)
+                ts = [t] * len(parts)
+                bids = sum(phase(_bid, parts, ts))
+                evals += len(rows)
+                won, owned = zip(*phase(_claim, parts, ts))
+                phase(_settle, parts, won, ts)
+                won, owned = np.concatenate(won), sum(owned)
+                back = rows[gain[rows] >= t]             # perdedores voltam à frente da fila
+                if not len(won) and len(back):
+                    # lance perdido entre processos deixou a janela sem aceito:
+                    # o de menor chave (ganho ≥ t reavaliado no lance) entra aqui
+                    best = back[np.argmin(_key(np, back, gain[back], t))]
+                    sub = _W["nb"](_W["cards"][best:best + 1])[0]
+                    owned = int(unc[sub].sum())
+                    unc[sub], gain[best] = 0, 0
+                    won, back = np.array([best]), back[back != best]
+                assert len(won) or not len(back), f"janela sem progresso no limiar {t}"
+                chosen.extend(won.tolist())
+                retries += bids - len(won)
+                covered += owned                         # piso; recontado a cada pct_step
+                if 100 * covered / total >= next_print or not (len(pend) or len(back)):
+                    covered = total - int(np.count_nonzero(unc))
+                if tel is not None:
+                    tel.tick(covered, len(chosen), evals, retries, t, len(pend) + len(back))
+                pct = 100 * covered / total
+                if pct >= next_print or covered == total:
+                    print(f"   {pct:6.2f}% coberto | SB tamanho: {len(chosen):,} | "
+                          f"limiar {t} | rodada {rounds}")
+                    next_print = pct + pct_step
+                if covered == total:                     # resto da fila não tem ganho
+                    break
+            if covered == total:
+                break
+            top = int(gain.max())                    # tetos: ninguém passa disso
+            if top == 0:
+                raise RuntimeError("candidatos esgotados com S_k descobertas")
+            t = max(1, min(top, t - 1, math.floor(t / (1 + eps))))
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        mine = _W.pop("shms", [])
+        _W.clear()
+        unc = gain = win = None                      # solta as visões antes do close()
+        for x in mine + shms:
+            x.close()
+        for x in shms:
+            x.unlink()
+    if tel is not None:
+        tel.tick(total, len(chosen), evals, retries, 0, 0, force=True)
+    return chosen, {"amostra": "", "avaliacoes": evals}
+
+def s15_masks(rows):
+    """Máscaras das linhas de S15.csv (posto lexicográfico) — p/ gravar o SB do paralelo."""
+    import numpy as np
+    import sbdaemon
+    return sbdaemon.lex_unrank(np, np.asarray(rows, dtype=np.int64), 15)
+
+def verify_masks(path: Path, k: int, gerador: str) -> None:
+    """Confere o SB15_k pelas máscaras (mapa de 2^25 bytes, sem S_k.csv) — motor paralelo."""
+    import numpy as np
+    import manifest, sbformat
+    print("\n▶ 3/3 Verificando cobertura (máscaras)…")
+    unc = _popcount(np, np.arange(1 << 25, dtype=np.uint32)) == k
+    nb, per_row = _neighborhood(np, k, None)
+    masks = np.frombuffer(sbformat.load_masks(path), dtype=np.uint32)
+    step = max(1, CHUNK_CELLS // per_row)
+    for a in range(0, len(masks), step):
+        unc[nb(masks[a:a + step])] = False
+    missing = int(np.count_nonzero(unc))
+    manifest.set_verified(path, not missing, gerador, missing)
+    if missing:
+        from verify_all import diagnose_k           # histograma + S_k descobertas
+        diagnose_k(k)
+        sys.exit(f"❌ Falha: {missing:,} S{k} não cobertas!")
+    print("✔ Cobertura 100 % confirmada.")
+
+def append_log(path: Path, header: List[str], row: dict) -> None:
+    """Anexa uma linha ao log; se o cabeçalho existente for antigo, migra o arquivo."""
+    header = header + [f for f in ENGINE_FIELDS if f not in header]
+    if path.exists():
+        with path.open(newline="", encoding="utf8") as f:
+            old = csv.DictReader(f)
+            fields = list(old.fieldnames or [])
+            rows = list(old) if fields != header else None
+        if rows is not None:                         # log de versão anterior
+            with path.open("w", newline="", encoding="utf8") as f:
+                w = csv.DictWriter(f, fieldnames=header, restval="")
+                w.writeheader()
+                for r in rows:
+                    r = {k: v for k, v in r.items() if k in header}
+                    w.writerow({"Motor": "lazy", **r})
+    first = not path.exists()
+    with path.open("a", newline="", encoding="utf8") as f:
+        w = csv.DictWriter(f, fieldnames=header, restval="")
+        if first:
+            w.writeheader()
+        w.writerow(row)
+    import historico                        # sqlite3 só ao registrar
+    historico.registrar(path)
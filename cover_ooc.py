@@ -0,0 +1,506 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# AUTOR: Leonardo dos Santos Marques
+"""
+cover_ooc.py — motor de cobertura fora da memória (perfis grandes).
+
+Cobre todos os C(N, t) subconjuntos de t números com cartões de m números
+(perfil em perfis.py) mantendo o pico de RAM abaixo de --ram, para
+universos de centenas de milhões de elementos (Quina, Mega‑Sena,
+Lotomania) que não cabem no set/heap dos programas 2‑5.
+
+  • Universo: bitmap de C(N, t) bits em <trabalho>/cobertura.bits, indexado
+    pelo posto colex do t‑subconjunto ordenado (0‑based)
+        r = Σᵢ C(cᵢ, i+1)
+    e dividido em partições contíguas de postos de no máximo metade de
+    --ram (descontado o interpretador) em bytes.  Uma partição por vez é aberta com np.memmap.
+  • Pool de candidatos: <trabalho>/pool.u8 (m bytes por cartão).  São todos
+    os C(N, m) cartões se cabem em --pool (padrão: pool·C(m,t) ≤ 5·10⁹
+    postos por passada), senão uma amostra aleatória (--seed).
+  • Por partição:
+      1. marca os t‑subconjuntos dos cartões já escolhidos;
+      2. uma passada no pool põe cada candidato com ganho g > 0 num balde
+         em disco b = ⌊log₁₊ε g⌋;
+      3. os baldes são esvaziados do maior para o menor: um candidato cujo
+         ganho (recalculado) ainda cai no balde é escolhido, senão desce
+         para o balde do novo ganho (disk‑friendly greedy, Cormode et al.
+         2010: aproximação (1+ε)·H(C(m,t)) só com leituras sequenciais);
+      4. o que o pool não cobre (amostra) é completado com um cartão feito
+         a partir do próprio t‑subconjunto descoberto (mais m − t números
+         livres: o melhor de COMPLETE_TRIES sorteios).
+
+Os ganhos são calculados em blocos numpy (cartões → postos B × C(m,t) →
+bits da partição); B sai de ¼ do mesmo orçamento.  Cartões escolhidos numa partição
+entram nas seguintes pelo passo 1, então a cobertura final é completa.
+
+Saídas: ooc_saida/<perfil>_m<m>_t<t>/SB.csv (Lotofácil com m = 15:
+SB15_t.csv + .sb via sbformat) e ooc_saida/ooc_log.csv.
+
+    python cover_ooc.py --perfil megasena --t 4 --ram 1G
+    python cover_ooc.py --perfil lotomania --t 5 --ram 2G --verificar
+    python cover_ooc.py --perfil lotofacil --t 14 --ram 256M --particoes 4
+
+Requer:  pip install numpy
+"""
+from __future__ import annotations
+
+import argparse, csv, math, shutil, sys, time
+from itertools import combinations, islice
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+import manifest
+import perfis
+import sbformat
+import telemetry
+
+OUT_BASE = Path("ooc_saida")
+LOG_CSV = OUT_BASE / "ooc_log.csv"
+DEFAULT_RAM = "1G"
+DEFAULT_EPS = 0.1
+DEFAULT_WORK = 5_000_000_000     # postos por passada no pool → tamanho padrão do pool
+BASE_MB = 48                     # interpretador + numpy + módulos, fora do orçamento
+BITMAP_FRAC = 0.5                # frações do restante de --ram: partição do bitmap,
+BLOCK_FRAC = 0.25                # blocos de ganho
+BYTES_PER_RANK = 48              # temporários numpy por posto calculado
+MAX_BLOCK = 65_536
+BUCKET_BUF = 16_384              # índices por balde antes de descarregar no disco
+COMPLETE_TRIES = 8               # sorteios de números livres por cartão de complemento
+TAKE_FRAC = 0.1                  # e trecho lido na leitura aleatória do pool
+LOG_HEADER = ["Perfil", "N", "Cartao", "t", "Universo", "SB_size", "Lower_bound",
+              "Approx_factor", "Pool", "Pool_tipo", "Particoes", "Epsilon", "Avaliacoes",
+              "Rebaixados", "Completados", "Tempo (s)", "Pico_RAM(MB)", "RAM_limite(MB)"]
+
+if hasattr(np, "bitwise_count"):         # numpy ≥ 2.0
+    def _popcount(a: np.ndarray) -> int:
+        return int(np.bitwise_count(a).sum(dtype=np.int64))
+else:
+    def _popcount(a: np.ndarray) -> int:
+        return int(np.unpackbits(a).sum(dtype=np.int64))
+
+def peak_mb() -> float:
+    try:
+        import resource
+        kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return kb / (1_048_576 if sys.platform == "darwin" else 1024)
+    except ImportError:
+        return telemetry.rss_mb()
+
+# ─── Arquivos de linhas fixas ──────────────────────────────────────────────
+class Linhas:
+    """Arquivo de registros de `width` itens lido por blocos.
+
+    Só np.fromfile, nunca memmap: páginas de arquivo mapeadas contam no RSS
+    (e o kernel mapeia 64 KiB por falta de página), o que estouraria o teto
+    numa leitura aleatória do pool.  `take` ordena os índices e lê trechos
+    contíguos de até `budget` bytes.
+    """
+
+    def __init__(self, path: Path, dtype, width: int = 1, budget: float = 16 * 2 ** 20) -> None:
+        self.path, self.dtype, self.width = path, np.dtype(dtype), width
+        self.span = max(1, int(budget // (self.dtype.itemsize * width)))
+        self.rows = path.stat().st_size // (self.dtype.itemsize * width) if path.exists() else 0
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def read(self, start: int, stop: int) -> np.ndarray:
+        stop = min(stop, self.rows)
+        data = np.fromfile(self.path, self.dtype, (stop - start) * self.width,
+                           offset=start * self.width * self.dtype.itemsize)
+        return data.reshape(-1, self.width) if self.width > 1 else data
+
+    def take(self, idx: np.ndarray) -> np.ndarray:
+        order = np.argsort(idx, kind="stable")
+        sidx = idx[order].astype(np.int64)
+        out = np.empty((len(idx), self.width), self.dtype)
+        i = 0
+        while i < len(sidx):
+            lo = int(sidx[i])
+            j = int(np.searchsorted(sidx, lo + self.span))
+            chunk = self.read(lo, int(sidx[j - 1]) + 1).reshape(-1, self.width)
+            out[order[i:j]] = chunk[sidx[i:j] - lo]
+            i = j
+        return out
+
+    def blocks(self, size: int) -> Iterator[np.ndarray]:
+        for i in range(0, self.rows, size):
+            yield self.read(i, i + size)
+
+# ─── Baldes em disco ───────────────────────────────────────────────────────
+class Baldes:
+    """Índices do pool agrupados por ⌊log₁₊ε g⌋, um arquivo por balde."""
+
+    def __init__(self, folder: Path, eps: float) -> None:
+        self.dir, self.base = folder, math.log1p(eps)
+        shutil.rmtree(folder, ignore_errors=True)
+        folder.mkdir(parents=True)
+        self.buf: Dict[int, List[np.ndarray]] = {}
+        self.pending: Dict[int, int] = {}
+
+    def of(self, gains: np.ndarray) -> np.ndarray:
+        # +1e-9: g = (1+ε)^b exato cai em b mesmo com arredondamento do log
+        return np.floor(np.log(gains) / self.base + 1e-9).astype(np.int64)
+
+    def add(self, idx: np.ndarray, buckets: np.ndarray) -> None:
+        for b in np.unique(buckets):
+            part = idx[buckets == b].astype(np.uint32)
+            self.buf.setdefault(int(b), []).append(part)
+            self.pending[int(b)] = self.pending.get(int(b), 0) + len(part)
+            if self.pending[int(b)] >= BUCKET_BUF:
+                self.flush(int(b))
+
+    def flush(self, b: int) -> None:
+        if self.buf.get(b):
+            with (self.dir / f"{b}.u32").open("ab") as f:
+                np.concatenate(self.buf[b]).tofile(f)
+        self.buf[b], self.pending[b] = [], 0
+
+    def top(self) -> int:
+        files = [int(p.stem) for p in self.dir.glob("*.u32")]
+        return max(files + [b for b, v in self.buf.items() if v] + [-1])
+
+    def drain(self, b: int, block: int) -> Iterator[np.ndarray]:
+        """Lê e apaga o balde b em blocos (só baldes < b recebem inserções)."""
+        self.flush(b)
+        path = self.dir / f"{b}.u32"
+        if not path.exists():
+            return
+        yield from Linhas(path, np.uint32).blocks(block)
+        path.unlink()
+
+# ─── Motor ─────────────────────────────────────────────────────────────────
+class CoberturaOOC:
+    """Greedy por partições do universo com bitmap e pool em disco."""
+
+    def __init__(self, perfil: perfis.Perfil, m: int, t: int, ram_mb: float, work: Path,
+                 eps: float = DEFAULT_EPS, pool: Optional[int] = None, seed: int = 0,
+                 particoes: Optional[int] = None, tel=None) -> None:
+        self.perfil, self.n, self.m, self.t, self.eps = perfil, perfil.numeros, m, t, eps
+        self.work, self.seed, self.tel = work, seed, tel or telemetry.NullTelemetry()
+        self.size = math.comb(self.n, t)
+        if ram_mb < 2 * BASE_MB:
+            sys.exit(f"❌ --ram mínimo: {2 * BASE_MB} MB.")
+        self.ram = ram = (ram_mb - BASE_MB) * 1_048_576
+        self.combos = np.array(list(combinations(range(m), t)), dtype=np.uint8)
+        k = len(self.combos)
+        self.cols = [np.array([math.comb(c, i + 1) for c in range(self.n)], dtype=np.int64)
+                     for i in range(t)]
+        per_card = k * (t + BYTES_PER_RANK)
+        if per_card > ram * BLOCK_FRAC:
+            sys.exit(f"❌ C({m},{t}) = {k:,} postos por cartão exigem --ram ≥ "
+                     f"{per_card / BLOCK_FRAC / 1_048_576 + BASE_MB:,.0f} MB.")
+        self.block = max(1, min(MAX_BLOCK, int(ram * BLOCK_FRAC // per_card)))
+        if particoes:
+            bits = -(-self.size // particoes)
+        else:
+            bits = int(ram * BITMAP_FRAC) * 8
+        bits = max(64, -(-bits // 64) * 64)                # bordas em bytes inteiros
+        self.parts = [(lo, min(self.size, lo + bits)) for lo in range(0, self.size, bits)]
+        total_cards = math.comb(self.n, m)
+        self.pool_limit = min(total_cards, pool or max(1, DEFAULT_WORK // k))
+        if self.pool_limit >= 2 ** 32:
+            sys.exit("❌ pool acima de 2³² cartões; use --pool menor.")
+        self.pool_tipo = "completo" if self.pool_limit == total_cards else "amostra"
+        self.evals = self.demoted = self.completed = 0
+        self.chosen = 0
+        self.covered = 0
+        work.mkdir(parents=True, exist_ok=True)
+        self.chosen_path = work / "escolhidos.u8"
+        self.chosen_path.write_bytes(b"")
+
+    # postos / ganhos ---------------------------------------------------------
+    def ranks(self, cards: np.ndarray) -> np.ndarray:
+        """(B, m) uint8 ordenado → (B, C(m,t)) postos colex int64."""
+        r = self.cols[0][cards[:, self.combos[:, 0]]]
+        for i in range(1, self.t):
+            r += self.cols[i][cards[:, self.combos[:, i]]]
+        return r
+
+    def _novos(self, cards: np.ndarray, bm: np.ndarray, lo: int, hi: int
+               ) -> Tuple[np.ndarray, np.ndarray]:
+        """Máscara dos t‑subconjuntos descobertos na partição e os offsets."""
+        off = self.ranks(cards)
+        off -= lo
+        inside = (off >= 0) & (off < hi - lo)
+        off[~inside] = 0
+        bit = (bm[off >> 3] >> (off & 7).astype(np.uint8)) & 1
+        return inside & (bit == 0), off
+
+    def gains(self, cards: np.ndarray, bm: np.ndarray, lo: int, hi: int) -> np.ndarray:
+        self.evals += len(cards)
+        return self._novos(cards, bm, lo, hi)[0].sum(axis=1)
+
+    def _marcar(self, cards: np.ndarray, bm: np.ndarray, lo: int, hi: int) -> int:
+        new, off = self._novos(cards, bm, lo, hi)
+        off = off[new]
+        np.bitwise_or.at(bm, off >> 3, np.left_shift(1, off & 7).astype(np.uint8))
+        return len(off)                    # ganho (exato para um cartão)
+
+    def escolher(self, card: np.ndarray, bm: np.ndarray, lo: int, hi: int, out) -> int:
+        gain = self._marcar(card[None, :], bm, lo, hi)
+        out.write(card.tobytes())
+        self.chosen += 1
+        self.covered += gain
+        return gain
+
+    # pool --------------------------------------------------------------------
+    def build_pool(self) -> Linhas:
+        path = self.work / "pool.u8"
+        chunk = max(1, min(1_000_000, int(self.ram * BLOCK_FRAC // (self.n * 24))))
+        print(f"▶ Pool: {self.pool_limit:,} cartões ({self.pool_tipo}) → {path}")
+        with path.open("wb") as f:
+            if self.pool_tipo == "completo":
+                it = combinations(range(self.n), self.m)
+                while True:
+                    block = list(islice(it, chunk))
+                    if not block:
+                        break
+                    np.array(block, dtype=np.uint8).tofile(f)
+            else:
+                rng = np.random.default_rng(self.seed)
+                for start in range(0, self.pool_limit, chunk):
+                    b = min(chunk, self.pool_limit - start)
+                    keys = rng.random((b, self.n))
+                    np.sort(np.argpartition(keys, self.m - 1, axis=1)[:, :self.m], axis=1
+                            ).astype(np.uint8).tofile(f)
+        return Linhas(path, np.uint8, self.m, self.ram * TAKE_FRAC)
+
+    # partições ----------------------------------------------------------------
+    def _bitmap(self, path: Path, lo: int, hi: int) -> np.memmap:
+        return np.memmap(path, np.uint8, "r+", offset=lo // 8, shape=(-(-(hi - lo) // 8),))
+
+    def _aplicar(self, bm: np.ndarray, lo: int, hi: int) -> None:
+        """Marca na partição os t‑subconjuntos dos cartões já escolhidos."""
+        if not self.chosen:
+            return
+        for cards in Linhas(self.chosen_path, np.uint8, self.m).blocks(self.block):
+            self._marcar(cards, bm, lo, hi)
+
+    def _cobrir(self, pool: Linhas, bm: np.ndarray, lo: int, hi: int, out) -> None:
+        out.flush()
+        self._aplicar(bm, lo, hi)
+        falta = (hi - lo) - _popcount(bm)
+        self.covered += (hi - lo) - falta
+        if not falta:
+            return
+        baldes = Baldes(self.work / "baldes", self.eps)
+        for start in range(0, len(pool), self.block):           # passada de distribuição
+            g = self.gains(pool.read(start, start + self.block), bm, lo, hi)
+            alive = np.nonzero(g)[0]
+            if len(alive):
+                baldes.add(alive + start, baldes.of(g[alive]))
+            self.tel.scan(start, len(pool))
+
+        for b in range(baldes.top(), -1, -1):
+            if not falta:
+                break
+            for idx in baldes.drain(b, self.block):
+                if not falta:
+                    break
+                cards = pool.take(idx)
+                g = self.gains(cards, bm, lo, hi)               # limite superior no bloco
+                bk = np.full(len(g), -1, dtype=np.int64)
+                bk[g > 0] = baldes.of(g[g > 0])
+                low = (bk >= 0) & (bk < b)
+                if low.any():
+                    baldes.add(idx[low], bk[low])
+                    self.demoted += int(low.sum())
+                dirty = False
+                for j in np.nonzero(bk == b)[0]:
+                    gj = int(g[j])
+                    if dirty:                                   # escolhas no bloco mudam o ganho
+                        gj = int(self.gains(cards[j:j + 1], bm, lo, hi)[0])
+                        if not gj:
+                            continue
+                        bj = int(baldes.of(np.array([gj]))[0])
+                        if bj < b:
+                            baldes.add(idx[j:j + 1], np.array([bj]))
+                            self.demoted += 1
+                            continue
+                    falta -= self.escolher(cards[j], bm, lo, hi, out)
+                    dirty = True
+                    self.tel.tick(self.covered, self.chosen, self.evals, self.demoted,
+                                  gj, len(pool))
+                    if not falta:
+                        break
+        shutil.rmtree(baldes.dir, ignore_errors=True)
+        if falta:
+            self._completar(bm, lo, hi, out)
+
+    def unrank(self, r: int) -> List[int]:
+        """Posto colex → t‑subconjunto ordenado (0‑based)."""
+        out: List[int] = []
+        for i in range(self.t, 0, -1):
+            c = i - 1
+            while math.comb(c + 1, i) <= r:
+                c += 1
+            r -= math.comb(c, i)
+            out.append(c)
+        return out[::-1]
+
+    def _completar(self, bm: np.ndarray, lo: int, hi: int, out) -> None:
+        """Cobre o que o pool (amostra) não cobriu: cartão = t‑subconjunto + m − t
+        números livres, o melhor de COMPLETE_TRIES sorteios."""
+        rng = np.random.default_rng([self.seed, lo])
+        step = 1 << 20
+        for a in range(0, len(bm), step):
+            zeros = np.nonzero(np.unpackbits(np.array(bm[a:a + step]), bitorder="little") == 0)[0]
+            for z in zeros:
+                off = a * 8 + int(z)
+                if off >= hi - lo or (bm[off >> 3] >> (off & 7)) & 1:
+                    continue
+                sub = np.array(self.unrank(lo + off))
+                free = np.setdiff1d(np.arange(self.n), sub)
+                opts = np.sort(np.hstack([np.tile(sub, (COMPLETE_TRIES, 1)),
+                                          rng.permuted(np.tile(free, (COMPLETE_TRIES, 1)), axis=1)
+                                          [:, :self.m - self.t]]), axis=1).astype(np.uint8)
+                best = opts[int(self.gains(opts, bm, lo, hi).argmax())]
+                self.escolher(best, bm, lo, hi, out)
+                self.completed += 1
+
+    def run(self) -> None:
+        pool = self.build_pool()
+        bits_path = self.work / "cobertura.bits"
+        with bits_path.open("wb") as f:
+            f.truncate(-(-self.size // 8))                      # esparso, zerado
+        self.tel.set_phase("greedy")
+        with self.chosen_path.open("ab") as out:
+            for p, (lo, hi) in enumerate(self.parts, 1):
+                print(f"▶ Partição {p}/{len(self.parts)}: postos {lo:,}–{hi:,} | "
+                      f"SB até aqui: {self.chosen:,}")
+                bm = self._bitmap(bits_path, lo, hi)
+                self._cobrir(pool, bm, lo, hi, out)
+                bm.flush()
+                del bm
+                self.tel.tick(self.covered, self.chosen, self.evals, self.demoted, 0,
+                              len(pool), force=True)
+        bits_path.unlink()
+
+    def verificar(self) -> bool:
+        """Recalcula a cobertura do zero, partição por partição."""
+        path = self.work / "verifica.bits"
+        with path.open("wb") as f:
+            f.truncate(-(-self.size // 8))
+        ok = True
+        for lo, hi in self.parts:
+            bm = self._bitmap(path, lo, hi)
+            self._aplicar(bm, lo, hi)
+            ok &= _popcount(bm) == hi - lo
+            del bm
+        path.unlink()
+        return ok
+
+    def cards(self) -> Iterator[np.ndarray]:
+        for cards in Linhas(self.chosen_path, np.uint8, self.m).blocks(self.block):
+            yield cards + 1
+
+# ─── Saída ─────────────────────────────────────────────────────────────────
+def save_sb(motor: CoberturaOOC, out_dir: Path, params: dict) -> Path:
+    lines = (",".join(map(str, c)) for block in motor.cards() for c in block.tolist())
+    if motor.perfil is perfis.LOTOFACIL and motor.m == 15:     # mesmo SB dos programas 2‑5
+        path = out_dir / f"SB15_{motor.t}.csv"
+        sbformat.save_lines(path, list(lines), motor.t, "cover_ooc.py", params)
+        return path
+    path = out_dir / "SB.csv"
+    with path.open("w", newline="", encoding="ascii") as raw:
+        fh = manifest.HashingSink(raw)
+        w = csv.writer(fh)
+        for line in lines:
+            w.writerow(line.split(","))
+        digest = fh.hexdigest()
+    manifest.record(path, motor.chosen, digest, "cover_ooc.py", params)
+    return path
+
+def append_log(row: dict) -> None:
+    first = not LOG_CSV.exists()
+    with LOG_CSV.open("a", newline="", encoding="utf8") as f:
+        w = csv.DictWriter(f, fieldnames=LOG_HEADER)
+        if first:
+            w.writeheader()
+        w.writerow(row)
+    print("📄 Log salvo em", LOG_CSV)
+    import historico                        # sqlite3 só ao registrar
+    historico.registrar(LOG_CSV)
+
+# ─── CLI ───────────────────────────────────────────────────────────────────
+def parse_args() -> argparse.Namespace:
+    from memplan import parse_size                     # '2G' → MB
+    ap = argparse.ArgumentParser(description="Cobertura fora da memória por perfil de jogo")
+    ap.add_argument("--perfil", choices=list(perfis.PERFIS), default="lotofacil")
+    ap.add_argument("--t", type=int, required=True, help="tamanho dos subconjuntos a cobrir")
+    ap.add_argument("--cartao", type=int, help="números por cartão (padrão do perfil)")
+    ap.add_argument("--ram", type=parse_size, default=parse_size(DEFAULT_RAM),
+                    help="teto de RAM (ex.: 512M, 4G)")
+    ap.add_argument("--eps", type=float, default=DEFAULT_EPS,
+                    help="largura dos baldes: aproximação (1+ε)·H")
+    ap.add_argument("--pool", type=int, help="máximo de candidatos (acima disso: amostra)")
+    ap.add_argument("--seed", type=int, default=0, help="semente da amostra do pool")
+    ap.add_argument("--particoes", type=int, help="força nº de partições do universo")
+    ap.add_argument("--trabalho", type=Path, help="diretório dos arquivos temporários")
+    ap.add_argument("--manter", action="store_true", help="não apaga o diretório de trabalho")
+    ap.add_argument("--verificar", action="store_true", help="confere 100 %% ao final")
+    telemetry.add_args(ap)
+    return ap.parse_args()
+
+def main() -> None:
+    args = parse_args()
+    perfil = perfis.get(args.perfil)
+    m = args.cartao or perfil.cartao
+    if not 1 <= args.t <= m <= perfil.numeros:
+        sys.exit(f"❌ exige 1 ≤ t ≤ cartão ≤ {perfil.numeros} (t={args.t}, cartão={m}).")
+    if not 0 < args.eps < 1:
+        sys.exit("❌ --eps deve estar em (0, 1).")
+    out_dir = OUT_BASE / f"{perfil.nome}_m{m}_t{args.t}"
+    out_dir.mkdir(parents=True, exist_ok=True)
+    work = args.trabalho or out_dir / "trabalho"
+
+    tel = telemetry.from_args(args, f"cover_ooc:{perfil.nome}", args.t, perfil.universo(args.t))
+    motor = CoberturaOOC(perfil, m, args.t, args.ram, work, args.eps, args.pool, args.seed,
+                         args.particoes, tel)
+    print(f"▶ {perfil.nome}: C({perfil.numeros},{args.t}) = {motor.size:,} elementos · "
+          f"cartão {m} cobre {len(motor.combos):,} · {len(motor.parts)} partição(ões) · "
+          f"bloco {motor.block:,} cartões · RAM ≤ {args.ram:,.0f} MB")
+    t0 = time.perf_counter()
+    try:
+        motor.run()
+    except BaseException:
+        tel.close("falha")
+        raise
+    elapsed = round(time.perf_counter() - t0, 1)
+
+    params = {"perfil": perfil.nome, "n": perfil.numeros, "cartao": m, "t": args.t,
+              "eps": args.eps, "pool": motor.pool_limit, "pool_tipo": motor.pool_tipo,
+              "seed": args.seed, "particoes": len(motor.parts)}
+    path = save_sb(motor, out_dir, params)
+    if args.verificar:
+        tel.set_phase("verificacao")
+        ok = motor.verificar()
+        manifest.set_verified(path, ok, "cover_ooc.py")
+        if not ok:
+            tel.close("falha")
+            sys.exit("❌ Falha: algum t‑subconjunto não coberto!")
+        print("✔ Cobertura 100 % confirmada.")
+    tel.close()
+
+    peak = round(peak_mb(), 1)
+    lb = perfil.limite_inferior(args.t, m)
+    append_log({
+        "Perfil": perfil.nome, "N": perfil.numeros, "Cartao": m, "t": args.t,
+        "Universo": motor.size, "SB_size": motor.chosen, "Lower_bound": lb,
+        "Approx_factor": round(motor.chosen / lb, 4), "Pool": motor.pool_limit,
+        "Pool_tipo": motor.pool_tipo, "Particoes": len(motor.parts), "Epsilon": args.eps,
+        "Avaliacoes": motor.evals, "Rebaixados": motor.demoted, "Completados": motor.completed,
+        "Tempo (s)": elapsed, "Pico_RAM(MB)": peak, "RAM_limite(MB)": round(args.ram, 1),
+    })
+    if not args.manter:
+        shutil.rmtree(work, ignore_errors=True)
+    if peak > args.ram:
+        print(f"⚠ pico de RAM {peak:,} MB acima do teto {args.ram:,.0f} MB")
+    print(f"\n✅ {path} gerado ({motor.chosen:,} cartões) em {elapsed}s — "
+          f"α={motor.chosen / lb:.3f} | pico RAM {peak} MB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# AUTOR: Leonardo dos Santos Marques
+"""
+cover_workers.py — pré-passada dos programas 2‑5 distribuída em workers TCP.
+
+A varredura inicial (ids S_k de cada linha S15 + ganho inicial) é a parte
+paralelizável do greedy; o coordenador (o próprio programa, `--workers`)
+divide os postos 0…C(25,15)−1 em faixas de --faixa linhas e as entrega aos
+workers — processos neste host ou em outros — que não leem CSV nenhum:
+
+  • linha S15 de posto r: lex_unrank (sistema combinatório, sbdaemon.py);
+  • id da S_k = posição em S_k.csv = C(25,k)−1 − Σ C(24−c_i, k−i), para as
+    C(15,k) sub-combinações de cada linha, em blocos numpy;
+  • ganho inicial = nº de ids distintos da linha.
+
+Protocolo TCP (little-endian), uma faixa por pedido na mesma conexão:
+    pedido     <4s "LFW1"> <B k> <B 0> <H 0> <I início> <I fim>
+    quadro     <B tipo> <B bytes/id> <H largura> <I início> <I n> <I crc32>
+               + n × uint16 ganhos + n × largura × bytes/id ids
+               tipo 0 = dados, 1 = fim da faixa, 2 = erro (corpo = n bytes utf‑8)
+    Os ids vão em 3 bytes (C(25,k) < 2²⁴ para k = 11…14); crc32 do corpo.
+
+O coordenador grava cada quadro direto na matriz de ids do modo ram/mmap
+(memplan.py) e confere a 1ª linha de cada faixa com os ids locais (S_k.csv
+fora da ordem lexicográfica aborta).  Conexão caída, tempo esgotado, crc
+ou erro do worker devolvem a faixa à fila — outro worker a refaz; a faixa
+que falha MAX_TENTATIVAS vezes, ou o que sobra sem workers, é calculado
+no próprio coordenador.
+
+    python cover_workers.py worker --porta 7301 --host 0.0.0.0   # em cada máquina
+    python programa4.py --workers maq1:7301,maq2:7301 --modo mmap
+    python programa2.py --workers local:2                        # 2 workers neste host
+    python cover_workers.py bench 13 --workers local:2           # só a pré-passada
+
+Requer numpy (workers e coordenador).
+"""
+from __future__ import annotations
+
+import argparse, os, queue, socket, socketserver, struct, subprocess, sys, threading, time, zlib
+from itertools import combinations
+from math import comb
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import sbformat
+from cover_engine import DEFAULT_SHARD, add_workers_args as add_args
+
+MAGIC = b"LFW1"
+REQ = struct.Struct("<4sBBHII")          # magic, k, 0, 0, início, fim
+HDR = struct.Struct("<BBHIII")           # tipo, bytes/id, largura, início, n, crc32
+DATA, END, ERROR = range(3)
+DEFAULT_PORT = 7301
+CHUNK_IDS = 1 << 20                      # ids por quadro (e por bloco numpy)
+TIMEOUT = 120.0
+MAX_TENTATIVAS = 3                       # por faixa, antes de calcular localmente
+RECONEXOES = 3                           # por worker, antes de dá-lo por perdido
+TOTAL_S15 = comb(25, 15)
+
+class WorkerError(RuntimeError):
+    pass
+
+class Divergencia(RuntimeError):
+    """ids do worker ≠ S_k.csv local: erro de ordem, não de rede — não reenvia."""
+
+def _numpy():
+    np = sbformat._numpy()
+    if np is None:
+        sys.exit("❌ cover_workers requer numpy (pip install numpy).")
+    return np
+
+# ─── Cálculo de uma faixa ──────────────────────────────────────────────────
+class Calculo:
+    """Tabelas por k (posições das sub-combinações, C(d, j)) e o cálculo em blocos."""
+
+    def __init__(self, np) -> None:
+        self.np = np
+        self._tab: Dict[int, tuple] = {}
+
+    def tables(self, k: int):
+        if k not in self._tab:
+            import sbdaemon                         # só quem calcula (o programa não paga)
+            np = self.np
+            pick = np.array(list(combinations(range(15), k)), dtype=np.intp)
+            self._tab[k] = (pick, sbdaemon._rows(np, k))
+        return self._tab[k]
+
+    def block(self, k: int, start: int, end: int):
+        """(ganhos uint16 (n,), ids uint32 (n, C(15,k))) das linhas S15 start…end−1."""
+        import sbdaemon
+        np = self.np
+        pick, tab = self.tables(k)
+        masks = sbdaemon.lex_unrank(np, np.arange(start, end, dtype=np.int64), 15)
+        bits = ((masks[:, None] >> np.arange(25, dtype=np.uint32)) & 1).astype(bool)
+        c = np.nonzero(bits)[1].reshape(len(masks), 15)        # números − 1, crescentes
+        sub = c[:, pick]                                        # (n, largura, k)
+        y = np.zeros(sub.shape[:2], dtype=np.int64)
+        for i in range(k):
+            y += tab[k - i][24 - sub[:, :, i]]
+        ids = (comb(25, k) - 1 - y).astype(np.uint32)
+        srt = np.sort(ids, axis=1)
+        gains = (1 + (srt[:, 1:] != srt[:, :-1]).sum(axis=1)).astype(np.uint16)
+        return gains, ids
+
+def id_bytes(k: int) -> int:
+    return 3 if comb(25, k) <= 1 << 24 else 4
+
+def pack(np, gains, ids, nb: int) -> bytes:
+    raw = np.ascontiguousarray(ids, dtype="<u4").view(np.uint8).reshape(-1, 4)[:, :nb]
+    return gains.astype("<u2").tobytes() + raw.tobytes()
+
+def unpack(np, body: bytes, n: int, width: int, nb: int):
+    gains = np.frombuffer(body, dtype="<u2", count=n)
+    raw = np.frombuffer(body, dtype=np.uint8, offset=2 * n).reshape(-1, nb)
+    ids = np.zeros(len(raw), dtype=np.uint32)
+    for b in range(nb):
+        ids |= raw[:, b].astype(np.uint32) << np.uint32(8 * b)
+    return gains, ids.reshape(n, width)
+
+def _frame(kind: int, nb: int, width: int, start: int, n: int, body: bytes) -> bytes:
+    return HDR.pack(kind, nb, width, start, n, zlib.crc32(body)) + body
+
+def _recv(sock: socket.socket, n: int) -> bytes:
+    buf = bytearray()
+    while len(buf) < n:
+        chunk = sock.recv(min(n - len(buf), 1 << 22))
+        if not chunk:
+            raise WorkerError("conexão fechada pelo worker")
+        buf += chunk
+    return bytes(buf)
+
+# ─── Worker ────────────────────────────────────────────────────────────────
+def serve(host: str, port: int) -> None:
+    import sbdaemon
+    calc = Calculo(_numpy())
+
+    class Handler(socketserver.BaseRequestHandler):
+        def handle(self) -> None:
+            sock = self.request
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            while True:
+                try:
+                    magic, k, _, _, start, end = REQ.unpack(_recv(sock, REQ.size))
+                except (WorkerError, OSError, struct.error):
+                    return
+                try:
+                    if magic != MAGIC or k not in (11, 12, 13, 14) or not 0 <= start < end <= TOTAL_S15:
+                        raise WorkerError(f"pedido inválido: k={k} faixa {start}…{end}")
+                    width, nb = comb(15, k), id_bytes(k)
+                    step = max(1, CHUNK_IDS // width)
+                    for a in range(start, end, step):
+                        b = min(a + step, end)
+                        gains, ids = calc.block(k, a, b)
+                        sock.sendall(_frame(DATA, nb, width, a, b - a, pack(calc.np, gains, ids, nb)))
+                    sock.sendall(_frame(END, nb, width, start, end - start, b""))
+                except (WorkerError, sbdaemon.DaemonError, ValueError) as e:
+                    msg = str(e).encode("utf8")
+                    sock.sendall(_frame(ERROR, 0, 0, start, len(msg), msg))
+                except OSError:
+                    return
+
+    socketserver.ThreadingTCPServer.allow_reuse_address = True
+    socketserver.ThreadingTCPServer.daemon_threads = True
+    with socketserver.ThreadingTCPServer((host, port), Handler) as server:
+        print(f"🛰  worker em {host}:{server.server_address[1]} (pid {os.getpid()})", flush=True)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            print("👋 worker encerrado.")
+
+def spawn_local(n: int) -> Tuple[List[str], List[subprocess.Popen]]:
+    """Sobe n workers neste host em portas livres; (endereços, processos)."""
+    procs, addrs = [], []
+    for _ in range(n):
+        p = subprocess.Popen([sys.executable, str(Path(__file__).resolve()), "worker", "--porta", "0"],
+                             stdout=subprocess.PIPE, text=True)
+        line = p.stdout.readline()
+        if not line:
+            sys.exit("❌ worker local não subiu.")
+        addrs.append("127.0.0.1:" + line.split(":")[-1].split()[0])
+        procs.append(p)
+    return addrs, procs
+
+# ─── Coordenador ───────────────────────────────────────────────────────────
+def parse_addr(text: str) -> Tuple[str, int]:
+    host, _, port = text.rpartition(":")
+    return (host or "127.0.0.1"), int(port or DEFAULT_PORT)
+
+class Coordenador:
+    """Distribui as faixas de postos S15 entre os workers e recolhe ids/ganhos."""
+
+    def __init__(self, addrs: Sequence[str], shard: int = DEFAULT_SHARD,
+                 procs: Sequence[subprocess.Popen] = ()) -> None:
+        self.addrs, self.shard, self.procs = list(addrs), shard, list(procs)
+        self.lock = threading.Lock()
+        self.stats = {"faixas": 0, "reenvios": 0, "locais": 0, "bytes": 0, "perdidos": 0}
+        self.fatal: Optional[str] = None
+
+    def close(self) -> None:
+        for p in self.procs:
+            p.terminate()
+            p.wait()
+
+    def run(self, k: int, store, check: Callable[[int], Sequence[int]], tel=None,
+            n: int = TOTAL_S15):
+        """Preenche `store.put(início, ids)`; devolve os ganhos iniciais (uint16, n)."""
+        np = _numpy()
+        t0 = time.perf_counter()
+        gains = np.zeros(n, dtype=np.uint16)
+        todo: "queue.Queue[Tuple[int, int, int]]" = queue.Queue()
+        for a in range(0, n, self.shard):
+            todo.put((a, min(a + self.shard, n), 0))
+        total = todo.qsize()
+        done: List[int] = [0, 0]                            # faixas, linhas
+        local: List[Tuple[int, int]] = []
+
+        def finished() -> bool:
+            with self.lock:
+                return self.fatal is not None or done[0] + len(local) >= total
+
+        def deliver(start: int, g, ids, nbytes: int) -> None:
+            store.put(start, ids)
+            gains[start:start + len(g)] = g
+            with self.lock:
+                self.stats["bytes"] += nbytes
+
+        def fetch(sock: socket.socket, a: int, b: int) -> None:
+            sock.sendall(REQ.pack(MAGIC, k, 0, 0, a, b))
+            first = None
+            while True:
+                kind, nb, width, start, cnt, crc = HDR.unpack(_recv(sock, HDR.size))
+                if kind == END:
+                    break
+                body = _recv(sock, cnt if kind == ERROR else cnt * (2 + width * nb))
+                if kind == ERROR:
+                    raise WorkerError(body.decode("utf8", "replace"))
+                if zlib.crc32(body) != crc or not a <= start < start + cnt <= b:
+                    raise WorkerError(f"quadro corrompido na faixa {a}…{b}")
+                g, ids = unpack(np, body, cnt, width, nb)
+                if first is None:
+                    first = ids[0]
+                deliver(start, g, ids, HDR.size + len(body))
+            if sorted(first.tolist()) != sorted(check(a)):
+                raise Divergencia(f"ids do worker divergem de S{k}.csv na linha {a:,} "
+                                  "(S_k.csv fora da ordem lexicográfica?)")
+
+        def feed(addr: str) -> None:
+            falhas = 0
+            while not finished():
+                try:
+                    sock = socket.create_connection(parse_addr(addr), timeout=TIMEOUT)
+                except OSError as e:
+                    falhas += 1
+                    if falhas > RECONEXOES:
+                        print(f"⚠ worker {addr} perdido ({e})")
+                        with self.lock:
+                            self.stats["perdidos"] += 1
+                        return
+                    time.sleep(0.5 * falhas)
+                    continue
+                with sock:
+                    while True:
+                        try:
+                            a, b, tent = todo.get(timeout=0.2)
+                        except queue.Empty:
+                            if finished():
+                                return
+                            continue
+                        try:
+                            fetch(sock, a, b)
+                        except Divergencia as e:
+                            with self.lock:
+                                self.fatal = str(e)
+                            return
+                        except (OSError, WorkerError, struct.error) as e:
+                            falhas += 1
+                            with self.lock:
+                                self.stats["reenvios"] += 1
+                                if tent + 1 >= MAX_TENTATIVAS:
+                                    local.append((a, b))
+                                else:
+                                    todo.put((a, b, tent + 1))
+                            print(f"⚠ worker {addr}: {e} — faixa {a:,}…{b:,} reenviada")
+                            break
+                        falhas = 0
+                        with self.lock:
+                            done[0] += 1
+                            done[1] += b - a
+                            rows = done[1]
+                        if tel is not None:
+                            tel.scan(rows, rows)
+
+        print(f"🛰  Pré-passada: {n:,} linhas S15 em {total} faixas × {len(self.addrs)} worker(s)")
+        threads = [threading.Thread(target=feed, args=(addr,), daemon=True) for addr in self.addrs]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        if self.fatal:
+            sys.exit(f"❌ {self.fatal}")
+        while True:                                         # sem workers: o que restou
+            try:
+                a, b, _ = todo.get_nowait()
+            except queue.Empty:
+                break
+            local.append((a, b))
+        if local:
+            print(f"⚠ {len(local)} faixa(s) calculada(s) no coordenador")
+            calc = Calculo(np)
+            step = max(1, CHUNK_IDS // comb(15, k))
+            for a, b in local:
+                for s in range(a, b, step):
+                    g, ids = calc.block(k, s, min(s + step, b))
+                    deliver(s, g, ids, 0)
+        secs = time.perf_counter() - t0
+        self.stats.update(faixas=total, locais=len(local), tempo=round(secs, 1))
+        mb = self.stats["bytes"] / 1_048_576
+        print(f"   {n:,} linhas em {secs:.1f}s — {mb:,.0f} MB recebidos ({mb / secs:,.0f} MB/s); "
+              f"reenvios {self.stats['reenvios']}, locais {len(local)}")
+        return gains
+
+def from_args(args: argparse.Namespace) -> Optional[Coordenador]:
+    if not args.workers:
+        return None
+    if args.workers.startswith("local:"):
+        addrs, procs = spawn_local(int(args.workers.split(":")[1]))
+        return Coordenador(addrs, args.faixa, procs)
+    return Coordenador(args.workers.split(","), args.faixa)
+
+# ─── CLI ───────────────────────────────────────────────────────────────────
+class _Matriz:
+    """Destino de `bench`: só confere que toda linha chegou."""
+
+    def __init__(self, np, n: int) -> None:
+        self.got = np.zeros(n, dtype=bool)
+
+    def put(self, start: int, ids) -> None:
+        self.got[start:start + len(ids)] = True
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Pré-passada dos programas 2‑5 em workers TCP")
+    sub = ap.add_subparsers(dest="acao", required=True)
+    w = sub.add_parser("worker", help="serve faixas (k, início, fim) por TCP")
+    w.add_argument("--host", default="127.0.0.1", help="0.0.0.0 para aceitar outras máquinas")
+    w.add_argument("--porta", type=int, default=DEFAULT_PORT, help="0 = porta livre")
+    b = sub.add_parser("bench", help="mede só a pré-passada (sem greedy)")
+    b.add_argument("k", type=int, choices=(14, 13, 12, 11))
+    b.add_argument("--linhas", type=int, default=TOTAL_S15, help="primeiras N linhas S15")
+    add_args(b)
+    args = ap.parse_args()
+    if args.acao == "worker":
+        serve(args.host, args.porta)
+        return
+    np = _numpy()
+    coord = from_args(args) if args.workers else None
+    if coord is None:
+        sys.exit("❌ informe --workers HOST:PORTA,… ou local:N")
+    calc = Calculo(np)
+    sink = _Matriz(np, args.linhas)
+    try:
+        gains = coord.run(args.k, sink, lambda r: calc.block(args.k, r, r + 1)[1][0].tolist(),
+                          n=args.linhas)
+    finally:
+        coord.close()
+    if not sink.got.all() or (gains != comb(15, args.k)).any():
+        sys.exit("❌ pré-passada incompleta")
+    print("✅ todas as linhas recebidas, ganho inicial C(15,k) em todas.")
+
+if __name__ == "__main__":
+    main()
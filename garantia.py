@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# AUTOR: Leonardo dos Santos Marques
+"""
+garantia.py — análise exaustiva de um SB contra **todos** os C(25,15) =
+3 268 760 sorteios possíveis.
+
+Para cada sorteio D calcula o melhor cartão, max_c popcount(c & D), e
+acumula:
+
+• mínimo sobre todos os sorteios   → garantia real do SB ("sempre faz ≥ m");
+• histograma do máximo de acertos  → P(melhor cartão fez 11, 12, …, 15);
+• prêmios esperados por sorteio    → E[nº de cartões com j acertos]
+  (exato: cada cartão tem acertos hipergeométricos, N·C(15,j)·C(10,15‑j)/C(25,15);
+  --contagens confere somando todos os pares cartão × sorteio).
+
+Kernel: blocos (sorteios × cartões) de ~512 K pares; AND + popcount
+(np.bitwise_count, ou LUT de 16 bits em numpy < 2.0) escritos em buffers
+pré‑alocados, máximo por linha acumulado entre blocos.  Memória limitada
+pelo tamanho do bloco, não pelo SB nem pelo nº de sorteios.  Os sorteios
+são divididos entre --jobs processos (cada um gera sua fatia e carrega o
+SB uma vez).
+
+Geração (--gerar T): o contrário — um SB feito para a garantia.  O greedy
+paralelo do cover_engine roda com a condição "≥ T acertos" (cada cartão
+cobre os hit_size(T) sorteios da sua vizinhança, enumerados por tabelas de
+deslocamento) sobre os 3 268 760 sorteios; o SB vai para
+prog7_saida/SB15_A{T}.csv (+ .sb), a linha de log para acertos_log.csv e a
+análise acima confirma o mínimo ≥ T.
+
+Uso:
+    python garantia.py prog5_saida/SB15_11.csv --jobs 8
+    python garantia.py --jobs 8                 # os quatro SB15_k existentes
+    python garantia.py prog4_saida/SB15_12.csv --limite 100000   # amostra rápida
+    python garantia.py --gerar 14 --jobs 8      # SB com ≥ 14 acertos em todo sorteio
+
+Requer:  pip install numpy
+"""
+from __future__ import annotations
+
+import argparse, csv, sys, time
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from math import comb
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+import cover_engine
+import premios
+import sbformat
+
+TOTAL_DRAWS = comb(25, 15)               # 3 268 760
+BLOCK_DRAWS = 128
+BLOCK_CARDS = 4096                       # 128 × 4096 = 512 K pares por bloco
+                                         # (linhas longas → max(axis=1) vetorizado)
+CHUNKS_PER_JOB = 8
+WORST_KEEP = 10                          # exemplos de sorteios no mínimo
+OUT_DIR = Path("prog7_saida")
+SB_PATHS = [Path("prog2_saida/SB15_14.csv"), Path("prog3_saida/SB15_13.csv"),
+            Path("prog4_saida/SB15_12.csv"), Path("prog5_saida/SB15_11.csv")]
+
+# ─── Sorteios ──────────────────────────────────────────────────────────────
+@lru_cache(maxsize=None)
+def _subsets(n: int, k: int) -> np.ndarray:
+    """Máscaras de todos os k‑subconjuntos de {0…n‑1} (sem laço por elemento)."""
+    if k == 0:
+        return np.zeros(1, dtype=np.uint32)
+    if k > n:
+        return np.zeros(0, dtype=np.uint32)
+    return np.concatenate((_subsets(n - 1, k),
+                           _subsets(n - 1, k - 1) | np.uint32(1 << (n - 1))))
+
+def all_draws() -> np.ndarray:
+    return _subsets(25, 15)
+
+# ─── Kernel ────────────────────────────────────────────────────────────────
+if hasattr(np, "bitwise_count"):
+    def _popcount(x: np.ndarray, out: np.ndarray) -> np.ndarray:
+        return np.bitwise_count(x, out=out)
+else:                                    # numpy < 2.0: LUT de 16 bits
+    def _popcount(x: np.ndarray, out: np.ndarray) -> np.ndarray:
+        np.add(premios.POPCOUNT16[x & 0xFFFF], premios.POPCOUNT16[x >> 16], out=out)
+        return out
+
+def best_hits(cards: np.ndarray, draws: np.ndarray,
+              counts: Optional[np.ndarray] = None) -> np.ndarray:
+    """max_c popcount(c & d) para cada sorteio (uint8); soma pares em `counts`."""
+    best = np.zeros(len(draws), dtype=np.uint8)
+    and_buf = np.empty((BLOCK_DRAWS, BLOCK_CARDS), dtype=np.uint32)
+    pop_buf = np.empty((BLOCK_DRAWS, BLOCK_CARDS), dtype=np.uint8)
+    row_max = np.empty(BLOCK_DRAWS, dtype=np.uint8)
+    for d0 in range(0, len(draws), BLOCK_DRAWS):
+        d = draws[d0:d0 + BLOCK_DRAWS, None]
+        nd = len(d)
+        acc = best[d0:d0 + nd]
+        for c0 in range(0, len(cards), BLOCK_CARDS):
+            c = cards[None, c0:c0 + BLOCK_CARDS]
+            a = and_buf[:nd, :c.shape[1]]
+            p = pop_buf[:nd, :c.shape[1]]
+            np.bitwise_and(d, c, out=a)
+            _popcount(a, p)
+            m = row_max[:nd]
+            p.max(axis=1, out=m)
+            np.maximum(acc, m, out=acc)
+            if counts is not None:
+                counts += np.bincount(p.ravel(), minlength=16)[:16]
+    return best
+
+_CARDS: Optional[np.ndarray] = None
+
+def _init(sb_path: str) -> None:
+    global _CARDS
+    _CARDS = premios.load_sb(Path(sb_path))
+
+def _chunk(args: Tuple[int, int, bool]) -> Tuple[np.ndarray, np.ndarray, List[int]]:
+    start, end, want_counts = args
+    draws = all_draws()[start:end]
+    counts = np.zeros(16, dtype=np.int64) if want_counts else None
+    best = best_hits(_CARDS, draws, counts)
+    hist = np.bincount(best, minlength=16)[:16]
+    low = int(best.min()) if len(best) else 15
+    worst = [int(x) for x in draws[best == low][:WORST_KEEP]]
+    return hist, counts, worst
+
+# ─── Análise ───────────────────────────────────────────────────────────────
+def expected_counts(n_cards: int) -> List[float]:
+    """E[nº de cartões com j acertos] por sorteio (hipergeométrica exata)."""
+    return [n_cards * comb(15, j) * comb(10, 15 - j) / TOTAL_DRAWS for j in range(16)]
+
+def analyze(sb: Path, jobs: int, limit: int = 0, want_counts: bool = False) -> dict:
+    n_cards = len(premios.load_sb(sb))
+    if not n_cards:
+        sys.exit(f"❌ {sb} está vazio.")
+    total = min(limit, TOTAL_DRAWS) if limit else TOTAL_DRAWS
+    n_chunks = max(1, jobs * CHUNKS_PER_JOB)
+    step = -(-total // n_chunks)
+    tasks = [(a, min(a + step, total), want_counts) for a in range(0, total, step)]
+    hist = np.zeros(16, dtype=np.int64)
+    counts = np.zeros(16, dtype=np.int64)
+    worst: List[Tuple[int, int]] = []
+    t0 = time.perf_counter()
+    with ProcessPoolExecutor(jobs, initializer=_init, initargs=(str(sb),)) as ex:
+        for i, (h, c, w) in enumerate(ex.map(_chunk, tasks), 1):
+            hist += h
+            if c is not None:
+                counts += c
+            low = int(np.flatnonzero(h)[0])
+            worst += [(low, d) for d in w]
+            done = sum(t[1] - t[0] for t in tasks[:i])
+            print(f"\r   {100 * done / total:5.1f}% dos sorteios", end="", flush=True)
+    print()
+    low = int(np.flatnonzero(hist)[0])
+    return {
+        "sb": sb, "cartoes": n_cards, "sorteios": total,
+        "segundos": time.perf_counter() - t0, "minimo": low,
+        "hist": hist, "contagens": counts if want_counts else None,
+        "piores": [premios.mask_to_text(d) for v, d in worst if v == low][:WORST_KEEP],
+        "esperado": expected_counts(n_cards),
+    }
+
+def report(r: dict, table: dict) -> None:
+    n, total = r["cartoes"], r["sorteios"]
+    pairs = n * total
+    print(f"📊 {r['sb']}  ({n:,} cartões × {total:,} sorteios = {pairs:,} pares, "
+          f"{r['segundos']:.1f} s · {pairs / max(r['segundos'], 1e-9) / 1e9:.2f} G pares/s)")
+    print(f"   garantia: todo sorteio tem um cartão com ≥ {r['minimo']} acertos")
+    print("   melhor cartão  sorteios        fração")
+    for j in range(r["minimo"], 16):
+        print(f"   {j:>2} acertos  {r['hist'][j]:>11,}  {r['hist'][j] / total:>12.6%}")
+    exp = r["esperado"]
+    ret = sum(exp[j] * table[j] for j in premios.HITS)
+    print("   prêmios esperados/sorteio: "
+          + " ".join(f"{j}:{exp[j]:,.2f}" for j in premios.HITS)
+          + f" → R$ {ret:,.2f} (custo R$ {3.0 * n:,.2f})")
+    if r["contagens"] is not None:
+        ok = all(int(r["contagens"][j]) == n * comb(15, j) * comb(10, 15 - j)
+                 for j in range(16)) if total == TOTAL_DRAWS else None
+        print("   contagem exaustiva de pares por acertos: "
+              + " ".join(f"{j}:{int(r['contagens'][j]):,}" for j in premios.HITS)
+              + ("" if ok is None else f"  ({'confere' if ok else 'DIVERGE'} da fórmula)"))
+    if r["piores"]:
+        print(f"   ex. de sorteio no mínimo: {r['piores'][0]}")
+
+def save(r: dict) -> Path:
+    OUT_DIR.mkdir(exist_ok=True)
+    out = OUT_DIR / f"garantia_{r['sb'].stem}.csv"
+    with out.open("w", newline="", encoding="utf8") as f:
+        w = csv.writer(f)
+        w.writerow(["Max_acertos", "Sorteios", "Fracao", "Cartoes_esperados_com_j"])
+        for j in range(16):
+            w.writerow([j, int(r["hist"][j]), f"{r['hist'][j] / r['sorteios']:.8f}",
+                        f"{r['esperado'][j]:.6f}"])
+    return out
+
+# ─── Geração com garantia (--gerar T) ──────────────────────────────────────
+GEN_LOG = OUT_DIR / "acertos_log.csv"
+GEN_HEADER = ["Acertos", "Vizinhanca", "SB_size", "Lower_bound", "Approx_factor",
+              "Tempo (s)", "Pico_RAM(MB)"]
+
+def generate(t: int, eps: float, jobs: int) -> Path:
+    """SB em que todo sorteio tem um cartão com ≥ t acertos (greedy paralelo)."""
+    import resource
+    size = cover_engine.hit_size(t)
+    bound = -(-TOTAL_DRAWS // size)
+    print(f"▶ Garantia de {t} acertos: vizinhança de {size:,} sorteios por cartão, "
+          f"limite inferior ⌈{TOTAL_DRAWS:,} / {size:,}⌉ = {bound:,}")
+    draws = all_draws()
+    t0 = time.perf_counter()
+    rids, stats = cover_engine.parallel_greedy(draws, 15, eps, jobs, acertos=t)
+    elapsed = round(time.perf_counter() - t0, 2)
+    OUT_DIR.mkdir(exist_ok=True)
+    path = OUT_DIR / f"SB15_A{t}.csv"
+    sbformat.save_lines(path, [premios.mask_to_text(int(m)) for m in draws[rids]], t,
+                        "garantia.py", {"acertos": t, "motor": "paralelo", "eps": eps, "jobs": jobs})
+    peak_mb = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    cover_engine.append_log(GEN_LOG, GEN_HEADER, {
+        "Acertos": t, "Vizinhanca": size, "SB_size": len(rids), "Lower_bound": bound,
+        "Approx_factor": round(len(rids) / bound, 4), "Tempo (s)": elapsed,
+        "Pico_RAM(MB)": peak_mb, "Motor": "paralelo", "Epsilon": eps,
+        "Amostra": stats["amostra"], "Avaliacoes": stats["avaliacoes"],
+    })
+    print(f"✅ {path}: {len(rids):,} cartões (α={len(rids) / bound:.2f}) em {elapsed} s "
+          f"| pico RAM {peak_mb} MB")
+    print("📄 Log salvo em", GEN_LOG)
+    return path
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="SB × todos os 3 268 760 sorteios possíveis")
+    ap.add_argument("sb", type=Path, nargs="*", help="SB15_k.csv (padrão: os quatro)")
+    ap.add_argument("--jobs", type=int, default=1, help="processos")
+    ap.add_argument("--limite", type=int, default=0,
+                    help="só os N primeiros sorteios (amostra rápida)")
+    ap.add_argument("--contagens", action="store_true",
+                    help="soma também todos os pares por nº de acertos (mais lento)")
+    ap.add_argument("--premio", action="append", metavar="FAIXA=R$",
+                    help="valor de uma faixa (ex.: 14=1800); repetível")
+    ap.add_argument("--gerar", type=int, choices=(11, 12, 13, 14), metavar="T",
+                    help="gera um SB com garantia de ≥ T acertos (11‑14) e o analisa")
+    ap.add_argument("--eps", type=float, default=cover_engine.DEFAULT_EPS,
+                    help="--gerar: ε do greedy paralelo (limiar cai por 1+ε)")
+    args = ap.parse_args()
+
+    table = premios.parse_premios(args.premio)
+    if args.gerar:
+        sb = generate(args.gerar, args.eps, max(1, args.jobs))
+        r = analyze(sb, max(1, args.jobs), 0, args.contagens)
+        report(r, table)
+        print("📄 Histograma salvo em", save(r))
+        if r["minimo"] < args.gerar:
+            sys.exit(f"❌ Garantia violada: há sorteio com só {r['minimo']} acertos.")
+        print(f"✔ Garantia de {args.gerar} acertos confirmada em todos os sorteios.")
+        return
+    paths = args.sb or [p for p in SB_PATHS if p.exists()]
+    if not paths:
+        sys.exit("❌ Nenhum SB15_k encontrado — rode os programas 2‑5 primeiro.")
+    for sb in paths:
+        if not sb.exists():
+            sys.exit(f"❌ {sb} não encontrado.")
+        print(f"\n▶ {sb}")
+        r = analyze(sb, max(1, args.jobs), args.limite, args.contagens)
+        report(r, table)
+        print("📄 Histograma salvo em", save(r))
+
+if __name__ == "__main__":
+    main()
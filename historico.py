@@ -0,0 +1,506 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# AUTOR: Leonardo dos Santos Marques
+"""
+historico.py — histórico de benchmarks em SQLite (tendência e regressão).
+
+Cada linha dos logs do projeto vira uma execução (cenário + métricas +
+data, revisão git, máquina e Python) em historico.sqlite (--db ou
+LOTO_HISTORICO_DB), fora de resultados/ — sobrevive a `make reset` e ao
+bench.py, que apagam a pasta:
+
+    resultados/bench.csv                  gerador/S{k}
+    resultados/bench_stats.json           stats/S{k}/{formato}/{writer}  (medianas)
+    resultados/pipeline_bench.csv         pipeline/{etapa}
+    resultados/pipeline_runs.csv          dag/{etapa}/{modo}
+    prog*_saida/cover{k}_log.csv          cover/k{k}/{motor}[/{modo}]  (mmap, stream)
+    ooc_saida/ooc_log.csv                 ooc/{perfil}/t{t}
+    prog7_saida/resultado_custo_sb.csv    custo/{SB}
+    prog7_saida/acertos_log.csv           acertos/t{T}   (garantia.py --gerar)
+
+A ingestão é idempotente (chave = arquivo + posição + conteúdo da linha,
+sem as colunas que a migração de log antigo preenche com o padrão).
+Linhas sem Data/Revisão/Máquina próprias recebem as do momento da
+ingestão — por isso os scripts chamam `registrar(LOG)` logo após gravar o
+log (LOTO_HISTORICO=0 desliga).  Linhas com Status ≠ ok ficam de fora.
+
+    python historico.py ingerir                         # varre todos os logs
+    python historico.py tendencia --cenario 'cover/*'
+    python historico.py tendencia --cenario cover/k14/lazy --runs
+    python historico.py regressao --janela 5 --limiar 0.15   # sai com 1 se regrediu
+    python historico.py relatorio --escrever            # tabelas de docs/REPORT.md
+
+Regressão: a última execução de cada cenário contra a mediana das
+--janela anteriores *na mesma máquina*; tempo acima de (1 + --limiar) ou
+pico de RAM acima de (1 + --limiar-ram) da base conta como regressão
+(diferenças absolutas abaixo de MIN_DELTA são ruído e não contam).
+
+Relatório: os blocos entre `<!-- historico:NOME -->` e `<!-- /historico -->`
+do REPORT são refeitos com a execução mais recente de cada cenário (motor
+--motor nas tabelas de cobertura); bloco com cenário sem dados fica como está.
+"""
+from __future__ import annotations
+
+import argparse, csv, fnmatch, hashlib, json, os, platform, re, sqlite3, statistics, subprocess, sys
+from datetime import datetime
+from math import comb
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+DB_PATH = Path(os.environ.get("LOTO_HISTORICO_DB", "historico.sqlite"))
+REPORT = Path("docs/REPORT.md")
+DEFAULT_WINDOW = 5
+DEFAULT_LIMIAR = 0.15
+DEFAULT_LIMIAR_RAM = 0.10
+DEFAULT_MIN_RUNS = 3
+MIN_DELTA = {"tempo": 0.05, "RAM": 1.0}          # s, MB
+SPARK = "▁▂▃▄▅▆▇█"
+
+TEMPO = ("Tempo (s)",)
+RAM = ("Pico RAM (MB)", "Pico_RAM(MB)", "Pico RSS (MB)")
+CONTEXT = {"Data": "data", "Revisão": "revisao", "Máquina": "maquina", "Python": "python"}
+COVER_K = {14: 2, 13: 3, 12: 4, 11: 5}           # k → programa
+MIGRADOS = {"Motor": "lazy"}                     # padrões que cover_engine.append_log põe ao migrar
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id       INTEGER PRIMARY KEY,
+    chave    TEXT UNIQUE NOT NULL,
+    fonte    TEXT NOT NULL,
+    arquivo  TEXT NOT NULL,
+    cenario  TEXT NOT NULL,
+    data     TEXT NOT NULL,
+    revisao  TEXT,
+    maquina  TEXT,
+    python   TEXT
+);
+CREATE TABLE IF NOT EXISTS metricas (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    nome   TEXT NOT NULL,
+    valor  REAL,
+    texto  TEXT,
+    PRIMARY KEY (run_id, nome)
+);
+CREATE INDEX IF NOT EXISTS runs_cenario ON runs (cenario, data);
+"""
+
+Row = Tuple[str, Dict[str, object], Dict[str, str]]      # (cenário, métricas, contexto)
+
+# ─── Contexto da execução ──────────────────────────────────────────────────
+def git_revision() -> str:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"],
+                             capture_output=True, text=True, timeout=5)
+        return out.stdout.strip() or "-"
+    except (OSError, subprocess.SubprocessError):
+        return "-"
+
+def machine() -> str:
+    """Mesmo formato da coluna Máquina do bench.py --pipeline."""
+    try:
+        total = os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (AttributeError, ValueError, OSError):
+        total = 0
+    return f"{platform.node()} ({os.cpu_count()} CPUs, {total / 1_048_576:.0f} MB)"
+
+# ─── Leitores de log ───────────────────────────────────────────────────────
+def _csv_rows(path: Path) -> List[dict]:
+    with path.open(newline="", encoding="utf8") as f:
+        return list(csv.DictReader(f))
+
+def _ok(r: dict) -> bool:
+    return (r.get("Status") or "ok").lower().startswith("ok")
+
+def _ctx(r: dict) -> Dict[str, str]:
+    return {key: r[col] for col, key in CONTEXT.items() if r.get(col) not in (None, "", "-")}
+
+def read_bench(path: Path) -> Iterator[Row]:
+    for r in _csv_rows(path):
+        yield f"gerador/S{r['k']}", r, {}
+
+def read_stats(path: Path) -> Iterator[Row]:
+    doc = json.loads(path.read_text(encoding="utf8"))
+    meta = doc.get("meta", {})
+    ctx = {k: meta[k] for k in ("data", "python") if meta.get(k)}
+    for name, metrics in doc.get("cenarios", {}).items():
+        yield f"stats/{name}", {m: s["mediana"] for m, s in metrics.items()}, ctx
+
+def read_pipeline(path: Path) -> Iterator[Row]:
+    for r in _csv_rows(path):
+        if _ok(r):
+            yield f"pipeline/{r['Etapa']}", r, _ctx(r)
+
+def read_runs(path: Path) -> Iterator[Row]:
+    for r in _csv_rows(path):
+        if _ok(r):
+            yield f"dag/{r['Etapa']}/{r['Modo']}", r, _ctx(r)
+
+def read_cover(path: Path) -> Iterator[Row]:
+    k = re.search(r"cover(\d+)_log", path.name).group(1)
+    for r in _csv_rows(path):
+        modo = r.get("Modo") or "ram"               # picos de modos diferentes não se comparam
+        yield f"cover/k{k}/{r.get('Motor') or 'lazy'}" + ("" if modo == "ram" else f"/{modo}"), r, {}
+
+def read_ooc(path: Path) -> Iterator[Row]:
+    for r in _csv_rows(path):
+        yield f"ooc/{r['Perfil']}/t{r['t']}", r, {}
+
+def read_custo(path: Path) -> Iterator[Row]:
+    for r in _csv_rows(path):
+        if _ok(r):
+            yield f"custo/{r['SB']}", r, {}
+
+def read_acertos(path: Path) -> Iterator[Row]:
+    for r in _csv_rows(path):
+        yield f"acertos/t{r['Acertos']}", r, {}
+
+# (fonte, padrão a partir da raiz, leitor)
+SOURCES: List[Tuple[str, str, Callable[[Path], Iterator[Row]]]] = [
+    ("bench", "resultados/bench.csv", read_bench),
+    ("stats", "resultados/bench_stats.json", read_stats),
+    ("pipeline", "resultados/pipeline_bench.csv", read_pipeline),
+    ("dag", "resultados/pipeline_runs.csv", read_runs),
+    ("cover", "prog*_saida/cover*_log.csv", read_cover),
+    ("ooc", "ooc_saida/ooc_log.csv", read_ooc),
+    ("custo", "prog7_saida/resultado_custo_sb.csv", read_custo),
+    ("acertos", "prog7_saida/acertos_log.csv", read_acertos),
+]
+
+# ─── Ingestão ──────────────────────────────────────────────────────────────
+def connect() -> sqlite3.Connection:
+    con = sqlite3.connect(DB_PATH, timeout=30)       # etapas do pipeline gravam em paralelo
+    con.executescript(SCHEMA)
+    return con
+
+def _value(v: object) -> Tuple[Optional[float], Optional[str]]:
+    try:
+        return float(v), None
+    except (TypeError, ValueError):
+        return None, str(v)
+
+def _relative(path: Path) -> str:
+    try:
+        return path.resolve().relative_to(Path.cwd().resolve()).as_posix()
+    except ValueError:
+        return path.resolve().as_posix()
+
+def _key(fonte: str, name: str, i: int, metrics: dict, keep: bool = False) -> str:
+    """Chave da linha; sem `keep`, colunas com o padrão da migração não contam
+    (a linha migrada de um log antigo mantém a chave que já tinha)."""
+    items = sorted((k, v) for k, v in metrics.items() if keep or MIGRADOS.get(k) != v)
+    return hashlib.sha1(json.dumps([fonte, name, i, items],
+                                   ensure_ascii=False, default=str).encode()).hexdigest()
+
+def ingest_file(con: sqlite3.Connection, fonte: str, path: Path,
+                reader: Callable[[Path], Iterator[Row]], rev: str, host: str) -> Tuple[int, int]:
+    """(novas, já conhecidas) para um log; não faz commit."""
+    name = _relative(path)
+    default = {"data": datetime.fromtimestamp(path.stat().st_mtime).isoformat(timespec="seconds"),
+               "revisao": rev, "maquina": host, "python": platform.python_version()}
+    new = seen = 0
+    for i, (cenario, row, ctx) in enumerate(reader(path)):
+        metrics = {k: v for k, v in row.items()
+                   if k and k not in CONTEXT and v not in (None, "", "-")}
+        key, raw = _key(fonte, name, i, metrics), _key(fonte, name, i, metrics, keep=True)
+        if raw != key and con.execute("SELECT 1 FROM runs WHERE chave = ?", (raw,)).fetchone():
+            seen += 1                                # ingerida antes com a chave antiga
+            continue
+        c = {**default, **ctx}
+        cur = con.execute("INSERT OR IGNORE INTO runs (chave, fonte, arquivo, cenario, data, "
+                          "revisao, maquina, python) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                          (key, fonte, name, cenario, c["data"], c["revisao"], c["maquina"], c["python"]))
+        if not cur.rowcount:
+            seen += 1
+            continue
+        con.executemany("INSERT INTO metricas VALUES (?, ?, ?, ?)",
+                        [(cur.lastrowid, k, *_value(v)) for k, v in metrics.items()])
+        new += 1
+    return new, seen
+
+def ingest_all() -> None:
+    rev, host = git_revision(), machine()
+    con = connect()
+    try:
+        with con:
+            total = 0
+            for fonte, pattern, reader in SOURCES:
+                for path in sorted(Path().glob(pattern)):
+                    new, seen = ingest_file(con, fonte, path, reader, rev, host)
+                    total += new
+                    print(f"   {path.as_posix():<38} +{new:<5} ({seen} já no histórico)")
+        n = con.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+    finally:
+        con.close()
+    print(f"✅ {total} execução(ões) nova(s); {n} no total em {DB_PATH}")
+
+def registrar(path: Path) -> None:
+    """Ingere `path` logo após o script gravá-lo; nunca interrompe quem chamou."""
+    if os.environ.get("LOTO_HISTORICO", "1") == "0":
+        return
+    path = Path(path)
+    for fonte, pattern, reader in SOURCES:
+        if not path.match(pattern):
+            continue
+        try:
+            con = connect()
+            try:
+                with con:
+                    new, _ = ingest_file(con, fonte, path, reader, git_revision(), machine())
+            finally:
+                con.close()
+        except (OSError, sqlite3.Error, KeyError, ValueError) as e:
+            print(f"⚠️  histórico não atualizado ({path}): {e}")
+            return
+        if new:
+            print(f"🗃️  {new} execução(ões) registrada(s) em {DB_PATH}")
+        return
+
+# ─── Consultas ─────────────────────────────────────────────────────────────
+def load(con: sqlite3.Connection, pattern: str = "*") -> Dict[str, List[dict]]:
+    """cenário → execuções em ordem cronológica, cada uma com suas métricas."""
+    runs: Dict[str, List[dict]] = {}
+    byid: Dict[int, dict] = {}
+    for rid, cen, data, rev, host in con.execute(
+            "SELECT id, cenario, data, revisao, maquina FROM runs ORDER BY data, id"):
+        if fnmatch.fnmatchcase(cen, pattern):
+            byid[rid] = {"data": data, "revisao": rev, "maquina": host, "m": {}}
+            runs.setdefault(cen, []).append(byid[rid])
+    for rid, nome, valor, texto in con.execute("SELECT run_id, nome, valor, texto FROM metricas"):
+        if rid in byid:
+            byid[rid]["m"][nome] = texto if valor is None else valor
+    return runs
+
+def value(run: dict, names: Sequence[str]) -> Optional[float]:
+    for n in names:
+        v = run["m"].get(n)
+        if isinstance(v, float):
+            return v
+    return None
+
+def spark(xs: Sequence[float]) -> str:
+    lo, hi = min(xs), max(xs)
+    if hi == lo:
+        return SPARK[3] * len(xs)
+    return "".join(SPARK[round((x - lo) / (hi - lo) * (len(SPARK) - 1))] for x in xs)
+
+def trend(runs: Dict[str, List[dict]], metric: Optional[str], last: int, detail: bool) -> None:
+    series = [(metric, (metric,))] if metric else [("Tempo (s)", TEMPO), ("Pico RAM (MB)", RAM)]
+    for title, names in series:
+        print(f"\n📈 {title}")
+        print(f"   {'cenário':<30} {'n':>4} {'primeira':>10} {'última':>10} {'Δ':>8} "
+              f"{'mín':>10} {'mediana':>10}  últimas {last}")
+        for cen, rs in sorted(runs.items()):
+            pts = [(r, v) for r in rs if (v := value(r, names)) is not None]
+            if not pts:
+                continue
+            xs = [v for _, v in pts]
+            delta = f"{(xs[-1] / xs[0] - 1) * 100:+.1f}%" if xs[0] else "—"
+            print(f"   {cen:<30} {len(xs):>4} {xs[0]:>10.2f} {xs[-1]:>10.2f} {delta:>8} "
+                  f"{min(xs):>10.2f} {statistics.median(xs):>10.2f}  {spark(xs[-last:])}")
+            if detail:
+                for r, v in pts[-last:]:
+                    print(f"      {r['data']:<20} {r['revisao'] or '-':<9} {v:>10.2f}  {r['maquina'] or '-'}")
+
+def regressions(runs: Dict[str, List[dict]], window: int, limiar: float,
+                limiar_ram: float, min_runs: int) -> List[str]:
+    found: List[str] = []
+    checked = 0
+    for cen, rs in sorted(runs.items()):
+        cur = rs[-1]
+        prev = [r for r in rs[:-1] if r["maquina"] == cur["maquina"]][-window:]
+        for label, names, lim in (("tempo", TEMPO, limiar), ("RAM", RAM, limiar_ram)):
+            v = value(cur, names)
+            base = [x for r in prev if (x := value(r, names)) is not None]
+            if v is None or len(base) < min_runs:
+                continue
+            checked += 1
+            med = statistics.median(base)
+            if v > med * (1 + lim) and v - med > MIN_DELTA[label]:
+                found.append(f"{cen} ({label})")
+                print(f"   ❌ {cen}: {label} {v:.2f} vs base {med:.2f} "
+                      f"({(v / med - 1) * 100:+.1f} %, {len(base)} exec., rev {cur['revisao']})")
+    print(f"   {checked} série(s) comparada(s) com a mediana das últimas {window} "
+          f"(mín. {min_runs} na mesma máquina)")
+    return found
+
+# ─── Tabelas do REPORT ─────────────────────────────────────────────────────
+BLOCK_RE = re.compile(r"(<!-- historico:(\w+) -->\n)(.*?)(<!-- /historico -->)", re.S)
+
+def _int(n: float) -> str:
+    return f"{int(n):,}".replace(",", " ")
+
+def _brl(x: float) -> str:
+    return f"{x:,.2f}".replace(",", " ").replace(".", ",")
+
+def _ram(mb: float) -> str:
+    return f"{mb / 1024:.1f} GB" if mb >= 1024 else f"{mb:.0f} MiB"
+
+def _secs(s: float, hours: bool = False) -> str:
+    if hours and s >= 3 * 3600:
+        h, m = divmod(round(s / 60), 60)
+        return f"{h} h {m:02d} m"
+    return f"{_int(round(s))} s"
+
+def md_table(header: Sequence[str], rows: Sequence[Sequence[str]], align: str) -> List[str]:
+    """Tabela markdown alinhada; align: l/r/c por coluna."""
+    w = [max(3, *(len(r[i]) for r in [header, *rows])) for i in range(len(header))]
+    pad = {"l": str.ljust, "r": str.rjust, "c": str.center}
+    rule = {"l": lambda n: "-" * n, "r": lambda n: "-" * (n - 1) + ":",
+            "c": lambda n: ":" + "-" * (n - 2) + ":"}
+    line = lambda cells: "| " + " | ".join(pad[a](c, n) for c, a, n in zip(cells, align, w)) + " |"
+    return [line(header), "| " + " | ".join(rule[a](n) for a, n in zip(align, w)) + " |",
+            *(line(r) for r in rows)]
+
+def _need(runs: Dict[str, List[dict]], cen: str) -> dict:
+    if not runs.get(cen):
+        raise LookupError(cen)
+    return runs[cen][-1]
+
+def _origin(picked: Sequence[dict]) -> str:
+    hosts = sorted({r["maquina"] or "-" for r in picked})
+    revs = sorted({r["revisao"] or "-" for r in picked})
+    return (f"_Máquina: {'; '.join(hosts)} · revisão {', '.join(revs)} · "
+            f"{max(r['data'] for r in picked)[:10]}_")
+
+def block_gerador(runs: Dict[str, List[dict]], motor: str) -> List[str]:
+    picked = [_need(runs, f"gerador/S{k}") for k in (15, 14, 13, 12, 11)]
+    rows = [[_int(r["m"]["k"]), _int(r["m"]["Combinações"]), f"{r['m']['Tempo (s)']:.1f}",
+             _ram(r["m"]["Pico RAM (MB)"])] for r in picked]
+    return [_origin(picked), "", *md_table(["k", "C(25,k)", "Tempo (s)", "Pico RAM"], rows, "rlll")]
+
+def block_alfa(runs: Dict[str, List[dict]], motor: str) -> List[str]:
+    picked = [_need(runs, f"cover/k{k}/{motor}") for k in COVER_K]
+    rows = []
+    for k, r in zip(COVER_K, picked):
+        m = r["m"]
+        rows.append([f"SB15-{k}", _int(comb(25, k)), f"{m['lnU+1']:.2f}", _int(m["SB_size"]),
+                     _int(m["Lower_bound"]), f"**{m['Approx_factor']:.2f}**",
+                     f"**{m['Alpha_over_ln']:.3f}**", _secs(m["Tempo (s)"], hours=True),
+                     _ram(m["Pico_RAM(MB)"])])
+    worst = max(r["m"]["Alpha_over_ln"] for r in picked)
+    return [_origin(picked), "",
+            *md_table(["SB", "\\|U\\|", "ln\\|U\\|+1", "\\|SB\\|", "Lower", "**α**",
+                       "**α ∕ (ln\\|U\\|+1)**", "Tempo", "RAM"], rows, "lrrrrrrrr"),
+            "", f"> Todos os **α ∕ (ln|U|+1) ≤ {worst:.2f}** ⇒ bem abaixo da cota teórica (1.0)."]
+
+def _custos(runs: Dict[str, List[dict]]) -> List[Tuple[str, dict]]:
+    return [(f"SB15-{k}", _need(runs, f"custo/SB15_{k}")["m"]) for k in COVER_K]
+
+def block_custo(runs: Dict[str, List[dict]], motor: str) -> List[str]:
+    rows = [[sb, _int(m["Linhas"]), _brl(m["Custo_R$"]), str(m.get("Status", "ok")).lower()]
+            for sb, m in _custos(runs)]
+    return md_table(["Subconjunto", "Linhas", "Custo (R\\$)", "Status"], rows, "lrrl")
+
+def block_custos(runs: Dict[str, List[dict]], motor: str) -> List[str]:
+    custos = _custos(runs)
+    rows = [[sb, _int(m["Linhas"]), _brl(m["Custo_R$"])] for sb, m in custos]
+    last = custos[-1][1]
+    total = comb(25, 15)
+    full = total * last["Custo_R$"] / last["Linhas"]
+    return [*md_table(["SB", "Cartões", "R\\$"], rows, "lrr"), "",
+            f"De {_int(total)} cartões iniciais (R\\$ {full / 1e6:.1f} mi".replace(".", ",")
+            + f") para {_int(last['Linhas'])} cartões (R\\$ {last['Custo_R$'] / 1e3:.0f} mil) "
+            f"→ **economia {total / last['Linhas']:.0f} ×**."]
+
+def block_consolidado(runs: Dict[str, List[dict]], motor: str) -> List[str]:
+    gen = [_need(runs, f"gerador/S{k}")["m"] for k in (15, 14, 13, 12, 11)]
+    ts = [m["Tempo (s)"] for m in gen]
+    rows = [["1", "S15…S11", "—", "—", f"{min(ts):.0f}-{max(ts):.0f} s",
+             _ram(max(m["Pico RAM (MB)"] for m in gen))]]
+    for k, prog in COVER_K.items():
+        m = _need(runs, f"cover/k{k}/{motor}")["m"]
+        rows.append([str(prog), f"SB15-{k}", f"{m['Approx_factor']:.2f}",
+                     f"{m['Alpha_over_ln']:.2f}", _secs(m["Tempo (s)"]), _ram(m["Pico_RAM(MB)"])])
+    return md_table(["Prog", "Escopo", "α", "α ∕ ln", "Tempo", "RAM"], rows, "clllll")
+
+BLOCKS: Dict[str, Callable[[Dict[str, List[dict]], str], List[str]]] = {
+    "gerador": block_gerador, "alfa": block_alfa, "custo": block_custo,
+    "consolidado": block_consolidado, "custos": block_custos,
+}
+
+def render(text: str, runs: Dict[str, List[dict]], motor: str) -> Tuple[str, List[str]]:
+    """(texto com os blocos refeitos, nomes refeitos); blocos sem dados ficam intactos."""
+    done: List[str] = []
+    def sub(m: re.Match) -> str:
+        name = m.group(2)
+        if name not in BLOCKS:
+            print(f"   ⚠️  bloco desconhecido: {name}")
+            return m.group(0)
+        try:
+            lines = BLOCKS[name](runs, motor)
+        except LookupError as e:
+            print(f"   · {name}: sem dados de {e.args[0]} — mantido")
+            return m.group(0)
+        done.append(name)
+        return m.group(1) + "\n" + "\n".join(lines) + "\n\n" + m.group(4)
+    return BLOCK_RE.sub(sub, text), done
+
+# ─── CLI ───────────────────────────────────────────────────────────────────
+def parse_args() -> argparse.Namespace:
+    ap = argparse.ArgumentParser(description="Histórico de benchmarks (SQLite): "
+                                             "tendência, regressão e tabelas do REPORT")
+    ap.add_argument("acao", choices=("ingerir", "tendencia", "regressao", "relatorio"))
+    ap.add_argument("--db", type=Path, default=DB_PATH, help="arquivo SQLite do histórico")
+    ap.add_argument("--cenario", default="*", help="padrão glob (ex.: 'cover/k1[34]/*')")
+    ap.add_argument("--metrica", help="tendência: coluna do log (padrão: tempo e pico de RAM)")
+    ap.add_argument("-n", type=int, default=12, help="tendência: últimas N execuções na série")
+    ap.add_argument("--runs", action="store_true", help="tendência: lista cada execução")
+    ap.add_argument("--janela", type=int, default=DEFAULT_WINDOW,
+                    help="regressão: execuções anteriores na base móvel")
+    ap.add_argument("--min", type=int, default=DEFAULT_MIN_RUNS, dest="min_runs",
+                    help="regressão: execuções mínimas na base para comparar")
+    ap.add_argument("--limiar", type=float, default=DEFAULT_LIMIAR,
+                    help="regressão: aumento de tempo tolerado (fração)")
+    ap.add_argument("--limiar-ram", type=float, default=DEFAULT_LIMIAR_RAM,
+                    help="regressão: aumento de pico de RAM tolerado (fração)")
+    ap.add_argument("--motor", default="lazy", help="relatório: motor das tabelas de cobertura")
+    ap.add_argument("--report", type=Path, default=REPORT, help="relatório: arquivo markdown")
+    ap.add_argument("--escrever", action="store_true",
+                    help="relatório: grava o REPORT (sem isto só mostra os blocos)")
+    return ap.parse_args()
+
+def main() -> None:
+    global DB_PATH
+    args = parse_args()
+    DB_PATH = args.db
+    if args.acao == "ingerir":
+        ingest_all()
+        return
+    if not DB_PATH.exists():
+        sys.exit(f"❌ {DB_PATH} não existe (rode: python historico.py ingerir)")
+    con = connect()
+    try:
+        runs = load(con, args.cenario)
+    finally:
+        con.close()
+    if not runs:
+        sys.exit(f"❌ nenhum cenário casa com {args.cenario!r}")
+
+    if args.acao == "tendencia":
+        trend(runs, args.metrica, args.n, args.runs)
+    elif args.acao == "regressao":
+        print(f"🔎 regressões (tempo > +{args.limiar:.0%}, RAM > +{args.limiar_ram:.0%})")
+        found = regressions(runs, args.janela, args.limiar, args.limiar_ram, args.min_runs)
+        if found:
+            sys.exit(f"❌ {len(found)} regressão(ões): {', '.join(found)}")
+        print("✅ nenhuma regressão.")
+    else:
+        if not args.report.exists():
+            sys.exit(f"❌ {args.report} não encontrado")
+        text = args.report.read_text(encoding="utf8")
+        new, done = render(text, runs, args.motor)
+        if not BLOCK_RE.search(text):
+            sys.exit(f"❌ {args.report} sem blocos <!-- historico:NOME -->")
+        if not args.escrever:
+            for m in BLOCK_RE.finditer(new):
+                if m.group(2) in done:
+                    print(f"\n--- {m.group(2)} ---{m.group(3).rstrip()}")
+            print(f"\n(prévia — --escrever grava {args.report})")
+        elif new != text:
+            args.report.write_text(new, encoding="utf8")
+            print(f"📄 {args.report}: {', '.join(done)} atualizado(s)")
+        else:
+            print(f"✔ {args.report} já reflete o histórico")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+# AUTOR: Leonardo dos Santos Marques
+"""
+lotofacil — pacote importável sobre os scripts do projeto.
+
+Os scripts (bench.py, programa2‑5.py, verify_all.py, …) continuam na raiz
+— Makefile, pipeline.py e o zip de entrega os chamam pelo caminho — e este
+pacote os expõe sem custo de importação:
+
+    import lotofacil
+    lotofacil.sbformat.load_masks(...)      # módulo da raiz, importado no 1º acesso
+    lotofacil.run("verify", "--sample", "2000")
+
+    python -m lotofacil gen|cover|verify|cost|bench|package|…   (lotofacil/cli.py)
+
+Nada pesado (numpy, psutil, bitarray, matplotlib) é importado aqui nem no
+despacho do CLI: cada subcomando importa só o seu script, e os scripts
+adiam as dependências opcionais até o ponto de uso.
+"""
+from __future__ import annotations
+
+import importlib, sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:                # scripts da raiz importáveis de qualquer lugar
+    sys.path.insert(0, str(ROOT))
+
+MODULES = (
+    "bench", "calcular_custo_sb", "cover_engine", "cover_ooc", "cover_workers", "garantia",
+    "historico", "lotogen", "manifest", "memplan", "package", "pcompress", "perfis", "pipeline", "premios",
+    "programa2", "programa3", "programa4", "programa5", "sbdaemon", "sbformat",
+    "stagecache", "telemetry", "timeline", "verify_all",
+)
+
+def __getattr__(name: str):
+    if name in MODULES:
+        mod = importlib.import_module(name)
+        globals()[name] = mod
+        return mod
+    if name == "run":
+        from lotofacil.cli import run
+        return run
+    raise AttributeError(f"module 'lotofacil' has no attribute {name!r}")
+
+def __dir__():
+    return sorted(list(globals()) + list(MODULES) + ["run"])
@@ -0,0 +1,5 @@
+# -*- coding: utf-8 -*-
+"""python -m lotofacil SUBCOMANDO … (ver lotofacil/cli.py)"""
+from lotofacil.cli import main
+
+main()
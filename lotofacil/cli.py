@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+# AUTOR: Leonardo dos Santos Marques
+"""
+lotofacil/cli.py — ponto de entrada único dos scripts do projeto.
+
+    python -m lotofacil gen 14                # lotogen.py 14
+    python -m lotofacil cover 11 --stream     # programa5.py --stream (14→2, 13→3, 12→4, 11→5)
+    python -m lotofacil verify --sample 2000  # verify_all.py
+    python -m lotofacil cost                  # calcular_custo_sb.py
+    python -m lotofacil bench                 # bench.py
+    python -m lotofacil package --incremental # package.py
+    python -m lotofacil importtime            # partida de cada subcomando (make importtime)
+
+O despacho importa só o script do subcomando (argv repassado intacto) e
+nenhuma dependência pesada: os subcomandos leves partem em dezenas de ms.
+`importtime` confere isso em processos novos — falha se um subcomando leve
+carregar numpy/psutil/bitarray/matplotlib ou se a importação do script passar
+de --limite-ms (a coluna partida, com interpretador e --help, é só
+informativa); os pesados sem a dependência instalada (ooc, garantia, premios
+sem numpy) saem como "requer numpy".  tests/test_importtime.py roda a mesma checagem no pytest.
+"""
+from __future__ import annotations
+
+import argparse, importlib, subprocess, sys, time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# subcomando → (script, descrição)
+COMMANDS: Dict[str, Tuple[str, str]] = {
+    "gen":        ("lotogen", "gera S_k em CSV (lotogen.py)"),
+    "bench":      ("bench", "S15…S11 + bench.csv, estatísticas, --pipeline"),
+    "cover":      ("", "SB15_K pelo programa 2‑5: cover K [opções do programa]"),
+    "ooc":        ("cover_ooc", "cobertura fora da memória por perfil (cover_ooc.py)"),
+    "verify":     ("verify_all", "verificação dos SB (completa, --jobs, --sample, --daemon)"),
+    "cost":       ("calcular_custo_sb", "custo das jogadas (prog7_saida)"),
+    "garantia":   ("garantia", "SB × todos os sorteios; --gerar T (≥ T acertos)"),
+    "premios":    ("premios", "prêmios esperados por cartão/SB"),
+    "package":    ("package", "lotofacil_submission.zip"),
+    "pipeline":   ("pipeline", "DAG gen → sb14…sb11 → verify → custo → package"),
+    "status":     ("manifest", "artefatos do manifest.json"),
+    "sb":         ("sbformat", "formato binário .sb (converter, info, exportar)"),
+    "cache":      ("stagecache", "cache de etapas do pipeline"),
+    "daemon":     ("sbdaemon", "daemon de índices S_k/SB por socket Unix"),
+    "workers":    ("cover_workers", "workers TCP da varredura inicial (cover --workers)"),
+    "telemetria": ("telemetry", "acompanhar snapshots de telemetria"),
+    "timeline":   ("timeline", "amostragem RSS/CPU/I/O de um comando"),
+    "perfis":     ("perfis", "perfis de jogo (Quina, Mega‑Sena, …)"),
+    "historico":  ("historico", "histórico SQLite: tendência, regressões, tabelas do REPORT"),
+}
+COVER = {14: "programa2", 13: "programa3", 12: "programa4", 11: "programa5"}
+
+LIGHT = ("gen", "bench", "cover", "verify", "cost", "package", "pipeline", "status", "sb",
+         "cache", "daemon", "workers", "telemetria", "timeline", "perfis", "historico")
+HEAVY = ("numpy", "psutil", "bitarray", "matplotlib")
+DEFAULT_LIMIT_MS = 100.0
+
+def resolve(cmd: str, args: Sequence[str]) -> Tuple[str, List[str]]:
+    """(script, argv restante); `cover K` escolhe o programa pelo K."""
+    if cmd not in COMMANDS:
+        raise SystemExit(f"❌ subcomando desconhecido: {cmd} (use {', '.join(COMMANDS)})")
+    if cmd != "cover":
+        return COMMANDS[cmd][0], list(args)
+    if not args or not args[0].isdigit() or int(args[0]) not in COVER:
+        raise SystemExit("❌ uso: lotofacil cover K [opções]  (K = 14, 13, 12 ou 11)")
+    return COVER[int(args[0])], list(args[1:])
+
+def run(cmd: str, *args: str) -> None:
+    """Executa o subcomando no processo atual, como `python <script>.py args…`."""
+    name, argv = resolve(cmd, args)
+    mod = importlib.import_module(name)
+    saved = sys.argv
+    sys.argv = [f"{name}.py", *argv]
+    try:
+        mod.main()
+    finally:
+        sys.argv = saved
+
+# ─── Tempo de partida ──────────────────────────────────────────────────────
+_PROBE = ("import sys, time; t = time.perf_counter(); import lotofacil.cli as c\n"
+          "try: __import__(c.resolve({cmd!r}, {args!r})[0])\n"
+          "except ModuleNotFoundError as e: print(-1, '!' + str(e.name)); sys.exit()\n"
+          "print((time.perf_counter() - t) * 1000, *[m for m in c.HEAVY if m in sys.modules])")
+
+def probe(cmd: str, args: Sequence[str] = (),
+          repeat: int = 3) -> Tuple[float, Optional[float], List[str], Optional[str]]:
+    """(ms de partida `-m lotofacil cmd --help`, ms de importação, pesados carregados,
+    dependência ausente).  Sem a dependência (ex.: ooc/garantia/premios sem numpy)
+    a importação vem None e o último campo diz qual falta."""
+    start = imp = float("inf")
+    heavy: List[str] = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        subprocess.run([sys.executable, "-m", "lotofacil", cmd, *args, "--help"],
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False)
+        start = min(start, (time.perf_counter() - t0) * 1000)
+        r = subprocess.run([sys.executable, "-c", _PROBE.format(cmd=cmd, args=list(args))],
+                           capture_output=True, text=True, check=False)
+        out = r.stdout.split()
+        if r.returncode or not out:
+            raise RuntimeError(f"importação de {cmd} falhou:\n{r.stderr.strip()}")
+        if out[1:2] and out[1].startswith("!"):
+            return start, None, [], out[1][1:]
+        imp, heavy = min(imp, float(out[0])), out[1:]
+    return start, imp, heavy, None
+
+def importtime(limit_ms: float, repeat: int) -> None:
+    t0 = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "pass"], check=True)
+    base = (time.perf_counter() - t0) * 1000
+    print(f"⏱  partida por subcomando (mín. de {repeat}; interpretador vazio ≈ {base:.0f} ms)")
+    print(f"   {'subcomando':<12} {'partida':>9} {'importação':>11}  pesados")
+    bad = []
+    for cmd in COMMANDS:
+        args = ("14",) if cmd == "cover" else ()
+        start, imp, heavy, missing = probe(cmd, args, repeat)
+        light = cmd in LIGHT
+        fail = light and bool(heavy or missing or imp > limit_ms)   # mesma métrica do pytest
+        col = f"{imp:8.0f} ms" if imp is not None else f"{'—':>11}"
+        extra = f"requer {missing}" if missing else ", ".join(heavy) or "—"
+        print(f"   {'❌' if fail else '✔' if light else '·'} {cmd:<10} {start:7.0f} ms "
+              f"{col}  {extra}")
+        if fail:
+            bad.append(cmd)
+    if bad:
+        sys.exit(f"❌ subcomandos leves lentos ou com dependência pesada: {', '.join(bad)} "
+                 f"(limite de importação {limit_ms:.0f} ms)")
+    print(f"✅ subcomandos leves importam em menos de {limit_ms:.0f} ms, sem {'/'.join(HEAVY)}.")
+
+# ─── CLI ───────────────────────────────────────────────────────────────────
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if not argv or argv[0] in ("-h", "--help"):
+        print("uso: python -m lotofacil SUBCOMANDO [opções do script]\n")
+        for cmd, (_, desc) in COMMANDS.items():
+            print(f"   {cmd:<11} {desc}")
+        print(f"   {'importtime':<11} mede a partida de cada subcomando (--limite-ms, -n)")
+        return
+    cmd, rest = argv[0], argv[1:]
+    if cmd == "importtime":
+        ap = argparse.ArgumentParser(prog="lotofacil importtime")
+        ap.add_argument("--limite-ms", type=float, default=DEFAULT_LIMIT_MS,
+                        help="teto de importação dos subcomandos leves")
+        ap.add_argument("-n", type=int, default=3, help="repetições (vale o mínimo)")
+        a = ap.parse_args(rest)
+        importtime(a.limite_ms, a.n)
+        return
+    run(cmd, *rest)
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,13 @@ Suporta saída em:
 Exemplos: (nao utilizados no fluxo principal, apenas para testes)
     python lotogen.py 15 --csv -o ./resultados
     python lotogen.py --all --csv 
+    python lotogen.py 15 --csv --writer batch   # estratégia de escrita
+    python lotogen.py 4 --csv --perfil megasena # outro jogo (perfis.py)
+
+Estratégias de escrita (--writer), comparadas por `bench.py --stats`:
+    csv    csv.writer.writerow por linha (padrão p/ .csv)
+    join   fh.write(sep.join(...)) por linha (padrão p/ .txt)
+    batch  junta BATCH_ROWS linhas por write
 """
 from __future__ import annotations
 import argparse, math, sys, csv
@@ -14,9 +21,14 @@ from pathlib import Path
 from time import perf_counter
 from typing import Iterable, Sequence, TextIO, List
 
-TOTAL_NUMBERS = 25
+import manifest
+import perfis
+
+TOTAL_NUMBERS = perfis.LOTOFACIL.numeros   # --perfil troca
 DEFAULT_KS = [15, 14, 13, 12, 11]
 PROGRESS_STEP = 100_000
+BATCH_ROWS = 8_192
+WRITERS = ('csv', 'join', 'batch')
 
 def nchoosek(k: int) -> int:
     return math.comb(TOTAL_NUMBERS, k)
@@ -38,7 +50,13 @@ def progress_msg(k: int, cur: int, total: int) -> None:
     if cur == total:
         print(file=sys.stderr)
 
-def write_table(k: int, out_dir: Path, csv_mode: bool, step: int=PROGRESS_STEP) -> None:
+def write_table(k: int, out_dir: Path, csv_mode: bool, step: int=PROGRESS_STEP,
+                writer: str | None = None, record: bool = True) -> None:
+    writer = writer or ('csv' if csv_mode else 'join')
+    if writer == 'csv' and not csv_mode:
+        raise ValueError('--writer csv exige saída --csv')
+    sep = ',' if csv_mode else ' '
+    eol = '\r\n' if csv_mode else '\n'      # mesmo terminador do csv.writer
     total = nchoosek(k)
     filename = f'S{k}.{"csv" if csv_mode else "txt"}'
     target = out_dir / filename
@@ -47,35 +65,63 @@ def write_table(k: int, out_dir: Path, csv_mode: bool, step: int=PROGRESS_STEP)
     print(f'▶️  S{k}: {human_int(total)} comb → {target}')
     start = perf_counter()
     written = 0
-    with open_sink(target, csv_mode) as fh:
-        if csv_mode:
-            writer = csv.writer(fh)
-        for written, combo in enumerate(generate_combinations(k), start=1):
-            if csv_mode:
-                writer.writerow(combo)
-            else:
-                fh.write(" ".join(map(str, combo)) + "\n")
-            if written % step == 0 or written == total:
-                progress_msg(k, written, total)
+    with open_sink(target, csv_mode) as raw:
+        fh = manifest.HashingSink(raw)       # hash calculado enquanto grava
+        if writer == 'csv':
+            w = csv.writer(fh)
+            for written, combo in enumerate(generate_combinations(k), start=1):
+                w.writerow(combo)
+                if written % step == 0 or written == total:
+                    progress_msg(k, written, total)
+        elif writer == 'join':
+            for written, combo in enumerate(generate_combinations(k), start=1):
+                fh.write(sep.join(map(str, combo)) + eol)
+                if written % step == 0 or written == total:
+                    progress_msg(k, written, total)
+        else:
+            batch: List[str] = []
+            for written, combo in enumerate(generate_combinations(k), start=1):
+                batch.append(sep.join(map(str, combo)))
+                if len(batch) == BATCH_ROWS or written == total:
+                    fh.write(eol.join(batch) + eol)
+                    batch.clear()
+                if written % step == 0 or written == total:
+                    progress_msg(k, written, total)
+        digest = fh.hexdigest()
     elapsed = perf_counter() - start
     if written != total:
         raise RuntimeError(f'Validação falhou S{k}: {written} ≠ {total}')
+    if record:
+        manifest.record(target, written, digest, 'lotogen.py',
+                        {'k': k, 'n': TOTAL_NUMBERS, 'formato': 'csv' if csv_mode else 'txt',
+                         'writer': writer})
     size_mb = target.stat().st_size / (1024 * 1024)
     print(f'✅  S{k} | {human_int(written)} linhas | {size_mb:.1f} MB | {elapsed:.2f} s\n')
 
 def parse_args() -> argparse.Namespace:
     ap = argparse.ArgumentParser(description='Gerador de combinações Lotofácil')
-    group = ap.add_mutually_exclusive_group(required=True)
-    group.add_argument('ks', metavar='K', type=int, nargs='*', help='valores de k (ex.: 15 13)')
-    group.add_argument('--all', action='store_true', help='gera S15…S11')
+    # K e --all são exclusivos; checado à mão (argparse ≥ 3.11 recusa
+    # posicional com nargs='*' dentro de grupo mutuamente exclusivo)
+    ap.add_argument('ks', metavar='K', type=int, nargs='*', help='valores de k (ex.: 15 13)')
+    ap.add_argument('--all', action='store_true', help='gera S15…S11 (ou os k do perfil)')
     ap.add_argument('--csv', action='store_true', help='salvar como .csv')
     ap.add_argument('-o', '--outdir', default='.', help='diretório de saída')
     ap.add_argument('--step', type=int, default=PROGRESS_STEP, help='linhas por update')
-    return ap.parse_args()
+    ap.add_argument('--writer', choices=WRITERS, help='estratégia de escrita')
+    ap.add_argument('--perfil', choices=list(perfis.PERFIS), default='lotofacil',
+                    help='jogo: define N (--all = cartão e alvos do perfil)')
+    args = ap.parse_args()
+    if args.all and args.ks:
+        ap.error('use K… ou --all, não ambos')
+    return args
 
 def main() -> None:
+    global TOTAL_NUMBERS
     args = parse_args()
-    ks: List[int] = DEFAULT_KS if args.all else args.ks
+    perfil = perfis.get(args.perfil)
+    TOTAL_NUMBERS = perfil.numeros
+    default_ks = DEFAULT_KS if perfil is perfis.LOTOFACIL else [perfil.cartao, *perfil.alvos]
+    ks: List[int] = default_ks if args.all else args.ks
     if not ks:
         print('Nenhum K informado', file=sys.stderr)
         sys.exit(1)
@@ -84,7 +130,7 @@ def main() -> None:
         if not 1 <= k <= TOTAL_NUMBERS:
             print(f'⚠️  ignorando K={k}', file=sys.stderr)
             continue
-        write_table(k, out_dir, csv_mode=args.csv, step=args.step)
+        write_table(k, out_dir, csv_mode=args.csv, step=args.step, writer=args.writer)
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# AUTOR: Leonardo dos Santos Marques
+"""
+manifest.py — manifesto dos artefatos gerados (manifest.json na raiz).
+
+Cada gerador (lotogen, programas 2‑5, verify_all, package) registra, no
+momento em que grava o arquivo, uma entrada com:
+
+    linhas · bytes · mtime_ns · blake2b (hash em streaming) · gerador ·
+    parâmetros · data · verificação (status, faltantes, por quem, quando)
+
+Assim o custo, as checagens de existência e o empacotamento respondem em
+O(1) pelos metadados, e um arquivo alterado depois do registro é detectado
+por tamanho/mtime sem reler gigabytes.
+
+Uso:
+    python manifest.py            # lista artefatos: ok / obsoleto / ausente
+    python manifest.py --check    # idem, sai com erro se algo obsoleto/ausente
+"""
+from __future__ import annotations
+
+import argparse, datetime, hashlib, json, os, sys, time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional, TextIO
+
+MANIFEST = Path("manifest.json")
+LOCK = MANIFEST.with_suffix(".json.lock")
+HASH_CHUNK = 1 << 20           # leitura em blocos de 1 MiB
+SINK_BATCH = 4_096             # linhas acumuladas antes de hash + write
+LOCK_STALE_S = 60
+
+# ─── Hash em streaming ─────────────────────────────────────────────────────
+def new_hash():
+    return hashlib.blake2b(digest_size=16)
+
+def digest_bytes(data: bytes) -> str:
+    h = new_hash()
+    h.update(data)
+    return h.hexdigest()
+
+def file_digest(path: Path) -> str:
+    h = new_hash()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+class HashingSink:
+    """Envolve um arquivo texto: agrupa as escritas e calcula o hash no caminho.
+
+    Compatível com `csv.writer` (só precisa de `write`).  O texto é
+    acumulado em lotes de SINK_BATCH escritas, então o custo extra por
+    linha é um `append`.
+    """
+
+    def __init__(self, fh: TextIO, encoding: str = "ascii") -> None:
+        self.fh, self.encoding = fh, encoding
+        self.hash = new_hash()
+        self._buf: list = []
+
+    def write(self, s: str) -> int:
+        self._buf.append(s)
+        if len(self._buf) >= SINK_BATCH:
+            self.flush()
+        return len(s)
+
+    def flush(self) -> None:
+        if self._buf:
+            data = "".join(self._buf)
+            self._buf.clear()
+            self.hash.update(data.encode(self.encoding))
+            self.fh.write(data)
+
+    def hexdigest(self) -> str:
+        self.flush()
+        return self.hash.hexdigest()
+
+# ─── Leitura / escrita do manifesto ────────────────────────────────────────
+def _key(path: Path) -> str:
+    p = Path(path)
+    try:
+        return p.resolve().relative_to(MANIFEST.resolve().parent).as_posix()
+    except ValueError:
+        return p.resolve().as_posix()
+
+@contextmanager
+def _locked() -> Iterator[None]:
+    """Trava simples por arquivo (O_EXCL) — funciona em Windows e Linux."""
+    deadline = time.monotonic() + 30
+    while True:
+        try:
+            fd = os.open(LOCK, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            try:
+                if time.time() - LOCK.stat().st_mtime > LOCK_STALE_S:
+                    LOCK.unlink()          # trava órfã de processo morto
+                    continue
+            except FileNotFoundError:
+                continue
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"{LOCK} ocupado")
+            time.sleep(0.05)
+    try:
+        yield
+    finally:
+        os.close(fd)
+        LOCK.unlink(missing_ok=True)
+
+def load() -> dict:
+    if not MANIFEST.exists():
+        return {}
+    with MANIFEST.open(encoding="utf8") as f:
+        return json.load(f)
+
+def _save(data: dict) -> None:
+    tmp = MANIFEST.with_suffix(".json.tmp")
+    with tmp.open("w", encoding="utf8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=1, sort_keys=True)
+    os.replace(tmp, MANIFEST)
+
+def _now() -> str:
+    return datetime.datetime.now().isoformat(timespec="seconds")
+
+def record(path: Path, rows: int, digest: Optional[str], gerador: str,
+           parametros: Optional[dict] = None) -> dict:
+    """Registra (ou substitui) a entrada de um artefato recém-gravado.
+
+    digest None = hash pendente (ex.: verify_all --add): linhas/tamanho valem
+    na hora e o blake2b é calculado por `current_digest` quando alguém pedir.
+    """
+    st = Path(path).stat()
+    entry = {
+        "linhas": rows,
+        "bytes": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+        "blake2b": digest,
+        "gerador": gerador,
+        "parametros": parametros or {},
+        "gerado_em": _now(),
+        "verificacao": None,
+    }
+    with _locked():
+        data = load()
+        data[_key(path)] = entry
+        _save(data)
+    return entry
+
+def set_verified(path: Path, ok: bool, por: str, faltantes: int = 0) -> None:
+    """Anota o resultado de uma verificação de cobertura (se o artefato estiver fresco)."""
+    with _locked():
+        data = load()
+        entry = data.get(_key(path))
+        if entry is None or not _fresh(path, entry):
+            return
+        entry["verificacao"] = {"status": "ok" if ok else "falha",
+                                "faltantes": faltantes, "por": por, "em": _now()}
+        _save(data)
+
+# ─── Consultas O(1) ────────────────────────────────────────────────────────
+def _fresh(path: Path, entry: dict) -> bool:
+    try:
+        st = Path(path).stat()
+    except FileNotFoundError:
+        return False
+    return (st.st_size, st.st_mtime_ns) == (entry["bytes"], entry["mtime_ns"])
+
+def status(path: Path, data: Optional[dict] = None) -> str:
+    """'ok' · 'obsoleto' (mudou após registro) · 'ausente' · 'sem manifesto'."""
+    entry = (load() if data is None else data).get(_key(path))
+    if not Path(path).exists():
+        return "ausente"
+    if entry is None:
+        return "sem manifesto"
+    return "ok" if _fresh(path, entry) else "obsoleto"
+
+def lookup(path: Path, data: Optional[dict] = None) -> Optional[dict]:
+    """Entrada do manifesto se o arquivo ainda é o registrado; senão None."""
+    entry = (load() if data is None else data).get(_key(path))
+    if entry is not None and _fresh(path, entry):
+        return entry
+    return None
+
+def current_digest(path: Path, data: Optional[dict] = None) -> str:
+    """blake2b do arquivo: do manifesto se fresco; senão lido (e, se a entrada
+    fresca estava com hash pendente, gravado nela)."""
+    entry = lookup(path, data)
+    if entry is not None and entry["blake2b"]:
+        return entry["blake2b"]
+    digest = file_digest(path)
+    if entry is not None:
+        entry["blake2b"] = digest
+        with _locked():
+            cur = load()
+            e = cur.get(_key(path))
+            if e is not None and not e["blake2b"] and _fresh(path, e):
+                e["blake2b"] = digest
+                _save(cur)
+    return digest
+
+def count_rows(path: Path, data: Optional[dict] = None) -> int:
+    """Nº de linhas pelo manifesto; recorre à contagem só se obsoleto."""
+    entry = lookup(path, data)
+    if entry is not None:
+        return entry["linhas"]
+    with open(path, "rb") as f:
+        return sum(1 for _ in f)
+
+# ─── CLI ───────────────────────────────────────────────────────────────────
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Manifesto de artefatos Lotofácil")
+    ap.add_argument("--check", action="store_true",
+                    help="erro se algum artefato registrado estiver obsoleto/ausente")
+    args = ap.parse_args()
+
+    data = load()
+    if not data:
+        print("ℹ️  manifest.json vazio ou inexistente.")
+    bad = 0
+    for key in sorted(data):
+        e = data[key]
+        st = status(Path(key), data)
+        ver = (e.get("verificacao") or {}).get("status", "—")
+        print(f"{key:<32} {e['linhas']:>10,} linhas {e['bytes'] / 1_048_576:>9.1f} MB"
+              f"  {st:<9} verif: {ver}")
+        bad += st in ("obsoleto", "ausente")
+    if args.check and bad:
+        sys.exit(f"❌ {bad} artefato(s) obsoleto(s) ou ausente(s).")
+
+if __name__ == "__main__":
+    main()
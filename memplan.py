@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# AUTOR: Leonardo dos Santos Marques
+"""
+memplan.py — escolhe o modo de memória dos programas 2‑5 (motores lazy e
+estocástico) a partir de k, do nº de candidatos e da RAM disponível.
+
+    ram     lista de ids S_k por linha S15 na RAM (row_to_idx)   mais rápido
+    mmap    a mesma matriz (linhas × C(15,k)) em uint32 num arquivo mapeado
+            (np.memmap em <saída>/.ids{k}.u32): as páginas ficam com o
+            kernel e saem da RAM sob pressão, sem swap
+    stream  recalcula os ids a cada avaliação (cover_ids)        ≈ 3× mais lento
+
+Modelo (bytes; medido em CPython 3.11 com as estruturas dos programas):
+
+    base   = interpretador + C(25,k)·(115 idx_map/masks + 84 set de descobertas)
+             + n·200 (texto da linha + heap)
+    ram    = base + n·(72 + 8,3·C(15,k))     (listas de refs. a ints do idx_map)
+    mmap   = base + n·C(15,k)·4 no page cache; exige só base + MMAP_WINDOW_MB
+    stream = base
+
+Com --workers (cover_workers.py) os ids chegam como uint32 e o modo ram
+guarda a matriz na RAM: ram = base + n·C(15,k)·4.
+
+    k = 12, n = 3 268 760:  ram 13,4 GB · mmap exige 2,0 GB (+5,5 GB em disco) · stream 1,7 GB
+
+Se cover{k}_log.csv já tem execuções do modo (coluna Modo), vale o maior
+pico real × MARGIN.  Disponível = psutil (ou /proc/meminfo) limitado pelo
+cgroup (v2 memory.max − memory.current; v1 limit_in_bytes − usage_in_bytes).
+`plan()` pega o modo mais rápido cujo "exige" cabe em --mem-budget (padrão
+90 % do disponível), imprime a decisão, e o programa grava no log o modo,
+a previsão e o pico real (ru_maxrss).
+
+    python memplan.py 12                      # estimativas e escolha p/ SB15_12
+    python memplan.py 11 --mem-budget 16G
+"""
+from __future__ import annotations
+
+import argparse, csv, importlib.util, math, re, shutil, sys
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+MODES = ("ram", "mmap", "stream")               # do mais rápido ao mais lento
+SPEED = {"ram": 1.0, "mmap": 1.3, "stream": 3.0}  # tempo relativo do greedy
+TOTAL_S15 = math.comb(25, 15)
+INTERP_MB = 155.0                               # interpretador + módulos do programa
+IDX_BYTES = 115 + 84                            # por S_k: idx_map + masks, set
+ROW_BYTES = 200                                 # por linha S15: texto + heap
+LIST_BYTES, ID_BYTES = 72, 8.3                  # lista de ids por linha
+MMAP_WINDOW_MB = 256.0
+MARGIN = 1.15
+BUDGET_FRACTION = 0.9
+FLUSH_ROWS = 4096
+MB = 1_048_576
+
+class Plan(NamedTuple):
+    modo: str
+    previsto: float          # pico de RSS previsto (MB)
+    exige: float             # RAM que precisa caber no orçamento (MB)
+    orcamento: float         # MB
+    fonte: str
+
+# ─── Memória disponível ────────────────────────────────────────────────────
+def parse_size(text: str) -> float:
+    """'48G', '48000M', '48000' (MB) → MB."""
+    m = re.fullmatch(r"\s*([\d.]+)\s*([KMGT]?)i?B?\s*", text, re.I)
+    if not m:
+        raise argparse.ArgumentTypeError(f"tamanho inválido: {text}")
+    scale = {"K": 1 / 1024, "": 1, "M": 1, "G": 1024, "T": 1024 ** 2}[m.group(2).upper()]
+    return float(m.group(1)) * scale
+
+def cgroup_free_mb() -> Optional[float]:
+    """Folga do cgroup do processo (MB) ou None sem limite."""
+    for limit, usage in (("/sys/fs/cgroup/memory.max", "/sys/fs/cgroup/memory.current"),
+                         ("/sys/fs/cgroup/memory/memory.limit_in_bytes",
+                          "/sys/fs/cgroup/memory/memory.usage_in_bytes")):
+        try:
+            lim = Path(limit).read_text().strip()
+            if lim == "max" or int(lim) >= 1 << 60:
+                return None
+            return (int(lim) - int(Path(usage).read_text())) / MB
+        except (OSError, ValueError):
+            continue
+    return None
+
+def available_mb() -> float:
+    """RAM disponível (psutil ou /proc/meminfo), limitada pelo cgroup."""
+    host = None
+    try:
+        import psutil
+        host = psutil.virtual_memory().available / MB
+    except ImportError:
+        try:
+            with open("/proc/meminfo") as f:
+                for line in f:
+                    if line.startswith("MemAvailable:"):
+                        host = int(line.split()[1]) / 1024
+        except OSError:
+            pass
+    if host is None:
+        host = 8_192.0
+    cg = cgroup_free_mb()
+    return host if cg is None else min(host, cg)
+
+def peak_mb() -> float:
+    """Pico de RSS do processo até aqui (ru_maxrss; sem `resource`, psutil)."""
+    try:
+        import resource
+    except ImportError:                          # Windows
+        import psutil
+        info = psutil.Process().memory_info()
+        return round(getattr(info, "peak_wset", info.rss) / MB, 1)
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(rss / (MB if sys.platform == "darwin" else 1024), 1)
+
+# ─── Estimativas ───────────────────────────────────────────────────────────
+def estimate(k: int, n: int = TOTAL_S15, matriz: bool = False) -> Dict[str, Tuple[float, float]]:
+    """modo → (pico previsto, RAM exigida) em MB, pelo modelo (matriz: ram em uint32)."""
+    width = math.comb(15, k)
+    base = INTERP_MB + (math.comb(25, k) * IDX_BYTES + n * ROW_BYTES) / MB
+    matrix = matrix_mb(k, n)
+    lists = matrix if matriz else n * (LIST_BYTES + ID_BYTES * width) / MB
+    return {"ram": (base + lists, base + lists),
+            "mmap": (base + matrix, base + min(matrix, MMAP_WINDOW_MB)),
+            "stream": (base, base)}
+
+def matrix_mb(k: int, n: int = TOTAL_S15) -> float:
+    return n * math.comb(15, k) * 4 / MB
+
+def learned(log_csv: Optional[Path]) -> Dict[str, float]:
+    """modo → maior pico real já registrado (motores lazy/estocástico)."""
+    if not log_csv or not Path(log_csv).exists():
+        return {}
+    out: Dict[str, float] = {}
+    with Path(log_csv).open(newline="", encoding="utf8") as f:
+        for r in csv.DictReader(f):
+            if r.get("Modo") not in MODES or r.get("Motor", "lazy") == "paralelo":
+                continue
+            try:
+                peak = float(r["Pico_RAM(MB)"])
+            except (KeyError, TypeError, ValueError):
+                continue
+            out[r["Modo"]] = max(out.get(r["Modo"], 0.0), peak)
+    return out
+
+def _gb(mb: float) -> str:
+    return f"{mb / 1024:5.1f} GB"
+
+def plan(k: int, requested: str = "auto", budget_mb: Optional[float] = None,
+         log_csv: Optional[Path] = None, work_dir: Path = Path("."),
+         n: int = TOTAL_S15, matriz: bool = False) -> Plan:
+    """Escolhe o modo (ou confere o pedido) e imprime a decisão."""
+    est = estimate(k, n, matriz)
+    fonte = {m: "modelo" for m in MODES}
+    for m, peak in ({} if matriz else learned(log_csv)).items():
+        prev, need = est[m]
+        est[m] = (peak * MARGIN, need if m == "mmap" else peak * MARGIN)
+        fonte[m] = "histórico"
+    avail = available_mb()
+    budget = budget_mb or BUDGET_FRACTION * avail
+
+    blocked: Dict[str, str] = {}
+    if importlib.util.find_spec("numpy") is None:
+        blocked["mmap"] = "numpy ausente"
+    else:
+        free = shutil.disk_usage(work_dir if Path(work_dir).exists() else ".").free / MB
+        if free < matrix_mb(k, n) * 1.05:
+            blocked["mmap"] = f"disco: {_gb(free).strip()} livres"
+
+    print(f"🧮 Plano de memória — k = {k}, {n:,} candidatos × {math.comb(15, k):,} ids")
+    print(f"   {'modo':<7} {'pico prev.':>10} {'exige':>9}  {'fonte':<9} tempo")
+    for m in MODES:
+        extra = f"  (+{_gb(matrix_mb(k, n)).strip()} em disco)" if m == "mmap" else ""
+        note = f"  ✖ {blocked[m]}" if m in blocked else ""
+        print(f"   {m:<7} {_gb(est[m][0]):>10} {_gb(est[m][1]):>9}  {fonte[m]:<9} "
+              f"×{SPEED[m]:.1f}{extra}{note}")
+    origem = "--mem-budget" if budget_mb else f"{BUDGET_FRACTION:.0%} de {_gb(avail).strip()} disponíveis"
+    print(f"   orçamento {_gb(budget).strip()} ({origem})")
+
+    if requested != "auto":
+        modo = requested
+        if est[modo][1] > budget:
+            print(f"⚠️  modo {modo} pedido exige {_gb(est[modo][1]).strip()} > orçamento")
+        if modo in blocked:
+            sys.exit(f"❌ modo {modo} indisponível: {blocked[modo]}")
+    else:
+        fits = [m for m in MODES if m not in blocked and est[m][1] <= budget]
+        modo = fits[0] if fits else "stream"
+        if not fits:
+            print("⚠️  nenhum modo cabe no orçamento — usando stream (o menor)")
+    previsto = est[modo][0]
+    if modo == "mmap":                          # o kernel devolve páginas acima do orçamento
+        previsto = min(previsto, max(est[modo][1], budget))
+    print(f"   → modo {modo}{' (pedido)' if requested != 'auto' else ''}: "
+          f"pico previsto {_gb(previsto).strip()}")
+    return Plan(modo, round(previsto, 1), round(est[modo][1], 1), round(budget, 1), fonte[modo])
+
+def report(p: Plan, actual_mb: float) -> None:
+    print(f"📏 pico real {actual_mb:,.0f} MB × previsto {p.previsto:,.0f} MB "
+          f"({(actual_mb / p.previsto - 1) * 100:+.0f} %) — modo {p.modo}")
+
+# ─── Matriz de ids do modo mmap ────────────────────────────────────────────
+class IdsMatrix:
+    """row_to_idx em np.memmap (ou na RAM, sem `path`): `append` em blocos ou
+    `put` por faixa (cover_workers.py), leitura por linha como lista."""
+
+    def __init__(self, path: Optional[Path], rows: int, width: int) -> None:
+        import numpy as np
+        self.path = Path(path) if path else None
+        self.m = np.zeros((rows, width), dtype=np.uint32) if path is None else \
+            np.memmap(self.path, dtype=np.uint32, mode="w+", shape=(rows, width))
+        self.n = 0
+        self.buf: List[List[int]] = []
+
+    def append(self, ids: List[int]) -> None:
+        self.buf.append(ids)
+        if len(self.buf) >= FLUSH_ROWS:
+            self.flush()
+
+    def flush(self) -> None:
+        if self.buf:
+            self.m[self.n:self.n + len(self.buf)] = self.buf
+            self.n += len(self.buf)
+            self.buf = []
+
+    def put(self, start: int, ids) -> None:
+        self.m[start:start + len(ids)] = ids
+        self.n = max(self.n, start + len(ids))
+
+    def __getitem__(self, rid: int) -> List[int]:
+        if self.buf:
+            self.flush()
+        return self.m[rid].tolist()
+
+    def close(self) -> None:
+        self.buf = []
+        del self.m
+        if self.path:
+            self.path.unlink(missing_ok=True)
+
+def ids_store(modo: str, rows: int, width: int, path: Path, matriz: bool = False):
+    """Contêiner de ids por linha: list (ram), IdsMatrix (mmap; ram com matriz) ou None."""
+    if modo == "ram":
+        return IdsMatrix(None, rows, width) if matriz else []
+    if modo == "mmap":
+        return IdsMatrix(path, rows, width)
+    return None
+
+def close_store(store) -> None:
+    if isinstance(store, IdsMatrix):
+        store.close()
+
+# ─── CLI ───────────────────────────────────────────────────────────────────
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Plano de memória dos programas 2‑5")
+    ap.add_argument("k", type=int, choices=(14, 13, 12, 11))
+    ap.add_argument("--mem-budget", type=parse_size, help="teto de RAM (padrão: 90 %% do disponível)")
+    ap.add_argument("--modo", choices=("auto",) + MODES, default="auto")
+    args = ap.parse_args()
+    prog = {14: 2, 13: 3, 12: 4, 11: 5}[args.k]
+    plan(args.k, args.modo, args.mem_budget, Path(f"prog{prog}_saida/cover{args.k}_log.csv"),
+         Path(f"prog{prog}_saida"))
+
+if __name__ == "__main__":
+    main()
@@ -11,21 +11,41 @@ Conteúdo incluído
 • Documentos de topo – README, REPORT, MakeFile  
 • Pastas de resultados: resultados/, prog2_saida/, …, prog7_saida/  
 • PDFs que existirem em docs/
+• manifest.json — linhas, tamanho, hash e verificação de cada artefato;
+  artefatos obsoletos (alterados após o registro) são avisados antes
 
 Regra de ouro: se o ZIP já existir, é **apagado** antes de ser recriado –
-evita submissões corrompidas.
+evita submissões corrompidas.  O novo ZIP é montado em um .tmp e só
+substitui o anterior quando está completo.
+
+Compressão em blocos paralelos (pcompress.RawZipWriter): cada arquivo é
+dividido em blocos de 4 MiB deflatados em threads; arquivos já
+comprimidos (.gz, .png, .pdf, …) entram STORED, sem recompressão.
+
+Modo incremental (--incremental): a cada empacotamento é gravado um índice
+lotofacil_submission.idx.json com (arcname → bytes, mtime_ns, blake2b).
+Na próxima execução, arquivo com mesmo tamanho/mtime (ou, se só o mtime
+mudou, mesmo hash) tem a entrada comprimida **copiada byte a byte** do ZIP
+anterior; só o que mudou é deflatado de novo.
 
 Uso
 ----
     python package_zip.py
+    python package_zip.py --threads 8 --level 6
+    python package_zip.py --incremental   # reaproveita entradas inalteradas
 """
 from pathlib import Path
-from zipfile import ZipFile, ZIP_DEFLATED
-import datetime
+from typing import Dict, Optional
+from zipfile import ZipFile, BadZipFile
+import argparse, datetime, json, os, struct
+
+import manifest
+import pcompress
 
 ROOT = Path(__file__).resolve().parent
 ZIP_NAME = "lotofacil_submission.zip"
 OUT_ZIP = ROOT / ZIP_NAME
+ZIP_INDEX = ROOT / "lotofacil_submission.idx.json"
 
 # ------------------------------------------------------------
 #  Contém todos os scripts necessários para reproduzir resultados
@@ -33,11 +53,16 @@ OUT_ZIP = ROOT / ZIP_NAME
 CODE_FILES = [
     "lotogen.py", "bench.py",
     "programa2.py", "programa3.py", "programa4.py", "programa5.py",
-    "verify_all.py", "calcular_custo_sb.py", "package.py"
+    "verify_all.py", "calcular_custo_sb.py", "package.py", "manifest.py",
+    "pcompress.py", "timeline.py", "pipeline.py", "stagecache.py", "premios.py",
+    "garantia.py", "sbformat.py", "cover_engine.py",
+    "telemetry.py", "perfis.py", "cover_ooc.py", "sbdaemon.py",
+    "historico.py", "memplan.py", "cover_workers.py", "lotofacil"
 ]
 
 DOC_FILES = [
     "README.md", "REPORT.md", "MakeFile",  # uso a grafia encontrada no repo
+    "manifest.json",
 ]
 
 RESULT_DIRS = [
@@ -47,31 +72,128 @@ RESULT_DIRS = [
 
 PDF_DIR = ROOT / "docs"      # incluir quaisquer PDFs do relatório
 
+# estados de trabalho regeneráveis (verify_all --state) e os SB binários
+# (sbformat.py; a submissão leva o texto) não vão para o ZIP, nem a matriz
+# de ids do modo mmap deixada por uma execução interrompida (memplan.py)
+SKIP_SUFFIXES = {".cov", ".sb", ".pyc", ".u32"}
+
+_LOCAL_HDR = struct.Struct("<IHHHHHIIIHH")    # cabeçalho local ZIP (30 bytes)
+
 # ------------------------------------------------------------
 
-def add(z: ZipFile, path: Path, arc_prefix: str = "") -> None:
-    """Adiciona arquivo / diretório recursivamente no zip."""
+class PreviousZip:
+    """ZIP anterior + seu índice: fonte das entradas copiadas sem recompressão."""
+
+    def __init__(self, zip_path: Path, index_path: Path) -> None:
+        with ZipFile(zip_path) as zf:
+            self.infos = {i.filename: i for i in zf.infolist()}
+        with index_path.open(encoding="utf8") as f:
+            self.index: Dict[str, dict] = json.load(f)
+        self.fp = open(zip_path, "rb")
+        self.copied = self.rebuilt = 0
+
+    @classmethod
+    def open(cls) -> Optional["PreviousZip"]:
+        if not (OUT_ZIP.exists() and ZIP_INDEX.exists()):
+            print("ℹ️  Sem ZIP/índice anterior — empacotamento completo.")
+            return None
+        try:
+            return cls(OUT_ZIP, ZIP_INDEX)
+        except (BadZipFile, ValueError, OSError) as e:
+            print(f"ℹ️  ZIP/índice anterior ilegível ({e}) — empacotamento completo.")
+            return None
+
+    def reuse(self, z: pcompress.RawZipWriter, path: Path, arcname: str,
+              st: os.stat_result) -> Optional[str]:
+        """Copia a entrada antiga se o conteúdo não mudou; devolve o hash."""
+        old, info = self.index.get(arcname), self.infos.get(arcname)
+        if old is None or info is None or st.st_size != old["bytes"]:
+            return None
+        digest = old["blake2b"]
+        if st.st_mtime_ns != old["mtime_ns"]:            # tocado: confere hash
+            digest = manifest.file_digest(path)
+            if digest != old["blake2b"]:
+                return None
+        self.fp.seek(info.header_offset)
+        hdr = _LOCAL_HDR.unpack(self.fp.read(_LOCAL_HDR.size))
+        dtime, ddate, name_len, extra_len = hdr[4], hdr[5], hdr[9], hdr[10]
+        z.add_raw(arcname, info.compress_type, info.CRC, info.file_size, self.fp,
+                  info.header_offset + _LOCAL_HDR.size + name_len + extra_len,
+                  info.compress_size, dtime, ddate)
+        return digest
+
+    def close(self) -> None:
+        self.fp.close()
+
+def add(z: pcompress.RawZipWriter, path: Path, arc_prefix: str = "",
+        index: Optional[dict] = None, prev: Optional[PreviousZip] = None) -> None:
+    """Adiciona arquivo / diretório recursivamente no zip (e no índice)."""
     if path.is_dir():
         for sub in path.iterdir():
-            add(z, sub, arc_prefix + path.name + "/")
+            add(z, sub, arc_prefix + path.name + "/", index, prev)
+    elif path.suffix in SKIP_SUFFIXES:
+        return
     else:
         arcname = arc_prefix + path.name
-        z.write(path, arcname)
-        print(f"  + {arcname}")
+        st = path.stat()
+        digest = prev.reuse(z, path, arcname, st) if prev else None
+        if digest is not None:
+            prev.copied += 1
+            print(f"  = {arcname}  (inalterado → copiado)")
+        else:
+            h = manifest.new_hash()
+            entry = z.add_file(path, arcname, digest=h)
+            digest = h.hexdigest()
+            if prev:
+                prev.rebuilt += 1
+            print(f"  + {arcname}" + ("  (já comprimido → stored)" if entry.method == 0 else ""))
+        if index is not None:
+            index[arcname] = {"bytes": st.st_size, "mtime_ns": st.st_mtime_ns,
+                              "blake2b": digest}
 
 # ------------------------------------------------------------
 
+def check_manifest() -> None:
+    """Avisa (sem reler os arquivos) sobre artefatos obsoletos ou não verificados."""
+    data = manifest.load()
+    for key, entry in sorted(data.items()):
+        if key == ZIP_NAME:
+            continue
+        st = manifest.status(Path(key), data)
+        ver = (entry.get("verificacao") or {}).get("status")
+        if st != "ok":
+            print(f"  ⚠ {key}: {st} em relação ao manifesto")
+        elif ver == "falha":
+            print(f"  ⚠ {key}: última verificação FALHOU")
+
+def parse_args() -> argparse.Namespace:
+    ap = argparse.ArgumentParser(description="Gera lotofacil_submission.zip")
+    ap.add_argument("--threads", type=int, default=0,
+                    help="threads de compressão (0 = nº de CPUs)")
+    ap.add_argument("--level", type=int, default=pcompress.DEFAULT_LEVEL,
+                    help="nível do deflate (1–9)")
+    ap.add_argument("--incremental", action="store_true",
+                    help="copia do ZIP anterior as entradas inalteradas (índice .idx.json)")
+    return ap.parse_args()
+
 def main() -> None:
-    if OUT_ZIP.exists():
+    args = parse_args()
+    print("🔎  Conferindo manifest.json…")
+    check_manifest()
+    prev = PreviousZip.open() if args.incremental else None
+    if prev is None and OUT_ZIP.exists():
         OUT_ZIP.unlink()
         print("ℹ️  ZIP anterior removido.")
 
-    with ZipFile(OUT_ZIP, "w", ZIP_DEFLATED) as z:
+    index: Dict[str, dict] = {}
+    tmp_zip = OUT_ZIP.with_suffix(".zip.tmp")
+    with pcompress.RawZipWriter(tmp_zip, level=args.level,
+                                threads=args.threads or None) as z:
         print("📦  Incluindo scripts Python…")
         for fname in CODE_FILES:
             fp = ROOT / fname
             if fp.exists():
-                add(z, fp)
+                add(z, fp, "", index, prev)
             else:
                 print(f"  ! {fname} não encontrado (ok se ainda não implementado).")
 
@@ -79,7 +201,7 @@ def main() -> None:
         for fname in DOC_FILES:
             fp = ROOT / fname
             if fp.exists():
-                add(z, fp)
+                add(z, fp, "", index, prev)
             else:
                 print(f"  ! {fname} ausente.")
 
@@ -87,18 +209,31 @@ def main() -> None:
         for d in RESULT_DIRS:
             dp = ROOT / d
             if dp.exists():
-                add(z, dp)
+                add(z, dp, "", index, prev)
             else:
                 print(f"  • {d} ainda não existe — será ignorado.")
 
         if PDF_DIR.exists():
             print("📑  Incluindo PDFs em docs/ …")
             for pdf in PDF_DIR.glob("*.pdf"):
-                add(z, pdf, "docs/")
+                add(z, pdf, "docs/", index, prev)
+
+    if prev:
+        prev.close()
+    os.replace(tmp_zip, OUT_ZIP)
+    tmp_idx = ZIP_INDEX.with_suffix(".json.tmp")
+    with tmp_idx.open("w", encoding="utf8") as f:
+        json.dump(index, f, indent=1, sort_keys=True)
+    os.replace(tmp_idx, ZIP_INDEX)
+    n_entries = len(z.entries)
+    manifest.record(OUT_ZIP, n_entries, manifest.file_digest(OUT_ZIP), "package.py")
 
     size_mb = OUT_ZIP.stat().st_size / (1024 * 1024)
     stamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M")
     print(f"\n✅ {ZIP_NAME} criado ({size_mb:.1f} MB) – {stamp}")
+    if prev:
+        print(f"   incremental: {prev.copied} entrada(s) copiada(s), "
+              f"{prev.rebuilt} recomprimida(s)")
 
 if __name__ == "__main__":
     main()
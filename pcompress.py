@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# AUTOR: Leonardo dos Santos Marques
+"""
+pcompress.py — compressão em blocos paralelos (estilo pigz) para o tar.gz do
+bench e para o lotofacil_submission.zip.
+
+O zlib libera o GIL enquanto comprime, então um ThreadPoolExecutor escala
+com os núcleos sem multiprocessing.  Os blocos são escritos na ordem
+original; no máximo 2 × threads blocos ficam em memória.
+
+• ParallelGzipWriter — objeto‑arquivo; cada bloco vira um *membro* gzip
+  completo (RFC 1952 permite membros concatenados; gzip/tar leem normal).
+• RawZipWriter       — escreve ZIP diretamente: entradas deflate produzidas
+  em paralelo (blocos com Z_SYNC_FLUSH + últimos 32 KiB como dicionário,
+  como o pigz), entradas STORED para formatos já comprimidos e cópia
+  byte‑a‑byte de entradas já comprimidas (usado pelo package incremental).
+
+Só biblioteca padrão.
+"""
+from __future__ import annotations
+
+import os, struct, time, zlib
+from collections import deque
+from pathlib import Path
+from typing import TYPE_CHECKING, BinaryIO, Deque, List, Optional, Tuple
+
+if TYPE_CHECKING:                            # concurrent.futures só quando comprime
+    from concurrent.futures import Future
+
+BLOCK_SIZE = 4 << 20                   # 4 MiB por bloco
+DICT_SIZE = 32 << 10                   # janela do deflate
+DEFAULT_LEVEL = 6
+# já comprimidos: recomprimir só gasta CPU
+COMPRESSED_SUFFIXES = {".gz", ".tgz", ".zip", ".bz2", ".xz", ".zst", ".7z",
+                       ".png", ".jpg", ".jpeg", ".pdf"}
+
+def default_threads() -> int:
+    return os.cpu_count() or 1
+
+# ─── gzip em membros paralelos ─────────────────────────────────────────────
+def _gzip_member(data: bytes, level: int) -> bytes:
+    c = zlib.compressobj(level, zlib.DEFLATED, 31)
+    return c.compress(data) + c.flush()
+
+class ParallelGzipWriter:
+    """Objeto‑arquivo de escrita que gera gzip multi‑membro em paralelo."""
+
+    def __init__(self, raw: BinaryIO, level: int = DEFAULT_LEVEL,
+                 threads: Optional[int] = None, block_size: int = BLOCK_SIZE) -> None:
+        self.raw, self.level, self.block_size = raw, level, block_size
+        self.threads = threads or default_threads()
+        from concurrent.futures import ThreadPoolExecutor
+        self._pool = ThreadPoolExecutor(self.threads)
+        self._pending: Deque[Future] = deque()
+        self._buf = bytearray()
+        self.closed = False
+
+    def write(self, data) -> int:
+        self._buf += data
+        while len(self._buf) >= self.block_size:
+            block = bytes(self._buf[:self.block_size])
+            del self._buf[:self.block_size]
+            self._submit(block)
+        return len(data)
+
+    def _submit(self, block: bytes) -> None:
+        self._pending.append(self._pool.submit(_gzip_member, block, self.level))
+        while len(self._pending) > 2 * self.threads:
+            self.raw.write(self._pending.popleft().result())
+
+    def flush(self) -> None:
+        pass                           # blocos só saem inteiros (ou no close)
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        if self._buf or not self._pending:
+            self._submit(bytes(self._buf))
+            self._buf.clear()
+        while self._pending:
+            self.raw.write(self._pending.popleft().result())
+        self._pool.shutdown()
+        self.closed = True
+
+    def __enter__(self) -> "ParallelGzipWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+# ─── deflate bruto em blocos paralelos ─────────────────────────────────────
+def _deflate_block(data: bytes, zdict: bytes, level: int, last: bool) -> bytes:
+    c = (zlib.compressobj(level, zlib.DEFLATED, -15, zdict=zdict) if zdict
+         else zlib.compressobj(level, zlib.DEFLATED, -15))
+    out = c.compress(data)
+    return out + c.flush(zlib.Z_FINISH if last else zlib.Z_SYNC_FLUSH)
+
+# ─── ZIP ───────────────────────────────────────────────────────────────────
+_LOCAL = struct.Struct("<IHHHHHIIIHH")
+_CENTRAL = struct.Struct("<IHHHHHHIIIHHHHHII")
+_EOCD = struct.Struct("<IHHHHIIH")
+_EOCD64 = struct.Struct("<IQHHIIQQQQ")
+_LOC64 = struct.Struct("<IIQI")
+_LIMIT = 0xFFFFFFFF
+_FLAG_UTF8 = 0x0800
+_MADE_BY = (3 << 8) | 45               # UNIX, spec 4.5
+_UNIX_RW = 0o100644 << 16              # -rw-r--r--
+_ZIP64_AT = _LIMIT - (_LIMIT >> 6)     # margem p/ expansão do deflate
+
+def dos_time(mtime: float) -> Tuple[int, int]:
+    t = time.localtime(max(mtime, 315532800))          # ZIP começa em 1980
+    return ((t.tm_hour << 11) | (t.tm_min << 5) | (t.tm_sec // 2),
+            ((t.tm_year - 1980) << 9) | (t.tm_mon << 5) | t.tm_mday)
+
+class ZipEntry:
+    """Metadados de uma entrada já escrita (para o diretório central)."""
+    __slots__ = ("name", "method", "crc", "csize", "usize", "offset", "dtime", "ddate")
+
+    def __init__(self, name, method, crc, csize, usize, offset, dtime, ddate):
+        self.name, self.method, self.crc = name, method, crc
+        self.csize, self.usize, self.offset = csize, usize, offset
+        self.dtime, self.ddate = dtime, ddate
+
+class RawZipWriter:
+    """Escritor ZIP mínimo (com ZIP64) sobre um arquivo com seek."""
+
+    def __init__(self, path: Path, level: int = DEFAULT_LEVEL,
+                 threads: Optional[int] = None, block_size: int = BLOCK_SIZE) -> None:
+        self.fp = open(path, "wb")
+        self.level, self.block_size = level, block_size
+        self.threads = threads or default_threads()
+        from concurrent.futures import ThreadPoolExecutor
+        self._pool = ThreadPoolExecutor(self.threads)
+        self.entries: List[ZipEntry] = []
+
+    # — cabeçalho local: tamanhos corrigidos por seek depois dos dados —
+    def _local_header(self, name: bytes, method: int, dtime: int, ddate: int,
+                      zip64: bool) -> int:
+        offset = self.fp.tell()
+        extra = struct.pack("<HHQQ", 1, 16, 0, 0) if zip64 else b""
+        self.fp.write(_LOCAL.pack(0x04034B50, 45 if zip64 else 20, _FLAG_UTF8, method,
+                                  dtime, ddate, 0, 0, 0, len(name), len(extra)))
+        self.fp.write(name + extra)
+        return offset
+
+    def _patch_local(self, entry: ZipEntry, zip64: bool) -> None:
+        end = self.fp.tell()
+        self.fp.seek(entry.offset + 14)
+        if zip64:
+            self.fp.write(struct.pack("<III", entry.crc, _LIMIT, _LIMIT))
+            self.fp.seek(entry.offset + 30 + len(entry.name) + 4)
+            self.fp.write(struct.pack("<QQ", entry.usize, entry.csize))
+        else:
+            self.fp.write(struct.pack("<III", entry.crc, entry.csize, entry.usize))
+        self.fp.seek(end)
+
+    def add_file(self, path: Path, arcname: str, store: Optional[bool] = None,
+                 digest=None) -> ZipEntry:
+        """Comprime `path` em blocos paralelos (ou STORED, se já comprimido).
+
+        `digest` (hashlib) opcional é alimentado com o conteúdo na mesma
+        leitura — o package incremental guarda o hash sem reler o arquivo.
+        """
+        path = Path(path)
+        if store is None:
+            store = path.suffix.lower() in COMPRESSED_SUFFIXES
+        st = path.stat()
+        usize = st.st_size
+        zip64 = usize >= _ZIP64_AT
+        name = arcname.encode("utf8")
+        dtime, ddate = dos_time(st.st_mtime)
+        method = 0 if store else 8
+        offset = self._local_header(name, method, dtime, ddate, zip64)
+        start = self.fp.tell()
+
+        crc = 0
+        with open(path, "rb") as f:
+            if store:
+                for chunk in iter(lambda: f.read(self.block_size), b""):
+                    crc = zlib.crc32(chunk, crc)
+                    if digest is not None:
+                        digest.update(chunk)
+                    self.fp.write(chunk)
+            else:
+                pending: Deque[Future] = deque()
+                prev = b""
+                block = f.read(self.block_size)
+                while True:
+                    nxt = f.read(self.block_size) if block else b""
+                    last = not nxt
+                    pending.append(self._pool.submit(_deflate_block, block,
+                                                     prev[-DICT_SIZE:], self.level, last))
+                    crc = zlib.crc32(block, crc)
+                    if digest is not None:
+                        digest.update(block)
+                    while len(pending) > 2 * self.threads:
+                        self.fp.write(pending.popleft().result())
+                    if last:
+                        break
+                    prev, block = block, nxt
+                while pending:
+                    self.fp.write(pending.popleft().result())
+
+        entry = ZipEntry(name, method, crc, self.fp.tell() - start, usize,
+                         offset, dtime, ddate)
+        self._patch_local(entry, zip64)
+        self.entries.append(entry)
+        return entry
+
+    def add_raw(self, arcname: str, method: int, crc: int, usize: int,
+                src: BinaryIO, src_offset: int, csize: int,
+                dtime: int, ddate: int) -> ZipEntry:
+        """Copia uma entrada já comprimida (bytes de `src`) sem recomprimir."""
+        name = arcname.encode("utf8")
+        zip64 = max(usize, csize) >= _LIMIT
+        offset = self._local_header(name, method, dtime, ddate, zip64)
+        src.seek(src_offset)
+        left = csize
+        while left:
+            chunk = src.read(min(self.block_size, left))
+            if not chunk:
+                raise EOFError(f"entrada {arcname} truncada no ZIP de origem")
+            self.fp.write(chunk)
+            left -= len(chunk)
+        entry = ZipEntry(name, method, crc, csize, usize, offset, dtime, ddate)
+        self._patch_local(entry, zip64)
+        self.entries.append(entry)
+        return entry
+
+    def close(self) -> None:
+        cd_start = self.fp.tell()
+        for e in self.entries:
+            big = e.usize >= _LIMIT or e.csize >= _LIMIT or e.offset >= _LIMIT
+            extra = (struct.pack("<HHQQQ", 1, 24, e.usize, e.csize, e.offset)
+                     if big else b"")
+            self.fp.write(_CENTRAL.pack(
+                0x02014B50, _MADE_BY, 45 if big else 20, _FLAG_UTF8, e.method,
+                e.dtime, e.ddate, e.crc, _LIMIT if big else e.csize,
+                _LIMIT if big else e.usize, len(e.name), len(extra), 0, 0, 0,
+                _UNIX_RW, _LIMIT if big else e.offset))
+            self.fp.write(e.name + extra)
+        cd_end = self.fp.tell()
+        n, cd_size = len(self.entries), cd_end - cd_start
+        if n >= 0xFFFF or cd_start >= _LIMIT or cd_size >= _LIMIT:
+            self.fp.write(_EOCD64.pack(0x06064B50, 44, 45, 45, 0, 0, n, n, cd_size, cd_start))
+            self.fp.write(_LOC64.pack(0x07064B50, 0, cd_end, 1))
+            self.fp.write(_EOCD.pack(0x06054B50, 0, 0, 0xFFFF, 0xFFFF,
+                                     _LIMIT, _LIMIT, 0))
+        else:
+            self.fp.write(_EOCD.pack(0x06054B50, 0, 0, n, n, cd_size, cd_start, 0))
+        self.fp.close()
+        self._pool.shutdown()
+
+    def __enter__(self) -> "RawZipWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
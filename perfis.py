@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# AUTOR: Leonardo dos Santos Marques
+"""
+perfis.py — perfis de jogo (N números, cartão de m, sorteio de s, alvos t).
+
+O problema de cobertura é sempre o mesmo: escolher cartões de m números
+(entre 1…N) tais que todo subconjunto de t números esteja em algum cartão.
+Na Lotofácil (25, 15) com t = 11…14 isso é o SB15_t dos programas 2‑5;
+os outros perfis têm universos C(N, t) de milhões a bilhões de elementos e
+são resolvidos pelo motor fora da memória (cover_ooc.py).
+
+    perfil      N    cartão  sorteio  alvos t   |U| = C(N, t)
+    lotofacil   25   15      15       11…14     4,5 M … 5,2 M
+    quina       80   5       5        3, 4      82 mil, 1,6 M
+    megasena    60   6       6        4, 5      488 mil, 5,5 M
+    lotomania   100  50      20       5, 6      75 M, 1,2 bi
+
+    python perfis.py                  # tabela com |U|, C(m,t) e limite ⌈|U|/C(m,t)⌉
+"""
+from __future__ import annotations
+
+import math
+from typing import Dict, NamedTuple, Tuple
+
+class Perfil(NamedTuple):
+    nome: str
+    numeros: int          # N
+    cartao: int           # m (padrão; --cartao em cover_ooc.py muda)
+    sorteio: int          # números sorteados
+    alvos: Tuple[int, ...]
+
+    def universo(self, t: int) -> int:
+        return math.comb(self.numeros, t)
+
+    def por_cartao(self, t: int, cartao: int = 0) -> int:
+        return math.comb(cartao or self.cartao, t)
+
+    def limite_inferior(self, t: int, cartao: int = 0) -> int:
+        return math.ceil(self.universo(t) / self.por_cartao(t, cartao))
+
+PERFIS: Dict[str, Perfil] = {p.nome: p for p in (
+    Perfil("lotofacil", 25, 15, 15, (11, 12, 13, 14)),
+    Perfil("quina", 80, 5, 5, (3, 4)),
+    Perfil("megasena", 60, 6, 6, (4, 5)),
+    Perfil("lotomania", 100, 50, 20, (5, 6)),
+)}
+LOTOFACIL = PERFIS["lotofacil"]
+
+def get(nome: str) -> Perfil:
+    try:
+        return PERFIS[nome]
+    except KeyError:
+        raise ValueError(f"perfil desconhecido: {nome} (use {', '.join(PERFIS)})") from None
+
+def main() -> None:
+    print(f"{'perfil':<10} {'N':>4} {'m':>3} {'t':>3} {'|U|':>15} {'C(m,t)':>12} {'⌈|U|/C⌉':>12}")
+    for p in PERFIS.values():
+        for t in p.alvos:
+            print(f"{p.nome:<10} {p.numeros:>4} {p.cartao:>3} {t:>3} {p.universo(t):>15,} "
+                  f"{p.por_cartao(t):>12,} {p.limite_inferior(t):>12,}")
+
+if __name__ == "__main__":
+    main()
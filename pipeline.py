@@ -0,0 +1,462 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# AUTOR: Leonardo dos Santos Marques
+"""
+pipeline.py — executa o DAG do projeto em paralelo, respeitando memória e núcleos.
+
+    gen15 ─┬─────────────────────────────┐
+    gen14 ─┴─ sb14 ─┐                    │
+    gen13 ─── sb13 ─┤                    │   (cada sbK depende de gen15 e genK)
+    gen12 ─── sb12 ─┼─ verify ─ custo ─ package
+    gen11 ─── sb11 ─┘
+
+Cada etapa tem estimativa de pico de RAM, tempo e núcleos *aprendida dos
+logs anteriores* (a mais recente dentre, por ordem de preferência):
+
+    resultados/pipeline_runs.csv   — execuções deste runner (ru_maxrss via wait4)
+    resultados/pipeline_bench.csv  — bench.py --pipeline
+    prog*_saida/cover{k}_log.csv   — Pico_RAM(MB)/Tempo (s) dos programas 2‑5
+    ESTIMATIVAS                    — valores de referência (docstrings dos programas)
+
+O pico de RAM é multiplicado por --margin (folga).  O escalonador é uma
+lista de prioridades pelo caminho crítico (maior soma de tempos estimados
+até o fim do DAG): a etapa pronta mais crítica é lançada se couber em
+--mem-budget e --cores; as demais só "furam a fila" (backfill) se
+terminarem antes de a etapa crítica conseguir espaço.  Uma etapa maior
+que o orçamento inteiro roda sozinha (com aviso).
+
+A saída de cada etapa vai para resultados/pipeline_logs/<etapa>.log.
+
+Cache por conteúdo (stagecache.py): antes de lançar uma etapa calcula‑se a
+chave (hash dos scripts, dos arquivos de entrada e dos parâmetros); se já
+houver saídas guardadas com essa chave, elas são restauradas e a etapa é
+pulada.  Regerar S*.csv idênticos, portanto, não refaz as coberturas.
+--no-cache desliga; --cache-max limita o tamanho (LRU).
+
+Uso:
+    python pipeline.py --mem-budget 60G --cores 16        # tudo até package
+    python pipeline.py sb12 sb11 --mem-budget 30G         # alvos + dependências
+    python pipeline.py --dry-run --mem-budget 64G         # só mostra o plano
+"""
+from __future__ import annotations
+
+import argparse, csv, heapq, os, statistics, subprocess, sys, time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+import memplan
+import stagecache
+
+RESULT_DIR = Path("resultados")
+RUNS_CSV = RESULT_DIR / "pipeline_runs.csv"
+BENCH_CSV = RESULT_DIR / "pipeline_bench.csv"
+LOG_DIR = RESULT_DIR / "pipeline_logs"
+RUNS_HEADER = ["Data", "Etapa", "Modo", "Status", "Tempo (s)", "CPU (s)",
+               "Pico RSS (MB)", "Núcleos", "Estimativa RAM (MB)", "Estimativa (s)"]
+
+SB_K = {"sb14": (14, "programa2.py", "prog2_saida"), "sb13": (13, "programa3.py", "prog3_saida"),
+        "sb12": (12, "programa4.py", "prog4_saida"), "sb11": (11, "programa5.py", "prog5_saida")}
+
+# (pico MB, segundos) de referência — usados só sem histórico
+ESTIMATIVAS: Dict[str, Tuple[float, float]] = {
+    "gen15": (40, 12), "gen14": (40, 15), "gen13": (40, 18), "gen12": (40, 18), "gen11": (40, 15),
+    "sb14": (2_300, 300), "sb13": (4_500, 600), "sb12": (13_100, 1_800), "sb11": (13_100, 1_800),
+    "verify": (400, 120), "custo": (60, 5), "package": (200, 60),
+}
+STREAM_RAM = {"sb13": 2_048, "sb12": 4_096}    # --stream economiza ≈ 2/4 GiB
+HISTORY = 3                                     # últimas execuções consideradas
+MARGIN = 1.15
+RSS_UNIT = 1 if sys.platform == "darwin" else 1024
+
+# ─── DAG ───────────────────────────────────────────────────────────────────
+class Stage:
+    """Etapa do DAG com estimativas e estado de execução.
+
+    `code`/`inputs`/`params` formam a chave do cache; `code=None` = nunca
+    cacheada.  `outputs` são os arquivos guardados/restaurados.
+    """
+    __slots__ = ("name", "cmd", "deps", "mem", "secs", "cores", "fonte", "rank",
+                 "code", "inputs", "outputs", "params")
+
+    def __init__(self, name: str, cmd: List[str], deps: List[str], cores: int = 1,
+                 code: Optional[List[str]] = None, inputs: Tuple[Path, ...] = (),
+                 outputs: Tuple[Path, ...] = (), params: Optional[dict] = None) -> None:
+        self.name, self.cmd, self.deps, self.cores = name, cmd, deps, cores
+        self.mem, self.secs, self.fonte, self.rank = 0.0, 0.0, "-", 0.0
+        self.code = [Path(c) for c in code] if code is not None else None
+        self.inputs, self.outputs = list(inputs), list(outputs)
+        self.params = params or {}
+
+def build_dag(stream: bool, cores: int) -> Dict[str, Stage]:
+    py = sys.executable
+    extra = ["--stream"] if stream else ["--modo", "ram"]   # a reserva de RAM é do DAG
+    sb_files = [Path(out) / f"SB15_{k}.csv" for k, _, out in SB_K.values()]
+    dag = {f"gen{k}": Stage(f"gen{k}", [py, "lotogen.py", str(k), "--csv",
+                                         "--outdir", str(RESULT_DIR)], [],
+                             code=["lotogen.py", "manifest.py", "perfis.py"],
+                             outputs=(RESULT_DIR / f"S{k}.csv",), params={"k": k, "csv": True})
+           for k in (15, 14, 13, 12, 11)}
+    for name, (k, script, out) in SB_K.items():
+        dag[name] = Stage(name, [py, script, *extra], ["gen15", f"gen{k}"],
+                          code=[script, "manifest.py", "verify_all.py", "sbformat.py",
+                                "cover_engine.py", "telemetry.py", "memplan.py",
+                                "cover_workers.py", "sbdaemon.py"],
+                          inputs=(RESULT_DIR / "S15.csv", RESULT_DIR / f"S{k}.csv"),
+                          outputs=(Path(out) / f"SB15_{k}.csv", Path(out) / f"SB15_{k}.sb"),
+                          params={"stream": stream})
+    dag["verify"] = Stage("verify", [py, "verify_all.py", "--jobs", str(cores)],
+                          list(SB_K), cores, code=["verify_all.py", "manifest.py", "sbformat.py"],
+                          inputs=tuple(sb_files))
+    dag["custo"] = Stage("custo", [py, "calcular_custo_sb.py"], ["verify"],
+                         code=["calcular_custo_sb.py", "manifest.py", "sbformat.py"], inputs=tuple(sb_files),
+                         outputs=(Path("prog7_saida") / "resultado_custo_sb.csv",))
+    dag["package"] = Stage("package", [py, "package.py"], ["verify", "custo"])
+    return dag
+
+def closure(dag: Dict[str, Stage], targets: List[str]) -> List[str]:
+    """Alvos + todas as dependências, na ordem do DAG."""
+    need: Set[str] = set()
+    todo = list(targets)
+    while todo:
+        n = todo.pop()
+        if n not in need:
+            need.add(n)
+            todo += dag[n].deps
+    return [n for n in dag if n in need]
+
+def critical_ranks(dag: Dict[str, Stage], names: List[str]) -> None:
+    """rank = tempo da etapa + maior rank entre as dependentes (caminho crítico)."""
+    for n in reversed(names):                   # dag está em ordem topológica
+        after = [dag[m].rank for m in names if n in dag[m].deps]
+        dag[n].rank = dag[n].secs + max(after, default=0.0)
+
+# ─── Estimativas aprendidas ────────────────────────────────────────────────
+def _read_csv(path: Path) -> List[dict]:
+    if not path.exists():
+        return []
+    with path.open(newline="", encoding="utf8") as f:
+        return list(csv.DictReader(f))
+
+def _num(row: dict, col: str) -> Optional[float]:
+    try:
+        return float(row[col])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+def learn(dag: Dict[str, Stage], stream: bool, margin: float) -> None:
+    """Preenche mem/secs/cores de cada etapa a partir do histórico."""
+    modo = "stream" if stream else "ram"
+    obs: Dict[str, List[Tuple[float, float, float, str]]] = {n: [] for n in dag}
+
+    for r in _read_csv(RUNS_CSV):
+        if r.get("Status") == "ok" and r.get("Modo") == modo and r.get("Etapa") in obs:
+            obs[r["Etapa"]].append((_num(r, "Pico RSS (MB)") or 0, _num(r, "Tempo (s)") or 0,
+                                    _num(r, "CPU (s)") or 0, "pipeline_runs"))
+    bench: Dict[str, list] = {n: [] for n in dag}
+    for r in _read_csv(BENCH_CSV):
+        name = r.get("Etapa")
+        if r.get("Status") != "ok" or ("--stream" in r.get("Comando", "")) != stream:
+            continue
+        cpu = (_num(r, "CPU usuário (s)") or 0) + (_num(r, "CPU sistema (s)") or 0)
+        row = (_num(r, "Pico RSS (MB)") or 0, _num(r, "Tempo (s)") or 0, cpu, "pipeline_bench")
+        if name == "gen":                       # bench gera os cinco S_k numa etapa
+            for k in (15, 14, 13, 12, 11):
+                bench[f"gen{k}"].append((row[0], row[1] / 5, row[2] / 5, row[3]))
+        elif name in bench:
+            bench[name].append(row)
+    for name, rows in bench.items():
+        if not obs[name]:
+            obs[name] = rows
+    for name, (k, _, out) in SB_K.items():
+        if obs[name]:
+            continue
+        rows = _read_csv(Path(out) / f"cover{k}_log.csv")
+        if rows:                                # modo não registrado: só como recurso
+            last = rows[-1]
+            obs[name].append((_num(last, "Pico_RAM(MB)") or 0, _num(last, "Tempo (s)") or 0,
+                              _num(last, "Tempo (s)") or 0, f"cover{k}_log"))
+
+    for name, st in dag.items():
+        hist = [o for o in obs[name] if o[0] > 0 and o[1] > 0][-HISTORY:]
+        if hist:
+            peak = max(o[0] for o in hist)
+            st.secs = statistics.median(o[1] for o in hist)
+            if name != "verify":                # verify usa exatamente --jobs
+                st.cores = max(1, round(max(o[2] / o[1] for o in hist)))
+            st.fonte = hist[-1][3]
+        else:
+            peak, st.secs = ESTIMATIVAS[name]
+            if stream and name in STREAM_RAM:
+                peak -= STREAM_RAM[name]
+            if name == "verify":
+                peak += 40 * st.cores
+            st.fonte = "referência"
+        st.mem = peak * margin
+
+# ─── Escalonador ───────────────────────────────────────────────────────────
+class Scheduler:
+    """Lista de prioridade por caminho crítico com backfill conservador."""
+
+    def __init__(self, dag: Dict[str, Stage], names: List[str],
+                 mem_budget: float, cores: int) -> None:
+        self.dag, self.mem_budget, self.cores = dag, mem_budget, cores
+        self.pending: Set[str] = set(names)
+        self.done: Set[str] = set()
+        self.failed: Set[str] = set()
+        self.running: Dict[str, float] = {}     # etapa → término estimado
+
+    def usage(self) -> Tuple[float, int]:
+        return (sum(self.dag[n].mem for n in self.running),
+                sum(self.dag[n].cores for n in self.running))
+
+    def _fits(self, st: Stage, mem: float, cores: int) -> bool:
+        return mem + st.mem <= self.mem_budget and cores + st.cores <= self.cores
+
+    def skip_blocked(self) -> List[str]:
+        """Remove etapas cujas dependências falharam (transitivamente)."""
+        skipped = []
+        changed = True
+        while changed:
+            changed = False
+            for n in sorted(self.pending):
+                if any(d in self.failed for d in self.dag[n].deps):
+                    self.pending.discard(n)
+                    self.failed.add(n)
+                    skipped.append(n)
+                    changed = True
+        return skipped
+
+    def pick(self, now: float) -> List[str]:
+        """Etapas a lançar agora (em ordem de prioridade)."""
+        ready = sorted((n for n in self.pending
+                        if all(d in self.done for d in self.dag[n].deps)),
+                       key=lambda n: -self.dag[n].rank)
+        launch: List[str] = []
+        mem, cores = self.usage()
+        reserve_at: Optional[float] = None       # quando a etapa crítica caberá
+        for n in ready:
+            st = self.dag[n]
+            if self._fits(st, mem, cores) or (not self.running and not launch):
+                if reserve_at is not None and now + st.secs > reserve_at:
+                    continue                     # atrasaria a etapa crítica
+                launch.append(n)
+                mem, cores = mem + st.mem, cores + st.cores
+            elif reserve_at is None:
+                reserve_at = self._reserve_time(st, now, mem, cores, launch)
+        for n in launch:
+            self.pending.discard(n)
+            self.running[n] = now + self.dag[n].secs
+        return launch
+
+    def _reserve_time(self, st: Stage, now: float, mem: float, cores: int,
+                      launch: List[str]) -> float:
+        """Instante estimado em que `st` passa a caber (término dos que rodam)."""
+        ends = sorted([(t, n) for n, t in self.running.items()] +
+                      [(now + self.dag[n].secs, n) for n in launch])
+        for t, n in ends:
+            mem, cores = mem - self.dag[n].mem, cores - self.dag[n].cores
+            if self._fits(st, mem, cores):
+                return t
+        return ends[-1][0] if ends else now
+
+    def finish(self, name: str, ok: bool) -> None:
+        self.running.pop(name, None)
+        (self.done if ok else self.failed).add(name)
+
+def simulate(dag: Dict[str, Stage], names: List[str], mem_budget: float,
+             cores: int) -> List[Tuple[float, float, str]]:
+    """Execução virtual com as estimativas: [(início, fim, etapa)]."""
+    sch = Scheduler(dag, names, mem_budget, cores)
+    now, events, plan = 0.0, [], []
+    while sch.pending or sch.running:
+        for n in sch.pick(now):
+            heapq.heappush(events, (now + dag[n].secs, n))
+            plan.append((now, now + dag[n].secs, n))
+        if not events:
+            break
+        now, n = heapq.heappop(events)
+        sch.finish(n, True)
+    return plan
+
+# ─── Execução real ─────────────────────────────────────────────────────────
+def available_mb() -> float:
+    return memplan.available_mb()               # limitado pelo cgroup, se houver
+
+def _log_tail(path: Path, n: int = 12) -> str:
+    try:
+        lines = path.read_text(encoding="utf8", errors="replace").splitlines()
+    except OSError:
+        return ""
+    return "\n".join("      │ " + line[-160:] for line in lines[-n:])
+
+def _wait_any(procs: Dict[int, Tuple[str, subprocess.Popen]]) -> Tuple[int, int, float, float]:
+    """(pid, rc, pico RSS MB, CPU s) do próximo filho a terminar."""
+    if hasattr(os, "wait4"):
+        pid, status, ru = os.wait4(-1, 0)
+        rc = os.WEXITSTATUS(status) if os.WIFEXITED(status) else -os.WTERMSIG(status)
+        procs[pid][1].returncode = rc
+        return pid, rc, ru.ru_maxrss * RSS_UNIT / 1_048_576, ru.ru_utime + ru.ru_stime
+    while True:                                  # sem wait4 (Windows): polling
+        for pid, (_, p) in procs.items():
+            if p.poll() is not None:
+                return pid, p.returncode, 0.0, 0.0
+        time.sleep(0.2)
+
+def run(dag: Dict[str, Stage], names: List[str], mem_budget: float, cores: int,
+        stream: bool, cache_max: Optional[int] = None) -> bool:
+    LOG_DIR.mkdir(parents=True, exist_ok=True)
+    sch = Scheduler(dag, names, mem_budget, cores)
+    procs: Dict[int, Tuple[str, subprocess.Popen]] = {}
+    logs: Dict[str, object] = {}
+    starts: Dict[str, float] = {}
+    keys: Dict[str, str] = {}
+    t0 = time.perf_counter()
+    stamp = datetime.now().isoformat(timespec="seconds")
+    modo = "stream" if stream else "ram"
+    records: List[dict] = []
+
+    def launch(n: str, now: float) -> None:
+        st = dag[n]
+        if st.mem > mem_budget:
+            print(f"⚠️  {n} estimada em {st.mem / 1024:.1f} GB > orçamento — "
+                  "rodando sozinha.")
+        log = (LOG_DIR / f"{n}.log").open("w", encoding="utf8")
+        p = subprocess.Popen(st.cmd, stdout=log, stderr=subprocess.STDOUT)
+        procs[p.pid], logs[n], starts[n] = (n, p), log, now
+        mem, used = sch.usage()
+        print(f"▶ [{now:7.1f}s] {n:<8} est. {st.mem / 1024:5.1f} GB · {st.secs:6.0f} s · "
+              f"{st.cores} núcleo(s)  │ em uso {mem / 1024:.1f}/{mem_budget / 1024:.1f} GB, "
+              f"{used}/{cores} núcleos")
+
+    def cached(n: str, now: float) -> bool:
+        st = dag[n]
+        if cache_max is None or st.code is None:
+            return False
+        keys[n] = stagecache.fingerprint(n, st.code, st.inputs, st.params)
+        if not stagecache.restore(keys[n], n):
+            return False
+        sch.finish(n, True)
+        print(f"♻ [{now:7.1f}s] {n:<8} restaurada do cache ({keys[n][:12]})")
+        records.append({"Data": stamp, "Etapa": n, "Modo": modo, "Status": "cache"})
+        return True
+
+    try:
+        while sch.pending or procs:
+            for n in sch.skip_blocked():
+                print(f"   ⏭ {n} ignorada — dependência falhou.")
+            restored = True
+            while restored:                     # acerto libera dependentes na hora
+                restored = False
+                now = time.perf_counter() - t0
+                for n in sch.pick(now):
+                    if cached(n, now):
+                        restored = True
+                    else:
+                        launch(n, now)
+            if not procs:
+                break
+            pid, rc, peak, cpu = _wait_any(procs)
+            n, _ = procs.pop(pid)
+            logs.pop(n).close()
+            now = time.perf_counter() - t0
+            secs = now - starts[n]
+            sch.finish(n, rc == 0)
+            print(f"{'✔' if rc == 0 else '✖'} [{now:7.1f}s] {n:<8} {secs:7.1f} s · pico "
+                  f"{peak / 1024:.2f} GB (est. {dag[n].mem / 1024:.2f}) · rc={rc}")
+            if rc != 0:
+                print(_log_tail(LOG_DIR / f"{n}.log"))
+            elif n in keys and stagecache.store(keys[n], n, dag[n].outputs, cache_max):
+                print(f"   ♻ saídas de {n} guardadas no cache ({keys[n][:12]})")
+            records.append({
+                "Data": stamp, "Etapa": n, "Modo": modo,
+                "Status": "ok" if rc == 0 else f"falha ({rc})",
+                "Tempo (s)": round(secs, 2), "CPU (s)": round(cpu, 2),
+                "Pico RSS (MB)": round(peak, 1), "Núcleos": dag[n].cores,
+                "Estimativa RAM (MB)": round(dag[n].mem, 1),
+                "Estimativa (s)": round(dag[n].secs, 1),
+            })
+    except KeyboardInterrupt:
+        print("\n⛔ Interrompido — encerrando etapas em execução…")
+        for _, p in procs.values():
+            p.terminate()
+        for _, p in procs.values():
+            p.wait()
+        raise
+    finally:
+        save_runs(records)
+    print(f"\n⏱ Total {time.perf_counter() - t0:.1f} s")
+    return not sch.failed
+
+def save_runs(rows: List[dict]) -> None:
+    if not rows:
+        return
+    first = not RUNS_CSV.exists()
+    with RUNS_CSV.open("a", newline="", encoding="utf8") as f:
+        w = csv.DictWriter(f, fieldnames=RUNS_HEADER)
+        if first:
+            w.writeheader()
+        w.writerows(rows)
+    print("📄 Histórico salvo em", RUNS_CSV)
+    import historico                        # sqlite3 só ao registrar
+    historico.registrar(RUNS_CSV)
+
+# ─── CLI ───────────────────────────────────────────────────────────────────
+def print_plan(dag: Dict[str, Stage], names: List[str], mem_budget: float, cores: int) -> None:
+    print(f"{'Etapa':<8} {'depende de':<24} {'RAM (GB)':>9} {'tempo (s)':>10} "
+          f"{'núcl.':>6} {'crítico (s)':>12}  fonte")
+    for n in sorted(names, key=lambda n: -dag[n].rank):
+        st = dag[n]
+        deps = ",".join(d for d in st.deps if d in names) or "-"
+        print(f"{n:<8} {deps:<24} {st.mem / 1024:>9.2f} {st.secs:>10.0f} "
+              f"{st.cores:>6} {st.rank:>12.0f}  {st.fonte}")
+    plan = simulate(dag, names, mem_budget, cores)
+    print(f"\nPlano simulado (orçamento {mem_budget / 1024:.1f} GB, {cores} núcleos):")
+    for a, b, n in plan:
+        print(f"   {a:8.0f} → {b:8.0f} s  {n}")
+    print(f"   duração estimada: {max((b for _, b, _ in plan), default=0):.0f} s "
+          f"(serial: {sum(dag[n].secs for n in names):.0f} s)")
+
+def parse_args() -> argparse.Namespace:
+    ap = argparse.ArgumentParser(description="Executa o pipeline Lotofácil em paralelo")
+    ap.add_argument("alvos", nargs="*", metavar="ETAPA", default=["package"],
+                    help="etapas‑alvo (dependências incluídas); padrão: package")
+    ap.add_argument("--mem-budget", type=memplan.parse_size, default=None,
+                    help="RAM total para etapas simultâneas (ex.: 48G; padrão 90%% da livre)")
+    ap.add_argument("--cores", type=int, default=os.cpu_count() or 1,
+                    help="núcleos disponíveis (também é o --jobs do verify)")
+    ap.add_argument("--stream", action="store_true", help="programas 2‑5 em modo --stream")
+    ap.add_argument("--margin", type=float, default=MARGIN,
+                    help="fator de folga sobre o pico de RAM estimado")
+    ap.add_argument("--dry-run", action="store_true", help="só mostra estimativas e plano")
+    ap.add_argument("--no-cache", action="store_true",
+                    help="não restaura nem guarda saídas no cache por conteúdo")
+    ap.add_argument("--cache-max", type=memplan.parse_size, default=stagecache.DEFAULT_MAX / 1_048_576,
+                    help="tamanho máximo do cache (.cache/stages, LRU; ex.: 20G)")
+    return ap.parse_args()
+
+def main() -> None:
+    args = parse_args()
+    dag = build_dag(args.stream, args.cores)
+    bad = [a for a in args.alvos if a not in dag]
+    if bad:
+        sys.exit(f"❌ etapa(s) desconhecida(s): {', '.join(bad)} — opções: {', '.join(dag)}")
+    budget = args.mem_budget or 0.9 * available_mb()
+    names = closure(dag, args.alvos)
+    learn(dag, args.stream, args.margin)
+    for st in dag.values():
+        st.cores = min(st.cores, args.cores)
+    critical_ranks(dag, names)
+
+    print_plan(dag, names, budget, args.cores)
+    if args.dry_run:
+        return
+    print()
+    RESULT_DIR.mkdir(exist_ok=True)
+    cache_max = None if args.no_cache else int(args.cache_max * 1_048_576)
+    if not run(dag, names, budget, args.cores, args.stream, cache_max):
+        sys.exit("❌ Pipeline terminou com falhas — veja resultados/pipeline_logs/.")
+    print("✅ Pipeline concluído.")
+
+if __name__ == "__main__":
+    main()
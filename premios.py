@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# AUTOR: Leonardo dos Santos Marques
+"""
+premios.py — quanto um SB15_k ganha em um sorteio (ou em milhares deles).
+
+O SB é carregado **uma vez** como vetor numpy uint32 de máscaras
+(bit n‑1 ↔ dezena n).  Para cada sorteio D:
+
+    acertos = popcount(cartão & D)          (LUT de 65 536 entradas,
+                                              metade baixa + metade alta)
+    histograma = bincount(acertos)          → quantos cartões fizeram 0…15
+
+Com numpy ≥ 2.0 o popcount usa np.bitwise_count (instrução POPCNT, ~10×
+mais rápido que a LUT); em versões antigas fica a LUT.
+
+No modo em lote os sorteios são processados em blocos (cartões × sorteios
+numa matriz só), então cada bloco custa poucas operações numpy sobre
+dados que cabem em cache.
+
+Prêmios: 11, 12 e 13 acertos têm valor fixo; 14 e 15 são rateio — os
+valores padrão são médias aproximadas e podem ser trocados com --premio.
+
+Uso:
+    python premios.py prog2_saida/SB15_14.csv --sorteio 1,2,3,4,5,6,7,8,9,10,11,12,13,14,15
+    python premios.py prog5_saida/SB15_11.csv --sorteios historico.csv   # 1 sorteio/linha
+    python premios.py prog4_saida/SB15_12.csv --aleatorios 5000          # benchmark
+(calcular_custo_sb.py --sorteio … usa este módulo para custo × retorno)
+
+Requer:  pip install numpy
+"""
+from __future__ import annotations
+
+import argparse, csv, sys, time
+from pathlib import Path
+from typing import Dict, Iterable, Sequence
+
+import numpy as np
+
+import sbformat
+
+HITS = (11, 12, 13, 14, 15)                  # faixas premiadas
+PREMIOS: Dict[int, float] = {11: 6.00, 12: 12.00, 13: 30.00,
+                             14: 1_500.00, 15: 1_500_000.00}   # 14/15: rateio médio
+BLOCK_CARDS = 1 << 16                        # cartões por bloco no modo em lote
+BLOCK_DRAWS = 32                             # sorteios por bloco
+
+POPCOUNT16 = np.array([bin(i).count("1") for i in range(1 << 16)], dtype=np.uint8)
+
+# ─── Carga ─────────────────────────────────────────────────────────────────
+def parse_cards(data: bytes, width: int = 15) -> np.ndarray:
+    """Texto CSV ('1,2,…' por linha) → máscaras uint32, sem loop Python.
+
+    Cada dezena tem 1 ou 2 dígitos: o início de um número é um dígito cujo
+    antecessor não é dígito; se o seguinte também for, vale d·10 + d'.
+    """
+    buf = np.frombuffer(data, dtype=np.uint8)
+    digit = (buf >= 48) & (buf <= 57)
+    val = buf.astype(np.int16) - 48
+    prev = np.concatenate(([False], digit[:-1]))
+    nxt = np.concatenate((digit[1:], [False]))
+    starts = np.flatnonzero(digit & ~prev)
+    nums = val[starts]
+    two = nxt[starts]
+    nums[two] = nums[two] * 10 + val[starts[two] + 1]
+    if nums.size % width:
+        raise ValueError(f"{nums.size} números não formam linhas de {width}")
+    if nums.size and (nums.min() < 1 or nums.max() > 25):
+        raise ValueError("dezena fora de 1…25")
+    bits = np.left_shift(np.uint32(1), (nums - 1).astype(np.uint32))
+    return np.bitwise_or.reduce(bits.reshape(-1, width), axis=1)
+
+def load_sb(path: Path) -> np.ndarray:
+    """SB15_k → máscaras uint32 (.sb atualizado: cópia direta; texto: parse_cards)."""
+    src = sbformat.resolve(path)
+    if sbformat.is_binary(src):
+        return np.frombuffer(sbformat.load_masks(src), dtype=np.uint32)
+    return parse_cards(src.read_bytes())
+
+def draw_mask(nums: Iterable[int]) -> int:
+    nums = sorted(set(int(n) for n in nums))
+    if len(nums) != 15 or nums[0] < 1 or nums[-1] > 25:
+        raise ValueError(f"sorteio inválido: {nums} (15 dezenas distintas de 1 a 25)")
+    m = 0
+    for n in nums:
+        m |= 1 << (n - 1)
+    return m
+
+def parse_draw(text: str) -> int:
+    return draw_mask(int(x) for x in text.replace(";", ",").replace(" ", ",").split(",") if x)
+
+def load_draws(path: Path) -> np.ndarray:
+    """Arquivo com um sorteio por linha (15 dezenas separadas por vírgula)."""
+    return parse_cards(Path(path).read_bytes())
+
+def random_draws(n: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    picks = np.argsort(rng.random((n, 25)), axis=1)[:, :15].astype(np.uint32)
+    return np.bitwise_or.reduce(np.left_shift(np.uint32(1), picks), axis=1)
+
+# ─── Avaliação ─────────────────────────────────────────────────────────────
+def popcount32_lut(x: np.ndarray) -> np.ndarray:
+    return POPCOUNT16[x & 0xFFFF] + POPCOUNT16[x >> 16]
+
+popcount32 = getattr(np, "bitwise_count", popcount32_lut)
+
+def hit_histogram(cards: np.ndarray, draw: int) -> np.ndarray:
+    """Histograma de acertos (índices 0…15) do SB para um sorteio."""
+    return np.bincount(popcount32(cards & np.uint32(draw)), minlength=16)[:16]
+
+def batch_histograms(cards: np.ndarray, draws: np.ndarray,
+                     block_cards: int = BLOCK_CARDS,
+                     block_draws: int = BLOCK_DRAWS) -> np.ndarray:
+    """Histogramas (n_sorteios × 16) para muitos sorteios de uma vez."""
+    draws = np.asarray(draws, dtype=np.uint32)
+    out = np.zeros((len(draws), 16), dtype=np.int64)
+    for d0 in range(0, len(draws), block_draws):
+        blk = draws[d0:d0 + block_draws]
+        nd = len(blk)
+        offs = (np.arange(nd, dtype=np.intp) * 16)[None, :]
+        acc = np.zeros(nd * 16, dtype=np.int64)
+        for c0 in range(0, len(cards), block_cards):
+            hits = popcount32(cards[c0:c0 + block_cards, None] & blk[None, :])
+            acc += np.bincount((hits + offs).ravel(), minlength=nd * 16)
+        out[d0:d0 + nd] = acc.reshape(nd, 16)
+    return out
+
+def prize_total(hist: np.ndarray, premios: Dict[int, float] = PREMIOS) -> np.ndarray:
+    """Retorno em R$ de um histograma (ou de cada linha de uma matriz)."""
+    hist = np.atleast_2d(hist)
+    return sum(hist[:, h] * premios[h] for h in HITS)
+
+def mask_to_text(m: int) -> str:
+    return ",".join(str(n) for n in range(1, 26) if m >> (n - 1) & 1)
+
+# ─── CLI ───────────────────────────────────────────────────────────────────
+def parse_premios(items: Sequence[str]) -> Dict[int, float]:
+    premios = dict(PREMIOS)
+    for it in items or ():
+        k, _, v = it.partition("=")
+        if int(k) not in premios:
+            sys.exit(f"❌ faixa {k} inválida — use 11 a 15.")
+        premios[int(k)] = float(v.replace(",", "."))
+    return premios
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Acertos/prêmios de um SB15_k por sorteio")
+    ap.add_argument("sb", type=Path, help="arquivo SB15_k.csv")
+    ap.add_argument("--sorteio", action="append", default=[], metavar="D1,…,D15",
+                    help="sorteio a avaliar (repetível)")
+    ap.add_argument("--sorteios", type=Path, help="CSV com um sorteio por linha")
+    ap.add_argument("--aleatorios", type=int, default=0, help="N sorteios aleatórios (lote)")
+    ap.add_argument("--premio", action="append", metavar="FAIXA=R$",
+                    help="valor de uma faixa (ex.: 14=1800); repetível")
+    ap.add_argument("--csv", type=Path, help="grava uma linha por sorteio")
+    args = ap.parse_args()
+
+    if not args.sb.exists():
+        sys.exit(f"❌ {args.sb} não encontrado.")
+    premios = parse_premios(args.premio)
+    t0 = time.perf_counter()
+    cards = load_sb(args.sb)
+    t_load = time.perf_counter() - t0
+
+    parts = [np.array([parse_draw(s) for s in args.sorteio], dtype=np.uint32)]
+    if args.sorteios:
+        parts.append(load_draws(args.sorteios))
+    if args.aleatorios:
+        parts.append(random_draws(args.aleatorios))
+    draws = np.concatenate(parts)
+    if not len(draws):
+        sys.exit("❌ informe --sorteio, --sorteios ou --aleatorios.")
+
+    t0 = time.perf_counter()
+    hists = batch_histograms(cards, draws)
+    t_eval = time.perf_counter() - t0
+    totals = prize_total(hists, premios)
+    cost = len(cards) * 3.00
+
+    print(f"📥 {args.sb}: {len(cards):,} cartões carregados em {t_load:.2f} s")
+    print(f"🎯 {len(draws):,} sorteio(s) em {t_eval:.3f} s "
+          f"({len(draws) / max(t_eval, 1e-9):,.0f} sorteios/s)")
+    for d, h, tot in list(zip(draws, hists, totals))[:20]:
+        faixas = " ".join(f"{k}:{h[k]:,}" for k in HITS)
+        print(f"   {mask_to_text(int(d)):<44} {faixas}  → R$ {tot:,.2f}")
+    if len(draws) > 20:
+        print(f"   … ({len(draws) - 20:,} sorteios omitidos)")
+    mean = hists[:, list(HITS)].mean(axis=0)
+    print("📊 Média por sorteio: " + " ".join(f"{k}:{m:,.2f}" for k, m in zip(HITS, mean))
+          + f" | retorno R$ {totals.mean():,.2f} × custo R$ {cost:,.2f}")
+
+    if args.csv:
+        with args.csv.open("w", newline="", encoding="utf8") as f:
+            w = csv.writer(f)
+            w.writerow(["Sorteio", *[f"Acertos_{k}" for k in HITS], "Retorno_R$"])
+            for d, h, tot in zip(draws, hists, totals):
+                w.writerow([mask_to_text(int(d)), *[int(h[k]) for k in HITS], f"{tot:.2f}"])
+        print("📄 Resultado salvo em", args.csv)
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,7 @@ sequências S14 e, em seguida, verifica a cobertura.
 
 Entradas .....................................  resultados/S15.csv · resultados/S14.csv
 Saídas ........................................  prog2_saida/SB15_14.csv
+                                                prog2_saida/SB15_14.sb (binário, sbformat.py)
                                                 prog2_saida/cover14_log.csv
                                                 prog2_saida/complexity_plot.png
 
@@ -26,6 +27,9 @@ Let n = |S15| = 3 268 760  e m = 15 (sub-combinações geradas por linha)
 
 Memória dominada por:
   idx_map (17 MiB) + heap (≈ 50 MiB) + texto + overhead ⇒ pico real ≈ 2.2 GiB
+`--modo auto` (padrão) guarda os ids por linha na RAM, num np.memmap ou os
+recalcula, o que couber em --mem-budget (memplan.py).  `--workers` faz a
+varredura inicial em workers TCP (cover_workers.py).
 ───────────────────────────────────────────────────────────────────────────────
 O script também:
 • calcula ln(|U|)+1 e α/(ln|U|+1) no CSV (α << 1 comprova “bem dentro da cota”);
@@ -34,21 +38,20 @@ O script também:
 
 from __future__ import annotations
 
-import argparse, csv, heapq, math, os, sys, time
+import argparse, csv, heapq, math, sys, time
 from pathlib import Path
-from typing import Dict, List, Set, Tuple
+from typing import Dict, List, Optional, Set, Tuple
 
-import psutil
-import matplotlib.pyplot as plt
+import cover_engine
+import manifest
+import memplan
+import sbformat
+import telemetry
 
-try:
-    import bitarray
-except ImportError:                       # fallback para lista-bool
-    bitarray = None
 
 # ───── PATHS ────────────────────────────────────────────────────────────────
 BASE_IN  = Path("resultados")
-OUT_DIR  = Path("prog2_saida"); OUT_DIR.mkdir(exist_ok=True)
+OUT_DIR  = Path("prog2_saida")
 
 S14_FILE = BASE_IN / "S14.csv"
 S15_FILE = BASE_IN / "S15.csv"
@@ -86,10 +89,23 @@ def s15_cover_indices(nums: List[int], idx_map: Dict[int, int]) -> List[int]:
     return idxs                  # sempre 15
 
 # ───── Greedy Set-Cover -----------------------------------------------------
-def greedy_set_cover(store_all: bool, pct_step: float = 1.0
-                     ) -> Tuple[int, float, List[int], List[float]]:
-    """Retorna tamanho SB, tempo total e amostras (n, t)."""
+def greedy_set_cover(modo: str = "ram", pct_step: float = 1.0, engine: str = "lazy",
+                     eps: float = cover_engine.DEFAULT_EPS, seed: int = 0,
+                     jobs: Optional[int] = None, tel=None, workers=None
+                     ) -> Tuple[int, float, List[int], List[float], dict]:
+    """Retorna tamanho SB, tempo total, amostras (n, t) e contadores do motor."""
     t0 = time.perf_counter()
+    if engine == "paralelo":                 # máscaras pelo posto: sem S14.csv, S15.csv nem índices
+        print("▶ 1/3  Greedy paralelo por limiares…")
+        tel = tel or telemetry.NullTelemetry()
+        tel.set_phase("greedy")
+        rids, stats = cover_engine.parallel_greedy(
+            None, 14, eps, jobs, pct_step, tel=tel)
+        print("▶ 2/3  Gravando SB…")
+        sb_lines = [sbformat.mask_to_text(int(m)) for m in cover_engine.s15_masks(rids)]
+        sbformat.save_lines(SB_FILE, sb_lines, 14, "programa2.py",
+                            {"k": 14, "stream": False, "motor": engine, "jobs": jobs})
+        return len(sb_lines), round(time.perf_counter() - t0, 2), [], [], stats
     idx_map, _ = load_S14()
     total = len(idx_map)
     uncovered: Set[int] = set(range(total))
@@ -99,81 +115,117 @@ def greedy_set_cover(store_all: bool, pct_step: float = 1.0
     xs, ts = [], []
 
     print("▶ 1/3 Varredura inicial…")
-    row_to_idx: List[List[int]] = []
+    tel = tel or telemetry.NullTelemetry()
+    tel.set_phase("varredura")
+    row_to_idx = memplan.ids_store(modo, memplan.TOTAL_S15, 15, OUT_DIR / ".ids14.u32",
+                                   matriz=workers is not None)
     heap: List[Tuple[int, int]] = []      # (-gain, row_id)
     lines_text: List[str] = []
 
-    with S15_FILE.open() as f:
-        for row_id, row in enumerate(csv.reader(f), start=1):
-            nums = list(map(int, row))
-            idxs = s15_cover_indices(nums, idx_map)
-            lines_text.append(",".join(row))
-            if store_all:
-                row_to_idx.append(idxs)
-            heapq.heappush(heap, (-15, row_id-1))
-
-            prog = row_id / 3_268_760
-            if checkpoints and prog >= checkpoints[0]:
-                xs.append(row_id)
-                ts.append(time.perf_counter() - t0)
-                checkpoints.pop(0)
+    if workers is not None:                  # ids e ganhos dos workers (cover_workers.py)
+        lines_text = S15_FILE.read_text().splitlines()
+        gains = workers.run(14, row_to_idx, lambda rid: s15_cover_indices(
+            list(map(int, lines_text[rid].split(","))), idx_map), tel)
+        heap = [(-g, rid) for rid, g in enumerate(gains.tolist())]
+        heapq.heapify(heap)
+    else:
+        with S15_FILE.open() as f:
+            for row_id, row in enumerate(csv.reader(f), start=1):
+                nums = list(map(int, row))
+                idxs = s15_cover_indices(nums, idx_map)
+                lines_text.append(",".join(row))
+                if row_to_idx is not None:
+                    row_to_idx.append(idxs)
+                heapq.heappush(heap, (-15, row_id-1))
+                tel.scan(row_id, len(heap))
+
+                prog = row_id / 3_268_760
+                if checkpoints and prog >= checkpoints[0]:
+                    xs.append(row_id)
+                    ts.append(time.perf_counter() - t0)
+                    checkpoints.pop(0)
 
     print("▶ 2/3 Executando Greedy…")
-    sb_lines: List[str] = []
-    next_print = pct_step
-    while uncovered:
-        neg_gain, rid = heapq.heappop(heap)
-        nums = list(map(int, lines_text[rid].split(",")))
-        idxs = row_to_idx[rid] if store_all else s15_cover_indices(nums, idx_map)
-
-        new = [i for i in idxs if i in uncovered]
-        if not new:
-            continue
-        if len(new) < -neg_gain:          # lazy-update
-            heapq.heappush(heap, (-len(new), rid))
-            continue
-
-        uncovered.difference_update(new)
-        sb_lines.append(lines_text[rid])
-
-        pct = 100 * (total - len(uncovered)) / total
-        if pct >= next_print or not uncovered:
-            print(f"   {pct:6.2f}% coberto | SB tamanho: {len(sb_lines):,}")
-            next_print += pct_step
+    tel.set_phase("greedy")
+    if engine == "estocastico":
+        ids_of = row_to_idx.__getitem__ if row_to_idx is not None else \
+            (lambda rid: s15_cover_indices(list(map(int, lines_text[rid].split(","))), idx_map))
+        rids, stats = cover_engine.stochastic_greedy(
+            len(lines_text), ids_of, uncovered, LOWER_BOUND, eps, seed, pct_step, tel=tel)
+        sb_lines = [lines_text[r] for r in rids]
+    else:
+        evals = stale = 0
+        sb_lines: List[str] = []
+        next_print = pct_step
+        while uncovered:
+            neg_gain, rid = heapq.heappop(heap)
+            evals += 1
+            tel.tick(total - len(uncovered), len(sb_lines), evals, stale, -neg_gain, len(heap))
+            nums = list(map(int, lines_text[rid].split(",")))
+            idxs = row_to_idx[rid] if row_to_idx is not None else s15_cover_indices(nums, idx_map)
+
+            new = [i for i in idxs if i in uncovered]
+            if not new:
+                stale += 1
+                continue
+            if len(new) < -neg_gain:          # lazy-update
+                heapq.heappush(heap, (-len(new), rid))
+                stale += 1
+                continue
+
+            uncovered.difference_update(new)
+            sb_lines.append(lines_text[rid])
+
+            pct = 100 * (total - len(uncovered)) / total
+            if pct >= next_print or not uncovered:
+                print(f"   {pct:6.2f}% coberto | SB tamanho: {len(sb_lines):,}")
+                next_print += pct_step
+        tel.tick(total, len(sb_lines), evals, stale, 0, len(heap), force=True)
+        stats = {"amostra": "", "avaliacoes": evals}
+    memplan.close_store(row_to_idx)
 
     # salva SB
-    SB_FILE.write_text("\n".join(sb_lines), encoding="ascii")
+    sbformat.save_lines(SB_FILE, sb_lines, 14, "programa2.py",
+                        {"k": 14, "stream": modo == "stream", "modo": modo, "motor": engine})
     elapsed = round(time.perf_counter() - t0, 2)
-    return len(sb_lines), elapsed, xs, ts
+    return len(sb_lines), elapsed, xs, ts, stats
 
 # ───── Verificação ----------------------------------------------------------
 def verify_sb(idx_map: Dict[int, int]) -> None:
+    try:                                  # opcional (acelera a verificação)
+        import bitarray
+    except ImportError:                   # fallback para lista-bool
+        bitarray = None
     total = len(idx_map)
     print("\n▶ 3/3 Verificando cobertura…")
     covered = bitarray.bitarray(total) if bitarray else [False]*total
     if bitarray:
         covered.setall(False)
 
-    with SB_FILE.open() as f:
-        for row in csv.reader(f):
-            r = list(map(int, row))
-            for omit in r:
-                mask = 0
-                for n in r:
-                    if n != omit:
-                        mask |= 1 << (n-1)
-                covered[idx_map[mask]] = True
+    for r in sbformat.iter_nums(SB_FILE):            # .sb se atualizado, senão CSV
+        for omit in r:
+            mask = 0
+            for n in r:
+                if n != omit:
+                    mask |= 1 << (n-1)
+            covered[idx_map[mask]] = True
 
     ok = covered.all() if bitarray else (False not in covered)
+    manifest.set_verified(SB_FILE, ok, "programa2.py")
     if not ok:
+        from verify_all import diagnose_k   # histograma + S14 descobertas
+        diagnose_k(14)
         sys.exit("❌ Falha: alguma S14 não coberta!")
     print("✔ Cobertura 100 % confirmada.")
 
 # ───── Logging + gráfico ----------------------------------------------------
-def append_log(sb_size: int, elapsed: float, peak_mb: float) -> None:
-    import csv, math
+def append_log(sb_size: int, elapsed: float, peak_mb: float, engine: str = "lazy",
+               eps: float = 0.0, stats: Optional[dict] = None,
+               plano: Optional[memplan.Plan] = None) -> None:
+    import math
+    stats = stats or {"amostra": "", "avaliacoes": ""}
     header = ["SB_size", "Lower_bound", "Approx_factor",
-              "lnU+1", "Alpha_over_ln", "Tempo (s)", "Pico_RAM(MB)"]
+              "lnU+1", "Alpha_over_ln", "Tempo (s)", "Pico_RAM(MB)", "Modo", "RAM_prevista(MB)"]
 
     alpha = sb_size / LOWER_BOUND
     ln_bound = math.log(TOTAL_U) + 1
@@ -184,14 +236,15 @@ def append_log(sb_size: int, elapsed: float, peak_mb: float) -> None:
         "lnU+1": round(ln_bound, 3),
         "Alpha_over_ln": round(alpha / ln_bound, 3),
         "Tempo (s)": elapsed,
-        "Pico_RAM(MB)": peak_mb
+        "Pico_RAM(MB)": peak_mb,
+        "Modo": plano.modo if plano else "",
+        "RAM_prevista(MB)": plano.previsto if plano else "",
+        "Motor": engine,
+        "Epsilon": eps if engine != "lazy" else "",
+        "Amostra": stats["amostra"],
+        "Avaliacoes": stats["avaliacoes"],
     }
-    write_hdr = not LOG_CSV.exists()
-    with LOG_CSV.open("a", newline="", encoding="utf8") as f:
-        w = csv.DictWriter(f, fieldnames=header)
-        if write_hdr:
-            w.writeheader()
-        w.writerow(row)
+    cover_engine.append_log(LOG_CSV, header, row)
     print("📄 Log salvo em", LOG_CSV)
 
 def plot_complexity(xs: List[int], ts: List[float]) -> None:
@@ -202,6 +255,14 @@ def plot_complexity(xs: List[int], ts: List[float]) -> None:
     scale = ts[-1] / ref[-1]
     ref_scaled = [v * scale for v in ref]
 
+    try:
+        import matplotlib
+        matplotlib.use("Agg")             # não abre janela
+        import matplotlib.pyplot as plt
+    except Exception:
+        print("⚠ matplotlib não disponível — gráfico omitido.")
+        return
+
     plt.figure()
     plt.plot(xs, ts, marker="o", label="Tempo real")
     plt.plot(xs, ref_scaled, linestyle="--", label="c · n·log n")
@@ -218,31 +279,75 @@ def plot_complexity(xs: List[int], ts: List[float]) -> None:
 # ───── CLI ------------------------------------------------------------------
 def parse_args() -> argparse.Namespace:
     p = argparse.ArgumentParser(description="Programa 2 — SB15_14 por Greedy Set-Cover")
-    p.add_argument("--stream", action="store_true",
-                   help="menos RAM (recalcula índices on-the-fly)")
-    return p.parse_args()
+    p.add_argument("--modo", choices=("auto",) + memplan.MODES, default="auto",
+                   help="ids por linha: ram (lista), mmap (np.memmap em disco) ou "
+                        "stream (recalcula on-the-fly); auto = o mais rápido que cabe")
+    p.add_argument("--stream", action="store_true", help="o mesmo que --modo stream")
+    p.add_argument("--mem-budget", type=memplan.parse_size, default=None,
+                   help="teto de RAM do modo auto (ex.: 8G; padrão: 90%% do disponível)")
+    p.add_argument("--engine", choices=cover_engine.ENGINES, default="lazy",
+                   help="lazy = greedy exato; estocastico = amostra por passo; "
+                        "paralelo = lotes por limiar em vários processos")
+    p.add_argument("--eps", type=float, default=cover_engine.DEFAULT_EPS,
+                   help="ε do motor estocástico (amostra = n/k̂·ln(1/ε)) "
+                        "e do paralelo (limiar cai por 1+ε)")
+    p.add_argument("--seed", type=int, default=0, help="semente do motor estocástico")
+    p.add_argument("--jobs", type=int, default=None,
+                   help="processos do motor paralelo (padrão: todos os núcleos)")
+    telemetry.add_args(p)
+    cover_engine.add_workers_args(p)
+    args = p.parse_args()
+    if args.stream:
+        args.modo = "stream"
+    return args
 
 # ───── Main -----------------------------------------------------------------
 def main() -> None:
-    for f in (S14_FILE, S15_FILE):
-        if not f.exists():
-            sys.exit(f"❌ {f} não encontrado. Gere os CSV primeiro.")
-
     args = parse_args()
-    proc = psutil.Process(os.getpid())
-
-    sb_size, elapsed, xs, ts = greedy_set_cover(store_all=not args.stream)
-
-    peak_mb = round(proc.memory_info().rss / 1_048_576, 1)
-
-    idx_map, _ = load_S14()
-    verify_sb(idx_map)
-
-    append_log(sb_size, elapsed, peak_mb)
+    if args.engine != "paralelo":            # paralelo: S15 pelo posto, sem S14.csv
+        for f in (S14_FILE, S15_FILE):
+            if not f.exists():
+                sys.exit(f"❌ {f} não encontrado. Gere os CSV primeiro.")
+    OUT_DIR.mkdir(exist_ok=True)
+    if args.workers and args.engine == "paralelo":
+        sys.exit("❌ --workers vale para os motores lazy e estocástico.")
+    plano = None if args.engine == "paralelo" else \
+        memplan.plan(14, args.modo, args.mem_budget, LOG_CSV, OUT_DIR, matriz=bool(args.workers))
+    if args.workers and plano.modo == "stream":
+        sys.exit("❌ --workers guarda os ids recebidos: use --modo ram ou mmap (ou --mem-budget maior).")
+    workers = None
+    if args.workers:
+        import cover_workers                 # socket/threading só com --workers
+        workers = cover_workers.from_args(args)
+
+    tel = telemetry.from_args(args, "programa2", 14, TOTAL_U)
+    try:
+        sb_size, elapsed, xs, ts, stats = greedy_set_cover(
+            modo=plano.modo if plano else "ram", engine=args.engine, eps=args.eps, seed=args.seed, jobs=args.jobs, tel=tel, workers=workers)
+    except BaseException:
+        tel.close("falha")
+        raise
+    finally:
+        if workers is not None:
+            workers.close()
+    tel.set_phase("verificacao")
+
+    peak_mb = memplan.peak_mb()
+
+    if args.engine == "paralelo":            # sem S14.csv: mapa de máscaras
+        cover_engine.verify_masks(SB_FILE, 14, "programa2.py")
+    else:
+        idx_map, _ = load_S14()
+        verify_sb(idx_map)
+
+    append_log(sb_size, elapsed, peak_mb, args.engine, args.eps, stats, plano)
     plot_complexity(xs, ts)
 
+    tel.close()
     print(f"\n✅ SB15_14.csv gerado ({sb_size:,} linhas) em {elapsed}s — "
           f"α={sb_size/LOWER_BOUND:.2f} | pico RAM {peak_mb} MB")
+    if plano:
+        memplan.report(plano, peak_mb)
 
 if __name__ == "__main__":
     main()
@@ -9,6 +9,7 @@ heurística **Greedy Set-Cover**.
 
 Gera:
   • prog4_saida/SB15_12.csv           — subconjunto obtido
+  • prog4_saida/SB15_12.sb            — o mesmo, binário (sbformat.py)
   • prog4_saida/cover12_log.csv       — métricas + α / ln|U|
   • prog4_saida/complexity_plot.png   — gráfico evidenciando O(n log n)
 
@@ -19,12 +20,15 @@ Loop Greedy ……...…  Θ(n·log n)   (heap-pop/push a cada iteração)
 
 ⇒  T(n)  =  Θ(n log n)    (curva usada no gráfico).
 
-Memória (modo padrão, `store_all=True`)
+Memória (`--modo ram`: ids por linha em listas)
   • Índice S12        5 200 300 × 4 B ≈  20 MiB
   • Heap (-gain,id)    |S15| × 16 B ≈  50 MiB
   • Linhas S15 (txt)                     55 MiB
   • Overhead Python  →  pico medido ≈ 12,8 GiB
-Modo `--stream` recalc. ids on-the-fly (≈3× mais lento, –4 GiB).
+Modo `--stream` recalc. ids on-the-fly (≈3× mais lento, –4 GiB); `--modo mmap`
+guarda-os num np.memmap.  O padrão `auto` escolhe pelo orçamento de RAM
+(--mem-budget, memplan.py).  `--workers` faz a varredura inicial em workers
+TCP (cover_workers.py).
 
 ──────────────────────────────────────────────────────────────────────────────
 """
@@ -34,24 +38,24 @@ from __future__ import annotations
 import argparse
 import csv
 import heapq
-import os
 import sys
 import time
 from itertools import combinations
 from math import log
 from pathlib import Path
-from typing import Dict, List, Set, Tuple
+from typing import Dict, List, Optional, Set, Tuple
 
-import psutil
 
-try:
-    import bitarray
-except ImportError:
-    bitarray = None  # fallback se lib não instalada
+import cover_engine
+import manifest
+import memplan
+import sbformat
+import telemetry
+
 
 # ─────────────────────────── PATHS & CONSTANTES ────────────────────────────
 BASE_DIR   = Path("resultados")
-OUT_DIR    = Path("prog4_saida");  OUT_DIR.mkdir(exist_ok=True)
+OUT_DIR    = Path("prog4_saida")
 
 S12_FILE   = BASE_DIR / "S12.csv"
 S15_FILE   = BASE_DIR / "S15.csv"
@@ -98,8 +102,20 @@ def cover_ids(nums: List[int], idx_map: Dict[int,int]) -> List[int]:
     return ids        # len = 455
 
 # ─────────────────────────── GREEDY SET-COVER ──────────────────────────────
-def greedy(store_all: bool) -> Tuple[int,float]:
+def greedy(modo: str = "ram", engine: str = "lazy", eps: float = cover_engine.DEFAULT_EPS,
+           seed: int = 0, jobs: Optional[int] = None, tel=None, workers=None) -> Tuple[int,float,dict]:
     t0        = time.perf_counter()
+    if engine == "paralelo":                 # máscaras pelo posto: sem S12.csv, S15.csv nem índices
+        print("▶ 1/3  Greedy paralelo por limiares…")
+        tel = tel or telemetry.NullTelemetry()
+        tel.set_phase("greedy")
+        rids, stats = cover_engine.parallel_greedy(
+            None, 12, eps, jobs, 1.0, tel=tel)
+        print("▶ 2/3  Gravando SB…")
+        chosen = [sbformat.mask_to_text(int(m)) for m in cover_engine.s15_masks(rids)]
+        sbformat.save_lines(SB_FILE, chosen, 12, "programa4.py",
+                            {"k": 12, "stream": False, "motor": engine, "jobs": jobs})
+        return len(chosen), round(time.perf_counter()-t0, 1), stats
     idx_map,_ = load_S12()
     total     = len(idx_map)
     uncovered: Set[int] = set(range(total))
@@ -109,85 +125,121 @@ def greedy(store_all: bool) -> Tuple[int,float]:
     samples: List[Tuple[int,float]] = []
 
     print("▶ 1/3  Varredura inicial…")
-    row_to_idx: List[List[int]] = []
+    tel = tel or telemetry.NullTelemetry()
+    tel.set_phase("varredura")
+    row_to_idx = memplan.ids_store(modo, memplan.TOTAL_S15, SUB_PER_LINE, OUT_DIR / ".ids12.u32",
+                                   matriz=workers is not None)
     heap: List[Tuple[int,int]]  = []
     lines: List[str]            = []
 
     STEP = 50_000
-    with S15_FILE.open() as f:
-        for rid, row in enumerate(csv.reader(f), 1):
-            nums = list(map(int,row))
-            ids  = cover_ids(nums, idx_map)
-
-            lines.append(",".join(row))
-            if store_all:
-                row_to_idx.append(ids)
-            heapq.heappush(heap, (-SUB_PER_LINE, rid-1))
-
-            if rid % STEP == 0 or rid == TOTAL_S15:
-                pct = 100*rid/TOTAL_S15
-                spd = rid/(time.perf_counter()-t0)
-                print(f"   {pct:5.1f}% lido ({rid:,}/{TOTAL_S15:,}) – {spd:,.0f} linhas/s")
-
-            if rid in milestones:
-                samples.append( (rid, time.perf_counter()-t0) )
+    if workers is not None:                  # ids e ganhos dos workers (cover_workers.py)
+        lines = S15_FILE.read_text().splitlines()
+        gains = workers.run(12, row_to_idx, lambda rid: cover_ids(
+            list(map(int, lines[rid].split(","))), idx_map), tel)
+        heap = [(-g, rid) for rid, g in enumerate(gains.tolist())]
+        heapq.heapify(heap)
+    else:
+        with S15_FILE.open() as f:
+            for rid, row in enumerate(csv.reader(f), 1):
+                nums = list(map(int,row))
+                ids  = cover_ids(nums, idx_map)
+
+                lines.append(",".join(row))
+                if row_to_idx is not None:
+                    row_to_idx.append(ids)
+                heapq.heappush(heap, (-SUB_PER_LINE, rid-1))
+                tel.scan(rid, len(heap))
+
+                if rid % STEP == 0 or rid == TOTAL_S15:
+                    pct = 100*rid/TOTAL_S15
+                    spd = rid/(time.perf_counter()-t0)
+                    print(f"   {pct:5.1f}% lido ({rid:,}/{TOTAL_S15:,}) – {spd:,.0f} linhas/s")
+
+                if rid in milestones:
+                    samples.append( (rid, time.perf_counter()-t0) )
 
     print("▶ 2/3  Greedy Set-Cover…")
-    chosen: List[str] = []
-    next_print = 1.0
-    while uncovered:
-        neg_gain, rid = heapq.heappop(heap)
-        ids = row_to_idx[rid] if store_all else cover_ids(
-            list(map(int, lines[rid].split(","))), idx_map)
-
-        new = [i for i in ids if i in uncovered]
-        if not new:
-            continue
-        if len(new) < -neg_gain:               # lazy-update
-            heapq.heappush(heap, (-len(new), rid))
-            continue
-
-        uncovered.difference_update(new)
-        chosen.append(lines[rid])
-
-        pct = 100*(TOTAL_S12 - len(uncovered))/TOTAL_S12
-        if pct >= next_print or not uncovered:
-            print(f"   {pct:6.2f}% coberto | SB tamanho: {len(chosen):,}")
-            next_print += 1.0
-
-    SB_FILE.write_text("\n".join(chosen), encoding="ascii")
+    tel.set_phase("greedy")
+    if engine == "estocastico":
+        ids_of = row_to_idx.__getitem__ if row_to_idx is not None else \
+            (lambda rid: cover_ids(list(map(int, lines[rid].split(","))), idx_map))
+        rids, stats = cover_engine.stochastic_greedy(
+            len(lines), ids_of, uncovered, LOWER_BOUND, eps, seed, tel=tel)
+        chosen = [lines[r] for r in rids]
+    else:
+        evals = stale = 0
+        chosen: List[str] = []
+        next_print = 1.0
+        while uncovered:
+            neg_gain, rid = heapq.heappop(heap)
+            evals += 1
+            tel.tick(TOTAL_S12 - len(uncovered), len(chosen), evals, stale, -neg_gain, len(heap))
+            ids = row_to_idx[rid] if row_to_idx is not None else cover_ids(
+                list(map(int, lines[rid].split(","))), idx_map)
+
+            new = [i for i in ids if i in uncovered]
+            if not new:
+                stale += 1
+                continue
+            if len(new) < -neg_gain:               # lazy-update
+                heapq.heappush(heap, (-len(new), rid))
+                stale += 1
+                continue
+
+            uncovered.difference_update(new)
+            chosen.append(lines[rid])
+
+            pct = 100*(TOTAL_S12 - len(uncovered))/TOTAL_S12
+            if pct >= next_print or not uncovered:
+                print(f"   {pct:6.2f}% coberto | SB tamanho: {len(chosen):,}")
+                next_print += 1.0
+        tel.tick(TOTAL_S12, len(chosen), evals, stale, 0, len(heap), force=True)
+        stats = {"amostra": "", "avaliacoes": evals}
+
+    memplan.close_store(row_to_idx)
+    sbformat.save_lines(SB_FILE, chosen, 12, "programa4.py",
+                        {"k": 12, "stream": modo == "stream", "modo": modo, "motor": engine})
     elapsed = round(time.perf_counter()-t0, 1)
     samples.append( (TOTAL_S15, elapsed) )
     _plot_complexity(samples)
-    return len(chosen), elapsed
+    return len(chosen), elapsed, stats
 
 # ──────────────────────────── VERIFICAÇÃO ──────────────────────────────────
 def verify(idx_map: Dict[int,int]) -> None:
+    try:                                  # opcional (acelera a verificação)
+        import bitarray
+    except ImportError:                   # fallback para lista-bool
+        bitarray = None
     print("\n▶ 3/3  Verificando cobertura…")
     total = len(idx_map)
     covered = bitarray.bitarray(total) if bitarray else [False]*total
     if bitarray: covered.setall(False)
 
-    with SB_FILE.open() as f:
-        for row in csv.reader(f):
-            nums  = list(map(int,row))
-            bits  = [1<<(n-1) for n in nums]
-            full  = 0
-            for b in bits: full |= b
-            for a,b_,c in OMIT_LIST:
-                m = full ^ (bits[a] | bits[b_] | bits[c])
-                covered[idx_map[m]] = True
+    for nums in sbformat.iter_nums(SB_FILE):         # .sb se atualizado, senão CSV
+        bits  = [1<<(n-1) for n in nums]
+        full  = 0
+        for b in bits: full |= b
+        for a,b_,c in OMIT_LIST:
+            m = full ^ (bits[a] | bits[b_] | bits[c])
+            covered[idx_map[m]] = True
 
     ok = covered.all() if bitarray else (False not in covered)
+    manifest.set_verified(SB_FILE, ok, "programa4.py")
     if not ok:
+        from verify_all import diagnose_k   # histograma + S12 descobertas
+        diagnose_k(12)
         sys.exit("❌ Falha: alguma S12 não coberta!")
     print("✔ Cobertura 100 % confirmada.")
 
 # ───────────────────────────── CSV LOG ─────────────────────────────────────
-def log_csv(size_:int, secs:float, peak:float)->None:
+def log_csv(size_:int, secs:float, peak:float, engine:str="lazy",
+            eps:float=0.0, stats:Optional[dict]=None,
+            plano:Optional[memplan.Plan]=None)->None:
+    stats = stats or {"amostra": "", "avaliacoes": ""}
     hdr = ["SB_size","Lower_bound","Approx_factor",
            "ln|U|+1","Alpha_over_ln",
-           "Tempo (s)","Pico_RAM(MB)"]
+           "Tempo (s)","Pico_RAM(MB)","Modo","RAM_prevista(MB)"]
     alpha = round(size_/LOWER_BOUND,4)
     row = {
         "SB_size": size_,
@@ -196,13 +248,15 @@ def log_csv(size_:int, secs:float, peak:float)->None:
         "ln|U|+1": round(LN_BOUND,3),
         "Alpha_over_ln": round(alpha/LN_BOUND,3),
         "Tempo (s)": secs,
-        "Pico_RAM(MB)": peak
+        "Pico_RAM(MB)": peak,
+        "Modo": plano.modo if plano else "",
+        "RAM_prevista(MB)": plano.previsto if plano else "",
+        "Motor": engine,
+        "Epsilon": eps if engine != "lazy" else "",
+        "Amostra": stats["amostra"],
+        "Avaliacoes": stats["avaliacoes"],
     }
-    first = not LOG_CSV.exists()
-    with LOG_CSV.open("a",newline="",encoding="utf8") as f:
-        w = csv.DictWriter(f,fieldnames=hdr)
-        if first: w.writeheader()
-        w.writerow(row)
+    cover_engine.append_log(LOG_CSV, hdr, row)
     print("📄 Log salvo em", LOG_CSV)
 
 # ───────────────────────── GERAÇÃO DO GRÁFICO ──────────────────────────────
@@ -234,28 +288,71 @@ def _plot_complexity(samples: List[Tuple[int,float]])->None:
 # ───────────────────────────── CLI / MAIN ──────────────────────────────────
 def parse_args()->argparse.Namespace:
     p = argparse.ArgumentParser(description="Programa 4 — encontra SB15_12")
-    p.add_argument("--stream", action="store_true",
-                   help="usa menos RAM (recalcula ids on-the-fly)")
-    return p.parse_args()
+    p.add_argument("--modo", choices=("auto",) + memplan.MODES, default="auto",
+                   help="ids por linha: ram (lista), mmap (np.memmap em disco) ou "
+                        "stream (recalcula on-the-fly); auto = o mais rápido que cabe")
+    p.add_argument("--stream", action="store_true", help="o mesmo que --modo stream")
+    p.add_argument("--mem-budget", type=memplan.parse_size, default=None,
+                   help="teto de RAM do modo auto (ex.: 16G; padrão: 90%% do disponível)")
+    p.add_argument("--engine", choices=cover_engine.ENGINES, default="lazy",
+                   help="lazy = greedy exato; estocastico = amostra por passo; "
+                        "paralelo = lotes por limiar em vários processos")
+    p.add_argument("--eps", type=float, default=cover_engine.DEFAULT_EPS,
+                   help="ε do motor estocástico (amostra = n/k̂·ln(1/ε)) "
+                        "e do paralelo (limiar cai por 1+ε)")
+    p.add_argument("--seed", type=int, default=0, help="semente do motor estocástico")
+    p.add_argument("--jobs", type=int, default=None,
+                   help="processos do motor paralelo (padrão: todos os núcleos)")
+    telemetry.add_args(p)
+    cover_engine.add_workers_args(p)
+    args = p.parse_args()
+    if args.stream:
+        args.modo = "stream"
+    return args
 
 def main()->None:
-    for f in (S12_FILE, S15_FILE):
-        if not f.exists():
-            sys.exit(f"❌ {f} não encontrado. Execute bench.py primeiro.")
-
     args  = parse_args()
-    proc  = psutil.Process(os.getpid())
-
-    sb_size, secs = greedy(store_all=not args.stream)
-    peak = round(proc.memory_info().peak_wset/1_048_576,1) if os.name=="nt" \
-           else round(proc.memory_info().rss/1_048_576,1)
-
-    idx_map,_ = load_S12()
-    verify(idx_map)
-    log_csv(sb_size, secs, peak)
-
+    if args.engine != "paralelo":            # paralelo: S15 pelo posto, sem S12.csv
+        for f in (S12_FILE, S15_FILE):
+            if not f.exists():
+                sys.exit(f"❌ {f} não encontrado. Execute bench.py primeiro.")
+    OUT_DIR.mkdir(exist_ok=True)
+    if args.workers and args.engine == "paralelo":
+        sys.exit("❌ --workers vale para os motores lazy e estocástico.")
+    plano = None if args.engine == "paralelo" else \
+        memplan.plan(12, args.modo, args.mem_budget, LOG_CSV, OUT_DIR, matriz=bool(args.workers))
+    if args.workers and plano.modo == "stream":
+        sys.exit("❌ --workers guarda os ids recebidos: use --modo ram ou mmap (ou --mem-budget maior).")
+    workers = None
+    if args.workers:
+        import cover_workers                 # socket/threading só com --workers
+        workers = cover_workers.from_args(args)
+
+    tel = telemetry.from_args(args, "programa4", 12, TOTAL_S12)
+    try:
+        sb_size, secs, stats = greedy(modo=plano.modo if plano else "ram", engine=args.engine,
+                                      eps=args.eps, seed=args.seed, jobs=args.jobs, tel=tel, workers=workers)
+    except BaseException:
+        tel.close("falha")
+        raise
+    finally:
+        if workers is not None:
+            workers.close()
+    tel.set_phase("verificacao")
+    peak = memplan.peak_mb()
+
+    if args.engine == "paralelo":            # sem S12.csv: mapa de máscaras
+        cover_engine.verify_masks(SB_FILE, 12, "programa4.py")
+    else:
+        idx_map, _ = load_S12()
+        verify(idx_map)
+    log_csv(sb_size, secs, peak, args.engine, args.eps, stats, plano)
+
+    tel.close()
     print(f"\n✅ SB15_12.csv gerado ({sb_size:,} linhas) em {secs}s — "
           f"α={sb_size/LOWER_BOUND:.3f}; pico RAM {peak} MB.")
+    if plano:
+        memplan.report(plano, peak)
 
 if __name__ == "__main__":
     main()
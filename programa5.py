@@ -5,23 +5,28 @@ programa5.py — Cenário C4: encontra SB15_11 e verifica 100 %.
 
 Entradas:  resultados/S15.csv   resultados/S11.csv
 Saídas  :  prog5_saida/SB15_11.csv   prog5_saida/cover11_log.csv
+           prog5_saida/SB15_11.sb (binário, sbformat.py)
+
+Memória: `--modo auto` (padrão) escolhe ram, mmap ou stream pelo orçamento
+de RAM (--mem-budget, memplan.py); `--workers` faz a varredura inicial em
+workers TCP (cover_workers.py).
 """
 
 from __future__ import annotations
-import argparse, csv, heapq, os, sys, time
+import argparse, csv, heapq, sys, time
 from itertools import combinations
 from pathlib import Path
-from typing import Dict, List, Set, Tuple
+from typing import Dict, List, Optional, Set, Tuple
 
-import psutil
-try:
-    import bitarray
-except ImportError:
-    bitarray = None
+import cover_engine
+import manifest
+import memplan
+import sbformat
+import telemetry
 
 # ─────── Paths & consts ─────────────────────────────────────────────────────
 BASE     = Path("resultados")
-OUT_DIR  = Path("prog5_saida"); OUT_DIR.mkdir(exist_ok=True)
+OUT_DIR  = Path("prog5_saida")
 
 S11_FILE = BASE / "S11.csv"
 S15_FILE = BASE / "S15.csv"
@@ -63,119 +68,210 @@ def cover_ids(nums: List[int], idx_map: Dict[int,int]) -> List[int]:
     return ids           # len = 1 365
 
 # ─────── Greedy Set-Cover ───────────────────────────────────────────────────
-def greedy(store_all: bool) -> Tuple[int,float]:
+def greedy(modo: str = "ram", engine: str = "lazy", eps: float = cover_engine.DEFAULT_EPS,
+           seed: int = 0, jobs: Optional[int] = None, tel=None, workers=None) -> Tuple[int,float,dict]:
     t0      = time.perf_counter()
+    if engine == "paralelo":                 # máscaras pelo posto: sem S11.csv, S15.csv nem índices
+        print("▶ 1/3  Greedy paralelo por limiares…")
+        tel = tel or telemetry.NullTelemetry()
+        tel.set_phase("greedy")
+        rids, stats = cover_engine.parallel_greedy(
+            None, 11, eps, jobs, 1.0, tel=tel)
+        print("▶ 2/3  Gravando SB…")
+        chosen = [sbformat.mask_to_text(int(m)) for m in cover_engine.s15_masks(rids)]
+        sbformat.save_lines(SB_FILE, chosen, 11, "programa5.py",
+                            {"k": 11, "stream": False, "motor": engine, "jobs": jobs})
+        return len(chosen), round(time.perf_counter()-t0, 1), stats
     idx_map, _ = load_S11()
     uncovered: Set[int] = set(range(len(idx_map)))
 
     print("▶ 1/3  Varredura inicial…")
-    row_to_idx: List[List[int]] = []
+    tel = tel or telemetry.NullTelemetry()
+    tel.set_phase("varredura")
+    row_to_idx = memplan.ids_store(modo, memplan.TOTAL_S15, SUB_PER_LINE, OUT_DIR / ".ids11.u32",
+                                   matriz=workers is not None)
     heap: List[Tuple[int,int]]  = []
     lines: List[str]            = []
 
     STEP = 50_000
-    with S15_FILE.open() as f:
-        for rid, row in enumerate(csv.reader(f), 1):
-            nums = list(map(int,row))
-            ids  = cover_ids(nums, idx_map)
+    if workers is not None:                  # ids e ganhos dos workers (cover_workers.py)
+        lines = S15_FILE.read_text().splitlines()
+        gains = workers.run(11, row_to_idx, lambda rid: cover_ids(
+            list(map(int, lines[rid].split(","))), idx_map), tel)
+        heap = [(-g, rid) for rid, g in enumerate(gains.tolist())]
+        heapq.heapify(heap)
+    else:
+        with S15_FILE.open() as f:
+            for rid, row in enumerate(csv.reader(f), 1):
+                nums = list(map(int,row))
+                ids  = cover_ids(nums, idx_map)
 
-            lines.append(",".join(row))
-            if store_all: row_to_idx.append(ids)
-            heapq.heappush(heap, (-SUB_PER_LINE, rid-1))
+                lines.append(",".join(row))
+                if row_to_idx is not None: row_to_idx.append(ids)
+                heapq.heappush(heap, (-SUB_PER_LINE, rid-1))
+                tel.scan(rid, len(heap))
 
-            if rid % STEP == 0 or rid == TOTAL_S15:
-                pct = 100*rid/TOTAL_S15
-                spd = rid/(time.perf_counter()-t0)
-                print(f"   {pct:5.1f}% lido ({rid:,}/{TOTAL_S15:,}) "
-                      f"– {spd:,.0f} linhas/s")
+                if rid % STEP == 0 or rid == TOTAL_S15:
+                    pct = 100*rid/TOTAL_S15
+                    spd = rid/(time.perf_counter()-t0)
+                    print(f"   {pct:5.1f}% lido ({rid:,}/{TOTAL_S15:,}) "
+                          f"– {spd:,.0f} linhas/s")
 
     print("▶ 2/3  Greedy Set-Cover…")
-    chosen: List[str] = []
-    next_print = 1.0
-    while uncovered:
-        neg_gain, rid = heapq.heappop(heap)
-        nums = list(map(int, lines[rid].split(",")))
-        ids  = row_to_idx[rid] if store_all else cover_ids(nums, idx_map)
-
-        new_ids = [i for i in ids if i in uncovered]
-        if not new_ids:
-            continue
-        if len(new_ids) < -neg_gain:   # lazy-update
-            heapq.heappush(heap, (-len(new_ids), rid))
-            continue
-
-        uncovered.difference_update(new_ids)
-        chosen.append(lines[rid])
-
-        pct = 100*(TOTAL_S11 - len(uncovered))/TOTAL_S11
-        if pct >= next_print or not uncovered:
-            print(f"   {pct:6.2f}% coberto | SB tamanho: {len(chosen):,}")
-            next_print += 1.0
-
-    SB_FILE.write_text("\n".join(chosen), encoding="ascii")
-    return len(chosen), round(time.perf_counter()-t0,1)
+    tel.set_phase("greedy")
+    if engine == "estocastico":
+        ids_of = row_to_idx.__getitem__ if row_to_idx is not None else \
+            (lambda rid: cover_ids(list(map(int, lines[rid].split(","))), idx_map))
+        rids, stats = cover_engine.stochastic_greedy(
+            len(lines), ids_of, uncovered, LOWER_BOUND, eps, seed, tel=tel)
+        chosen = [lines[r] for r in rids]
+    else:
+        evals = stale = 0
+        chosen: List[str] = []
+        next_print = 1.0
+        while uncovered:
+            neg_gain, rid = heapq.heappop(heap)
+            evals += 1
+            tel.tick(TOTAL_S11 - len(uncovered), len(chosen), evals, stale, -neg_gain, len(heap))
+            nums = list(map(int, lines[rid].split(",")))
+            ids  = row_to_idx[rid] if row_to_idx is not None else cover_ids(nums, idx_map)
+
+            new_ids = [i for i in ids if i in uncovered]
+            if not new_ids:
+                stale += 1
+                continue
+            if len(new_ids) < -neg_gain:   # lazy-update
+                heapq.heappush(heap, (-len(new_ids), rid))
+                stale += 1
+                continue
+
+            uncovered.difference_update(new_ids)
+            chosen.append(lines[rid])
+
+            pct = 100*(TOTAL_S11 - len(uncovered))/TOTAL_S11
+            if pct >= next_print or not uncovered:
+                print(f"   {pct:6.2f}% coberto | SB tamanho: {len(chosen):,}")
+                next_print += 1.0
+        tel.tick(TOTAL_S11, len(chosen), evals, stale, 0, len(heap), force=True)
+        stats = {"amostra": "", "avaliacoes": evals}
+
+    memplan.close_store(row_to_idx)
+    sbformat.save_lines(SB_FILE, chosen, 11, "programa5.py",
+                        {"k": 11, "stream": modo == "stream", "modo": modo, "motor": engine})
+    return len(chosen), round(time.perf_counter()-t0,1), stats
 
 # ─────── Verificação 100 % ──────────────────────────────────────────────────
 def verify(idx_map: Dict[int,int]) -> None:
+    try:                                  # opcional (acelera a verificação)
+        import bitarray
+    except ImportError:                   # fallback para lista-bool
+        bitarray = None
     print("\n▶ 3/3  Verificando cobertura…")
     total   = len(idx_map)
     covered = bitarray.bitarray(total) if bitarray else [False]*total
     if bitarray: covered.setall(False)
 
-    with SB_FILE.open() as f:
-        for row in csv.reader(f):
-            nums = list(map(int,row))
-            bits = [1<<(n-1) for n in nums]
-            full = 0
-            for b in bits: full |= b
-            for omit in OMIT_LIST:
-                m = full ^ (bits[omit[0]]|bits[omit[1]]|bits[omit[2]]|bits[omit[3]])
-                covered[idx_map[m]] = True
+    for nums in sbformat.iter_nums(SB_FILE):         # .sb se atualizado, senão CSV
+        bits = [1<<(n-1) for n in nums]
+        full = 0
+        for b in bits: full |= b
+        for omit in OMIT_LIST:
+            m = full ^ (bits[omit[0]]|bits[omit[1]]|bits[omit[2]]|bits[omit[3]])
+            covered[idx_map[m]] = True
 
     ok = covered.all() if bitarray else (False not in covered)
     print("✔ Cobertura 100 % confirmada." if ok else
           "❌ Falha: alguma S11 não coberta!")
-    if not ok: sys.exit(1)
+    manifest.set_verified(SB_FILE, ok, "programa5.py")
+    if not ok:
+        from verify_all import diagnose_k   # histograma + S11 descobertas
+        diagnose_k(11)
+        sys.exit(1)
 
 # ─────── CSV Log ────────────────────────────────────────────────────────────
-def log(size_:int, secs:float, peak:float)->None:
-    import csv
-    hdr = ["SB_size","Lower_bound","Approx_factor","Tempo (s)","Pico_RAM(MB)"]
+def log(size_:int, secs:float, peak:float, engine:str="lazy",
+        eps:float=0.0, stats:Optional[dict]=None,
+        plano:Optional[memplan.Plan]=None)->None:
+    stats = stats or {"amostra": "", "avaliacoes": ""}
+    hdr = ["SB_size","Lower_bound","Approx_factor","Tempo (s)","Pico_RAM(MB)","Modo","RAM_prevista(MB)"]
     line= {"SB_size":size_,"Lower_bound":LOWER_BOUND,
            "Approx_factor":round(size_/LOWER_BOUND,4),
-           "Tempo (s)":secs,"Pico_RAM(MB)":peak}
-    first = not LOG_CSV.exists()
-    with LOG_CSV.open("a", newline="", encoding="utf8") as f:
-        w = csv.DictWriter(f, fieldnames=hdr)
-        if first: w.writeheader()
-        w.writerow(line)
+           "Tempo (s)":secs,"Pico_RAM(MB)":peak,
+           "Modo":plano.modo if plano else "",
+           "RAM_prevista(MB)":plano.previsto if plano else "",
+           "Motor":engine,"Epsilon":eps if engine != "lazy" else "",
+           "Amostra":stats["amostra"],"Avaliacoes":stats["avaliacoes"]}
+    cover_engine.append_log(LOG_CSV, hdr, line)
     print("📄 Log salvo em", LOG_CSV)
 
 # ─────── CLI / Main ─────────────────────────────────────────────────────────
 def parse_args()->argparse.Namespace:
     p = argparse.ArgumentParser(description="Programa 5 — SB15_11")
-    p.add_argument("--stream", action="store_true",
-                   help="economiza RAM (não armazena idxs)")
-    return p.parse_args()
+    p.add_argument("--modo", choices=("auto",) + memplan.MODES, default="auto",
+                   help="ids por linha: ram (lista), mmap (np.memmap em disco) ou "
+                        "stream (recalcula on-the-fly); auto = o mais rápido que cabe")
+    p.add_argument("--stream", action="store_true", help="o mesmo que --modo stream")
+    p.add_argument("--mem-budget", type=memplan.parse_size, default=None,
+                   help="teto de RAM do modo auto (ex.: 16G; padrão: 90%% do disponível)")
+    p.add_argument("--engine", choices=cover_engine.ENGINES, default="lazy",
+                   help="lazy = greedy exato; estocastico = amostra por passo; "
+                        "paralelo = lotes por limiar em vários processos")
+    p.add_argument("--eps", type=float, default=cover_engine.DEFAULT_EPS,
+                   help="ε do motor estocástico (amostra = n/k̂·ln(1/ε)) "
+                        "e do paralelo (limiar cai por 1+ε)")
+    p.add_argument("--seed", type=int, default=0, help="semente do motor estocástico")
+    p.add_argument("--jobs", type=int, default=None,
+                   help="processos do motor paralelo (padrão: todos os núcleos)")
+    telemetry.add_args(p)
+    cover_engine.add_workers_args(p)
+    args = p.parse_args()
+    if args.stream:
+        args.modo = "stream"
+    return args
 
 def main()->None:
-    for f in (S11_FILE, S15_FILE):
-        if not f.exists():
-            sys.exit(f"❌ {f} não encontrado. Gere os CSV primeiro.")
-
     args = parse_args()
-    proc = psutil.Process(os.getpid())
+    if args.engine != "paralelo":            # paralelo: S15 pelo posto, sem S11.csv
+        for f in (S11_FILE, S15_FILE):
+            if not f.exists():
+                sys.exit(f"❌ {f} não encontrado. Gere os CSV primeiro.")
+    OUT_DIR.mkdir(exist_ok=True)
+    if args.workers and args.engine == "paralelo":
+        sys.exit("❌ --workers vale para os motores lazy e estocástico.")
+    plano = None if args.engine == "paralelo" else \
+        memplan.plan(11, args.modo, args.mem_budget, LOG_CSV, OUT_DIR, matriz=bool(args.workers))
+    if args.workers and plano.modo == "stream":
+        sys.exit("❌ --workers guarda os ids recebidos: use --modo ram ou mmap (ou --mem-budget maior).")
+    workers = None
+    if args.workers:
+        import cover_workers                 # socket/threading só com --workers
+        workers = cover_workers.from_args(args)
 
-    sb_size, secs = greedy(store_all=not args.stream)
-    peak = round(proc.memory_info().peak_wset/1_048_576,1) if os.name=="nt" \
-           else round(proc.memory_info().rss/1_048_576,1)
+    tel = telemetry.from_args(args, "programa5", 11, TOTAL_S11)
+    try:
+        sb_size, secs, stats = greedy(modo=plano.modo if plano else "ram", engine=args.engine,
+                                      eps=args.eps, seed=args.seed, jobs=args.jobs, tel=tel, workers=workers)
+    except BaseException:
+        tel.close("falha")
+        raise
+    finally:
+        if workers is not None:
+            workers.close()
+    tel.set_phase("verificacao")
+    peak = memplan.peak_mb()
 
-    idx_map,_ = load_S11()
-    verify(idx_map)
-    log(sb_size, secs, peak)
+    if args.engine == "paralelo":            # sem S11.csv: mapa de máscaras
+        cover_engine.verify_masks(SB_FILE, 11, "programa5.py")
+    else:
+        idx_map, _ = load_S11()
+        verify(idx_map)
+    log(sb_size, secs, peak, args.engine, args.eps, stats, plano)
 
+    tel.close()
     print(f"\n✅ SB15_11.csv gerado ({sb_size:,} linhas) em {secs}s — "
           f"fator {sb_size/LOWER_BOUND:.3f} do limite; pico RAM {peak} MB.")
+    if plano:
+        memplan.report(plano, peak)
 
 if __name__ == "__main__":
     main()
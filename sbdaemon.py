@@ -0,0 +1,453 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# AUTOR: Leonardo dos Santos Marques
+"""
+sbdaemon.py — daemon residente com índices S_k e SB em memória.
+
+Cada execução de programa/verify_all/análise avulsa relê e reindexa tudo;
+o daemon carrega uma vez e responde por socket Unix (asyncio) em frações
+de milissegundo:
+
+    rank / unrank     máscara S_k ↔ linha em S_k.csv (ordem lexicográfica,
+                      sistema combinatório vetorizado — sem ler o CSV)
+    coberta           a S_k está em algum cartão do SB15_k?  (mapa bool de
+                      2^25 posições por k, montado no 1º uso a partir do SB)
+    cobrem            quais cartões do SB contêm X (qualquer conjunto)
+    acertos           histograma de acertos (0…15) do SB para cada sorteio
+    verificar         nº de S_k descobertas (+ exemplos) — verify_all --daemon
+
+Os SB (.sb se atualizado, via sbformat) são recarregados sozinhos quando o
+arquivo muda (stat por requisição).
+
+Protocolo (little-endian), um quadro por mensagem:
+    quadro     <I tamanho> <corpo>
+    pedido     <B op> <B k> <H 0> <I arg> <I n>  + n × uint32 (máscaras/postos)
+    resposta   <B status> <B op> <H 0> <I n>     + corpo do op
+               status 0 = ok; 1 = erro (corpo = mensagem utf‑8)
+
+    python sbdaemon.py serve &                 # socket em .cache/sbd.sock
+    python sbdaemon.py coberta 11 1,2,3,4,5,6,7,8,9,10,11
+    python sbdaemon.py cobrem 1,2,3,4,5,6,7,8,9,10,11,12,13 --limite 5
+    python sbdaemon.py rank 14 1,2,3,4,5,6,7,8,9,10,11,12,13,14
+    python sbdaemon.py unrank 14 0 4457399
+    python sbdaemon.py acertos 11 1,3,5,7,9,11,13,15,17,19,21,23,25,2,4
+    python sbdaemon.py verificar               # 14…11
+    python sbdaemon.py bench 11                # latência por consulta
+    python sbdaemon.py stop
+
+O cliente (`Client`, `connect`) usa só a biblioteca padrão; o servidor
+requer numpy.
+"""
+from __future__ import annotations
+
+import argparse, json, os, socket, struct, sys, time
+from array import array
+from itertools import combinations
+from math import comb
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import sbformat
+
+DEFAULT_SOCKET = Path(os.environ.get("LOTO_SBD_SOCKET", ".cache/sbd.sock"))
+LEN = struct.Struct("<I")
+REQ = struct.Struct("<BBHII")            # op, k, 0, arg, n
+RESP = struct.Struct("<BBHI")            # status, op, 0, n
+MAX_FRAME = 256 * 2 ** 20
+KS = (14, 13, 12, 11)
+
+OP_PING, OP_RANK, OP_UNRANK, OP_COVERED, OP_COVERING, OP_HITS, OP_VERIFY, \
+    OP_STATS, OP_RELOAD, OP_STOP = range(1, 11)
+OK, ERR = 0, 1
+
+class DaemonError(RuntimeError):
+    pass
+
+# ─── Postos lexicográficos (linha de S_k.csv), vetorizados ─────────────────
+def _rows(np, k: int):
+    """C(d, j) para d = 0…24, j = 0…k (int64)."""
+    return np.array([[comb(d, j) for d in range(25)] for j in range(k + 1)], dtype=np.int64)
+
+def lex_rank(np, masks, k: int):
+    """Máscaras S_k → posição em S_k.csv: C(25,k)−1 − Σ C(24−c_i, k−i)."""
+    bits = ((masks[:, None] >> np.arange(25, dtype=np.uint32)) & 1).astype(bool)
+    if (bits.sum(axis=1) != k).any():
+        raise DaemonError(f"máscara sem exatamente {k} números")
+    c = np.nonzero(bits)[1].reshape(len(masks), k)
+    tab = _rows(np, k)
+    y = np.zeros(len(masks), dtype=np.int64)
+    for i in range(k):
+        y += tab[k - i][24 - c[:, i]]
+    return (comb(25, k) - 1 - y).astype(np.uint32)
+
+def lex_unrank(np, ranks, k: int):
+    total = comb(25, k)
+    r = ranks.astype(np.int64)
+    if (r >= total).any():
+        raise DaemonError(f"posto fora de [0, {total:,})")
+    y = total - 1 - r
+    tab = _rows(np, k)
+    masks = np.zeros(len(r), dtype=np.uint32)
+    for j in range(k, 0, -1):                       # maior d com C(d,j) ≤ y
+        d = np.searchsorted(tab[j], y, side="right") - 1
+        y -= tab[j][d]
+        masks |= np.left_shift(np.uint32(1), (24 - d).astype(np.uint32))
+    return masks
+
+# ─── Estado residente ──────────────────────────────────────────────────────
+class Indice:
+    """SB15_k em memória (máscaras, mapa de cobertura) com recarga por mtime."""
+
+    def __init__(self, np) -> None:
+        import verify_all                            # SB_DIRS
+        self.np, self.dirs = np, verify_all.SB_DIRS
+        self.sb: Dict[int, dict] = {}
+        self.t0 = time.time()
+        self.queries = 0
+
+    def get(self, k: int) -> dict:
+        if k not in self.dirs:
+            raise DaemonError(f"k = {k} fora de 14…11")
+        path = sbformat.resolve(self.dirs[k] / f"SB15_{k}.csv")
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            raise DaemonError(f"{path} não encontrado") from None
+        cur = self.sb.get(k)
+        key = (str(path), st.st_size, st.st_mtime_ns)
+        if cur is None or cur["key"] != key:
+            t0 = time.perf_counter()
+            masks = self.np.frombuffer(sbformat.load_masks(path), dtype=self.np.uint32).copy()
+            cur = self.sb[k] = {"key": key, "masks": masks, "cover": None, "missing": None}
+            print(f"📥 SB15_{k}: {len(masks):,} cartões de {path} "
+                  f"({time.perf_counter() - t0:.2f} s)", flush=True)
+        return cur
+
+    def cover(self, k: int):
+        """Mapa bool 2^25: S_k (pela máscara) coberta pelo SB15_k."""
+        np, cur = self.np, self.get(k)
+        if cur["cover"] is None:
+            t0 = time.perf_counter()
+            masks = cur["masks"]
+            pos = np.nonzero(((masks[:, None] >> np.arange(25, dtype=np.uint32)) & 1) == 1)[1]
+            bits = np.left_shift(np.uint32(1), pos.reshape(len(masks), 15).astype(np.uint32))
+            cov = np.zeros(1 << 25, dtype=bool)
+            for omit in combinations(range(15), 15 - k):
+                sub = masks.copy()
+                for i in omit:
+                    sub ^= bits[:, i]
+                cov[sub] = True
+            cur["cover"] = cov
+            cur["missing"] = comb(25, k) - int(np.count_nonzero(cov))
+            print(f"🗺  cobertura S{k}: {cur['missing']:,} descobertas "
+                  f"({time.perf_counter() - t0:.1f} s)", flush=True)
+        return cur["cover"]
+
+    # operações --------------------------------------------------------------
+    def handle(self, op: int, k: int, arg: int, vals) -> Tuple[int, bytes]:
+        np = self.np
+        self.queries += 1
+        if op == OP_PING:
+            return 0, b"pong"
+        if op == OP_RANK:
+            return len(vals), lex_rank(np, vals, k).tobytes()
+        if op == OP_UNRANK:
+            return len(vals), lex_unrank(np, vals, k).tobytes()
+        if op == OP_COVERED:
+            return len(vals), self.cover(k)[vals].astype(np.uint8).tobytes()
+        if op == OP_COVERING:                        # n contagens + índices + máscaras
+            masks = self.get(k)["masks"]
+            counts, idx = [], []
+            for x in vals:
+                hit = np.nonzero((masks & x) == x)[0]
+                hit = hit[:arg] if arg else hit
+                counts.append(len(hit))
+                idx.append(hit.astype(np.uint32))
+            idx = np.concatenate(idx) if idx else np.zeros(0, np.uint32)
+            return len(vals), (np.array(counts, np.uint32).tobytes() + idx.tobytes()
+                               + masks[idx].tobytes())
+        if op == OP_HITS:                            # n × 16 uint32
+            masks = self.get(k)["masks"]
+            out = np.zeros((len(vals), 16), dtype=np.uint32)
+            for i, d in enumerate(vals):
+                out[i] = np.bincount(np.bitwise_count(masks & d) if hasattr(np, "bitwise_count")
+                                     else _popcount32(np, masks & d), minlength=16)[:16]
+            return len(vals), out.tobytes()
+        if op == OP_VERIFY:                          # <I descobertas> + até arg exemplos
+            cov = self.cover(k)
+            cur = self.sb[k]
+            ex = np.zeros(0, np.uint32)
+            if cur["missing"] and arg:
+                allk = lex_unrank(np, np.arange(comb(25, k), dtype=np.uint32), k)
+                ex = allk[~cov[allk]][:arg]
+            return len(ex), LEN.pack(cur["missing"]) + ex.tobytes()
+        if op == OP_STATS:
+            info = {"pid": os.getpid(), "uptime_s": round(time.time() - self.t0, 1),
+                    "consultas": self.queries,
+                    "sb": {k: {"arquivo": v["key"][0], "cartoes": len(v["masks"]),
+                               "mapa": v["cover"] is not None, "descobertas": v["missing"]}
+                           for k, v in self.sb.items()}}
+            return 0, json.dumps(info, ensure_ascii=False).encode("utf8")
+        if op == OP_RELOAD:
+            for kk in ([k] if k else list(self.sb)):
+                self.sb.pop(kk, None)
+            return 0, b""
+        raise DaemonError(f"op desconhecido: {op}")
+
+def _popcount32(np, x):
+    x = x - ((x >> 1) & 0x55555555)
+    x = (x & 0x33333333) + ((x >> 2) & 0x33333333)
+    x = (x + (x >> 4)) & 0x0F0F0F0F
+    return ((x * 0x01010101) & 0xFFFFFFFF) >> 24
+
+# ─── Servidor asyncio ──────────────────────────────────────────────────────
+async def _read_frame(reader: asyncio.StreamReader) -> Optional[bytes]:
+    import asyncio
+    try:
+        (size,) = LEN.unpack(await reader.readexactly(LEN.size))
+        if size > MAX_FRAME:
+            raise DaemonError("quadro grande demais")
+        return await reader.readexactly(size)
+    except asyncio.IncompleteReadError:
+        return None
+
+def _frame(status: int, op: int, n: int, body: bytes) -> bytes:
+    payload = RESP.pack(status, op, 0, n) + body
+    return LEN.pack(len(payload)) + payload
+
+async def serve(path: Path, preload: bool, build_cover: bool) -> None:
+    import asyncio                               # só o servidor (o cliente parte rápido)
+    np = sbformat._numpy()
+    if np is None:
+        sys.exit("❌ o servidor requer numpy (pip install numpy).")
+    idx = Indice(np)
+    if preload or build_cover:
+        for k in KS:
+            try:
+                idx.cover(k) if build_cover else idx.get(k)
+            except DaemonError as e:
+                print(f"⚠ {e}")
+    stop = asyncio.Event()
+
+    async def client(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                body = await _read_frame(reader)
+                if body is None:
+                    break
+                op = body[0] if body else 0
+                try:
+                    op, k, _, arg, n = REQ.unpack_from(body)
+                    vals = np.frombuffer(body, dtype="<u4", count=n, offset=REQ.size)
+                    if op == OP_STOP:
+                        writer.write(_frame(OK, op, 0, b""))
+                        stop.set()
+                        break
+                    cnt, out = idx.handle(op, k, arg, vals)
+                    writer.write(_frame(OK, op, cnt, out))
+                except (DaemonError, ValueError, struct.error, IndexError) as e:
+                    writer.write(_frame(ERR, op, 0, str(e).encode("utf8")))
+                await writer.drain()
+        except DaemonError as e:
+            print(f"⚠ cliente descartado: {e}")
+        finally:
+            writer.close()
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.exists():
+        if connect(path) is not None:
+            sys.exit(f"❌ já há um daemon em {path}.")
+        path.unlink()                                # socket órfão
+    server = await asyncio.start_unix_server(client, path=str(path))
+    print(f"🛰  sbdaemon em {path} (pid {os.getpid()})", flush=True)
+    async with server:
+        await stop.wait()
+    path.unlink(missing_ok=True)
+    print("👋 sbdaemon encerrado.")
+
+# ─── Cliente (biblioteca padrão) ───────────────────────────────────────────
+def _u32(values: Sequence[int]) -> bytes:
+    a = array("I", values)
+    if sys.byteorder != "little":
+        a.byteswap()
+    return a.tobytes()
+
+def _from_u32(data: bytes) -> array:
+    a = array("I")
+    a.frombytes(data)
+    if sys.byteorder != "little":
+        a.byteswap()
+    return a
+
+class Client:
+    """Conexão síncrona com o daemon; uma requisição por vez."""
+
+    def __init__(self, path: Path = DEFAULT_SOCKET, timeout: float = 600.0) -> None:
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        self.sock.connect(str(path))
+
+    def close(self) -> None:
+        self.sock.close()
+
+    def _recv(self, n: int) -> bytes:
+        buf = bytearray()
+        while len(buf) < n:
+            chunk = self.sock.recv(n - len(buf))
+            if not chunk:
+                raise DaemonError("daemon fechou a conexão")
+            buf += chunk
+        return bytes(buf)
+
+    def call(self, op: int, k: int = 0, values: Sequence[int] = (), arg: int = 0
+             ) -> Tuple[int, bytes]:
+        body = REQ.pack(op, k, 0, arg, len(values)) + _u32(values)
+        self.sock.sendall(LEN.pack(len(body)) + body)
+        (size,) = LEN.unpack(self._recv(LEN.size))
+        payload = self._recv(size)
+        status, _, _, n = RESP.unpack_from(payload)
+        data = payload[RESP.size:]
+        if status != OK:
+            raise DaemonError(data.decode("utf8"))
+        return n, data
+
+    def ping(self) -> bool:
+        return self.call(OP_PING)[1] == b"pong"
+
+    def rank(self, k: int, masks: Sequence[int]) -> array:
+        return _from_u32(self.call(OP_RANK, k, masks)[1])
+
+    def unrank(self, k: int, ranks: Sequence[int]) -> array:
+        return _from_u32(self.call(OP_UNRANK, k, ranks)[1])
+
+    def covered(self, k: int, masks: Sequence[int]) -> List[bool]:
+        return [b == 1 for b in self.call(OP_COVERED, k, masks)[1]]
+
+    def covering(self, k: int, masks: Sequence[int], limit: int = 0
+                 ) -> List[List[Tuple[int, int]]]:
+        """Para cada X: [(linha no SB15_k, máscara do cartão)…]."""
+        n, data = self.call(OP_COVERING, k, masks, limit)
+        counts = _from_u32(data[:4 * n])
+        total = sum(counts)
+        idx = _from_u32(data[4 * n:4 * (n + total)])
+        cards = _from_u32(data[4 * (n + total):])
+        out, pos = [], 0
+        for c in counts:
+            out.append(list(zip(idx[pos:pos + c], cards[pos:pos + c])))
+            pos += c
+        return out
+
+    def hits(self, k: int, draws: Sequence[int]) -> List[List[int]]:
+        h = _from_u32(self.call(OP_HITS, k, draws)[1])
+        return [list(h[i:i + 16]) for i in range(0, len(h), 16)]
+
+    def verify(self, k: int, examples: int = 0) -> Tuple[int, List[int]]:
+        n, data = self.call(OP_VERIFY, k, (), examples)
+        return LEN.unpack_from(data)[0], list(_from_u32(data[LEN.size:]))
+
+    def stats(self) -> dict:
+        return json.loads(self.call(OP_STATS)[1])
+
+    def reload(self, k: int = 0) -> None:
+        self.call(OP_RELOAD, k)
+
+    def stop(self) -> None:
+        self.call(OP_STOP)
+
+def connect(path: Path = DEFAULT_SOCKET) -> Optional[Client]:
+    """Cliente se houver daemon escutando em `path`, senão None."""
+    if not Path(path).exists():
+        return None
+    try:
+        return Client(path)
+    except OSError:
+        return None
+
+# ─── CLI ───────────────────────────────────────────────────────────────────
+def parse_nums(text: str) -> int:
+    return sbformat.text_to_mask(text.replace(" ", ""))
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Daemon residente de índices S_k / SB15_k")
+    ap.add_argument("acao", choices=("serve", "stop", "stats", "rank", "unrank", "coberta",
+                                     "cobrem", "acertos", "verificar", "bench"))
+    ap.add_argument("args", nargs="*", help="K e números (1,2,…) ou postos, conforme a ação")
+    ap.add_argument("--socket", type=Path, default=DEFAULT_SOCKET)
+    ap.add_argument("--preload", action="store_true", help="serve: carrega os quatro SB já")
+    ap.add_argument("--mapas", action="store_true", help="serve: monta os mapas de cobertura já")
+    ap.add_argument("--limite", type=int, default=20, help="cobrem: cartões por consulta")
+    ap.add_argument("-n", type=int, default=1000, help="bench: consultas")
+    args = ap.parse_args()
+
+    if args.acao == "serve":
+        import asyncio
+        asyncio.run(serve(args.socket, args.preload, args.mapas))
+        return
+    cli = connect(args.socket)
+    if cli is None:
+        sys.exit(f"❌ nenhum daemon em {args.socket} (python sbdaemon.py serve &).")
+    a = args.args
+    try:
+        t0 = time.perf_counter()
+        if args.acao == "stop":
+            cli.stop()
+            print("✔ daemon encerrado.")
+        elif args.acao == "stats":
+            print(json.dumps(cli.stats(), indent=2, ensure_ascii=False))
+        elif args.acao == "rank":
+            k = int(a[0])
+            for s, r in zip(a[1:], cli.rank(k, [parse_nums(s) for s in a[1:]])):
+                print(f"{s} → linha {r:,} de S{k}.csv")
+        elif args.acao == "unrank":
+            k = int(a[0])
+            for r, m in zip(a[1:], cli.unrank(k, [int(r) for r in a[1:]])):
+                print(f"{r} → {sbformat.mask_to_text(m)}")
+        elif args.acao == "coberta":
+            k = int(a[0])
+            for s, ok in zip(a[1:], cli.covered(k, [parse_nums(s) for s in a[1:]])):
+                print(f"{'✔' if ok else '❌'} {s}")
+        elif args.acao == "cobrem":
+            for s in a:
+                x = parse_nums(s)
+                for k in KS:
+                    found = cli.covering(k, [x], args.limite)[0]
+                    print(f"SB15_{k}: {len(found)} cartão(ões) contêm {s}"
+                          + (f" (primeiros {args.limite})" if len(found) == args.limite else ""))
+                    for row, m in found:
+                        print(f"   linha {row:,}: {sbformat.mask_to_text(m)}")
+        elif args.acao == "acertos":
+            k = int(a[0])
+            for s, h in zip(a[1:], cli.hits(k, [parse_nums(s) for s in a[1:]])):
+                print(f"{s}: " + " ".join(f"{i}:{c:,}" for i, c in enumerate(h) if c))
+        elif args.acao == "verificar":
+            bad = []
+            for k in [int(x) for x in a] or KS:
+                miss, ex = cli.verify(k, 3)
+                print(f"   {'❌' if miss else '✔'} k = {k}: {miss:,} S{k} descobertas")
+                for m in ex:
+                    print(f"      {sbformat.mask_to_text(m)}")
+                if miss:
+                    bad.append(k)
+            if bad:
+                sys.exit(f"❌ S_k descobertas em k = {bad}.")
+        elif args.acao == "bench":
+            k = int(a[0]) if a else 11
+            probe = list(cli.unrank(k, list(range(0, comb(25, k), max(1, comb(25, k) // args.n)))))
+            cli.covered(k, probe[:1])                # monta o mapa fora da medição
+            t1 = time.perf_counter()
+            for m in probe:
+                cli.covered(k, [m])
+            one = (time.perf_counter() - t1) / len(probe)
+            t1 = time.perf_counter()
+            cli.covered(k, probe)
+            batch = time.perf_counter() - t1
+            print(f"k = {k}: {one * 1e6:.0f} µs por consulta isolada · lote de {len(probe):,} "
+                  f"em {batch * 1e3:.2f} ms")
+        print(f"   ({(time.perf_counter() - t0) * 1e3:.2f} ms)")
+    except DaemonError as e:
+        sys.exit(f"❌ {e}")
+    finally:
+        cli.close()
+
+if __name__ == "__main__":
+    main()
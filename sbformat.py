@@ -0,0 +1,422 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# AUTOR: Leonardo dos Santos Marques
+"""
+sbformat.py — formato binário compacto dos SB15_k (SB15_k.sb, ao lado do .csv).
+
+Layout (little‑endian):
+
+    0   cabeçalho de 64 bytes
+          magic "LFSB0001" · versão · k · codificação · nº de cartões ·
+          blake2b (16 B) do payload · tamanho do bloco de metadados
+    64  metadados JSON (gerador, parâmetros, data, texto exportado)
+    …   payload, alinhado em 8 bytes:
+          mask32  — uint32 por cartão (bit n‑1 ↔ dezena n): carga = memcpy
+          rank22  — posição lexicográfica do cartão em S15.csv (< 2^22),
+                    22 bits por cartão, 4 cartões a cada 11 bytes (~27 % menor)
+
+SB15_14 (532 555 cartões): 20 MB em texto → 2,1 MB (mask32) / 1,5 MB (rank22);
+contar cartões lê só o cabeçalho.
+
+O texto (SB15_k.csv) continua sendo gravado — é o que vai na submissão.  O
+.sb guarda tamanho/mtime/blake2b do texto de onde veio; `resolve()` só o usa
+enquanto o texto for aquele (ou o manifesto confirmar o mesmo hash), senão os
+leitores voltam ao CSV.  Todos os leitores aceitam os dois formatos.
+
+Uso:
+    python sbformat.py info prog2_saida/SB15_14.csv        # cabeçalho / contagem
+    python sbformat.py binario prog5_saida/SB15_11.csv     # CSV → .sb
+    python sbformat.py binario prog2_saida/SB15_14.csv --rank22
+    python sbformat.py texto prog2_saida/SB15_14.sb -o sb14.csv
+"""
+from __future__ import annotations
+
+import argparse, json, os, re, struct, sys, time
+from array import array
+from math import comb
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional
+
+import manifest
+
+MAGIC = b"LFSB0001"
+VERSION = 1
+HDR = struct.Struct("<8sBBB5xQ16sI")      # magic versão k codif. | cartões hash meta
+HDR_SIZE = 64
+MASK32, RANK22 = 0, 1
+ENCODINGS = {"mask32": MASK32, "rank22": RANK22}
+SUFFIX = ".sb"
+READ_CHUNK = 1 << 20
+
+# ─── Dezenas ↔ máscara ─────────────────────────────────────────────────────
+_NUMS_LO: List[tuple] = []              # montadas no 1º uso (~25 ms na importação)
+_NUMS_HI: List[tuple] = []
+
+def mask_to_nums(m: int) -> tuple:
+    """Dezenas em ordem crescente (duas consultas de tabela, sem laço de bits)."""
+    try:
+        return _NUMS_LO[m & 0x1FFF] + _NUMS_HI[m >> 13]
+    except IndexError:
+        if _NUMS_LO:
+            raise
+        _NUMS_LO.extend(tuple(n + 1 for n in range(13) if m >> n & 1) for m in range(1 << 13))
+        _NUMS_HI.extend(tuple(n + 14 for n in range(12) if m >> n & 1) for m in range(1 << 12))
+        return _NUMS_LO[m & 0x1FFF] + _NUMS_HI[m >> 13]
+
+def mask_to_text(m: int) -> str:
+    return ",".join(map(str, mask_to_nums(m)))
+
+def text_to_mask(line) -> int:
+    m = 0
+    for x in line.split(b"," if isinstance(line, bytes) else ","):
+        m |= 1 << (int(x) - 1)
+    return m
+
+# ─── Posto lexicográfico (rank22) ──────────────────────────────────────────
+TOTAL_S15 = comb(25, 15)
+_BINOM = [[comb(d, j) for d in range(25)] for j in range(16)]
+
+def mask_to_rank(m: int) -> int:
+    """Posição do cartão em S15.csv: C(25,15)-1 − Σ C(24−c_i, 15−i)."""
+    y = 0
+    for i, n in enumerate(mask_to_nums(m)):
+        y += _BINOM[15 - i][25 - n]
+    return TOTAL_S15 - 1 - y
+
+def rank_to_mask(r: int) -> int:
+    y = TOTAL_S15 - 1 - r
+    m = 0
+    d = 25
+    for j in range(15, 0, -1):              # sistema combinatório: maior d com C(d,j) ≤ y
+        row = _BINOM[j]
+        d -= 1
+        while row[d] > y:
+            d -= 1
+        y -= row[d]
+        m |= 1 << (24 - d)
+    return m
+
+_np = None
+
+def _numpy():
+    """numpy se instalado (caminho vetorizado), senão None — carregado sob demanda."""
+    global _np
+    if _np is None:
+        try:
+            import numpy
+            _np = numpy
+        except ImportError:
+            _np = False
+    return _np or None
+
+def _ranks_np(np, masks):
+    bits = (masks[:, None] >> np.arange(25, dtype=np.uint32)) & 1
+    pos = np.cumsum(bits, axis=1) - 1                   # índice i da dezena no cartão
+    table = np.array([[comb(24 - b, 15 - i) if i < 15 else 0 for i in range(16)]
+                      for b in range(25)], dtype=np.int64)
+    y = (table[np.arange(25), np.clip(pos, 0, 15)] * bits).sum(axis=1)
+    return TOTAL_S15 - 1 - y
+
+def _masks_np(np, ranks):
+    y = TOTAL_S15 - 1 - ranks.astype(np.int64)
+    out = np.zeros(len(ranks), dtype=np.uint32)
+    for j in range(15, 0, -1):
+        row = np.array(_BINOM[j], dtype=np.int64)
+        d = np.searchsorted(row, y, side="right") - 1
+        y -= row[d]
+        out |= np.left_shift(np.uint32(1), (24 - d).astype(np.uint32))
+    return out
+
+# ─── Codificação do payload ────────────────────────────────────────────────
+def encode(masks: array, encoding: int) -> bytes:
+    if encoding == MASK32:
+        out = array("I", masks)
+        if sys.byteorder != "little":
+            out.byteswap()
+        return out.tobytes()
+    np = _numpy()
+    if np is not None:                      # 22 bits por posto, fluxo LSB‑first
+        ranks = _ranks_np(np, np.frombuffer(encode(masks, MASK32), dtype="<u4"))
+        ranks = np.concatenate((ranks, np.zeros(-len(ranks) % 4, dtype=np.int64)))
+        bits = ((ranks[:, None] >> np.arange(22)) & 1).astype(np.uint8)
+        return np.packbits(bits.ravel(), bitorder="little").tobytes()
+    ranks = [mask_to_rank(m) for m in masks]
+    ranks += [0] * (-len(ranks) % 4)
+    return b"".join((a | b << 22 | c << 44 | d << 66).to_bytes(11, "little")
+                    for a, b, c, d in zip(*[iter(ranks)] * 4))
+
+def decode(payload: bytes, count: int, encoding: int) -> array:
+    if encoding == MASK32:
+        out = array("I")
+        out.frombytes(payload[:4 * count])
+        if sys.byteorder != "little":
+            out.byteswap()
+        return out
+    np = _numpy()
+    if np is not None:
+        bits = np.unpackbits(np.frombuffer(payload, dtype=np.uint8), count=22 * count,
+                             bitorder="little").reshape(count, 22)
+        ranks = bits.astype(np.int64) @ (np.int64(1) << np.arange(22, dtype=np.int64))
+        return array("I", _masks_np(np, ranks).astype("=u4").tobytes())
+    out = array("I")
+    low = (1 << 22) - 1
+    for g in range(0, len(payload) - len(payload) % 11, 11):
+        v = int.from_bytes(payload[g:g + 11], "little")
+        out.extend(rank_to_mask(v >> s & low) for s in (0, 22, 44, 66))
+    del out[count:]
+    return out
+
+# ─── Leitura ───────────────────────────────────────────────────────────────
+def bin_path(path: Path) -> Path:
+    return Path(path).with_suffix(SUFFIX)
+
+def is_binary(path: Path) -> bool:
+    with open(path, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+def read_header(path: Path) -> dict:
+    with open(path, "rb") as f:
+        raw = f.read(HDR_SIZE)
+        if len(raw) < HDR_SIZE or raw[:8] != MAGIC:
+            raise ValueError(f"{path} não é um SB binário")
+        magic, version, k, encoding, count, digest, meta_len = HDR.unpack(raw[:HDR.size])
+        if version != VERSION:
+            raise ValueError(f"{path}: versão {version} do formato não suportada")
+        meta = json.loads(f.read(meta_len).decode("utf8")) if meta_len else {}
+    return {"k": k, "codificacao": encoding, "cartoes": count, "blake2b": digest.hex(),
+            "meta": meta, "offset": -(-(HDR_SIZE + meta_len) // 8) * 8}
+
+def resolve(path: Path) -> Path:
+    """O .sb irmão se ele ainda corresponde ao texto; senão o próprio arquivo."""
+    path = Path(path)
+    if path.suffix == SUFFIX:
+        return path
+    sb = bin_path(path)
+    if not sb.exists():
+        return path
+    if not path.exists():
+        return sb
+    try:
+        src = read_header(sb)["meta"].get("texto") or {}
+    except (OSError, ValueError):
+        return path
+    st = path.stat()
+    if src.get("bytes") != st.st_size:
+        return path
+    if src.get("mtime_ns") == st.st_mtime_ns:
+        return sb
+    entry = manifest.lookup(path)                 # tocado (ex.: cache): confere hash
+    return sb if entry and entry["blake2b"] and entry["blake2b"] == src.get("blake2b") else path
+
+def load_masks(path: Path, check: bool = True) -> array:
+    """Máscaras uint32 (array 'I') do SB — binário ou texto, na ordem do arquivo."""
+    path = resolve(path)
+    if not is_binary(path):
+        if _numpy():                         # parser vetorizado de premios.py
+            import premios
+            return array("I", premios.parse_cards(path.read_bytes()).astype("=u4").tobytes())
+        return array("I", iter_masks(path))
+    hdr = read_header(path)
+    with open(path, "rb") as f:
+        f.seek(hdr["offset"])
+        payload = f.read()
+    if check and manifest.digest_bytes(payload) != hdr["blake2b"]:
+        raise ValueError(f"{path}: payload corrompido (hash não confere)")
+    return decode(payload, hdr["cartoes"], hdr["codificacao"])
+
+def load_range(path: Path, start: int, stop: int) -> array:
+    """Cartões [start, stop) de um .sb, lendo só os bytes da fatia."""
+    hdr = read_header(path)
+    stop = min(stop, hdr["cartoes"])
+    if start >= stop:
+        return array("I")
+    if hdr["codificacao"] == MASK32:
+        a, b, skip = 4 * start, 4 * stop, 0
+    else:                                    # grupos de 4 postos em 11 bytes
+        a, b, skip = 11 * (start // 4), 11 * -(-stop // 4), start % 4
+    with open(path, "rb") as f:
+        f.seek(hdr["offset"] + a)
+        payload = f.read(b - a)
+    return decode(payload, skip + stop - start, hdr["codificacao"])[skip:]
+
+def iter_masks(path: Path) -> Iterator[int]:
+    """Máscara de cada cartão; texto é lido em blocos, sem carregar tudo."""
+    path = resolve(path)
+    if is_binary(path):
+        yield from load_masks(path)
+        return
+    with open(path, "rb") as f:
+        while True:
+            lines = f.readlines(READ_CHUNK)
+            if not lines:
+                break
+            for line in lines:
+                line = line.strip()
+                if line:
+                    yield text_to_mask(line)
+
+def iter_nums(path: Path) -> Iterator[tuple]:
+    """Dezenas de cada cartão (substitui csv.reader + map(int) nos verificadores)."""
+    for m in iter_masks(path):
+        yield mask_to_nums(m)
+
+def count(path: Path) -> int:
+    """Nº de cartões: cabeçalho do .sb, senão manifesto/contagem de linhas."""
+    src = resolve(path)
+    if is_binary(src):
+        return read_header(src)["cartoes"]
+    return manifest.count_rows(src)
+
+# ─── Escrita ───────────────────────────────────────────────────────────────
+def write(path: Path, masks: Iterable[int], k: int, encoding: int = MASK32,
+          meta: Optional[dict] = None) -> str:
+    """Grava o .sb (tmp + rename) e devolve o blake2b do arquivo inteiro."""
+    masks = array("I", masks)
+    payload = encode(masks, encoding)
+    meta_raw = json.dumps(meta or {}, ensure_ascii=False, sort_keys=True).encode("utf8")
+    head = HDR.pack(MAGIC, VERSION, k, encoding, len(masks),
+                    bytes.fromhex(manifest.digest_bytes(payload)), len(meta_raw))
+    head = head.ljust(HDR_SIZE, b"\0") + meta_raw
+    head += b"\0" * (-len(head) % 8)
+    tmp = Path(path).with_name(Path(path).name + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(head)
+        f.write(payload)
+    os.replace(tmp, path)
+    return manifest.digest_bytes(head + payload)
+
+def text_source(path: Path, digest: str) -> dict:
+    st = Path(path).stat()
+    return {"arquivo": Path(path).name, "bytes": st.st_size,
+            "mtime_ns": st.st_mtime_ns, "blake2b": digest}
+
+def write_binary(csv_path: Path, masks: Iterable[int], k: int, text_digest: str,
+                 gerador: str, params: Optional[dict] = None,
+                 encoding: int = MASK32) -> Path:
+    """.sb irmão de um texto já gravado (e registrado) + entrada no manifesto."""
+    masks = array("I", masks)
+    sb = bin_path(csv_path)
+    meta = {"gerador": gerador, "parametros": params or {},
+            "gerado_em": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "texto": text_source(csv_path, text_digest)}
+    digest = write(sb, masks, k, encoding, meta)
+    manifest.record(sb, len(masks), digest, gerador, params)
+    return sb
+
+def append_binary(csv_path: Path, masks: Iterable[int], text_digest: Optional[str],
+                  gerador: str, params: Optional[dict] = None) -> bool:
+    """Anexa cartões ao .sb irmão sem reescrevê-lo (texto já anexado antes).
+
+    Só mask32: o payload cresce no fim e o cabeçalho recebe a nova contagem,
+    o hash do payload (lido de novo: 4 bytes/cartão) e a origem de texto,
+    com o JSON completado por espaços no mesmo tamanho.  False se não der
+    para remendar (rank22, metadados maiores) — o .sb fica obsoleto e
+    `resolve` passa a ler o texto até alguém regravá-lo.
+    """
+    sb = bin_path(csv_path)
+    hdr = read_header(sb)
+    count = hdr["cartoes"]
+    end = hdr["offset"] + 4 * count
+    if hdr["codificacao"] != MASK32 or sb.stat().st_size != end:
+        return False
+    meta = dict(hdr["meta"], gerador=gerador, parametros=params or {},
+                gerado_em=time.strftime("%Y-%m-%dT%H:%M:%S"),
+                texto=text_source(csv_path, text_digest))
+    with open(sb, "r+b") as f:
+        meta_len = HDR.unpack(f.read(HDR.size))[-1]
+        meta_raw = json.dumps(meta, ensure_ascii=False, sort_keys=True).encode("utf8")
+        if len(meta_raw) > meta_len:
+            return False
+        extra = encode(array("I", masks), MASK32)
+        h = manifest.new_hash()
+        f.seek(hdr["offset"])
+        for chunk in iter(lambda: f.read(READ_CHUNK), b""):
+            h.update(chunk)
+        h.update(extra)
+        f.write(extra)                          # payload primeiro: queda no meio = hash não confere
+        count += len(extra) // 4
+        f.seek(0)
+        f.write(HDR.pack(MAGIC, VERSION, hdr["k"], MASK32, count, h.digest(), meta_len))
+        f.seek(HDR_SIZE)
+        f.write(meta_raw.ljust(meta_len))
+    manifest.record(sb, count, None, gerador, params)
+    return True
+
+def save_lines(csv_path: Path, lines: List[str], k: int, gerador: str,
+               params: Optional[dict] = None) -> int:
+    """Grava o SB dos programas 2‑5: texto (submissão) + .sb, ambos no manifesto."""
+    text = "\n".join(lines)
+    data = text.encode("ascii")
+    Path(csv_path).write_bytes(data)
+    digest = manifest.digest_bytes(data)
+    manifest.record(csv_path, len(lines), digest, gerador, params)
+    write_binary(csv_path, (text_to_mask(line) for line in lines), k, digest, gerador, params)
+    return len(lines)
+
+def export_text(masks: Iterable[int], path: Path) -> str:
+    """Texto no formato dos programas (uma linha por cartão, sem \\n final)."""
+    data = "\n".join(mask_to_text(m) for m in masks).encode("ascii")
+    tmp = Path(path).with_name(Path(path).name + ".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+    return manifest.digest_bytes(data)
+
+def guess_k(path: Path) -> int:
+    m = re.search(r"SB15_(\d+)", Path(path).name)
+    return int(m.group(1)) if m else 0
+
+# ─── CLI ───────────────────────────────────────────────────────────────────
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Formato binário dos SB15_k")
+    ap.add_argument("acao", choices=("info", "binario", "texto"))
+    ap.add_argument("sb", type=Path, help="SB15_k.csv ou SB15_k.sb")
+    ap.add_argument("-o", "--saida", type=Path, help="arquivo de saída")
+    ap.add_argument("--rank22", action="store_true", help="binário com postos de 22 bits")
+    args = ap.parse_args()
+
+    if not args.sb.exists():
+        sys.exit(f"❌ {args.sb} não encontrado.")
+    t0 = time.perf_counter()
+    if args.acao == "info":
+        src = resolve(args.sb)
+        if not is_binary(src):
+            n = count(src)
+            print(f"📄 {src}: texto, {n:,} cartões, {src.stat().st_size / 1_048_576:.1f} MB"
+                  f" (sem .sb atualizado)")
+            return
+        hdr = read_header(src)
+        enc = {v: k for k, v in ENCODINGS.items()}[hdr["codificacao"]]
+        print(f"📦 {src}: k = {hdr['k']}, {hdr['cartoes']:,} cartões, {enc}, "
+              f"{src.stat().st_size / 1_048_576:.2f} MB · cabeçalho em "
+              f"{1e3 * (time.perf_counter() - t0):.2f} ms")
+        for key, val in hdr["meta"].items():
+            print(f"   {key}: {val}")
+        return
+
+    if args.acao == "binario":
+        if is_binary(args.sb):
+            sys.exit(f"❌ {args.sb} já é binário.")
+        masks = load_masks(args.sb)
+        digest = manifest.current_digest(args.sb)
+        enc = RANK22 if args.rank22 else MASK32
+        if args.saida:
+            meta = {"gerador": "sbformat.py", "texto": text_source(args.sb, digest)}
+            write(args.saida, masks, guess_k(args.sb), enc, meta)
+            out = args.saida
+        else:
+            out = write_binary(args.sb, masks, guess_k(args.sb), digest, "sbformat.py",
+                               {"de": args.sb.name}, enc)
+        print(f"📦 {out}: {len(masks):,} cartões, {args.sb.stat().st_size / 1_048_576:.1f} MB"
+              f" → {out.stat().st_size / 1_048_576:.2f} MB em {time.perf_counter() - t0:.2f} s")
+        return
+
+    masks = load_masks(args.sb)
+    out = args.saida or args.sb.with_suffix(".csv")
+    if out.resolve() == args.sb.resolve():
+        sys.exit("❌ informe -o para não sobrescrever a entrada.")
+    digest = export_text(masks, out)
+    manifest.record(out, len(masks), digest, "sbformat.py", {"de": args.sb.name})
+    print(f"📄 {out}: {len(masks):,} cartões em {time.perf_counter() - t0:.2f} s")
+
+if __name__ == "__main__":
+    main()
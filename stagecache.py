@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# AUTOR: Leonardo dos Santos Marques
+"""
+stagecache.py — cache por conteúdo das etapas do pipeline (disco local, offline).
+
+A chave de uma etapa é o blake2b de:
+
+    nome da etapa · hash dos scripts (versão do código) · hash de cada
+    arquivo de entrada · parâmetros que alteram o resultado
+
+Os hashes de entrada vêm do manifest.json quando o arquivo ainda é o
+registrado (O(1)); só arquivos obsoletos/sem manifesto são relidos.  Assim
+um `make bench` que regera S*.csv **idênticos** não invalida as coberturas:
+o conteúdo é o mesmo, a chave também.
+
+Layout:  .cache/stages/<ch>/<chave>/{meta.json, 0, 1, …}
+    meta.json — etapa, saídas (caminho, bytes, linhas, blake2b, entrada do
+                manifesto), criado/último uso, tamanho total.
+
+Acerto → as saídas são copiadas de volta (conferindo o hash na cópia) e
+re‑registradas no manifesto, com a verificação que tinham.  Saídas já
+idênticas no lugar nem são copiadas.  Tamanho limitado (--cache-max):
+as entradas usadas há mais tempo são removidas primeiro (LRU).
+
+Uso:
+    python stagecache.py                 # lista entradas
+    python stagecache.py --max 20G       # aplica o limite (evicção LRU)
+    python stagecache.py --clear         # esvazia
+"""
+from __future__ import annotations
+
+import argparse, json, os, shutil, sys, time
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+import manifest
+
+CACHE_DIR = Path(os.environ.get("LOTO_CACHE_DIR", ".cache/stages"))
+DEFAULT_MAX = 20 << 30                    # 20 GiB
+COPY_CHUNK = 4 << 20
+
+# ─── Chave ─────────────────────────────────────────────────────────────────
+def file_hash(path: Path, meta: Optional[dict] = None) -> str:
+    return manifest.current_digest(path, meta)
+
+def fingerprint(stage: str, code: Iterable[Path], inputs: Iterable[Path],
+                params: dict) -> str:
+    """Chave da etapa (hex); entradas ausentes entram como 'ausente'."""
+    meta = manifest.load()
+    h = manifest.new_hash()
+    h.update(stage.encode())
+    for group in (code, inputs):
+        for p in sorted(Path(x) for x in group):
+            digest = file_hash(p, meta) if p.exists() else "ausente"
+            h.update(f"\0{p.as_posix()}={digest}".encode())
+    h.update(json.dumps(params, sort_keys=True).encode())
+    return h.hexdigest()
+
+# ─── Entradas ──────────────────────────────────────────────────────────────
+def _entry_dir(key: str) -> Path:
+    return CACHE_DIR / key[:2] / key
+
+def _write_meta(d: Path, meta: dict) -> None:
+    tmp = d / "meta.json.tmp"
+    tmp.write_text(json.dumps(meta, ensure_ascii=False, indent=1), encoding="utf8")
+    os.replace(tmp, d / "meta.json")
+
+def _read_meta(d: Path) -> Optional[dict]:
+    try:
+        return json.loads((d / "meta.json").read_text(encoding="utf8"))
+    except (OSError, ValueError):
+        return None
+
+def _copy(src: Path, dst: Path) -> str:
+    """Copia em blocos calculando o blake2b no caminho (mesmo hash do manifesto)."""
+    h = manifest.new_hash()
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dst.with_name(dst.name + ".tmp")
+    with open(src, "rb") as fi, open(tmp, "wb") as fo:
+        for chunk in iter(lambda: fi.read(COPY_CHUNK), b""):
+            h.update(chunk)
+            fo.write(chunk)
+    os.replace(tmp, dst)
+    return h.hexdigest()
+
+def entries() -> List[dict]:
+    out = []
+    if CACHE_DIR.exists():
+        for d in CACHE_DIR.glob("*/*"):
+            meta = _read_meta(d)
+            if meta is not None:
+                meta["_dir"] = d
+                out.append(meta)
+    return out
+
+def store(key: str, stage: str, outputs: List[Path], max_bytes: int = DEFAULT_MAX) -> bool:
+    """Guarda as saídas de uma etapa concluída com sucesso."""
+    outputs = [Path(p) for p in outputs]
+    if any(not p.exists() for p in outputs):
+        return False
+    total = sum(p.stat().st_size for p in outputs)
+    if total > max_bytes:
+        print(f"   ♻ {stage}: saídas ({total / 2**30:.1f} GB) maiores que o cache — não guardadas.")
+        return False
+    final = _entry_dir(key)
+    tmp = final.with_name(f"{key}.tmp-{os.getpid()}")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+    data = manifest.load()
+    outs = []
+    for i, p in enumerate(outputs):
+        digest = _copy(p, tmp / str(i))
+        entry = manifest.lookup(p, data)
+        rows = entry["linhas"] if entry and entry["blake2b"] == digest else manifest.count_rows(p, {})
+        outs.append({"caminho": p.as_posix(), "bytes": p.stat().st_size, "linhas": rows,
+                     "blake2b": digest, "manifesto": entry if entry and entry["blake2b"] == digest
+                     else None})
+    now = time.time()
+    _write_meta(tmp, {"etapa": stage, "saidas": outs, "bytes": total,
+                      "criado": now, "usado": now})
+    shutil.rmtree(final, ignore_errors=True)
+    os.replace(tmp, final)
+    evict(max_bytes)
+    return True
+
+def restore(key: str, stage: str) -> bool:
+    """Acerto → saídas no lugar (e no manifesto).  False = não há entrada válida."""
+    d = _entry_dir(key)
+    meta = _read_meta(d)
+    if meta is None:
+        return False
+    data = manifest.load()
+    for i, out in enumerate(meta["saidas"]):
+        path = Path(out["caminho"])
+        current = manifest.lookup(path, data)
+        if current is not None and current["blake2b"] == out["blake2b"]:
+            continue                                    # já idêntico no lugar
+        if _copy(d / str(i), path) != out["blake2b"]:
+            print(f"   ⚠ cache corrompido para {stage} ({path}) — descartado.")
+            shutil.rmtree(d, ignore_errors=True)
+            return False
+        entry = out["manifesto"] or {}
+        manifest.record(path, out["linhas"], out["blake2b"],
+                        entry.get("gerador", f"stagecache:{stage}"), entry.get("parametros"))
+        ver = entry.get("verificacao") or {}
+        if ver.get("status"):
+            manifest.set_verified(path, ver["status"] == "ok", ver.get("por", stage),
+                                  ver.get("faltantes", 0))
+    meta["usado"] = time.time()
+    _write_meta(d, meta)
+    return True
+
+def evict(max_bytes: int) -> int:
+    """Remove as entradas menos usadas até caber em max_bytes; devolve quantas."""
+    items = sorted(entries(), key=lambda m: m["usado"])
+    total = sum(m["bytes"] for m in items)
+    removed = 0
+    for m in items:
+        if total <= max_bytes:
+            break
+        shutil.rmtree(m["_dir"], ignore_errors=True)
+        total -= m["bytes"]
+        removed += 1
+    return removed
+
+# ─── CLI ───────────────────────────────────────────────────────────────────
+def main() -> None:
+    from memplan import parse_size                    # '20G' → MB
+    ap = argparse.ArgumentParser(description="Cache de etapas do pipeline Lotofácil")
+    ap.add_argument("--max", type=parse_size, help="aplica limite de tamanho (ex.: 20G)")
+    ap.add_argument("--clear", action="store_true", help="remove todo o cache")
+    args = ap.parse_args()
+
+    if args.clear:
+        shutil.rmtree(CACHE_DIR, ignore_errors=True)
+        print(f"🗑️  {CACHE_DIR} removido.")
+        return
+    if args.max is not None:
+        n = evict(int(args.max * 1_048_576))
+        print(f"♻ {n} entrada(s) removida(s).")
+    items = sorted(entries(), key=lambda m: -m["usado"])
+    if not items:
+        print(f"ℹ️  {CACHE_DIR} vazio.")
+        return
+    for m in items:
+        used = time.strftime("%Y-%m-%d %H:%M", time.localtime(m["usado"]))
+        outs = ", ".join(Path(o["caminho"]).name for o in m["saidas"]) or "(sem saídas)"
+        print(f"{m['_dir'].name[:16]}  {m['etapa']:<8} {m['bytes'] / 1_048_576:>9.1f} MB  "
+              f"usado {used}  {outs}")
+    print(f"Total: {sum(m['bytes'] for m in items) / 1_048_576:.1f} MB em {len(items)} entrada(s)")
+
+if __name__ == "__main__":
+    sys.exit(main())
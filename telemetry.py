@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# AUTOR: Leonardo dos Santos Marques
+"""
+telemetry.py — telemetria ao vivo dos greedy (programas 2‑5).
+
+Com --telemetria ARQ o programa grava, a cada --telemetria-intervalo
+segundos, um snapshot em ARQ (tmp + os.replace → nunca meio escrito):
+
+    ARQ.prom            formato texto do Prometheus (node_exporter textfile)
+    ARQ.ndjson/.json    um JSON por linha, últimos HISTORY_KEEP snapshots
+
+e, com --telemetria-porta N, serve o último snapshot em
+http://127.0.0.1:N/metrics (Prometheus) e /json.
+
+Campos: fase, cobertura %, cobertos/total, seleções, seleções/s e
+elementos cobertos/s (janela de WINDOW_S s), pops do heap e fração de pops
+"velhos" (ganho desatualizado → reinserido ou descartado), ganho máximo
+atual (topo do heap), tamanho da fila, RSS, pid e ETA:
+
+    eta_s        = descobertos / ritmo recente de cobertura   (otimista: o
+                   ganho por seleção só cai)
+    eta_max_s    = (descobertos / ganho_max) · H(ganho_max) seleções ×
+                   s/seleção recente — cota do greedy (ln n + 1) aplicada ao
+                   que falta; limite superior prático
+
+O custo no laço é uma comparação de relógio por chamada de `tick`.
+
+Acompanhar / matar corridas descontroladas:
+    python telemetry.py prog5_saida/telemetria.prom                # mostra
+    python telemetry.py prog5_saida/telemetria.prom --seguir 30 \\
+        --max-eta 8h --max-rss 12G --matar                         # vigia
+"""
+from __future__ import annotations
+
+import argparse, json, os, signal, sys, threading, time
+from collections import deque
+from pathlib import Path
+from typing import Deque, Dict, Optional, Tuple
+
+DEFAULT_INTERVAL = 10.0
+WINDOW_S = 60.0
+HISTORY_KEEP = 720                 # snapshots mantidos no NDJSON (2 h a 10 s)
+PREFIX = "lotofacil_"
+
+HELP = {                           # métrica → (tipo, descrição)
+    "cobertura_pct": ("gauge", "percentual de S_k coberto"),
+    "cobertos": ("gauge", "S_k cobertas"),
+    "total": ("gauge", "tamanho do universo S_k"),
+    "selecionados": ("counter", "cartões escolhidos"),
+    "selecoes_por_s": ("gauge", "seleções por segundo (janela)"),
+    "cobertura_por_s": ("gauge", "S_k cobertas por segundo (janela)"),
+    "pops": ("counter", "avaliações de candidato (pops do heap)"),
+    "pops_velhos_ratio": ("gauge", "fração de pops com ganho desatualizado (janela)"),
+    "ganho_max": ("gauge", "ganho do candidato no topo da fila"),
+    "fila": ("gauge", "candidatos na fila/pool"),
+    "lidos": ("gauge", "linhas S15 lidas na varredura"),
+    "rss_mb": ("gauge", "memória residente do processo (MB)"),
+    "decorrido_s": ("counter", "segundos desde o início"),
+    "eta_s": ("gauge", "ETA otimista (ritmo recente de cobertura)"),
+    "eta_max_s": ("gauge", "ETA pela cota H(ganho_max) do greedy"),
+}
+
+# ─── Medidas ───────────────────────────────────────────────────────────────
+def rss_mb() -> float:
+    try:                                     # /proc primeiro: psutil só fora do Linux
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1_048_576
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import psutil
+    except ImportError:
+        return 0.0
+    return psutil.Process().memory_info().rss / 1_048_576
+
+def harmonic(n: int) -> float:
+    return sum(1.0 / i for i in range(1, max(1, n) + 1))
+
+# ─── Telemetria ────────────────────────────────────────────────────────────
+class Telemetry:
+    """Snapshots periódicos de um greedy em andamento."""
+
+    def __init__(self, path: Optional[Path], programa: str, k: int, total: int,
+                 interval: float = DEFAULT_INTERVAL, port: Optional[int] = None) -> None:
+        self.path = Path(path) if path else None
+        self.ndjson = bool(self.path) and self.path.suffix in (".ndjson", ".json", ".jsonl")
+        self.labels = {"programa": programa, "k": str(k)}
+        self.total, self.interval = total, interval
+        self.t0 = time.monotonic()
+        self._next = self.t0
+        self.phase = "inicio"
+        self.state = {"cobertos": 0, "selecionados": 0, "pops": 0, "velhos": 0,
+                      "ganho_max": 0, "fila": 0, "lidos": 0}
+        self._hist: Deque[Tuple[float, int, int, int, int]] = deque()
+        self._history: Deque[str] = deque(maxlen=HISTORY_KEEP)
+        self.latest: Dict[str, object] = {}
+        self._server = None
+        if port:
+            self._serve(port)
+        self.flush()                       # arquivo existe desde o início
+
+    # chamadas do laço -------------------------------------------------------
+    def set_phase(self, phase: str) -> None:
+        self.phase = phase
+        self.flush()
+
+    def scan(self, rows: int, queue: int = 0) -> None:
+        """Progresso da varredura inicial (linhas S15 lidas)."""
+        if time.monotonic() >= self._next:
+            self.state.update(lidos=rows, fila=queue)
+            self.flush()
+
+    def tick(self, covered: int, selected: int, pops: int, stale: int,
+             max_gain: int, queue: int, force: bool = False) -> None:
+        """Estado atual do greedy; só grava quando vence o intervalo (ou `force`)."""
+        if force or time.monotonic() >= self._next:
+            self.state.update(cobertos=covered, selecionados=selected, pops=pops,
+                              velhos=stale, ganho_max=max_gain, fila=queue)
+            self.flush()
+
+    def close(self, status: str = "concluido") -> None:
+        self.phase = status
+        self.flush()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+    # snapshot ---------------------------------------------------------------
+    def snapshot(self) -> Dict[str, object]:
+        now = time.monotonic()
+        st = self.state
+        self._hist.append((now, st["cobertos"], st["selecionados"], st["pops"], st["velhos"]))
+        while len(self._hist) > 2 and now - self._hist[0][0] > WINDOW_S:
+            self._hist.popleft()
+        t_a, cov_a, sel_a, pop_a, old_a = self._hist[0]
+        dt = now - t_a
+        cov_rate = (st["cobertos"] - cov_a) / dt if dt > 0 else 0.0
+        sel_rate = (st["selecionados"] - sel_a) / dt if dt > 0 else 0.0
+        dpops = st["pops"] - pop_a
+        left = self.total - st["cobertos"]
+        eta = left / cov_rate if cov_rate > 0 else None
+        eta_max = None
+        if sel_rate > 0 and st["ganho_max"] > 0:
+            eta_max = left / st["ganho_max"] * harmonic(st["ganho_max"]) / sel_rate
+        return {
+            **self.labels, "fase": self.phase, "pid": os.getpid(), "ts": time.time(),
+            "decorrido_s": round(now - self.t0, 1),
+            "cobertura_pct": round(100 * st["cobertos"] / self.total, 4) if self.total else 0.0,
+            "cobertos": st["cobertos"], "total": self.total,
+            "selecionados": st["selecionados"], "selecoes_por_s": round(sel_rate, 3),
+            "cobertura_por_s": round(cov_rate, 1), "pops": st["pops"],
+            "pops_velhos_ratio": round((st["velhos"] - old_a) / dpops, 4) if dpops > 0 else 0.0,
+            "ganho_max": st["ganho_max"], "fila": st["fila"], "lidos": st["lidos"],
+            "rss_mb": round(rss_mb(), 1),
+            "eta_s": round(eta, 1) if eta is not None else None,
+            "eta_max_s": round(eta_max, 1) if eta_max is not None else None,
+        }
+
+    def flush(self) -> None:
+        self.latest = self.snapshot()
+        self._next = time.monotonic() + self.interval
+        if self.path is None:
+            return
+        if self.ndjson:
+            self._history.append(json.dumps(self.latest, ensure_ascii=False))
+            text = "\n".join(self._history) + "\n"
+        else:
+            text = to_prometheus(self.latest)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(text, encoding="utf8")
+        os.replace(tmp, self.path)
+
+    # HTTP -------------------------------------------------------------------
+    def _serve(self, port: int) -> None:
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        tel = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if self.path.startswith("/json"):
+                    body, ctype = json.dumps(tel.latest, ensure_ascii=False), "application/json"
+                elif self.path.startswith("/metrics") or self.path == "/":
+                    body, ctype = to_prometheus(tel.latest), "text/plain; version=0.0.4"
+                else:
+                    self.send_error(404)
+                    return
+                data = body.encode("utf8")
+                self.send_response(200)
+                self.send_header("Content-Type", f"{ctype}; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args) -> None:      # sem ruído no stdout do greedy
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        print(f"📡 Telemetria em http://127.0.0.1:{port}/metrics")
+
+class NullTelemetry:
+    """Telemetria desligada: mesma interface, nenhum custo."""
+
+    def set_phase(self, phase: str) -> None: pass
+    def scan(self, rows: int, queue: int = 0) -> None: pass
+    def tick(self, *args, **kw) -> None: pass
+    def close(self, status: str = "concluido") -> None: pass
+
+def to_prometheus(snap: Dict[str, object]) -> str:
+    labels = ",".join(f'{k}="{snap.get(k, "")}"' for k in ("programa", "k"))
+    out = [f'# HELP {PREFIX}info fase atual e pid\n# TYPE {PREFIX}info gauge\n'
+           f'{PREFIX}info{{{labels},fase="{snap.get("fase", "")}",pid="{snap.get("pid", "")}"}} 1']
+    for name, (kind, desc) in HELP.items():
+        val = snap.get(name)
+        if val is None:
+            continue
+        out.append(f"# HELP {PREFIX}{name} {desc}\n# TYPE {PREFIX}{name} {kind}\n"
+                   f"{PREFIX}{name}{{{labels}}} {val}")
+    return "\n".join(out) + "\n"
+
+# ─── Integração com os programas ───────────────────────────────────────────
+def add_args(p: argparse.ArgumentParser) -> None:
+    p.add_argument("--telemetria", type=Path, metavar="ARQ",
+                   help="snapshots de progresso (.prom = Prometheus, .ndjson = JSON)")
+    p.add_argument("--telemetria-intervalo", type=float, default=DEFAULT_INTERVAL,
+                   metavar="S", help="segundos entre snapshots")
+    p.add_argument("--telemetria-porta", type=int, metavar="N",
+                   help="serve /metrics e /json em 127.0.0.1:N")
+
+def from_args(args: argparse.Namespace, programa: str, k: int, total: int):
+    if not (args.telemetria or args.telemetria_porta):
+        return NullTelemetry()
+    # SIGTERM (ex.: --matar) vira SystemExit → o programa grava fase "falha"
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit("❌ interrompido por SIGTERM."))
+    return Telemetry(args.telemetria, programa, k, total,
+                     args.telemetria_intervalo, args.telemetria_porta)
+
+# ─── CLI: ler / vigiar um arquivo de telemetria ────────────────────────────
+def parse_duration(text: str) -> float:
+    """'90', '45m', '8h' → segundos."""
+    mult = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+    t = text.strip().lower()
+    return float(t[:-1]) * mult[t[-1]] if t[-1] in mult else float(t)
+
+def read_snapshot(path: Path) -> Dict[str, object]:
+    text = path.read_text(encoding="utf8")
+    if path.suffix in (".ndjson", ".json", ".jsonl"):
+        return json.loads(text.strip().splitlines()[-1])
+    snap: Dict[str, object] = {}
+    for line in text.splitlines():
+        if not line.startswith(PREFIX):
+            continue
+        head, _, val = line.rpartition(" ")
+        name, _, labels = head[len(PREFIX):].partition("{")
+        for kv in labels.rstrip("}").split(","):
+            k, _, v = kv.partition("=")
+            snap.setdefault(k, v.strip('"'))
+        if name != "info":
+            snap[name] = float(val)
+    return snap
+
+def fmt_s(v) -> str:
+    if v is None or v == "":
+        return "—"
+    v = float(v)
+    return f"{v / 3600:.1f} h" if v >= 3600 else f"{v / 60:.1f} min" if v >= 60 else f"{v:.0f} s"
+
+def main() -> None:
+    from memplan import parse_size                     # '12G' → MB
+    ap = argparse.ArgumentParser(description="Mostra/vigia a telemetria de um greedy")
+    ap.add_argument("arquivo", type=Path)
+    ap.add_argument("--seguir", type=float, metavar="S", help="relê a cada S segundos")
+    ap.add_argument("--max-eta", type=parse_duration, help="alerta se eta_max passar disso (ex.: 8h)")
+    ap.add_argument("--max-rss", type=parse_size, help="alerta se RSS passar disso (ex.: 12G)")
+    ap.add_argument("--matar", action="store_true", help="envia SIGTERM ao pid no alerta")
+    args = ap.parse_args()
+
+    while True:
+        if not args.arquivo.exists():
+            sys.exit(f"❌ {args.arquivo} não encontrado.")
+        s = read_snapshot(args.arquivo)
+        print(f"{s.get('programa')} k={s.get('k')} [{s.get('fase')}] "
+              f"{float(s.get('cobertura_pct', 0)):6.2f}% · {int(float(s.get('selecionados', 0))):,} sel "
+              f"({float(s.get('selecoes_por_s', 0)):.1f}/s) · ganho_max {int(float(s.get('ganho_max', 0)))}"
+              f" · velhos {100 * float(s.get('pops_velhos_ratio', 0)):.0f}% · fila "
+              f"{int(float(s.get('fila', 0))):,} · RSS {float(s.get('rss_mb', 0)):,.0f} MB · "
+              f"ETA {fmt_s(s.get('eta_s'))} (máx {fmt_s(s.get('eta_max_s'))})", flush=True)
+        alert = None
+        if args.max_eta and s.get("eta_max_s") not in (None, "") \
+                and float(s["eta_max_s"]) > args.max_eta:
+            alert = f"ETA {fmt_s(s['eta_max_s'])} acima do limite"
+        if args.max_rss and float(s.get("rss_mb", 0)) > args.max_rss:
+            alert = f"RSS {float(s['rss_mb']):,.0f} MB acima do limite"
+        if alert:
+            print(f"⚠ {alert}")
+            if args.matar and s.get("fase") not in ("concluido", "falha"):
+                os.kill(int(s["pid"]), signal.SIGTERM)
+                sys.exit(f"❌ pid {s['pid']} encerrado: {alert}.")
+        if not args.seguir or s.get("fase") in ("concluido", "falha"):
+            break
+        time.sleep(args.seguir)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+# AUTOR: Leonardo dos Santos Marques
+"""
+tests/test_historico.py — ingestão idempotente do histórico de benchmarks.
+
+Um cover{k}_log.csv de cabeçalho antigo é migrado por cover_engine.append_log
+(Motor = "lazy" em todas as linhas); as linhas já ingeridas não podem voltar
+como execuções novas.
+
+    python -m pytest -q tests/test_historico.py
+"""
+import csv, sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import cover_engine
+import historico
+
+OLD_HEADER = ["SB_size", "Tempo (s)", "Pico RAM (MB)", "Data"]
+
+@pytest.fixture
+def logdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(historico, "DB_PATH", tmp_path / "historico.sqlite")
+    monkeypatch.delenv("LOTO_HISTORICO", raising=False)
+    (tmp_path / "prog2_saida").mkdir()
+    return tmp_path
+
+def _cover_runs() -> int:
+    con = historico.connect()
+    try:
+        return con.execute("SELECT COUNT(*) FROM runs WHERE fonte = 'cover'").fetchone()[0]
+    finally:
+        con.close()
+
+def test_migrated_log_is_not_ingested_again(logdir):
+    log = Path("prog2_saida/cover14_log.csv")
+    with log.open("w", newline="", encoding="utf8") as f:
+        w = csv.DictWriter(f, fieldnames=OLD_HEADER)
+        w.writeheader()
+        w.writerow({"SB_size": 532566, "Tempo (s)": 82.3, "Pico RAM (MB)": 800, "Data": "2025-06-16"})
+        w.writerow({"SB_size": 532566, "Tempo (s)": 80.1, "Pico RAM (MB)": 801, "Data": "2025-06-17"})
+    historico.ingest_all()
+    assert _cover_runs() == 2
+
+    cover_engine.append_log(log, OLD_HEADER, {"SB_size": 532484, "Tempo (s)": 52.7,
+                                              "Pico RAM (MB)": 345, "Data": "2025-06-18",
+                                              "Motor": "paralelo"})
+    with log.open(newline="", encoding="utf8") as f:
+        assert [r["Motor"] for r in csv.DictReader(f)] == ["lazy", "lazy", "paralelo"]
+    assert _cover_runs() == 3
+
+    historico.ingest_all()                       # reingestão completa também não duplica
+    assert _cover_runs() == 3
+
+def test_rows_keyed_with_explicit_default_are_still_known(logdir):
+    log = Path("prog2_saida/cover14_log.csv")
+    cover_engine.append_log(log, OLD_HEADER, {"SB_size": 532566, "Tempo (s)": 82.3,
+                                              "Pico RAM (MB)": 800, "Data": "2025-06-16",
+                                              "Motor": "lazy"})
+    con = historico.connect()
+    try:                                         # chave no formato anterior (com Motor)
+        with con:
+            con.execute("UPDATE runs SET chave = ?", (historico._key(
+                "cover", "prog2_saida/cover14_log.csv", 0,
+                {"SB_size": "532566", "Tempo (s)": "82.3", "Pico RAM (MB)": "800",
+                 "Motor": "lazy"}, keep=True),))
+    finally:
+        con.close()
+    historico.ingest_all()
+    assert _cover_runs() == 1
@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+# AUTOR: Leonardo dos Santos Marques
+"""
+tests/test_importtime.py — partida dos subcomandos de `python -m lotofacil`.
+
+Cada subcomando leve é importado num interpretador novo (lotofacil.cli.probe):
+não pode carregar numpy/psutil/bitarray/matplotlib e a importação tem de ficar
+abaixo de DEFAULT_LIMIT_MS.  Os pesados só precisam não quebrar a sonda,
+com ou sem numpy instalado.
+
+    python -m pytest -q tests/test_importtime.py
+"""
+import os, sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+os.chdir(ROOT)                                   # a sonda importa os scripts da raiz
+
+from lotofacil import cli
+
+def _args(cmd):
+    return ("14",) if cmd == "cover" else ()
+
+@pytest.mark.parametrize("cmd", cli.LIGHT)
+def test_light_command_imports_fast_without_heavy(cmd):
+    _, imp, heavy, missing = cli.probe(cmd, _args(cmd), repeat=3)
+    assert missing is None, f"{cmd} requer {missing}"
+    assert heavy == [], f"{cmd} carregou {', '.join(heavy)}"
+    assert imp < cli.DEFAULT_LIMIT_MS, f"{cmd}: importação {imp:.0f} ms"
+
+@pytest.mark.parametrize("cmd", [c for c in cli.COMMANDS if c not in cli.LIGHT])
+def test_heavy_command_probe_reports_missing_dependency(cmd):
+    _, imp, heavy, missing = cli.probe(cmd, _args(cmd), repeat=1)
+    assert (imp is None) == (missing is not None)
+    if missing:
+        assert missing in cli.HEAVY
+
+def test_every_command_is_classified():
+    assert set(cli.LIGHT) <= set(cli.COMMANDS)
@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# AUTOR: Leonardo dos Santos Marques
+"""
+timeline.py — linha do tempo de recursos de um processo (e descendentes).
+
+Uma thread em segundo plano lê /proc/<pid> a cada --sample-ms e guarda a
+série completa (nada de "último valor" ou só o pico):
+
+    t_ms · nproc · rss_kb · hwm_kb · user_ms · sys_ms · rchar · wchar ·
+    read_bytes · write_bytes · minflt · majflt · fase
+
+• hwm_kb é o VmHWM do kernel (pico real de RSS do processo raiz, mesmo
+  entre amostras); rss_kb soma a árvore inteira.
+• CPU inclui cutime/cstime, então filhos já encerrados não "somem".
+• fase = última linha de progresso ("▶ …", "⚙ …") impressa pelo processo —
+  o stdout é repassado ao terminal e marcado no caminho, de modo que um
+  estouro de memória fica atribuído à etapa que o causou.
+
+Saída: CSV (ou NDJSON, se o nome terminar em .ndjson) por execução, mais
+as curvas de vazão (MB/s lidos/gravados, CPU %, RSS) em janelas de
+--window segundos e um resumo por fase.
+
+Sem /proc (Windows/macOS) recorre ao psutil, se instalado.
+
+Uso:
+    python timeline.py -o run.csv -- python programa2.py --stream
+    python timeline.py --curves run.csv          # recalcula curvas/resumo
+(bench.py usa o Recorder em run_generator e, com --timeline, no --pipeline)
+"""
+from __future__ import annotations
+
+import argparse, csv, json, os, re, subprocess, sys, threading, time
+from pathlib import Path
+from typing import Dict, IO, Iterable, List, Optional
+
+FIELDS = ["t_ms", "nproc", "rss_kb", "hwm_kb", "user_ms", "sys_ms", "rchar", "wchar",
+          "read_bytes", "write_bytes", "minflt", "majflt", "fase"]
+CURVE_FIELDS = ["t (s)", "Fase", "RSS (MB)", "CPU (%)", "Lido (MB/s)", "Gravado (MB/s)",
+                "Falhas/s"]
+DEFAULT_SAMPLE_MS = 20
+DEFAULT_WINDOW_S = 0.5
+PHASE_RE = re.compile(r"^\s*(▶|⚙|🏁)")        # linhas de progresso dos scripts
+
+PROC = Path("/proc")
+HAS_PROC = (PROC / "self" / "stat").exists()
+
+psutil = None
+if not HAS_PROC:                              # só fora do Linux (importação custa)
+    try:
+        import psutil
+    except ImportError:
+        pass
+
+_TICK_MS = 1000 / os.sysconf("SC_CLK_TCK") if HAS_PROC else 10.0
+_PAGE_KB = os.sysconf("SC_PAGE_SIZE") // 1024 if HAS_PROC else 4
+# /proc/<pid>/task/<tid>/children depende de CONFIG_PROC_CHILDREN
+HAS_CHILDREN = (PROC / "self" / "task" / str(os.getpid()) / "children").exists()
+
+# ─── Leitura de /proc ──────────────────────────────────────────────────────
+def _children(pid: int) -> List[int]:
+    kids: List[int] = []
+    if not HAS_CHILDREN:                       # varre /proc pelo ppid
+        for d in PROC.iterdir():
+            if d.name.isdigit():
+                try:
+                    raw = (d / "stat").read_text()
+                except (FileNotFoundError, ProcessLookupError):
+                    continue
+                if int(raw[raw.rindex(")") + 2:].split()[1]) == pid:
+                    kids.append(int(d.name))
+        return kids
+    try:
+        for task in (PROC / str(pid) / "task").iterdir():
+            kids += map(int, (task / "children").read_text().split())
+    except (FileNotFoundError, ProcessLookupError, PermissionError):
+        pass
+    return kids
+
+def _tree(pid: int) -> List[int]:
+    out, todo = [], [pid]
+    while todo:
+        p = todo.pop()
+        out.append(p)
+        todo += _children(p)
+    return out
+
+def _read_proc(pid: int) -> Optional[Dict[str, int]]:
+    """Contadores de um pid (None se já sumiu)."""
+    try:
+        raw = (PROC / str(pid) / "stat").read_text()
+    except (FileNotFoundError, ProcessLookupError):
+        return None
+    f = raw[raw.rindex(")") + 2:].split()      # f[0] = campo 3 (state)
+    row = {
+        "rss_kb": int(f[21]) * _PAGE_KB,
+        "user_ms": (int(f[11]) + int(f[13])) * _TICK_MS,   # utime + cutime
+        "sys_ms": (int(f[12]) + int(f[14])) * _TICK_MS,    # stime + cstime
+        "minflt": int(f[7]), "majflt": int(f[9]),
+        "rchar": 0, "wchar": 0, "read_bytes": 0, "write_bytes": 0,
+    }
+    try:
+        for line in (PROC / str(pid) / "io").read_text().splitlines():
+            key, _, val = line.partition(":")
+            if key in row:
+                row[key] = int(val)
+    except (FileNotFoundError, ProcessLookupError, PermissionError):
+        pass
+    return row
+
+def _read_hwm(pid: int) -> int:
+    try:
+        for line in (PROC / str(pid) / "status").read_text().splitlines():
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1])
+    except (FileNotFoundError, ProcessLookupError):
+        pass
+    return 0
+
+def _sample_proc(pid: int) -> Optional[dict]:
+    total: Optional[dict] = None
+    n = 0
+    for p in _tree(pid):
+        row = _read_proc(p)
+        if row is None:
+            if p == pid:
+                return None
+            continue
+        n += 1
+        if total is None:
+            total = row
+        else:
+            for key, val in row.items():
+                total[key] += val
+    if total is not None:
+        total["nproc"] = n
+        total["hwm_kb"] = _read_hwm(pid)
+    return total
+
+def _sample_psutil(pid: int) -> Optional[dict]:
+    try:
+        root = psutil.Process(pid)
+        procs = [root] + root.children(recursive=True)
+    except psutil.Error:
+        return None
+    total = dict.fromkeys(("rss_kb", "hwm_kb", "user_ms", "sys_ms", "minflt", "majflt",
+                           "rchar", "wchar", "read_bytes", "write_bytes"), 0)
+    n = 0
+    for p in procs:
+        try:
+            with p.oneshot():
+                mi, ct = p.memory_info(), p.cpu_times()
+                total["rss_kb"] += mi.rss // 1024
+                total["user_ms"] += (ct.user + getattr(ct, "children_user", 0)) * 1000
+                total["sys_ms"] += (ct.system + getattr(ct, "children_system", 0)) * 1000
+                if hasattr(p, "io_counters"):
+                    io_ = p.io_counters()
+                    total["read_bytes"] += io_.read_bytes
+                    total["write_bytes"] += io_.write_bytes
+                if p is root:
+                    total["hwm_kb"] = getattr(mi, "peak_wset", 0) // 1024
+            n += 1
+        except psutil.Error:
+            if p is root:
+                return None
+    total["nproc"] = n
+    return total
+
+# ─── Gravador ──────────────────────────────────────────────────────────────
+class Recorder:
+    """Amostra `pid` em uma thread até o processo sumir (ou stop())."""
+
+    def __init__(self, pid: int, sample_ms: int = DEFAULT_SAMPLE_MS) -> None:
+        self.pid, self.interval = pid, sample_ms / 1000
+        self.samples: List[dict] = []
+        self.phase = "-"
+        self._sample = _sample_proc if HAS_PROC else (_sample_psutil if psutil else None)
+        self._stop = threading.Event()
+        self._t0 = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self) -> "Recorder":
+        self._thread.start()
+        return self
+
+    def mark(self, label: str) -> None:
+        """Muda a fase corrente (vale para as próximas amostras)."""
+        self.phase = label.split("\r")[0].strip()[:60] or "-"
+
+    def follow(self, stream: IO[bytes], echo: IO[str] = sys.stdout) -> threading.Thread:
+        """Repassa o stdout do processo e marca fases nas linhas de progresso.
+
+        Lê em binário: os "\r" das barras de progresso passam intactos.
+        """
+        def pump() -> None:
+            for raw in stream:
+                line = raw.decode("utf8", "replace")
+                echo.write(line)
+                echo.flush()
+                if PHASE_RE.match(line):
+                    self.mark(line)
+        th = threading.Thread(target=pump, daemon=True)
+        th.start()
+        return th
+
+    def _run(self) -> None:
+        if self._sample is None:
+            return
+        nxt = time.perf_counter()
+        while not self._stop.is_set():
+            row = self._sample(self.pid)
+            if row is None:
+                break
+            row["t_ms"] = round((time.perf_counter() - self._t0) * 1000)
+            row["fase"] = self.phase
+            self.samples.append(row)
+            nxt += self.interval
+            self._stop.wait(max(0.0, nxt - time.perf_counter()))
+
+    def stop(self) -> List[dict]:
+        self._stop.set()
+        self._thread.join()
+        return self.samples
+
+    # — métricas agregadas (compatíveis com as colunas do bench) —
+    def peak_rss_kb(self) -> int:
+        return max((max(s["rss_kb"], s["hwm_kb"]) for s in self.samples), default=0)
+
+    def last(self, key: str) -> float:
+        return self.samples[-1][key] if self.samples else 0
+
+# ─── Persistência ──────────────────────────────────────────────────────────
+def save(samples: List[dict], path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", newline="", encoding="utf8") as f:
+        if path.suffix == ".ndjson":
+            for s in samples:
+                f.write(json.dumps({k: s[k] for k in FIELDS}, ensure_ascii=False) + "\n")
+        else:
+            w = csv.DictWriter(f, fieldnames=FIELDS, extrasaction="ignore")
+            w.writeheader()
+            w.writerows(samples)
+
+def load(path: Path) -> List[dict]:
+    with path.open(encoding="utf8") as f:
+        if path.suffix == ".ndjson":
+            return [json.loads(line) for line in f if line.strip()]
+        rows = list(csv.DictReader(f))
+    for r in rows:
+        for k in FIELDS[:-1]:
+            r[k] = float(r[k])
+    return rows
+
+# ─── Curvas de vazão e resumo por fase ─────────────────────────────────────
+def curves(samples: List[dict], window_s: float = DEFAULT_WINDOW_S) -> List[dict]:
+    """Taxas por janela: deltas de contadores ÷ Δt entre amostras-limite."""
+    out: List[dict] = []
+    if len(samples) < 2:
+        return out
+    prev = samples[0]
+    for s in samples[1:]:
+        dt = (s["t_ms"] - prev["t_ms"]) / 1000
+        if dt < window_s and s is not samples[-1]:
+            continue
+        dt = dt or 1e-9
+        cpu = (s["user_ms"] + s["sys_ms"] - prev["user_ms"] - prev["sys_ms"]) / 1000
+        out.append({
+            "t (s)": round(s["t_ms"] / 1000, 3),
+            "Fase": s["fase"],
+            "RSS (MB)": round(s["rss_kb"] / 1024, 1),
+            "CPU (%)": round(100 * max(cpu, 0) / dt, 1),
+            "Lido (MB/s)": round(max(s["rchar"] - prev["rchar"], 0) / 1_048_576 / dt, 2),
+            "Gravado (MB/s)": round(max(s["wchar"] - prev["wchar"], 0) / 1_048_576 / dt, 2),
+            "Falhas/s": round(max(s["minflt"] + s["majflt"]
+                                  - prev["minflt"] - prev["majflt"], 0) / dt),
+        })
+        prev = s
+    return out
+
+def phase_summary(samples: List[dict]) -> List[dict]:
+    """Por fase (na ordem em que aparecem): duração, pico RSS, vazões médias."""
+    groups: Dict[str, List[dict]] = {}
+    for s in samples:
+        groups.setdefault(s["fase"], []).append(s)
+    out = []
+    for name, rows in groups.items():
+        a, b = rows[0], rows[-1]
+        dt = max((b["t_ms"] - a["t_ms"]) / 1000, 1e-9)
+        out.append({
+            "Fase": name,
+            "Início (s)": round(a["t_ms"] / 1000, 2),
+            "Duração (s)": round(dt, 2),
+            "Pico RSS (MB)": round(max(r["rss_kb"] for r in rows) / 1024, 1),
+            "Δ RSS (MB)": round((b["rss_kb"] - a["rss_kb"]) / 1024, 1),
+            "CPU (%)": round(100 * (b["user_ms"] + b["sys_ms"]
+                                    - a["user_ms"] - a["sys_ms"]) / 1000 / dt, 1),
+            "Gravado (MB/s)": round((b["wchar"] - a["wchar"]) / 1_048_576 / dt, 2),
+        })
+    return out
+
+def print_summary(samples: List[dict]) -> None:
+    if not samples:
+        print("   (linha do tempo vazia)")
+        return
+    print(f"   {'Fase':<40} {'início':>7} {'dur.':>7} {'pico MB':>8} "
+          f"{'ΔMB':>7} {'CPU%':>6} {'grav MB/s':>9}")
+    for r in phase_summary(samples):
+        print(f"   {r['Fase'][:40]:<40} {r['Início (s)']:>7} {r['Duração (s)']:>7} "
+              f"{r['Pico RSS (MB)']:>8} {r['Δ RSS (MB)']:>7} {r['CPU (%)']:>6} "
+              f"{r['Gravado (MB/s)']:>9}")
+
+def save_outputs(samples: List[dict], path: Path, window_s: float = DEFAULT_WINDOW_S) -> None:
+    """Grava série + curvas (<nome>_curvas.csv) e imprime o resumo por fase."""
+    save(samples, path)
+    curve_path = path.with_name(path.stem + "_curvas.csv")
+    with curve_path.open("w", newline="", encoding="utf8") as f:
+        w = csv.DictWriter(f, fieldnames=CURVE_FIELDS)
+        w.writeheader()
+        w.writerows(curves(samples, window_s))
+    print(f"📈 Linha do tempo: {path} ({len(samples)} amostras) · curvas: {curve_path}")
+    print_summary(samples)
+
+def run(cmd: List[str], sample_ms: int = DEFAULT_SAMPLE_MS,
+        follow: bool = True) -> "tuple[int, Recorder]":
+    """Executa `cmd` sob o gravador; devolve (returncode, recorder)."""
+    env = {**os.environ, "PYTHONUNBUFFERED": "1"}      # fases chegam na hora
+    proc = subprocess.Popen(cmd, env=env, stdout=subprocess.PIPE if follow else None)
+    rec = Recorder(proc.pid, sample_ms).start()
+    pump = rec.follow(proc.stdout) if follow else None
+    rc = proc.wait()
+    if pump:
+        pump.join()
+    rec.stop()
+    return rc, rec
+
+# ─── CLI ───────────────────────────────────────────────────────────────────
+def main(argv: Optional[Iterable[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="Linha do tempo de recursos de um comando")
+    ap.add_argument("-o", "--out", type=Path, default=Path("timeline.csv"),
+                    help="série de amostras (.csv ou .ndjson)")
+    ap.add_argument("--sample-ms", type=int, default=DEFAULT_SAMPLE_MS,
+                    help="intervalo entre amostras (ms)")
+    ap.add_argument("--window", type=float, default=DEFAULT_WINDOW_S,
+                    help="janela das curvas de vazão (s)")
+    ap.add_argument("--curves", type=Path, metavar="SERIE",
+                    help="só recalcula curvas/resumo de uma série já gravada")
+    ap.add_argument("cmd", nargs=argparse.REMAINDER, help="-- comando a executar")
+    args = ap.parse_args(argv)
+
+    if args.curves:
+        if not args.curves.exists():
+            sys.exit(f"❌ {args.curves} não encontrado.")
+        save_outputs(load(args.curves), args.curves, args.window)
+        return
+    cmd = args.cmd[1:] if args.cmd[:1] == ["--"] else args.cmd
+    if not cmd:
+        sys.exit("❌ informe o comando após --")
+    if not HAS_PROC and psutil is None:
+        sys.exit("❌ sem /proc: instale psutil para amostrar processos.")
+    rc, rec = run(cmd, args.sample_ms)
+    save_outputs(rec.samples, args.out, args.window)
+    sys.exit(rc)
+
+if __name__ == "__main__":
+    main()
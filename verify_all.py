@@ -3,21 +3,64 @@
 # verify_all.py – Valida SB15_k (k = 14…11) em lote
 #
 # Uso:  python verify_all.py
+#       python verify_all.py --jobs 8     # k e fatias do SB em paralelo
 #
 # Requer diretórios/nomes padrão gerados pelos nossos scripts:
 #   resultados/Sk.csv          (k = 14, 13, 12, 11)
 #   progN_saida/SB15_k.csv     (N = 2, 3, 4, 5)
+# Se houver um SB15_k.sb atualizado (sbformat.py), ele é lido no lugar do
+# texto — mesmas máscaras, sem parsing.
+#
+# Modo --diag [K…]: conta quantas vezes cada S_k é coberta (contador uint8
+# saturado em 255, um byte por máscara → 32 MiB fixos, SB lido em blocos) e
+# grava, em progN_saida/:
+#   diagK_histograma.csv     multiplicidade → nº de S_k
+#   diagK_descobertas.csv    S_k não cobertas (mesmo formato de Sk.csv)
+#   diagK_sobrecobertas.csv  S_k mais cobertas (--top)
+#   diagK_redundantes.csv    cartões do SB removíveis sem perder cobertura
+#
+# Modo incremental (--state / --add / --remove): mantém, ao lado de cada SB,
+# um arquivo SB15_k.cov mapeado em memória com a multiplicidade de cada
+# máscara (uint8 se C(25-k,15-k) ≤ 255, senão uint16) mais um cabeçalho com
+# o nº de S_k descobertas e um hash multiconjunto do SB.  Incluir/remover um
+# cartão custa O(C(15,k)) e a checagem de cobertura é O(1); o texto e o .sb
+# recebem só o anexo (remoção: regravação por fatias de bytes) e o hash do
+# texto no manifesto fica pendente até alguém pedir (manifest.current_digest).
+#   python verify_all.py --state            # cria/atualiza e confere 14…11
+#   python verify_all.py --add 11 novos.csv # anexa cartões ao SB15_11
+#   python verify_all.py --remove 11 fora.csv
+#
+# Modo --jobs N: os quatro k são verificados ao mesmo tempo e cada SB é
+# dividido em fatias de cartões (.sb) ou de bytes alinhadas em fim de linha
+# (texto).  Cada worker marca
+# um bitmap parcial indexado pela própria máscara de 25 bits (2^25 bits =
+# 4 MiB, em memória compartilhada) e o processo principal faz o OR das
+# fatias.  Como a máscara já é o índice, o S_k.csv não precisa ser lido.
+#
+# Modo --sample N: checagem rápida por amostragem, sem ler S_k.csv.  Sorteia
+# N postos uniformes em [0, C(25,k)), desfaz o posto (sistema combinatório,
+# vetorizado) em máscaras S_k e testa a continência contra o SB: cada S_k
+# está contida em C(25-k,15-k) máscaras de 15 números (11 … 1 001), buscadas
+# por np.searchsorted no SB ordenado — mais barato que varrer o SB inteiro
+# por amostra.  Com x descobertas em N, informa o limite superior de
+# Clopper‑Pearson (unilateral, --confianca) da fração descoberta.  Qualquer
+# descoberta é falha certa.  Requer numpy.
+#   python verify_all.py --sample 2000 --confianca 0.99
+#
+# Modo --daemon: pergunta ao sbdaemon.py (SB e mapas de cobertura residentes)
+# — após a 1ª montagem dos mapas, cada verificação completa custa ms.
 #
 # Dependências: psutil (opcional) | bitarray (opcional – mais rápido)
 
 from pathlib import Path
 from itertools import combinations
-import csv, sys, time
+from collections import Counter
+from contextlib import closing
+from math import ceil, comb
+import argparse, csv, hashlib, math, mmap, os, struct, sys, time
 
-try:
-    import bitarray
-except ImportError:
-    bitarray = None
+import manifest
+import sbformat
 
 BASE_IN = Path("resultados")
 SB_DIRS = {
@@ -60,6 +103,10 @@ def verify_k(k):
     total = len(idx)
 
     # 2) vetor de cobertura
+    try:
+        import bitarray
+    except ImportError:
+        bitarray = None
     covered = bitarray.bitarray(total) if bitarray else [False] * total
     if bitarray:
         covered.setall(False)
@@ -67,29 +114,691 @@ def verify_k(k):
     omit = list(combinations(range(15), 15 - k))  # tuplas a omitir
     print(f"   • S{k}: {total:,} seqs  ·  cada S15 cobre {SUB_PER_LINE[k]} delas")
 
-    with sb_file.open() as f:
-        for row in csv.reader(f):
-            nums = list(map(int, row))
-            bits = [1 << (n - 1) for n in nums]
-            full = sum(bits)
-            for o in omit:
-                m = full
-                for i in o:                     # remove 15-k bits
-                    m ^= bits[i]
-                covered[idx[m]] = True
+    for nums in sbformat.iter_nums(sb_file):    # .sb se atualizado, senão CSV
+        bits = [1 << (n - 1) for n in nums]
+        full = sum(bits)
+        for o in omit:
+            m = full
+            for i in o:                         # remove 15-k bits
+                m ^= bits[i]
+            covered[idx[m]] = True
 
     ok = covered.all() if bitarray else (False not in covered)
     elapsed = time.perf_counter() - t0
     if ok:
+        manifest.set_verified(sb_file, True, "verify_all.py")
         print(f"   ✔ Cobertura 100 % confirmada em {elapsed:.1f}s")
     else:
         missing = (covered.count(False) if bitarray else covered.count(False))
+        manifest.set_verified(sb_file, False, "verify_all.py", missing)
         sys.exit(f"❌ Falha: {missing} sequências S{k} não cobertas.")
 
+# ─── Modo paralelo (--jobs N) ────────────────────────────────────────────────
+MASK_BYTES = 1 << 22        # 2^25 máscaras possíveis → 1 bit cada
+SHARDS_PER_JOB = 2          # fatias extras para balancear a fila
+
+def plan_shards(path, n_shards):
+    """Divide o SB em n intervalos [ini, fim): cartões no .sb, bytes no texto."""
+    size = (sbformat.read_header(path)["cartoes"] if sbformat.is_binary(path)
+            else path.stat().st_size)
+    step = max(1, ceil(size / n_shards))
+    return [(a, min(a + step, size)) for a in range(0, size, step)]
+
+def iter_shard(sb_path, start, end):
+    """Máscaras S15 da fatia; no texto, uma linha pertence à fatia do 1º byte."""
+    if sbformat.is_binary(sb_path):
+        yield from sbformat.load_range(sb_path, start, end)
+        return
+    with open(sb_path, "rb") as f:
+        if start:
+            f.seek(start - 1)
+            f.readline()                     # resto da linha da fatia anterior
+        while f.tell() < end:
+            line = f.readline()
+            if not line.strip():
+                if not line:
+                    break
+                continue
+            yield sbformat.text_to_mask(line)
+
+def verify_shard(k, sb_path, start, end, shm_name):
+    """Marca, num bitmap parcial, as S_k cobertas pelos cartões em [start, end).
+
+    Retorna o número de cartões processados.
+    """
+    omit = list(combinations(range(15), 15 - k))
+    part = bytearray(MASK_BYTES)
+    cards = 0
+    for full in iter_shard(sb_path, start, end):
+        bits = [1 << n for n in range(25) if full >> n & 1]
+        for o in omit:
+            m = full
+            for i in o:
+                m ^= bits[i]
+            part[m >> 3] |= 1 << (m & 7)
+        cards += 1
+
+    from multiprocessing import shared_memory
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        shm.buf[:MASK_BYTES] = part
+    finally:
+        shm.close()
+    return cards
+
+def verify_parallel(jobs):
+    """Verifica k = 14…11 concorrentemente, fatiando cada SB por linhas."""
+    from concurrent.futures import ProcessPoolExecutor   # só com --jobs (importação custa)
+    from multiprocessing import shared_memory
+    sb_files = {k: SB_DIRS[k] / f"SB15_{k}.csv" for k in SUB_PER_LINE}
+    for k, sb_file in sb_files.items():
+        if not sb_file.exists():
+            sys.exit(f"❌ Faltando {sb_file}  — execute programa correspondente para gerar SB15_{k}.csv.")
+    sources = {k: sbformat.resolve(p) for k, p in sb_files.items()}
+
+    # custo de uma fatia ∝ cartões × sub-combinações por linha
+    weight = {k: sbformat.count(sb_files[k]) * SUB_PER_LINE[k] for k in sb_files}
+    target = max(1, sum(weight.values()) / (jobs * SHARDS_PER_JOB))
+    tasks = []
+    for k in sorted(weight, key=weight.get, reverse=True):
+        for start, end in plan_shards(sources[k], max(1, ceil(weight[k] / target))):
+            tasks.append((k, start, end))
+    print(f"   • {len(tasks)} fatias em {jobs} processos")
+
+    t0 = time.perf_counter()
+    shms = [shared_memory.SharedMemory(create=True, size=MASK_BYTES) for _ in tasks]
+    try:
+        with ProcessPoolExecutor(max_workers=jobs) as ex:
+            futs = [ex.submit(verify_shard, k, str(sources[k]), a, b, shm.name)
+                    for (k, a, b), shm in zip(tasks, shms)]
+            cards = {k: 0 for k in sb_files}
+            for (k, _, _), fut in zip(tasks, futs):
+                cards[k] += fut.result()
+
+        # OR-reduce dos bitmaps parciais de cada k
+        acc = {k: 0 for k in sb_files}
+        for (k, _, _), shm in zip(tasks, shms):
+            acc[k] |= int.from_bytes(shm.buf[:MASK_BYTES], "little")
+    finally:
+        for shm in shms:
+            shm.close()
+            shm.unlink()
+    elapsed = time.perf_counter() - t0
+
+    failed = []
+    for k in sorted(sb_files, reverse=True):
+        total = comb(25, k)
+        missing = total - bin(acc[k]).count("1")
+        manifest.set_verified(sb_files[k], not missing, "verify_all.py --jobs", missing)
+        print(f"\n▶ k = {k}  (SB15_{k}: {cards[k]:,} cartões → S{k}: {total:,} seqs)")
+        if missing:
+            print(f"   ❌ {missing} sequências S{k} não cobertas.")
+            failed.append(k)
+        else:
+            print("   ✔ Cobertura 100 % confirmada")
+    print(f"\n⏱  {elapsed:.1f}s no total (paralelo)")
+    if failed:
+        sys.exit(f"❌ Falha de cobertura em k = {', '.join(map(str, failed))}.")
+
+# ─── Diagnóstico de multiplicidade (--diag) ─────────────────────────────────
+DIAG_TOP = 1_000            # S_k mais cobertas listadas
+COUNT_MAX = 255             # contador uint8 satura aqui
+
+def mask_to_seq(m):
+    return [i + 1 for i in range(25) if m >> i & 1]
+
+def iter_sb_masks(sb_file, k):
+    """Gera (máscara S15, máscaras S_k cobertas) — .sb, ou texto lido em blocos."""
+    return card_masks(sbformat.iter_masks(sb_file), k)
+
+def card_masks(fulls, k):
+    """(máscara S15, máscaras S_k cobertas) para cada cartão de `fulls`."""
+    omit = list(combinations(range(15), 15 - k))
+    for full in fulls:
+        bits = [1 << n for n in range(25) if full >> n & 1]
+        subs = []
+        for o in omit:
+            m = full
+            for i in o:
+                m ^= bits[i]
+            subs.append(m)
+        yield full, subs
+
+def coverage_counts(k, sb_file):
+    """Vetor uint8 (bytearray 2^25) com a cobertura de cada máscara S_k."""
+    counts = bytearray(1 << 25)
+    cards = 0
+    for _, subs in iter_sb_masks(sb_file, k):
+        for m in subs:
+            c = counts[m]
+            if c < COUNT_MAX:
+                counts[m] = c + 1
+        cards += 1
+    return counts, cards
+
+def multiplicity_histogram(k, counts):
+    """{multiplicidade: nº de S_k}; 0 = não coberta, 255 = 255 ou mais."""
+    hist = {}
+    for v in range(1, COUNT_MAX + 1):
+        n = counts.count(v.to_bytes(1, "little"))
+        if n:
+            hist[v] = n
+    hist[0] = comb(25, k) - sum(hist.values())
+    return dict(sorted(hist.items()))
+
+def uncovered_masks(k, counts):
+    for c in combinations(range(25), k):
+        m = 0
+        for v in c:
+            m |= 1 << v
+        if not counts[m]:
+            yield m
+
+def most_covered(counts, top):
+    """As `top` máscaras de maior multiplicidade (varredura via bytes.find)."""
+    out = []
+    for v in range(COUNT_MAX, 1, -1):
+        needle = v.to_bytes(1, "little")
+        pos = counts.find(needle)
+        while pos != -1 and len(out) < top:
+            out.append((pos, v))
+            pos = counts.find(needle, pos + 1)
+        if len(out) >= top:
+            break
+    return out
+
+def redundant_cards(k, sb_file, counts):
+    """Poda sequencial: cartão cujas S_k têm todas multiplicidade ≥ 2 sai do SB.
+
+    Os contadores são decrementados a cada remoção, então o conjunto
+    devolvido pode ser removido inteiro sem perder cobertura (contadores
+    saturados só subestimam a multiplicidade real — lado seguro).
+    """
+    removable = []
+    for full, subs in iter_sb_masks(sb_file, k):
+        if all(counts[m] >= 2 for m in subs):
+            for m in subs:
+                counts[m] -= 1
+            removable.append(sbformat.mask_to_text(full))
+    return removable
+
+def write_rows(path, rows):
+    with path.open("w", newline="", encoding="ascii") as f:
+        csv.writer(f).writerows(rows)
+
+def diagnose_k(k, top=DIAG_TOP):
+    """Diagnóstico completo de SB15_k; retorna nº de S_k não cobertas."""
+    sb_file = SB_DIRS[k] / f"SB15_{k}.csv"
+    if not sb_file.exists():
+        print(f"   • SB15_{k} ausente — diagnóstico de k = {k} ignorado.")
+        return 0
+
+    print(f"\n▶ Diagnóstico k = {k}  ({sb_file})")
+    t0 = time.perf_counter()
+    counts, cards = coverage_counts(k, sb_file)
+    hist = multiplicity_histogram(k, counts)
+    missing = hist.get(0, 0)
+
+    out = SB_DIRS[k]
+    write_rows(out / f"diag{k}_histograma.csv",
+               [("multiplicidade", "seqs")] + list(hist.items()))
+    print(f"   • {cards:,} cartões · multiplicidade → nº de S{k}:")
+    for v, n in hist.items():
+        label = f"{v}+" if v == COUNT_MAX else str(v)
+        print(f"      {label:>4} | {n:>10,}")
+
+    write_rows(out / f"diag{k}_descobertas.csv",
+               (mask_to_seq(m) for m in uncovered_masks(k, counts)) if missing else [])
+    write_rows(out / f"diag{k}_sobrecobertas.csv",
+               [["cobertura"] + [f"n{i}" for i in range(1, k + 1)]] +
+               [[v] + mask_to_seq(m) for m, v in most_covered(counts, top)])
+
+    removable = redundant_cards(k, sb_file, counts)
+    write_rows(out / f"diag{k}_redundantes.csv", (r.split(",") for r in removable))
+
+    print(f"   • {missing:,} não cobertas · {len(removable):,} cartões redundantes"
+          f" · {time.perf_counter() - t0:.1f}s → {out}/diag{k}_*.csv")
+    return missing
+
+# ─── Estado de cobertura persistido (--state/--add/--remove) ─────────────────
+STATE_MAGIC = b"LFCOV001"
+STATE_HDR = struct.Struct("<8sBB6xQQQQQ")  # magic k itemsize | descobertas
+STATE_HDR_SIZE = 64                        # cartões hash tamanho mtime_ns
+STATE_SLOTS = 1 << 25                      # um contador por máscara
+HASH_MOD = 1 << 64
+FIND_MAX = 32                              # --remove: cartões distintos por bytes.find
+
+def state_path(k):
+    return SB_DIRS[k] / f"SB15_{k}.cov"
+
+def card_hash(full):
+    """Hash de um cartão; a soma mod 2^64 dá o hash (multiconjunto) do SB."""
+    return int.from_bytes(hashlib.blake2b(full.to_bytes(4, "little"),
+                                          digest_size=8).digest(), "little")
+
+def sb_fingerprint(sb_file, k):
+    """(hash multiconjunto, nº de cartões) de um SB inteiro."""
+    h = cards = 0
+    for full in sbformat.iter_masks(sb_file):
+        h = (h + card_hash(full)) % HASH_MOD
+        cards += 1
+    return h, cards
+
+def build_state(k):
+    """(Re)constrói SB15_k.cov a partir do SB — custo de uma verificação."""
+    sb_file = SB_DIRS[k] / f"SB15_{k}.csv"
+    itemsize = 1 if comb(25 - k, 15 - k) <= 255 else 2
+    print(f"   • construindo {state_path(k)} (uint{8 * itemsize})…")
+    counts = bytearray(STATE_SLOTS * itemsize)
+    view = memoryview(counts).cast("B" if itemsize == 1 else "H")
+    h = cards = 0
+    missing = comb(25, k)
+    for full, subs in iter_sb_masks(sb_file, k):
+        for m in subs:
+            c = view[m]
+            missing -= c == 0
+            view[m] = c + 1
+        h = (h + card_hash(full)) % HASH_MOD
+        cards += 1
+    view.release()
+    st = sb_file.stat()
+    with state_path(k).open("wb") as f:
+        f.write(STATE_HDR.pack(STATE_MAGIC, k, itemsize, missing, cards, h,
+                               st.st_size, st.st_mtime_ns).ljust(STATE_HDR_SIZE, b"\0"))
+        f.write(counts)
+
+def read_state_header(k):
+    with state_path(k).open("rb") as f:
+        magic, k_, itemsize, missing, cards, h, size, mtime = STATE_HDR.unpack(
+            f.read(STATE_HDR.size))
+    if magic != STATE_MAGIC or k_ != k:
+        raise ValueError(f"{state_path(k)} inválido")
+    return {"itemsize": itemsize, "missing": missing, "cards": cards,
+            "hash": h, "size": size, "mtime_ns": mtime}
+
+def ensure_state(k):
+    """Garante estado coerente com o SB; O(1) quando tamanho/mtime batem."""
+    sb_file = SB_DIRS[k] / f"SB15_{k}.csv"
+    if not sb_file.exists():
+        sys.exit(f"❌ Faltando {sb_file}  — execute programa correspondente para gerar SB15_{k}.csv.")
+    if not state_path(k).exists():
+        build_state(k)
+        return read_state_header(k)
+    hdr = read_state_header(k)
+    st = sb_file.stat()
+    if (st.st_size, st.st_mtime_ns) == (hdr["size"], hdr["mtime_ns"]):
+        return hdr
+    # arquivo tocado: só reconstrói se o conteúdo (hash) realmente mudou
+    if sb_fingerprint(sb_file, k) == (hdr["hash"], hdr["cards"]):
+        with state_path(k).open("r+b") as f:
+            f.write(STATE_HDR.pack(STATE_MAGIC, k, hdr["itemsize"], hdr["missing"],
+                                   hdr["cards"], hdr["hash"], st.st_size, st.st_mtime_ns))
+        return read_state_header(k)
+    print(f"   • SB15_{k} mudou fora do verify_all — estado obsoleto.")
+    build_state(k)
+    return read_state_header(k)
+
+def read_cards(cards_file):
+    """Máscaras dos cartões de --add/--remove; sai na 1ª linha que não tiver
+    exatamente 15 dezenas distintas de 1 a 25 (antes de tocar no estado)."""
+    src = sbformat.resolve(Path(cards_file))
+    if sbformat.is_binary(src):
+        lines = enumerate(map(card_line, sbformat.load_masks(src)), 1)
+    else:
+        lines = enumerate(src.read_text(encoding="utf8").splitlines(), 1)
+    masks = []
+    for n, line in lines:
+        if not line.strip():
+            continue
+        try:
+            nums = [int(x) for x in line.split(",")]
+        except ValueError:
+            nums = []
+        if len(nums) != 15 or len(set(nums)) != 15 or not all(1 <= x <= 25 for x in nums):
+            sys.exit(f"❌ cartão inválido na linha {n} de {cards_file}: {line.strip()!r} "
+                     f"(15 dezenas distintas de 1 a 25)")
+        masks.append(sum(1 << (x - 1) for x in nums))
+    return masks
+
+def card_line(full):
+    """Linha do cartão como os programas 2‑5 gravam (sem as tabelas de sbformat)."""
+    return ",".join(map(str, mask_to_seq(full)))
+
+def drop_lines(sb_file, delta, k):
+    """(texto do SB sem os cartões de `delta`, posições das linhas tiradas).
+
+    Casamento como multiconjunto; sai sem tocar em nada se algum cartão não
+    está no SB.  Até FIND_MAX cartões distintos cada um é achado por
+    bytes.find no texto inteiro (velocidade de memchr); acima disso, um passe
+    pelas linhas.
+    """
+    left = Counter(card_line(full).encode() for full, _ in delta)
+    if len(left) <= FIND_MAX:
+        size = sb_file.stat().st_size             # "\n" + texto + "\n", lido sem cópias
+        text = bytearray(size + 2)
+        with sb_file.open("rb") as f:
+            f.readinto(memoryview(text)[1:size + 1])
+        text[0] = text[-1] = 10
+        spans = []
+        for line, n in left.items():
+            needle, pos = b"\n" + line + b"\n", -1
+            for _ in range(n):
+                pos = text.find(needle, pos + 1)
+                if pos < 0:
+                    break
+                spans.append(pos)
+                left[line] -= 1
+    else:
+        lines = sb_file.read_bytes().split(b"\n")
+        if lines and not lines[-1]:
+            lines.pop()
+        hits = []
+        for i, line in enumerate(lines):
+            if left.get(line):
+                left[line] -= 1
+                hits.append(i)
+    absent = +left
+    if absent:
+        sys.exit(f"❌ {sum(absent.values())} cartão(ões) removido(s) não pertence(m) ao SB15_{k}"
+                 f" (ex.: {next(iter(absent)).decode()}).")
+    if len(left) > FIND_MAX:
+        return b"\n".join(without(lines, hits)), hits
+    spans.sort()
+    view, idx, pieces, prev, line_no = memoryview(text), [], [], 0, -1
+    for pos in spans:                           # "\n" em pos abre a linha tirada
+        line_no += text.count(b"\n", prev, pos + 1)
+        idx.append(line_no)
+        end = text.index(b"\n", pos + 1)
+        pieces.append(view[prev:pos + 1])
+        prev = end + 1
+        line_no += 1                            # o "\n" final da linha já foi pulado
+    pieces.append(view[prev:])
+    return memoryview(b"".join(pieces))[1:-1], idx
+
+def without(seq, idx):
+    """Cópia de `seq` (list ou array) sem as posições `idx` (crescentes), por fatias."""
+    out, prev = seq[:0], 0
+    for i in idx:
+        out += seq[prev:i]
+        prev = i + 1
+    return out + seq[prev:]
+
+def update_state(k, cards_file, remove=False):
+    """Inclui/remove os cartões de `cards_file` no SB15_k e no estado mapeado.
+
+    Incluir anexa ao texto e ao payload do .sb (sbformat.append_binary);
+    remover regrava o texto por fatias de bytes e o .sb a partir do próprio
+    payload.  O hash do texto fica pendente no manifesto (calculado por
+    manifest.current_digest quando alguém pedir) e um .sb que não dá para
+    remendar fica obsoleto até o próximo --state.
+    """
+    sb_file = SB_DIRS[k] / f"SB15_{k}.csv"
+    sb_bin = sbformat.bin_path(sb_file)
+    delta = list(card_masks(read_cards(cards_file), k))
+    hdr = ensure_state(k)
+    t0 = time.perf_counter()
+    patch = sbformat.resolve(sb_file) == sb_bin     # .sb corresponde ao texto atual
+    if remove:                      # contadores ≥ 1 não provam que o cartão está no SB
+        kept_text, drop = drop_lines(sb_file, delta, k)
+
+    with state_path(k).open("r+b") as f, mmap.mmap(f.fileno(), 0) as mm:
+        view = memoryview(mm)[STATE_HDR_SIZE:].cast("B" if hdr["itemsize"] == 1 else "H")
+        need = {}
+        for _, subs in delta:
+            for m in subs:
+                need[m] = need.get(m, 0) + 1
+        # valida tudo antes de tocar no estado (falha não deixa meio-update)
+        top = (1 << (8 * hdr["itemsize"])) - 1
+        if remove and any(view[m] < n for m, n in need.items()):
+            view.release()
+            sys.exit(f"❌ Estado {state_path(k)} incoerente com SB15_{k} — apague-o e rode --state.")
+        if not remove and any(view[m] + n > top for m, n in need.items()):
+            view.release()
+            sys.exit(f"❌ Contador estouraria em {state_path(k)} (cartões repetidos?).")
+
+        missing, cards, h = hdr["missing"], hdr["cards"], hdr["hash"]
+        for full, subs in delta:
+            for m in subs:
+                c = view[m]
+                if remove:
+                    view[m] = c - 1
+                    missing += c == 1
+                else:
+                    view[m] = c + 1
+                    missing -= c == 0
+            hc = card_hash(full)
+            h = (h - hc if remove else h + hc) % HASH_MOD
+            cards += -1 if remove else 1
+        view.release()
+
+        # aplica a mesma mudança ao SB texto e ao .sb
+        params = {"k": k, "delta": f"{'-' if remove else '+'}{len(delta)}"}
+        if remove:
+            tmp = sb_file.with_suffix(".tmp")
+            tmp.write_bytes(kept_text)
+            os.replace(tmp, sb_file)
+            manifest.record(sb_file, cards, None, "verify_all.py", params)
+            if patch:
+                kept = without(sbformat.load_masks(sb_bin), drop)
+                sbformat.write_binary(sb_file, kept, k, None, "verify_all.py", params,
+                                      sbformat.read_header(sb_bin)["codificacao"])
+        elif delta:
+            sep = b"\n" if sb_file.stat().st_size else b""
+            with sb_file.open("ab") as out:
+                out.write(sep + "\n".join(card_line(full) for full, _ in delta).encode("ascii"))
+            manifest.record(sb_file, cards, None, "verify_all.py", params)
+            if patch:
+                patch = sbformat.append_binary(sb_file, (full for full, _ in delta), None,
+                                               "verify_all.py", params)
+        manifest.set_verified(sb_file, not missing, "verify_all.py --state", missing)
+
+        st = sb_file.stat()
+        mm[:STATE_HDR.size] = STATE_HDR.pack(STATE_MAGIC, k, hdr["itemsize"], missing,
+                                             cards, h, st.st_size, st.st_mtime_ns)
+        mm.flush()
+
+    op = "removidos" if remove else "incluídos"
+    print(f"   • {len(delta)} cartões {op} em SB15_{k} em {1e3 * (time.perf_counter() - t0):.1f} ms"
+          f" → {cards:,} cartões, {missing:,} S{k} descobertas")
+    if delta and sb_bin.exists() and not patch:
+        print(f"   • {sb_bin} obsoleto — regravado no próximo --state")
+    return missing
+
+def refresh_binary(k):
+    """Regrava o .sb que --add/--remove deixaram obsoleto (fora do caminho quente)."""
+    sb_file = SB_DIRS[k] / f"SB15_{k}.csv"
+    sb_bin = sbformat.bin_path(sb_file)
+    if not sb_bin.exists() or sbformat.resolve(sb_file) == sb_bin:
+        return
+    print(f"   • regravando {sb_bin} (obsoleto)…")
+    sbformat.write_binary(sb_file, sbformat.load_masks(sb_file), k,
+                          manifest.current_digest(sb_file), "verify_all.py", {"k": k},
+                          sbformat.read_header(sb_bin)["codificacao"])
+
+def check_state(k):
+    refresh_binary(k)
+    t0 = time.perf_counter()
+    hdr = ensure_state(k)
+    ms = 1e3 * (time.perf_counter() - t0)
+    manifest.set_verified(SB_DIRS[k] / f"SB15_{k}.csv", not hdr["missing"],
+                          "verify_all.py --state", hdr["missing"])
+    if hdr["missing"]:
+        print(f"   ❌ k = {k}: {hdr['missing']:,} S{k} descobertas ({hdr['cards']:,} cartões, {ms:.1f} ms)")
+    else:
+        print(f"   ✔ k = {k}: cobertura 100 % ({hdr['cards']:,} cartões, {ms:.1f} ms)")
+    return hdr["missing"]
+
+# ─── Verificação por amostragem (--sample N) ────────────────────────────────
+SAMPLE_CONF = 0.95
+SAMPLE_BLOCK = 8_192        # amostras por bloco (bloco × C(25-k,15-k) máscaras)
+
+def unrank_masks(np, ranks, k):
+    """Postos colex (r = Σ C(c_i, i+1)) → máscaras S_k uint32, vetorizado."""
+    r = ranks.astype(np.int64)
+    masks = np.zeros(len(r), dtype=np.uint32)
+    for i in range(k, 0, -1):
+        row = np.array([comb(d, i) for d in range(25)], dtype=np.int64)
+        d = np.searchsorted(row, r, side="right") - 1   # maior d com C(d,i) ≤ r
+        r -= row[d]
+        masks |= np.left_shift(np.uint32(1), d.astype(np.uint32))
+    return masks
+
+def covered_sample(np, sorted_sb, samples, k):
+    """Máscara bool: alguma máscara do SB contém a amostra?"""
+    free = np.nonzero(((samples[:, None] >> np.arange(25, dtype=np.uint32)) & 1) == 0)[1]
+    free = free.reshape(len(samples), 25 - k).astype(np.uint32)
+    combos = np.array(list(combinations(range(25 - k), 15 - k)), dtype=np.intp)
+    sup = np.repeat(samples[:, None], len(combos), axis=1)
+    for j in range(15 - k):
+        sup |= np.left_shift(np.uint32(1), free[:, combos[:, j]])
+    pos = np.minimum(np.searchsorted(sorted_sb, sup), len(sorted_sb) - 1)
+    return (sorted_sb[pos] == sup).any(axis=1)
+
+def binom_cdf(x, n, p):
+    if p <= 0.0:
+        return 1.0
+    if p >= 1.0:
+        return 1.0 if x >= n else 0.0
+    lp, lq = math.log(p), math.log1p(-p)
+    return min(1.0, sum(math.exp(math.lgamma(n + 1) - math.lgamma(i + 1) - math.lgamma(n - i + 1)
+                                 + i * lp + (n - i) * lq) for i in range(x + 1)))
+
+def upper_bound(x, n, conf=SAMPLE_CONF):
+    """Clopper‑Pearson unilateral: maior p com P(X ≤ x | n, p) ≥ 1 − conf."""
+    alpha = 1 - conf
+    if x >= n:
+        return 1.0
+    if x == 0:
+        return 1 - alpha ** (1 / n)                     # forma fechada
+    lo, hi = x / n, 1.0
+    for _ in range(60):
+        mid = (lo + hi) / 2
+        if binom_cdf(x, n, mid) > alpha:
+            lo = mid
+        else:
+            hi = mid
+    return hi
+
+def sample_k(np, k, n, rng, conf=SAMPLE_CONF):
+    """Amostra n S_k; devolve nº de descobertas (e imprime o limite)."""
+    t0 = time.perf_counter()
+    sb_file = SB_DIRS[k] / f"SB15_{k}.csv"
+    if not sbformat.resolve(sb_file).exists():
+        sys.exit(f"❌ {sb_file} não encontrado.")
+    sb = np.sort(np.frombuffer(sbformat.load_masks(sb_file), dtype=np.uint32))
+    total = comb(25, k)
+    missing, examples = 0, []
+    for start in range(0, n, SAMPLE_BLOCK):
+        size = min(SAMPLE_BLOCK, n - start)
+        samples = unrank_masks(np, rng.integers(0, total, size), k)
+        miss = samples[~covered_sample(np, sb, samples, k)]
+        missing += len(miss)
+        examples += [int(m) for m in miss[:3 - len(examples)]]
+    ub = upper_bound(missing, n, conf)
+    ms = (time.perf_counter() - t0) * 1000
+    mark = "❌" if missing else "✔"
+    print(f"   {mark} k = {k}: {missing:,}/{n:,} descobertas · fração descoberta ≤ {ub:.2e} "
+          f"({conf:.0%}) → ≤ {ub * total:,.0f} S{k} · {len(sb):,} cartões · {ms:.0f} ms")
+    for m in examples:
+        print(f"      S{k} descoberta: {mask_to_seq(m)}")
+    return missing
+
+def verify_sample(n, conf, seed):
+    np = sbformat._numpy()
+    if np is None:
+        sys.exit("❌ --sample requer numpy (pip install numpy).")
+    if n < 1 or not 0 < conf < 1:
+        sys.exit("❌ --sample N ≥ 1 e 0 < --confianca < 1.")
+    seed = seed if seed is not None else int.from_bytes(os.urandom(4), "little")
+    print(f"=== Verificação por amostragem SB15_k (N = {n:,}, semente {seed}) ===")
+    rng = np.random.default_rng(seed)
+    bad = [str(k) for k in (14, 13, 12, 11) if sample_k(np, k, n, rng, conf)]
+    if bad:
+        sys.exit(f"\n❌ S_k descobertas em k = {', '.join(bad)} (falha certa; rode --diag).")
+    print("\n✅ Nenhuma descoberta na amostra (limites acima).")
+
+def verify_daemon():
+    import sbdaemon
+    cli = sbdaemon.connect()
+    if cli is None:
+        sys.exit(f"❌ nenhum daemon em {sbdaemon.DEFAULT_SOCKET} (python sbdaemon.py serve &).")
+    print("=== Verificação via sbdaemon SB15_k ===")
+    bad = []
+    with closing(cli):
+        for k in (14, 13, 12, 11):
+            t0 = time.perf_counter()
+            missing, examples = cli.verify(k, 3)
+            ms = (time.perf_counter() - t0) * 1000
+            if missing:
+                bad.append(str(k))
+                print(f"   ❌ k = {k}: {missing:,} S{k} descobertas ({ms:.1f} ms)")
+                for m in examples:
+                    print(f"      S{k} descoberta: {mask_to_seq(m)}")
+            else:
+                print(f"   ✔ k = {k}: cobertura 100 % ({ms:.1f} ms)")
+    if bad:
+        sys.exit(f"\n❌ Falha de cobertura em k = {', '.join(bad)}.")
+    print("\n✅ Todos os quatro cenários estão corretos.")
+
+def parse_args():
+    ap = argparse.ArgumentParser(description="Valida SB15_k (k = 14…11) em lote")
+    ap.add_argument("--jobs", type=int, default=1,
+                    help="processos paralelos (1 = modo sequencial original)")
+    ap.add_argument("--diag", type=int, nargs="*", metavar="K",
+                    help="diagnóstico de multiplicidade (vazio → 14…11)")
+    ap.add_argument("--top", type=int, default=DIAG_TOP,
+                    help="S_k mais cobertas listadas no diagnóstico")
+    ap.add_argument("--state", type=int, nargs="*", metavar="K",
+                    help="checagem incremental via SB15_k.cov (vazio → 14…11)")
+    ap.add_argument("--add", nargs=2, metavar=("K", "CSV"),
+                    help="inclui os cartões do CSV no SB15_K e atualiza o estado")
+    ap.add_argument("--remove", nargs=2, metavar=("K", "CSV"),
+                    help="remove os cartões do CSV do SB15_K e atualiza o estado")
+    ap.add_argument("--sample", type=int, metavar="N",
+                    help="checagem rápida: N S_k sorteadas por k, sem ler S_k.csv")
+    ap.add_argument("--confianca", type=float, default=SAMPLE_CONF,
+                    help="nível do limite superior da fração descoberta (--sample)")
+    ap.add_argument("--seed", type=int, help="semente da amostra (padrão: aleatória)")
+    ap.add_argument("--daemon", action="store_true",
+                    help="verifica pelo sbdaemon.py (SB e mapas já em memória)")
+    return ap.parse_args()
+
 def main():
+    args = parse_args()
+    if args.daemon:
+        verify_daemon()
+        return
+    if args.sample is not None:
+        verify_sample(args.sample, args.confianca, args.seed)
+        return
+    if args.add or args.remove:
+        k, cards_file = args.add or args.remove
+        missing = update_state(int(k), cards_file, remove=bool(args.remove))
+        if missing:
+            sys.exit(f"❌ SB15_{k} deixou {missing:,} S{k} descobertas.")
+        return
+    if args.state is not None:
+        print("=== Verificação incremental SB15_k ===")
+        bad = [str(k) for k in (args.state or (14, 13, 12, 11)) if check_state(k)]
+        if bad:
+            sys.exit(f"\n❌ Falha de cobertura em k = {', '.join(bad)}.")
+        print("\n✅ Cobertura confirmada pelo estado incremental.")
+        return
+    if args.diag is not None:
+        print("=== Diagnóstico de cobertura SB15_k ===")
+        missing = {k: diagnose_k(k, args.top) for k in (args.diag or (14, 13, 12, 11))}
+        bad = [str(k) for k, n in missing.items() if n]
+        if bad:
+            sys.exit(f"\n❌ S_k não cobertas em k = {', '.join(bad)} — veja diagK_descobertas.csv.")
+        print("\n✅ Nenhuma S_k descoberta.")
+        return
+
     print("=== Verificação em lote SB15_k ===")
-    for k in (14, 13, 12, 11):
-        verify_k(k)
+    if args.jobs > 1:
+        verify_parallel(args.jobs)
+    else:
+        for k in (14, 13, 12, 11):
+            verify_k(k)
     print("\n✅ Todos os quatro cenários estão corretos.")
 
 if __name__ == "__main__":